@@ -4,36 +4,56 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 
+def read_counts(stats_dir: Path, spider_names: list[str]) -> dict[str, dict]:
+    """Read the counts of each spider from its stats, in the form of the run summary results."""
+    counts = {}
+    for spider_name in spider_names:
+        stats_file = stats_dir / f"{spider_name}.json"
+        if not stats_file.exists():
+            continue
+        try:
+            stats = json.loads(stats_file.read_text())
+        except (json.JSONDecodeError, OSError):
+            stats = {}
+        counts[spider_name] = {
+            "features": stats.get("item_scraped_count", 0),
+            "errors": stats.get("log_count/ERROR", 0),
+            "elapsed_time": stats.get("elapsed_time_seconds", 0),
+        }
+    return counts
+
+
 def build_manifest(
     group: str,
     run_id: str,
     run_url_prefix: str,
     spider_names: list[str],
-    stats_dir: Path,
+    stats_dir: Path | None,
     previous_manifest: dict | None,
+    results: list[dict] | None = None,
 ) -> dict:
     """Build a group manifest by merging current run results with previous manifest.
 
     Spiders that succeeded (non-zero item_scraped_count) get fresh entries.
     Spiders that failed or produced zero items keep their previous entry.
     Spiders no longer in the group are dropped.
+
+    The counts of each spider are taken from the run summary results if
+    given, rather than reading the stats of each spider again.
     """
     now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     previous_spiders = (previous_manifest or {}).get("spiders", {})
     spiders = {}
+    if results is not None:
+        counts = {result["spider"]: result for result in results}
+    else:
+        counts = read_counts(stats_dir, spider_names)
 
     for spider_name in spider_names:
-        stats_file = stats_dir / f"{spider_name}.json"
-
-        if stats_file.exists():
-            try:
-                stats = json.loads(stats_file.read_text())
-            except (json.JSONDecodeError, OSError):
-                stats = {}
-
-            feature_count = stats.get("item_scraped_count", 0) or 0
-            error_count = stats.get("log_count/ERROR", 0) or 0
-            elapsed_time = stats.get("elapsed_time_seconds", 0) or 0
+        if count := counts.get(spider_name):
+            feature_count = count.get("features", 0) or 0
+            error_count = count.get("errors", 0) or 0
+            elapsed_time = count.get("elapsed_time", 0) or 0
 
             if feature_count > 0:
                 spiders[spider_name] = {
@@ -65,14 +85,17 @@ def main():
     parser.add_argument("--run-id", required=True, help="Run timestamp ID")
     parser.add_argument("--run-url-prefix", required=True, help="URL prefix for this run")
     parser.add_argument("--spider-list", required=True, help="File with spider names, one per line")
-    parser.add_argument("--stats-dir", required=True, help="Directory containing per-spider stats JSON files")
+    stats = parser.add_mutually_exclusive_group(required=True)
+    stats.add_argument("--stats-dir", help="Directory containing per-spider stats JSON files")
+    stats.add_argument("--results", help="Run summary JSON file (stats/_results.json) of the spiders")
     parser.add_argument("--previous-manifest", help="Path to previous manifest JSON file (optional)")
     parser.add_argument("--output", required=True, help="Output manifest file path")
 
     args = parser.parse_args()
 
     spider_names = [s for s in Path(args.spider_list).read_text().strip().splitlines() if s]
-    stats_dir = Path(args.stats_dir)
+    stats_dir = Path(args.stats_dir) if args.stats_dir else None
+    results = json.loads(Path(args.results).read_text())["results"] if args.results else None
 
     previous_manifest = None
     if args.previous_manifest and Path(args.previous_manifest).exists():
@@ -85,6 +108,7 @@ def main():
         spider_names=spider_names,
         stats_dir=stats_dir,
         previous_manifest=previous_manifest,
+        results=results,
     )
 
     Path(args.output).write_text(json.dumps(manifest, indent=2))
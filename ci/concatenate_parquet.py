@@ -1,7 +1,11 @@
 import argparse
 import glob
 import json
+import os
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
 
 import pyarrow.lib
 import pyarrow.parquet
@@ -16,25 +20,217 @@ def align_schema(row_group: pyarrow.Table, schema: pyarrow.Schema) -> pyarrow.Ta
         schema: The unified schema to align to.
 
     Returns:
-        A new table with a schema matching the unified schema.
+        A new table with a schema matching the unified schema. Columns missing
+        from the table are typed null arrays, which allocate no values.
     """
     aligned_columns = []
     for field in schema:
         if field.name in row_group.schema.names:
-            aligned_columns.append(row_group.column(field.name))
+            column = row_group.column(field.name)
+            if not column.type.equals(field.type):
+                column = column.cast(field.type)
+            aligned_columns.append(column)
         else:
             # Create a column of nulls if the field is missing in the table
-            aligned_columns.append(pyarrow.array([None] * row_group.num_rows, type=field.type).cast(field.type))
+            aligned_columns.append(pyarrow.nulls(row_group.num_rows, type=field.type))
 
     return pyarrow.Table.from_arrays(aligned_columns, schema=schema)
 
 
+def merge_geo_metadata(geo_metadata: dict, this_geo_metadata: dict) -> dict:
+    """
+    Merge the geoparquet metadata of another file into that gathered so far.
+
+    Args:
+        geo_metadata: The geoparquet metadata gathered so far, or an empty dict.
+        this_geo_metadata: The geoparquet metadata of another file.
+
+    Returns:
+        The geoparquet metadata with the bounding box expanded to include that
+        of the other file and the union of their geometry types.
+    """
+    if not geo_metadata:
+        return this_geo_metadata
+
+    # Expand the bounding box to include all the bounding boxes
+    if bounding_box := this_geo_metadata.get("columns", {}).get("geometry", {}).get("bbox"):
+        if current_bounding_box := geo_metadata["columns"]["geometry"].get("bbox"):
+            geo_metadata["columns"]["geometry"]["bbox"] = [
+                min(current_bounding_box[0], bounding_box[0]),
+                min(current_bounding_box[1], bounding_box[1]),
+                max(current_bounding_box[2], bounding_box[2]),
+                max(current_bounding_box[3], bounding_box[3]),
+            ]
+        else:
+            geo_metadata["columns"]["geometry"]["bbox"] = bounding_box
+
+    # Union the geometry types
+    if geometry_types := this_geo_metadata.get("columns", {}).get("geometry", {}).get("geometry_types"):
+        for geometry_type in geometry_types:
+            if geometry_type not in geo_metadata["columns"]["geometry"]["geometry_types"]:
+                geo_metadata["columns"]["geometry"]["geometry_types"].append(geometry_type)
+
+    return geo_metadata
+
+
+def read_metadata(parquet_filenames: list[str], threads: int) -> dict[str, pyarrow.parquet.FileMetaData]:
+    """
+    Read the footer of every Parquet file once, in a pool of threads, skipping invalid files.
+
+    Args:
+        parquet_filenames: The Parquet files.
+        threads: The number of files to read at once.
+
+    Returns:
+        The metadata of each valid file, in the given order.
+    """
+
+    def read_file_metadata(parquet_filename: str) -> pyarrow.parquet.FileMetaData | None:
+        try:
+            return pyarrow.parquet.read_metadata(parquet_filename)
+        except (pyarrow.lib.ArrowInvalid, OSError) as e:
+            sys.stderr.write(f"Skipping {parquet_filename} because: {e}\n")
+            return None
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return {
+            parquet_filename: file_metadata
+            for parquet_filename, file_metadata in zip(
+                parquet_filenames, executor.map(read_file_metadata, parquet_filenames)
+            )
+            if file_metadata is not None
+        }
+
+
+def unify_schemas(
+    metadata: dict[str, pyarrow.parquet.FileMetaData], columns: list[str] | None = None
+) -> pyarrow.Schema:
+    """
+    Unify the schema of all Parquet files and gather the geoparquet metadata.
+
+    Args:
+        metadata: The metadata of each Parquet file.
+        columns: The columns to keep, in this order, or None for every column.
+
+    Returns:
+        The unified schema, with the merged geoparquet metadata.
+    """
+    geo_metadata = {}
+    schemas = []
+    for file_metadata in metadata.values():
+        schemas.append(file_metadata.schema.to_arrow_schema())
+        if geo_metadata_str := (file_metadata.metadata or {}).get(b"geo"):
+            geo_metadata = merge_geo_metadata(geo_metadata, json.loads(geo_metadata_str))
+
+    unified_schema = pyarrow.unify_schemas(schemas, promote_options="permissive")
+    if columns is not None:
+        unified_schema = pyarrow.schema(
+            [unified_schema.field(column) for column in columns if column in unified_schema.names],
+            unified_schema.metadata,
+        )
+        if geo_metadata.get("primary_column", "geometry") not in unified_schema.names:
+            geo_metadata = {}
+
+    unified_metadata = unified_schema.metadata or {}
+    unified_metadata[b"geo"] = json.dumps(geo_metadata)
+    return unified_schema.with_metadata(unified_metadata)
+
+
+def read_row_group(
+    parquet_filename: str, file_metadata: pyarrow.parquet.FileMetaData, i: int, schema: pyarrow.Schema
+) -> pyarrow.Table:
+    """
+    Read a row group, only the columns of the schema, aligned to the schema.
+    """
+    parquet_file = pyarrow.parquet.ParquetFile(parquet_filename, metadata=file_metadata)
+    try:
+        columns = [name for name in schema.names if name in parquet_file.schema_arrow.names]
+        return align_schema(parquet_file.read_row_group(i, columns=columns), schema)
+    finally:
+        parquet_file.close()
+
+
+def iter_row_groups(
+    metadata: dict[str, pyarrow.parquet.FileMetaData], schema: pyarrow.Schema, threads: int
+) -> Iterator[pyarrow.Table]:
+    """
+    Read the row groups of every Parquet file in a pool of threads, a few
+    ahead of those being written, and yield them aligned to the schema in
+    the order of the files and their row groups.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending: deque[Future] = deque()
+        for parquet_filename, file_metadata in metadata.items():
+            for i in range(file_metadata.num_row_groups):
+                pending.append(executor.submit(read_row_group, parquet_filename, file_metadata, i, schema))
+                if len(pending) >= threads * 2:
+                    yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def concatenate(
+    parquet_filenames: list[str],
+    output,
+    columns: list[str] | None = None,
+    row_group_size: int | None = None,
+    threads: int | None = None,
+) -> int:
+    """
+    Concatenate Parquet files, with a unified schema, into a single Parquet file.
+
+    Args:
+        parquet_filenames: The Parquet files, in the order their rows are written.
+        output: The path or file object of the output Parquet file.
+        columns: The columns to keep, or None for every column.
+        row_group_size: The number of rows of each row group written, or None to
+            write the row groups of the files as they are.
+        threads: The number of files or row groups to read at once.
+
+    Returns:
+        The number of rows written.
+    """
+    threads = threads or min(32, (os.cpu_count() or 1) + 4)
+    metadata = read_metadata(parquet_filenames, threads)
+    if not metadata:
+        raise ValueError("No valid Parquet files found.")
+    unified_schema = unify_schemas(metadata, columns)
+
+    row_count = 0
+    buffered: list[pyarrow.Table] = []
+    buffered_rows = 0
+    with pyarrow.parquet.ParquetWriter(output, unified_schema) as writer:
+        for row_group in iter_row_groups(metadata, unified_schema, threads):
+            row_count += row_group.num_rows
+            if row_group_size is None:
+                writer.write_table(row_group)
+                continue
+            buffered.append(row_group)
+            buffered_rows += row_group.num_rows
+            if buffered_rows >= row_group_size:
+                table = pyarrow.concat_tables(buffered)
+                full_rows = buffered_rows - buffered_rows % row_group_size
+                writer.write_table(table.slice(0, full_rows), row_group_size=row_group_size)
+                buffered = [table.slice(full_rows)]
+                buffered_rows -= full_rows
+        if buffered_rows:
+            writer.write_table(pyarrow.concat_tables(buffered), row_group_size=row_group_size)
+    return row_count
+
+
 def main():
     parser = argparse.ArgumentParser(description="Concatenate multiple Parquet files into a single Parquet file.")
     parser.add_argument("files", type=str, nargs="+", help="Parquet files")
     parser.add_argument(
         "-o", "--output", type=argparse.FileType("wb"), nargs="?", help="the path to the output Parquet file"
     )
+    parser.add_argument(
+        "-c", "--column", dest="columns", action="append", help="a column to keep, may be repeated (default: all)"
+    )
+    parser.add_argument(
+        "--row-group-size", type=int, help="the number of rows of each row group (default: as in the files)"
+    )
+    parser.add_argument("--threads", type=int, help="the number of files or row groups to read at once")
 
     args = parser.parse_args()
 
@@ -48,59 +244,12 @@ def main():
     if args.output is None:
         exit(1)
 
-    # Unify the schema of all Parquet files and gather the geoparquet metadata
-    geo_metadata = {}
-    schemas = []
-    for parquet_filename in parquet_filenames:
-        try:
-            parquet_file = pyarrow.parquet.ParquetFile(parquet_filename)
-        except pyarrow.lib.ArrowInvalid as e:
-            sys.stderr.write(f"Skipping {parquet_filename} because: {e}\n")
-            continue
-
-        schemas.append(parquet_file.schema_arrow)
-
-        if geo_metadata_str := parquet_file.metadata.metadata.get(b"geo"):
-            this_geo_metadata = json.loads(geo_metadata_str)
-
-            if not geo_metadata:
-                geo_metadata = this_geo_metadata
-
-            # Expand the bounding box to include all the bounding boxes
-            if bounding_box := this_geo_metadata.get("columns", {}).get("geometry", {}).get("bbox"):
-                geo_metadata["columns"]["geometry"]["bbox"] = [
-                    min(geo_metadata["columns"]["geometry"]["bbox"][0], bounding_box[0]),
-                    min(geo_metadata["columns"]["geometry"]["bbox"][1], bounding_box[1]),
-                    max(geo_metadata["columns"]["geometry"]["bbox"][2], bounding_box[2]),
-                    max(geo_metadata["columns"]["geometry"]["bbox"][3], bounding_box[3]),
-                ]
-
-            # Union the geometry types
-            if geometry_types := this_geo_metadata.get("columns", {}).get("geometry", {}).get("geometry_types"):
-                for geometry_type in geometry_types:
-                    if geometry_type not in geo_metadata["columns"]["geometry"]["geometry_types"]:
-                        geo_metadata["columns"]["geometry"]["geometry_types"].append(geometry_type)
-
-    if not schemas:
-        sys.stderr.write("No valid Parquet files found.\n")
+    try:
+        concatenate(parquet_filenames, args.output, args.columns, args.row_group_size, args.threads)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
         exit(1)
 
-    unified_schema = pyarrow.unify_schemas(schemas, promote_options="permissive")
-
-    unified_metadata = unified_schema.metadata
-    unified_metadata[b"geo"] = json.dumps(geo_metadata)
-    unified_schema = unified_schema.with_metadata(unified_metadata)
-
-    # Concatenate the Parquet files
-    with pyarrow.parquet.ParquetWriter(args.output, unified_schema) as writer:
-        for parquet_filename in parquet_filenames:
-            parquet_file = pyarrow.parquet.ParquetFile(parquet_filename)
-
-            for i in range(parquet_file.num_row_groups):
-                row_group = parquet_file.read_row_group(i)
-                aligned_row_group = align_schema(row_group, unified_schema)
-                writer.write(aligned_row_group)
-
 
 if __name__ == "__main__":
     main()
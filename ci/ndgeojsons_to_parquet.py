@@ -1,17 +1,28 @@
 import json
 import logging
-import math
+import os
 import sys
 import traceback
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 from logging import getLogger
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-import duckdb
+import numpy as np
 import psutil
+import pyarrow as pa
 import pyarrow.parquet as pq
 
+from locations.exporters.parquet_shard import (
+    HILBERT_NULL_KEY,
+    HILBERT_ORDER_KEY,
+    HILBERT_ORDER_ROW_GROUP,
+    SHARD_SCHEMA,
+    ShardWriter,
+    geo_metadata,
+)
+
 logger = getLogger(__name__)
 # Log to both file and stderr so errors appear in ECS logs
 logging.basicConfig(
@@ -23,13 +34,32 @@ logging.basicConfig(
     ],
 )
 
+# Spiders write a Parquet shard of their features, already sorted by the
+# Hilbert key, alongside their NdGeoJSON output (see the "parquet_shard" feed
+# format). Spiders that didn't finish writing one, for example because they
+# were killed, have their NdGeoJSON converted instead.
+SHARD_SUFFIX = ".parquet_shard"
+
+# The most sorted runs merged at once, bounding both the number of open files
+# and the memory of the buffers. More runs than this are merged in several
+# passes, the shards of each group of the first pass merged in parallel.
+MAX_FAN_IN = 128
+
+# The number of rows buffered across all the shards of one merge. Merged
+# rows are written out in row groups of the same size.
+MERGE_BUFFER_ROWS = 500_000
+
+# The memory given to each process converting or merging shards, which is
+# more than any of them is expected to use.
+WORKER_MEMORY_BYTES = 2 * 1024**3
+
 
 def cgroup_memory_limit_bytes() -> int | None:
     # psutil.virtual_memory().total reads the host/VM's physical memory, which on
     # Fargate can be larger than the memory actually allocated to the task - the
-    # container is still capped by the cgroup limit below. Without this, DuckDB
-    # gets configured with a limit bigger than what the container can actually
-    # use and is silently OOM-killed by the container runtime.
+    # container is still capped by the cgroup limit below. Without this, too many
+    # workers are started for the memory the container can actually use and it
+    # is silently OOM-killed by the container runtime.
     for path in (
         Path("/sys/fs/cgroup/memory.max"),  # cgroup v2
         Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"),  # cgroup v1
@@ -51,27 +81,202 @@ def cgroup_memory_limit_bytes() -> int | None:
     return None
 
 
-def duckdb_memory_limit() -> str:
+def worker_count() -> int:
+    """
+    :return: the number of processes to convert or merge shards in, one per core unless memory is short
+    """
     total_bytes = cgroup_memory_limit_bytes() or psutil.virtual_memory().total
-    # Reserve 2 GB for Python, pyarrow, and OS overhead
-    reserved_bytes = 2 * 1024**3
-    duckdb_bytes = max(total_bytes - reserved_bytes, reserved_bytes)
-    duckdb_gb = math.floor(duckdb_bytes / 1024**3)
-    return f"{duckdb_gb}GB"
-
-
-# ST_Hilbert() returns a UINTEGER (32-bit) curve position. Used to split the
-# table into spatially-contiguous batches so no single ORDER BY has to sort/
-# materialize the whole dataset at once.
-HILBERT_RANGE = 2**32
-
-# Sorting and writing the whole table in one COPY holds the full row set
-# (geometry + properties + dataset_attributes) in memory during the sort. On
-# a ~43M row dataset that has been observed to exceed the container's memory
-# limit and get silently OOM-killed (see #14341/#16158). Splitting into
-# batches of roughly this many rows keeps each sort's peak memory bounded
-# regardless of total dataset size.
-TARGET_ROWS_PER_BATCH = 2_000_000
+    return max(1, min(os.cpu_count() or 1, total_bytes // WORKER_MEMORY_BYTES))
+
+
+def convert_to_shard(ndgeojson_path: Path, shard_path: Path) -> int:
+    """
+    Convert an NdGeoJSON file to a Parquet shard.
+    :return: the number of features converted
+    """
+    writer = ShardWriter(str(shard_path))
+    with open(ndgeojson_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                writer.add(json.loads(line))
+            except json.JSONDecodeError as e:
+                # The last line of a killed spider's output can be cut short.
+                logger.warning(f"Skipping line {line_number} of {ndgeojson_path}: {e}")
+    return writer.close()
+
+
+def shard_runs(shard_path: Path) -> list[list[int]]:
+    """
+    :return: the row groups of each run of rows sorted by their Hilbert key in the shard
+    """
+    metadata = pq.read_metadata(str(shard_path))
+    row_groups = list(range(metadata.num_row_groups))
+    if not row_groups:
+        return []
+    if (metadata.metadata or {}).get(HILBERT_ORDER_KEY) == HILBERT_ORDER_ROW_GROUP:
+        return [[row_group] for row_group in row_groups]
+    # Merged shards are sorted as a whole.
+    return [row_groups]
+
+
+def group_shards(shard_paths: list[Path]) -> list[list[Path]]:
+    """
+    :return: the shards in groups of at most MAX_FAN_IN runs, or of one shard of more runs than that
+    """
+    groups: list[list[Path]] = []
+    group_runs = 0
+    for shard_path in shard_paths:
+        runs = len(shard_runs(shard_path))
+        if not groups or group_runs + runs > MAX_FAN_IN:
+            groups.append([])
+            group_runs = 0
+        groups[-1].append(shard_path)
+        group_runs += runs
+    return groups
+
+
+class ShardReader:
+    """
+    Read the rows of a sorted run of a shard in order, a buffer of at most
+    `batch_size` rows at a time.
+    """
+
+    def __init__(self, path: Path, batch_size: int, row_groups: list[int]):
+        self.batches = pq.ParquetFile(str(path)).iter_batches(batch_size=batch_size, row_groups=row_groups)
+        self.buffer: pa.Table | None = None
+        self.keys = np.empty(0, dtype=np.int64)
+        self.fill()
+
+    def fill(self) -> bool:
+        """
+        Read the next batch if the buffer is empty.
+        :return: whether there are rows left
+        """
+        while len(self.keys) == 0:
+            try:
+                batch = next(self.batches)
+            except StopIteration:
+                self.buffer = None
+                return False
+            self.buffer = pa.Table.from_batches([batch])
+            self.keys = batch.column("hilbert").cast(pa.int64()).fill_null(HILBERT_NULL_KEY).to_numpy().astype(np.int64)
+        return True
+
+    @property
+    def last_key(self) -> int:
+        return self.keys[-1]
+
+    def take_until(self, key: int) -> pa.Table:
+        """
+        :return: the buffered rows up to and including those with the key
+        """
+        end = int(np.searchsorted(self.keys, key, side="right"))
+        rows = self.buffer.slice(0, end)
+        self.buffer = self.buffer.slice(end)
+        self.keys = self.keys[end:]
+        return rows
+
+
+def merge_shards(shard_paths: list[Path], output_path: Path, schema: pa.Schema = SHARD_SCHEMA) -> int:
+    """
+    Merge the runs of shards sorted by their Hilbert key into one file sorted
+    by it, with the columns of the schema.
+
+    Each round takes, from the buffer of every run, the rows up to the least
+    of the last keys of the buffers. No row yet to be read can come before
+    those, so they are sorted and written, and at least one buffer is used up
+    each round. Only the buffers are held in memory.
+
+    :return: the number of rows written
+    """
+    runs = [(path, row_groups) for path in shard_paths for row_groups in shard_runs(path)]
+    batch_size = max(1, MERGE_BUFFER_ROWS // max(1, len(runs)))
+    readers = [ShardReader(path, batch_size, row_groups) for path, row_groups in runs]
+    readers = [reader for reader in readers if reader.buffer is not None]
+    row_count = 0
+    pending: list[pa.Table] = []
+    pending_rows = 0
+    with pq.ParquetWriter(str(output_path), schema, compression="zstd") as writer:
+        while readers:
+            cutoff = min(reader.last_key for reader in readers)
+            block = pa.concat_tables([reader.take_until(cutoff) for reader in readers])
+            pending.append(block.sort_by("hilbert"))
+            pending_rows += block.num_rows
+            readers = [reader for reader in readers if reader.fill()]
+            if pending_rows >= MERGE_BUFFER_ROWS or not readers:
+                table = pa.concat_tables(pending).select(schema.names)
+                writer.write_table(table, row_group_size=MERGE_BUFFER_ROWS)
+                row_count += table.num_rows
+                pending = []
+                pending_rows = 0
+    return row_count
+
+
+def read_geo_metadata(shard_paths: list[Path]) -> dict:
+    """
+    :return: the GeoParquet metadata of every shard together
+    """
+    geometry_types = set()
+    bbox = None
+    for shard_path in shard_paths:
+        # ShardWriter adds the metadata to the file once the rows are written,
+        # so it is only in the file metadata rather than the Arrow schema.
+        metadata = pq.read_metadata(str(shard_path)).metadata or {}
+        shard_geo = json.loads(metadata.get(b"geo", b"{}"))
+        column = shard_geo.get("columns", {}).get("geom", {})
+        geometry_types.update(column.get("geometry_types", []))
+        shard_bbox = shard_geo.get("bbox")
+        if not shard_bbox or None in shard_bbox:
+            continue
+        if bbox is None:
+            bbox = shard_bbox
+        else:
+            bbox = [
+                min(bbox[0], shard_bbox[0]),
+                min(bbox[1], shard_bbox[1]),
+                max(bbox[2], shard_bbox[2]),
+                max(bbox[3], shard_bbox[3]),
+            ]
+    return geo_metadata(geometry_types, bbox)
+
+
+def is_complete_shard(shard_path: Path) -> bool:
+    """
+    :return: whether the shard has rows and a Parquet footer which can be read
+    """
+    if shard_path.stat().st_size == 0:
+        return False
+    try:
+        pq.read_metadata(str(shard_path))
+    except (pa.ArrowInvalid, OSError) as e:
+        # Cut short, for example by a spider killed while writing it.
+        logger.warning(f"Converting the NdGeoJSON instead of {shard_path}: {e}")
+        return False
+    return True
+
+
+def find_shards(input_dir_path: Path, temp_dir: Path) -> list[Path]:
+    """
+    Find the shards written by spiders, converting the NdGeoJSON of spiders
+    without a complete one in parallel.
+    :return: the paths of every non-empty shard
+    """
+    shard_paths = [path for path in sorted(input_dir_path.glob(f"*{SHARD_SUFFIX}")) if is_complete_shard(path)]
+    sharded = {path.name.removesuffix(SHARD_SUFFIX) for path in shard_paths}
+    to_convert = [
+        path
+        for path in sorted(input_dir_path.glob("*.ndgeojson"))
+        if path.stem not in sharded and path.stat().st_size > 0
+    ]
+    logger.info(f"Found {len(shard_paths)} shards, converting {len(to_convert)} ndgeojson files without one")
+
+    converted_paths = [temp_dir / f"{path.stem}{SHARD_SUFFIX}" for path in to_convert]
+    with ProcessPoolExecutor(max_workers=worker_count()) as executor:
+        row_counts = list(executor.map(convert_to_shard, to_convert, converted_paths))
+    shard_paths.extend(path for path, row_count in zip(converted_paths, row_counts) if row_count > 0)
+    return shard_paths
 
 
 def to_parquet(input_dir_path: Path, output_file_path: Path) -> None:
@@ -79,171 +284,43 @@ def to_parquet(input_dir_path: Path, output_file_path: Path) -> None:
     if output_file_path.exists():
         output_file_path.unlink()
 
-    input_files_pattern = str(input_dir_path / "*.ndgeojson")
-    logger.info(f"Processing ndgeojson files matching: {input_files_pattern}")
-
     with TemporaryDirectory() as temp_dir:
-        db_path = Path(temp_dir) / "temp.db"
-        logger.info(f"Using DuckDB version: {duckdb.__version__}")
-        logger.info(f"Creating temporary database at: {db_path}")
-        with duckdb.connect(db_path.as_posix()) as con:
-            logger.info("Installing spatial extension...")
-            con.install_extension("spatial")
-            con.load_extension("spatial")
-            logger.info("Spatial extension loaded successfully")
-
-            logger.info("Configuring DuckDB settings...")
-            cgroup_limit = cgroup_memory_limit_bytes()
-            memory_limit = duckdb_memory_limit()
-            source = "cgroup limit" if cgroup_limit is not None else "total system RAM"
-            detected_bytes = cgroup_limit if cgroup_limit is not None else psutil.virtual_memory().total
-            logger.info(f"Setting DuckDB memory limit to {memory_limit} ({source}: {detected_bytes / 1024**3:.1f} GB)")
-            con.execute(f"SET temp_directory='{temp_dir}'")
-            con.execute(f"SET memory_limit='{memory_limit}'")
-            con.execute("SET threads=2")
-            con.execute("SET preserve_insertion_order=false")
-
-            logger.info("Creating geojson_data table from ndgeojson files...")
-            con.execute(f"""
-            CREATE TABLE geojson_data AS
-                SELECT
-                    id,
-                    type,
-                    dataset_attributes,
-                    properties,
-                    ST_GeomFromGeoJSON(geometry) AS geom
-                FROM read_ndjson(
-                    '{input_files_pattern}',
-                    columns={{
-                        'type': 'VARCHAR' ,
-                        'id': 'VARCHAR',
-                        'dataset_attributes': 'MAP(VARCHAR, VARCHAR)',
-                        'properties' : 'MAP(VARCHAR, VARCHAR)',
-                        'geometry': 'JSON',
-                        }}
-                    );
-            """)
-            logger.info("Table created successfully")
-
-            # compute overall bbox and geometry types from the created table
-            logger.info("Computing bounding box...")
-            bbox_res = con.execute(
-                "SELECT min(ST_XMin(geom)), min(ST_YMin(geom)), max(ST_XMax(geom)), max(ST_YMax(geom)) FROM geojson_data"
-            ).fetchone()
-            logger.info(f"Bounding box: {bbox_res}")
-
-            logger.info("Computing geometry types...")
-            geom_types_raw = con.execute("SELECT DISTINCT ST_GeometryType(geom) FROM geojson_data").fetchall()
-            geom_types = [t[0] for t in geom_types_raw if t and t[0] is not None]
-            logger.info(f"Found geometry types: {geom_types}")
-
-            row_count = con.execute("SELECT count(*) FROM geojson_data").fetchone()[0]
-            num_batches = max(1, math.ceil(row_count / TARGET_ROWS_PER_BATCH))
-            logger.info(f"Table has {row_count:,} rows; writing in {num_batches} spatial batch(es)")
-
-            if num_batches > 1:
-                # Bucket rows into spatially-contiguous ranges of the Hilbert curve so each
-                # batch can be sorted and written independently, without needing the whole
-                # table's rows in memory at once. Buckets won't be perfectly balanced (data
-                # is denser in some regions than others), but this bounds the *typical* peak
-                # memory of any single sort to a small fraction of the full dataset.
-                con.execute("ALTER TABLE geojson_data ADD COLUMN batch_id INTEGER")
-                con.execute(f"""
-                    UPDATE geojson_data
-                    SET batch_id = LEAST(
-                        CAST(FLOOR(ST_Hilbert(geom) / ({HILBERT_RANGE} / {num_batches})) AS INTEGER),
-                        {num_batches - 1}
-                    )
-                """)
-
-            # write parquet with a larger row group size (target 64-256 MB). 128MB chosen here.
-            row_group_size = 134217728
-
-            batch_paths = []
-            for batch_num in range(num_batches):
-                batch_path = Path(temp_dir) / f"batch_{batch_num}.parquet"
-                where_clause = f"WHERE batch_id = {batch_num}" if num_batches > 1 else ""
-                logger.info(f"Writing batch {batch_num + 1}/{num_batches} to {batch_path}...")
-                con.execute(f"""
-                COPY (
-                    SELECT
-                        id,
-                        type,
-                        dataset_attributes,
-                        properties,
-                        geom,
-                        {{
-                            'xmin': ST_XMin(geom),
-                            'ymin': ST_YMin(geom),
-                            'xmax': ST_XMax(geom),
-                            'ymax': ST_YMax(geom)
-                        }} as bbox
-                    FROM geojson_data
-                    {where_clause}
-                    ORDER BY ST_Hilbert(geom)
-                ) TO '{str(batch_path)}'
-                (FORMAT PARQUET, COMPRESSION 'ZSTD', ROW_GROUP_SIZE {row_group_size});
-                """)
-                batch_paths.append(batch_path)
-            logger.info("All batches written successfully")
-
-        # DuckDB connection is now closed, releasing its memory before pyarrow runs.
-        # Merge the batch files into the final output one row group at a time so we
-        # never need to hold the full dataset in memory (unlike a read_table/write_table
-        # round trip over the whole file, which was itself a prior OOM risk).
-        logger.info("Merging batches into final parquet file with GeoParquet metadata...")
-
-        if bbox_res is None:
-            xmin, ymin, xmax, ymax = None, None, None, None
-        else:
-            xmin, ymin, xmax, ymax = bbox_res
-        geo_meta = {
-            "version": "1.1.0",
-            "primary_column": "geom",
-            # No "crs" key: per the GeoParquet spec, omitting it means the default of
-            # OGC:CRS84 (WGS84, lon/lat axis order), which matches our WKB geometries.
-            # "EPSG:4326" would be wrong here - that CRS formally specifies lat/lon axis
-            # order, the opposite of what's actually stored, which readers (e.g. DuckDB)
-            # correctly reject.
-            "columns": {"geom": {"encoding": "WKB", "geometry_types": geom_types or ["Unknown"]}},
-            "bbox": [xmin, ymin, xmax, ymax],
-        }
-
-        writer = None
-        try:
-            for batch_path in batch_paths:
-                parquet_file = pq.ParquetFile(str(batch_path))
-                for row_group_idx in range(parquet_file.num_row_groups):
-                    row_group_table = parquet_file.read_row_group(row_group_idx)
-                    if writer is None:
-                        schema = row_group_table.schema.with_metadata(
-                            {
-                                **(row_group_table.schema.metadata or {}),
-                                b"geo": json.dumps(geo_meta, ensure_ascii=False).encode("utf-8"),
-                            }
-                        )
-                        writer = pq.ParquetWriter(str(output_file_path), schema, compression="ZSTD")
-                    writer.write_table(row_group_table)
-
-            if writer is None:
-                # No rows in any batch (empty dataset) - still emit a valid, empty parquet
-                # file with the right schema and GeoParquet metadata rather than nothing.
-                schema = pq.ParquetFile(str(batch_paths[0])).schema_arrow.with_metadata(
-                    {b"geo": json.dumps(geo_meta, ensure_ascii=False).encode("utf-8")}
-                )
-                writer = pq.ParquetWriter(str(output_file_path), schema, compression="ZSTD")
-        finally:
-            if writer is not None:
-                writer.close()
+        shard_paths = find_shards(input_dir_path, Path(temp_dir))
+        geo_meta = read_geo_metadata(shard_paths)
+        logger.info(f"Bounding box: {geo_meta['bbox']}")
+        logger.info(f"Found geometry types: {geo_meta['columns']['geom']['geometry_types']}")
+
+        # Merge the shards in groups of at most MAX_FAN_IN runs, in parallel,
+        # until few enough are left to merge into the output.
+        merge_pass = 0
+        while len(groups := group_shards(shard_paths)) > 1:
+            merge_pass += 1
+            merged_paths = [Path(temp_dir) / f"merged_{merge_pass}_{i}{SHARD_SUFFIX}" for i in range(len(groups))]
+            logger.info(f"Merge pass {merge_pass}: merging {len(shard_paths)} shards into {len(groups)}")
+            with ProcessPoolExecutor(max_workers=worker_count()) as executor:
+                list(executor.map(merge_shards, groups, merged_paths))
+            shard_paths = merged_paths
+
+        output_fields = [field for field in SHARD_SCHEMA if field.name != "hilbert"]
+        schema = pa.schema(output_fields, metadata={"geo": json.dumps(geo_meta, ensure_ascii=False)})
+        logger.info(f"Merging {len(shard_paths)} shards into {output_file_path}...")
+        # With no rows in any shard (empty dataset) this still writes a valid, empty
+        # parquet file with the right schema and GeoParquet metadata rather than nothing.
+        row_count = merge_shards(shard_paths, output_file_path, schema)
 
     file_size = output_file_path.stat().st_size
-    logger.info(f"✓ Created {output_file_path} ({file_size:,} bytes)")
+    logger.info(f"✓ Created {output_file_path} with {row_count:,} rows ({file_size:,} bytes)")
 
 
 def main() -> None:
-    parser = ArgumentParser(description="Pack collection of NdGeoJSON files to Parquet format")
+    parser = ArgumentParser(description="Merge the Parquet shards and NdGeoJSON files of a run to GeoParquet format")
     parser.add_argument(
-        "-d", "--directory", type=str, required=True, nargs="?", help="Directory containing NdGeoJSON files"
+        "-d",
+        "--directory",
+        type=str,
+        required=True,
+        nargs="?",
+        help="Directory containing Parquet shards and NdGeoJSON files",
     )
     parser.add_argument("-o", "--output", type=str, required=True, nargs="?", help="Output Parquet file path")
 
@@ -252,11 +329,9 @@ def main() -> None:
     output_file_path = Path(args.output)
 
     try:
-        ndgeojson_file_paths = list(input_directory.glob("*.ndgeojson"))
-        if not ndgeojson_file_paths:
-            raise FileNotFoundError(f"No NdGeoJSON files found in directory: {input_directory}")
+        if not any(input_directory.glob(f"*{SHARD_SUFFIX}")) and not any(input_directory.glob("*.ndgeojson")):
+            raise FileNotFoundError(f"No Parquet shards or NdGeoJSON files found in directory: {input_directory}")
 
-        logger.info(f"Found {len(ndgeojson_file_paths)} ndgeojson files to process")
         to_parquet(input_directory, output_file_path)
     except Exception as e:
         logger.error(f"Failed to create parquet file: {e}")
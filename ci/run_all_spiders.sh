@@ -25,24 +25,57 @@ RUN_S3_PREFIX="s3://${S3_BUCKET}/${RUN_KEY_PREFIX}"
 RUN_R2_PREFIX="s3://${R2_BUCKET}/${RUN_KEY_PREFIX}"
 RUN_URL_PREFIX="https://alltheplaces-data.openaddresses.io/${RUN_KEY_PREFIX}"
 SPIDER_RUN_DIR="${GITHUB_WORKSPACE}/output"
+# PARALLELISM is the number of spiders run at once, shared between workers running SPIDERS_PER_WORKER each.
 PARALLELISM=${PARALLELISM:-12}
+SPIDERS_PER_WORKER=${SPIDERS_PER_WORKER:-4}
+WORKERS=$((PARALLELISM / SPIDERS_PER_WORKER > 0 ? PARALLELISM / SPIDERS_PER_WORKER : 1))
 SPIDER_TIMEOUT=${SPIDER_TIMEOUT:-28800} # default to 8 hours
 
 mkdir -p "${SPIDER_RUN_DIR}"
 
-(>&2 echo "Writing to ${SPIDER_RUN_DIR}")
-for spider in $(uv run scrapy list -s REQUESTS_CACHE_ENABLED=False)
-do
-    # The CLOSESPIDER_TIMEOUT setting is used to limit the maximum run time of each spider.
-    # Sometimes spiders can hang during network operations, so we use the timeout command to enforce
-    # a hard limit slightly longer than CLOSESPIDER_TIMEOUT to ensure the spider is killed.
-    echo "timeout -k 15m 495m uv run scrapy crawl --output ${SPIDER_RUN_DIR}/output/${spider}.geojson:geojson --output ${SPIDER_RUN_DIR}/output/${spider}.ndgeojson:ndgeojson --logfile ${SPIDER_RUN_DIR}/logs/${spider}.txt --loglevel ERROR --set TELNETCONSOLE_ENABLED=0 --set CLOSESPIDER_TIMEOUT=${SPIDER_TIMEOUT} --set LOGSTATS_FILE=${SPIDER_RUN_DIR}/stats/${spider}.json ${spider}" >> ${SPIDER_RUN_DIR}/commands.txt
-done
+# Every spider process loads the NSI, so prebuild a snapshot that can be memory mapped
+# rather than each process parsing the vendored NSI JSON files.
+uv run scrapy vendor_nsi --snapshot-only --nolog
+
+# Likewise for the searchable points that spiders search from.
+uv run scrapy build_searchable_points --nolog
+
+# Pages are requested conditionally on their ETag or Last-Modified in earlier runs when the
+# cache of those is kept somewhere between runs. The crawl rate learned of each host is kept
+# alongside it.
+if [ -n "${CONDITIONAL_CACHE_S3_PATH}" ]; then
+    export CONDITIONAL_CACHE_DIR="${GITHUB_WORKSPACE}/conditional_cache"
+    export ADAPTIVE_THROTTLE_DIR="${CONDITIONAL_CACHE_DIR}/throttle_profiles"
+    mkdir -p "${CONDITIONAL_CACHE_DIR}"
+    uv run aws s3 sync \
+        --only-show-errors \
+        "${CONDITIONAL_CACHE_S3_PATH}" \
+        "${CONDITIONAL_CACHE_DIR}/" \
+        || (>&2 echo "Couldn't restore conditional cache, starting with an empty cache")
+fi
 
+(>&2 echo "Writing to ${SPIDER_RUN_DIR}")
 mkdir -p "${SPIDER_RUN_DIR}/logs"
 mkdir -p "${SPIDER_RUN_DIR}/stats"
 mkdir -p "${SPIDER_RUN_DIR}/output"
-SPIDER_COUNT=$(wc -l < "${SPIDER_RUN_DIR}/commands.txt" | tr -d ' ')
+uv run scrapy list -s REQUESTS_CACHE_ENABLED=False > "${SPIDER_RUN_DIR}/spider_list.txt"
+SPIDER_COUNT=$(wc -l < "${SPIDER_RUN_DIR}/spider_list.txt" | tr -d ' ')
+
+# Start the longest running spiders first, going by their elapsed times in the previous run, so
+# that none of them start late and hold up the end of the run.
+PREVIOUS_RUN_ID=$(uv run aws s3 cp --only-show-errors "s3://${S3_BUCKET}/runs/latest.json" - | jq --raw-output '.run_id')
+uv run aws s3 cp \
+    --only-show-errors \
+    "s3://${S3_BUCKET}/runs/${PREVIOUS_RUN_ID}/stats/_results.json" \
+    "${GITHUB_WORKSPACE}/previous_results.json" \
+    || (>&2 echo "Couldn't download the previous run's results, scheduling without history")
+uv run python ci/schedule_spiders.py \
+    --spider-list "${SPIDER_RUN_DIR}/spider_list.txt" \
+    --history "${GITHUB_WORKSPACE}/previous_results.json" \
+    --workers "${WORKERS}" \
+    --concurrent-spiders "${SPIDERS_PER_WORKER}" \
+    --timeout "${SPIDER_TIMEOUT}" \
+    || (>&2 echo "Couldn't schedule spiders, running them in alphabetical order")
 
 # Send a message to Slack that we're starting
 if [ -z "${SLACK_WEBHOOK_URL}" ]; then
@@ -73,17 +106,48 @@ else
     }' EXIT
 fi
 
-(>&2 echo "Running ${SPIDER_COUNT} spiders ${PARALLELISM} at a time")
-xargs -P "${PARALLELISM}" -a "${SPIDER_RUN_DIR}/commands.txt" -I CMD sh -c "CMD || true"
+(>&2 echo "Running ${SPIDER_COUNT} spiders in ${WORKERS} workers, ${SPIDERS_PER_WORKER} at a time each")
+# The CLOSESPIDER_TIMEOUT setting is used to limit the maximum run time of each spider. Sometimes spiders
+# can hang during network operations, so crawl_many stops a spider 15 minutes after the timeout and kills
+# its worker 15 minutes after that. Spiders that fail or are killed don't fail the run.
+CRAWL_START=$(date +%s)
+uv run scrapy crawl_many \
+    --spider-list "${SPIDER_RUN_DIR}/spider_list.txt" \
+    --output-dir "${SPIDER_RUN_DIR}" \
+    --workers "${WORKERS}" \
+    --concurrent-spiders "${SPIDERS_PER_WORKER}" \
+    --timeout "${SPIDER_TIMEOUT}" \
+    --kill-after 900 \
+    --loglevel ERROR \
+    --set TELNETCONSOLE_ENABLED=0 \
+    || (>&2 echo "Some spiders did not complete")
+CRAWL_SECONDS=$(($(date +%s) - CRAWL_START))
+(>&2 echo "Actual makespan $((CRAWL_SECONDS / 3600))h $(printf '%02d' $((CRAWL_SECONDS % 3600 / 60)))m")
+(>&2 echo "Done running spiders")
+
+if [ -n "${CONDITIONAL_CACHE_S3_PATH}" ]; then
+    uv run aws s3 sync \
+        --only-show-errors \
+        --delete \
+        "${CONDITIONAL_CACHE_DIR}/" \
+        "${CONDITIONAL_CACHE_S3_PATH}" \
+        || (>&2 echo "Couldn't save conditional cache")
+fi
 
+# Summarise the stats of every spider into stats/_results.json, counting the lines of their output
+# on the way, reading each file just once.
+(>&2 echo "Writing out summary JSON")
+OUTPUT_LINECOUNT=$(uv run python -m ci.summarise_run \
+    --spider-list "${SPIDER_RUN_DIR}/spider_list.txt" \
+    --stats-dir "${SPIDER_RUN_DIR}/stats" \
+    --output-dir "${SPIDER_RUN_DIR}/output" \
+    --output "${SPIDER_RUN_DIR}/stats/_results.json")
 retval=$?
 if [ ! $retval -eq 0 ]; then
-    (>&2 echo "xargs failed with exit code ${retval}")
+    (>&2 echo "Couldn't write out summary JSON")
     exit 1
 fi
-(>&2 echo "Done running spiders")
-
-OUTPUT_LINECOUNT=$(cat "${SPIDER_RUN_DIR}"/output/*.geojson | wc -l | tr -d ' ')
+(>&2 echo "Wrote out summary JSON")
 (>&2 echo "Generated ${OUTPUT_LINECOUNT} lines")
 
 tippecanoe --cluster-distance=25 \
@@ -106,7 +170,7 @@ else
     include_pmtiles=true
 fi
 
-uv run python ci/ndgeojsons_to_parquet.py \
+uv run python -m ci.ndgeojsons_to_parquet \
     --directory "${SPIDER_RUN_DIR}/output" \
     --output "${SPIDER_RUN_DIR}/output.parquet"
 retval=$?
@@ -117,58 +181,21 @@ else
     include_parquet=true
 fi
 
-# Clean up ndgeojson files as they are packed into parquet and no longer needed
+# Clean up ndgeojson files and parquet shards as they are packed into parquet and no longer needed
 rm "${SPIDER_RUN_DIR}"/output/*.ndgeojson
+rm -f "${SPIDER_RUN_DIR}"/output/*.parquet_shard
 
 (>&2 echo "Done creating parquet file")
 
-uv run scrapy insights --atp-nsi-osm "${SPIDER_RUN_DIR}/output" --outfile "${SPIDER_RUN_DIR}/stats/_insights.json"
+# The consolidated parquet file has every feature, read just its properties rather than parsing the GeoJSON again.
+if [ "${include_parquet}" = true ]; then
+    insights_input="${SPIDER_RUN_DIR}/output.parquet"
+else
+    insights_input="${SPIDER_RUN_DIR}/output"
+fi
+uv run scrapy insights --atp-nsi-osm "${insights_input}" --outfile "${SPIDER_RUN_DIR}/stats/_insights.json"
 (>&2 echo "Done comparing against Name Suggestion Index and OpenStreetMap")
 
-(>&2 echo "Writing out summary JSON")
-echo "{\"count\": ${SPIDER_COUNT}, \"results\": []}" >> "${SPIDER_RUN_DIR}/stats/_results.json"
-for spider in $(uv run scrapy list)
-do
-    statistics_json="${SPIDER_RUN_DIR}/stats/${spider}.json"
-
-    if [ ! -f "${statistics_json}" ]; then
-        (>&2 echo "Couldn't find ${statistics_json}")
-        continue
-    fi
-
-    feature_count=$(jq --raw-output '.item_scraped_count' "${statistics_json}")
-    retval=$?
-    if [ ! $retval -eq 0 ] || [ "${feature_count}" == "null" ]; then
-        feature_count="0"
-    fi
-
-    error_count=$(jq --raw-output '."log_count/ERROR"' "${statistics_json}")
-    retval=$?
-    if [ ! $retval -eq 0 ] || [ "${error_count}" == "null" ]; then
-        error_count="0"
-    fi
-
-    elapsed_time=$(jq --raw-output '.elapsed_time_seconds' "${statistics_json}")
-    retval=$?
-    if [ ! $retval -eq 0 ] || [ "${elapsed_time}" == "null" ]; then
-        elapsed_time="0"
-    fi
-
-    spider_filename=$(uv run scrapy spider_filename "${spider}")
-
-    # use JQ to create an overall results JSON
-    jq --compact-output \
-        --arg spider_name "${spider}" \
-        --arg spider_feature_count ${feature_count} \
-        --arg spider_error_count ${error_count} \
-        --arg spider_elapsed_time ${elapsed_time} \
-        --arg spider_filename ${spider_filename} \
-        '.results += [{"spider": $spider_name, "filename": $spider_filename, "errors": $spider_error_count | tonumber, "features": $spider_feature_count | tonumber, "elapsed_time": $spider_elapsed_time | tonumber}]' \
-        "${SPIDER_RUN_DIR}/stats/_results.json" > "${SPIDER_RUN_DIR}/stats/_results.json.tmp"
-    mv "${SPIDER_RUN_DIR}/stats/_results.json.tmp" "${SPIDER_RUN_DIR}/stats/_results.json"
-done
-(>&2 echo "Wrote out summary JSON")
-
 (>&2 echo "Compressing output files")
 (cd "${SPIDER_RUN_DIR}" && zip -qr output.zip output)
 
@@ -396,10 +423,9 @@ fi
 
 # Create a simple command file with one S3 cp command per spider
 rm -f "${SPIDER_RUN_DIR}/redirect_commands.txt"
-for spider in $(uv run scrapy list)
-do
+while IFS= read -r spider; do
     echo "uv run aws s3 cp --only-show-errors --website-redirect=\"${RUN_URL_PREFIX}/output/${spider}.geojson\" \"${SPIDER_RUN_DIR}/latest_placeholder.txt\" \"s3://${S3_BUCKET}/runs/latest/output/${spider}.geojson\"" >> "${SPIDER_RUN_DIR}/redirect_commands.txt"
-done
+done < "${SPIDER_RUN_DIR}/spider_list.txt"
 
 # Run all redirect updates in parallel
 xargs -P 50 -a "${SPIDER_RUN_DIR}/redirect_commands.txt" -I CMD sh -c "CMD || echo 'Failed S3 redirect' >&2"
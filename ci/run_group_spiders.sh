@@ -27,7 +27,10 @@ RUN_S3_PREFIX="s3://${S3_BUCKET}/${RUN_KEY_PREFIX}"
 RUN_R2_PREFIX="s3://${R2_BUCKET}/${RUN_KEY_PREFIX}"
 RUN_URL_PREFIX="https://alltheplaces-data.openaddresses.io/${RUN_KEY_PREFIX}"
 SPIDER_RUN_DIR="${GITHUB_WORKSPACE}/output"
+# PARALLELISM is the number of spiders run at once, shared between workers running SPIDERS_PER_WORKER each.
 PARALLELISM=${PARALLELISM:-12}
+SPIDERS_PER_WORKER=${SPIDERS_PER_WORKER:-4}
+WORKERS=$((PARALLELISM / SPIDERS_PER_WORKER > 0 ? PARALLELISM / SPIDERS_PER_WORKER : 1))
 SPIDER_TIMEOUT=${SPIDER_TIMEOUT:-28800} # default to 8 hours
 
 mkdir -p "${SPIDER_RUN_DIR}"
@@ -45,10 +48,32 @@ if [ "${SPIDER_COUNT}" -eq 0 ]; then
     exit 1
 fi
 
+# Download previous manifest (if it exists), for the elapsed time of each spider when
+# scheduling them and for the spiders that fail in this run when building the new manifest
+uv run aws s3 cp \
+    --only-show-errors \
+    "s3://${S3_BUCKET}/runs/latest/${RUN_GROUP}.manifest.json" \
+    "${SPIDER_RUN_DIR}/previous_manifest.json" || true
+
+# Start the longest running spiders first, so that none of them start late and hold up the end of the run.
+if [ -s "${SPIDER_RUN_DIR}/previous_manifest.json" ]; then
+    uv run python ci/schedule_spiders.py \
+        --spider-list "${SPIDER_RUN_DIR}/spider_list.txt" \
+        --history "${SPIDER_RUN_DIR}/previous_manifest.json" \
+        --workers "${WORKERS}" \
+        --concurrent-spiders "${SPIDERS_PER_WORKER}" \
+        --timeout "${SPIDER_TIMEOUT}" \
+        || (>&2 echo "Couldn't schedule spiders, running them in listed order")
+fi
+
+# Every spider process loads the NSI, so prebuild a snapshot that can be memory mapped
+# rather than each process parsing the vendored NSI JSON files.
+uv run scrapy vendor_nsi --snapshot-only --nolog
+
+# Likewise for the searchable points that spiders search from.
+uv run scrapy build_searchable_points --nolog
+
 (>&2 echo "Writing to ${SPIDER_RUN_DIR}")
-while IFS= read -r spider; do
-    echo "timeout -k 15m 495m uv run scrapy crawl --output ${SPIDER_RUN_DIR}/output/${spider}.geojson:geojson --output ${SPIDER_RUN_DIR}/output/${spider}.ndgeojson:ndgeojson --logfile ${SPIDER_RUN_DIR}/logs/${spider}.txt --loglevel ERROR --set TELNETCONSOLE_ENABLED=0 --set CLOSESPIDER_TIMEOUT=${SPIDER_TIMEOUT} --set LOGSTATS_FILE=${SPIDER_RUN_DIR}/stats/${spider}.json ${spider}" >> "${SPIDER_RUN_DIR}/commands.txt"
-done < "${SPIDER_RUN_DIR}/spider_list.txt"
 
 # Send a message to Slack that we're starting
 if [ -z "${SLACK_WEBHOOK_URL:-}" ]; then
@@ -79,17 +104,39 @@ else
     }' EXIT
 fi
 
-(>&2 echo "Running ${SPIDER_COUNT} spiders ${PARALLELISM} at a time")
-xargs -t -L 1 -P "${PARALLELISM}" -a "${SPIDER_RUN_DIR}/commands.txt" -i sh -c "{} || true"
+(>&2 echo "Running ${SPIDER_COUNT} spiders in ${WORKERS} workers, ${SPIDERS_PER_WORKER} at a time each")
+# The CLOSESPIDER_TIMEOUT setting is used to limit the maximum run time of each spider. Sometimes spiders
+# can hang during network operations, so crawl_many stops a spider 15 minutes after the timeout and kills
+# its worker 15 minutes after that. Spiders that fail or are killed don't fail the run.
+CRAWL_START=$(date +%s)
+uv run scrapy crawl_many \
+    --spider-list "${SPIDER_RUN_DIR}/spider_list.txt" \
+    --output-dir "${SPIDER_RUN_DIR}" \
+    --workers "${WORKERS}" \
+    --concurrent-spiders "${SPIDERS_PER_WORKER}" \
+    --timeout "${SPIDER_TIMEOUT}" \
+    --kill-after 900 \
+    --loglevel ERROR \
+    --set TELNETCONSOLE_ENABLED=0 \
+    || (>&2 echo "Some spiders did not complete")
+CRAWL_SECONDS=$(($(date +%s) - CRAWL_START))
+(>&2 echo "Actual makespan $((CRAWL_SECONDS / 3600))h $(printf '%02d' $((CRAWL_SECONDS % 3600 / 60)))m")
+(>&2 echo "Done running spiders")
 
+# Summarise the stats of every spider into stats/_results.json, counting the lines of their output
+# on the way, reading each file just once.
+(>&2 echo "Writing out summary JSON")
+OUTPUT_LINECOUNT=$(uv run python -m ci.summarise_run \
+    --spider-list "${SPIDER_RUN_DIR}/spider_list.txt" \
+    --stats-dir "${SPIDER_RUN_DIR}/stats" \
+    --output-dir "${SPIDER_RUN_DIR}/output" \
+    --output "${SPIDER_RUN_DIR}/stats/_results.json")
 retval=$?
 if [ ! $retval -eq 0 ]; then
-    (>&2 echo "xargs failed with exit code ${retval}")
+    (>&2 echo "Couldn't write out summary JSON")
     exit 1
 fi
-(>&2 echo "Done running spiders")
-
-OUTPUT_LINECOUNT=$(cat "${SPIDER_RUN_DIR}"/output/*.geojson | wc -l | tr -d ' ')
+(>&2 echo "Wrote out summary JSON")
 (>&2 echo "Generated ${OUTPUT_LINECOUNT} lines")
 
 # Generate pmtiles
@@ -114,7 +161,7 @@ else
 fi
 
 # Generate parquet
-uv run python ci/ndgeojsons_to_parquet.py \
+uv run python -m ci.ndgeojsons_to_parquet \
     --directory "${SPIDER_RUN_DIR}/output" \
     --output "${SPIDER_RUN_DIR}/${RUN_GROUP}.parquet"
 retval=$?
@@ -125,54 +172,12 @@ else
     include_parquet=true
 fi
 
-# Clean up ndgeojson files as they are packed into parquet and no longer needed
+# Clean up ndgeojson files and parquet shards as they are packed into parquet and no longer needed
 rm "${SPIDER_RUN_DIR}"/output/*.ndgeojson
+rm -f "${SPIDER_RUN_DIR}"/output/*.parquet_shard
 
 (>&2 echo "Done creating parquet file")
 
-# Summarize stats from spider_list.txt instead of calling scrapy list again
-(>&2 echo "Writing out summary JSON")
-echo "{\"count\": ${SPIDER_COUNT}, \"results\": []}" >> "${SPIDER_RUN_DIR}/stats/_results.json"
-while IFS= read -r spider; do
-    statistics_json="${SPIDER_RUN_DIR}/stats/${spider}.json"
-
-    if [ ! -f "${statistics_json}" ]; then
-        (>&2 echo "Couldn't find ${statistics_json}")
-        continue
-    fi
-
-    feature_count=$(jq --raw-output '.item_scraped_count' "${statistics_json}")
-    retval=$?
-    if [ ! $retval -eq 0 ] || [ "${feature_count}" == "null" ]; then
-        feature_count="0"
-    fi
-
-    error_count=$(jq --raw-output '."log_count/ERROR"' "${statistics_json}")
-    retval=$?
-    if [ ! $retval -eq 0 ] || [ "${error_count}" == "null" ]; then
-        error_count="0"
-    fi
-
-    elapsed_time=$(jq --raw-output '.elapsed_time_seconds' "${statistics_json}")
-    retval=$?
-    if [ ! $retval -eq 0 ] || [ "${elapsed_time}" == "null" ]; then
-        elapsed_time="0"
-    fi
-
-    spider_filename=$(uv run scrapy spider_filename "${spider}")
-
-    jq --compact-output \
-        --arg spider_name "${spider}" \
-        --arg spider_feature_count ${feature_count} \
-        --arg spider_error_count ${error_count} \
-        --arg spider_elapsed_time ${elapsed_time} \
-        --arg spider_filename ${spider_filename} \
-        '.results += [{"spider": $spider_name, "filename": $spider_filename, "errors": $spider_error_count | tonumber, "features": $spider_feature_count | tonumber, "elapsed_time": $spider_elapsed_time | tonumber}]' \
-        "${SPIDER_RUN_DIR}/stats/_results.json" > "${SPIDER_RUN_DIR}/stats/_results.json.tmp"
-    mv "${SPIDER_RUN_DIR}/stats/_results.json.tmp" "${SPIDER_RUN_DIR}/stats/_results.json"
-done < "${SPIDER_RUN_DIR}/spider_list.txt"
-(>&2 echo "Wrote out summary JSON")
-
 # Create per-group zip
 (>&2 echo "Compressing output files")
 (cd "${SPIDER_RUN_DIR}" && zip -qr "${RUN_GROUP}.zip" output)
@@ -323,18 +328,12 @@ fi
 # Build group manifest
 (>&2 echo "Building group manifest for ${RUN_GROUP}")
 
-# Download previous manifest (if it exists)
-uv run aws s3 cp \
-    --only-show-errors \
-    "s3://${S3_BUCKET}/runs/latest/${RUN_GROUP}.manifest.json" \
-    "${SPIDER_RUN_DIR}/previous_manifest.json" || true
-
 MANIFEST_ARGS=(
     --group "${RUN_GROUP}"
     --run-id "${RUN_TIMESTAMP}"
     --run-url-prefix "${RUN_URL_PREFIX}"
     --spider-list "${SPIDER_RUN_DIR}/spider_list.txt"
-    --stats-dir "${SPIDER_RUN_DIR}/stats"
+    --results "${SPIDER_RUN_DIR}/stats/_results.json"
     --output "${SPIDER_RUN_DIR}/${RUN_GROUP}.manifest.json"
 )
 
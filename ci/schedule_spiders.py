@@ -0,0 +1,135 @@
+import argparse
+import heapq
+import json
+import logging
+import statistics
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Predicted elapsed time of spiders without any history, if no spider has any.
+DEFAULT_ELAPSED_TIME = 600.0
+
+
+def load_elapsed_times(path: Path) -> dict[str, float]:
+    """Load the elapsed time of each spider in an earlier run.
+
+    Accepts the run summary (stats/_results.json), a group manifest, or a
+    directory of per-spider stats JSON files. Spiders without an elapsed
+    time are left out.
+    """
+    elapsed_times = {}
+    if path.is_dir():
+        for stats_file in path.glob("*.json"):
+            if stats_file.name.startswith("_"):
+                continue
+            try:
+                stats = json.loads(stats_file.read_text())
+            except (json.JSONDecodeError, OSError):
+                continue
+            elapsed_times[stats_file.stem] = stats.get("elapsed_time_seconds")
+    else:
+        data = json.loads(path.read_text())
+        if "results" in data:
+            for result in data["results"]:
+                elapsed_times[result["spider"]] = result.get("elapsed_time")
+        else:
+            for spider_name, entry in data.get("spiders", {}).items():
+                elapsed_times[spider_name] = entry.get("elapsed_time")
+    return {spider_name: float(elapsed) for spider_name, elapsed in elapsed_times.items() if elapsed}
+
+
+def predict_elapsed_times(
+    spider_names: list[str],
+    history: dict[str, float],
+    default: float | None = None,
+    timeout: float | None = None,
+) -> dict[str, float]:
+    """Predict the elapsed time of each spider from its earlier runs.
+
+    Spiders without history are predicted to take the default, or if there
+    is none, the median of the spiders with history. No spider is predicted
+    to take longer than the timeout after which it is stopped.
+    """
+    if default is None:
+        known = [history[spider_name] for spider_name in spider_names if spider_name in history]
+        default = statistics.median(known) if known else DEFAULT_ELAPSED_TIME
+    predictions = {spider_name: history.get(spider_name, default) for spider_name in spider_names}
+    if timeout:
+        predictions = {spider_name: min(elapsed, timeout) for spider_name, elapsed in predictions.items()}
+    return predictions
+
+
+def order_longest_first(spider_names: list[str], elapsed_times: dict[str, float]) -> list[str]:
+    """Order spiders by their predicted elapsed time, longest first, keeping the given order of equal times."""
+    return sorted(spider_names, key=lambda spider_name: -elapsed_times[spider_name])
+
+
+def predict_makespan(spider_names: list[str], elapsed_times: dict[str, float], slots: int) -> float:
+    """Predict the time to run every spider.
+
+    Each spider is started, in order, in whichever of the slots (workers
+    times spiders at once per worker) frees first, as with `scrapy
+    crawl_many`.
+    """
+    finish_times = [0.0] * min(slots, len(spider_names))
+    for spider_name in spider_names:
+        heapq.heapreplace(finish_times, finish_times[0] + elapsed_times[spider_name])
+    return max(finish_times, default=0.0)
+
+
+def format_duration(seconds: float) -> str:
+    hours, remainder = divmod(round(seconds), 3600)
+    return f"{hours}h {remainder // 60:02d}m"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order spiders longest first from the elapsed times of earlier runs")
+    parser.add_argument("--spider-list", required=True, help="File with spider names, one per line")
+    parser.add_argument(
+        "--history",
+        action="append",
+        default=[],
+        help="Run summary JSON, group manifest JSON or stats directory of an earlier run, may be repeated with later ones taking precedence",
+    )
+    parser.add_argument("--workers", type=int, required=True, help="Number of crawl_many worker processes")
+    parser.add_argument("--concurrent-spiders", type=int, default=1, help="Number of spiders each worker runs at once")
+    parser.add_argument("--timeout", type=float, help="Seconds after which a spider is stopped")
+    parser.add_argument(
+        "--default-elapsed-time",
+        type=float,
+        help="Predicted seconds for spiders without history (default: the median of those with history)",
+    )
+    parser.add_argument("--output", help="File to write the ordered spider names to (default: --spider-list)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    spider_names = [s for s in Path(args.spider_list).read_text().strip().splitlines() if s]
+
+    history = {}
+    for path in args.history:
+        try:
+            history.update(load_elapsed_times(Path(path)))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Ignoring history %s: %s", path, e)
+
+    elapsed_times = predict_elapsed_times(spider_names, history, args.default_elapsed_time, args.timeout)
+    ordered = order_longest_first(spider_names, elapsed_times)
+    slots = args.workers * args.concurrent_spiders
+
+    Path(args.output or args.spider_list).write_text("".join(f"{spider_name}\n" for spider_name in ordered))
+
+    known = sum(1 for spider_name in spider_names if spider_name in history)
+    logger.info(
+        "Scheduled %s spiders longest first (%s with history) in %s slots, predicted makespan %s (given order: %s)",
+        len(ordered),
+        known,
+        slots,
+        format_duration(predict_makespan(ordered, elapsed_times, slots)),
+        format_duration(predict_makespan(spider_names, elapsed_times, slots)),
+    )
+
+
+if __name__ == "__main__":
+    main()
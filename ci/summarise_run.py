@@ -0,0 +1,145 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from locations.spider_manifest import get_manifest
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def read_stats(stats_file: Path) -> dict | None:
+    """
+    :return: the stats of a spider, empty if unreadable, or None if the spider wrote none
+    """
+    try:
+        return json.loads(stats_file.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning("Couldn't read %s: %s", stats_file, e)
+        return {}
+
+
+def count_lines(path: Path) -> int:
+    """
+    :return: the number of lines in the file, as counted by `wc -l`, or 0 if there is no file
+    """
+    lines = 0
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                lines += chunk.count(b"\n")
+    except FileNotFoundError:
+        pass
+    return lines
+
+
+def summarise_spider(
+    spider_name: str, stats_dir: Path, output_dir: Path | None, filename: str
+) -> tuple[dict | None, int]:
+    """
+    :return: the run summary entry of the spider, or None if it wrote no stats, and the line count of its GeoJSON output
+    """
+    line_count = count_lines(output_dir / f"{spider_name}.geojson") if output_dir else 0
+    if (stats := read_stats(stats_dir / f"{spider_name}.json")) is None:
+        return None, line_count
+    result = {
+        "spider": spider_name,
+        "filename": filename,
+        "errors": stats.get("log_count/ERROR") or 0,
+        "features": stats.get("item_scraped_count") or 0,
+        "elapsed_time": stats.get("elapsed_time_seconds") or 0,
+    }
+    return result, line_count
+
+
+def summarise_run(
+    spider_names: list[str],
+    stats_dir: Path,
+    output_dir: Path | None = None,
+    filenames: dict[str, str] | None = None,
+    threads: int = 16,
+) -> tuple[dict, int]:
+    """Summarise the stats of every spider in a run, as written to stats/_results.json.
+
+    The stats and output of each spider are read once, in a pool of threads.
+    Spiders without stats are left out of the results, which are in order of
+    spider name, as `scrapy list` prints them, whatever order the spiders ran.
+
+    :return: the run summary and the total line count of the GeoJSON output
+    """
+    filenames = filenames or {}
+    spider_names = sorted(spider_names)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        summaries = list(
+            executor.map(
+                lambda spider_name: summarise_spider(
+                    spider_name, stats_dir, output_dir, filenames.get(spider_name, "")
+                ),
+                spider_names,
+            )
+        )
+
+    results = []
+    for spider_name, (result, _) in zip(spider_names, summaries):
+        if result is None:
+            logger.warning("Couldn't find %s", stats_dir / f"{spider_name}.json")
+            continue
+        results.append(result)
+    line_count = sum(lines for _, lines in summaries)
+    return {"count": len(spider_names), "results": results}, line_count
+
+
+def spider_filenames(spider_names: list[str]) -> dict[str, str]:
+    """
+    :return: the file of each spider relative to the working directory, as `scrapy spider_filename` prints them
+    """
+    manifest = get_manifest()
+    filenames = {}
+    for spider_name in spider_names:
+        if spider := manifest.get(spider_name):
+            filenames[spider_name] = os.path.relpath(spider["file"])
+    return filenames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the run summary of every spider and print the line count of their GeoJSON output"
+    )
+    parser.add_argument("--spider-list", required=True, help="File with spider names, one per line")
+    parser.add_argument("--stats-dir", required=True, help="Directory containing per-spider stats JSON files")
+    parser.add_argument("--output-dir", help="Directory containing per-spider GeoJSON files to count the lines of")
+    parser.add_argument("--output", required=True, help="Run summary file path, usually stats/_results.json")
+    parser.add_argument("--threads", type=int, default=16, help="Number of files to read at once")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    spider_names = [s for s in Path(args.spider_list).read_text().strip().splitlines() if s]
+
+    summary, line_count = summarise_run(
+        spider_names,
+        Path(args.stats_dir),
+        Path(args.output_dir) if args.output_dir else None,
+        spider_filenames(spider_names),
+        args.threads,
+    )
+
+    tmp_path = Path(f"{args.output}.tmp")
+    tmp_path.write_text(json.dumps(summary, separators=(",", ":")))
+    os.replace(tmp_path, args.output)
+    logger.info(
+        "Summarised %s of %s spiders, %s lines of output", len(summary["results"]), len(spider_names), line_count
+    )
+
+    sys.stdout.write(f"{line_count}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+import logging
+
+from scrapy.commands import ScrapyCommand
+
+from locations.searchable_points.store import STORE_FILE_PATH, write_store
+
+logger = logging.getLogger(__name__)
+
+
+class BuildSearchablePointsCommand(ScrapyCommand):
+    default_settings = {"LOG_ENABLED": False}
+
+    def short_desc(self) -> str:
+        return "Build the binary store of searchable points"
+
+    def long_desc(self) -> str:
+        return (
+            "Parse every searchable points CSV and postcode file into a single binary store, "
+            "which spiders memory map rather than each parsing the files they search from"
+        )
+
+    def run(self, args: list[str], opts: argparse.Namespace) -> None:
+        logger.info("Writing searchable points store")
+        write_store(STORE_FILE_PATH)
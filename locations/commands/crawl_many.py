@@ -0,0 +1,433 @@
+import argparse
+import contextlib
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from multiprocessing.context import ForkProcess
+from typing import Any, cast
+
+from scrapy.commands import ScrapyCommand
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.exceptions import UsageError
+from scrapy.settings import Settings
+from scrapy.statscollectors import StatsCollector
+from scrapy.utils.defer import deferred_from_coro
+from scrapy.utils.reactor import install_reactor
+from twisted.internet.base import ReactorBase
+from twisted.python.failure import Failure
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORMATS = ["geojson", "ndgeojson", "parquet_shard"]
+
+
+def get_reactor() -> ReactorBase:
+    """
+    :return: the installed reactor, imported only once install_reactor has chosen it
+    """
+    from twisted.internet import reactor
+
+    return cast(ReactorBase, reactor)
+
+
+class SpiderLogHandler(logging.FileHandler):
+    """
+    Write the log records belonging to one crawler to its own file. Several
+    crawlers share a process, so records are attributed to a crawler by the
+    "spider" or "crawler" extra that Scrapy attaches, or by the logger name of
+    the spider and its module.
+
+    The records written are also counted into the "log_count/<level>" stats of
+    the crawler. Scrapy's LogCount extension cannot be used for this as it
+    counts every record of the process, including those of other crawlers.
+    """
+
+    def __init__(self, crawler: Crawler, filename: str):
+        super().__init__(filename, mode="w", encoding=crawler.settings.get("LOG_ENCODING"))
+        self.crawler = crawler
+        self.setLevel(crawler.settings.get("LOG_LEVEL"))
+        self.setFormatter(
+            logging.Formatter(fmt=crawler.settings.get("LOG_FORMAT"), datefmt=crawler.settings.get("LOG_DATEFORMAT"))
+        )
+        self.logger_names = (crawler.spidercls.name, crawler.spidercls.__module__)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (spider := getattr(record, "spider", None)) is not None:
+            return getattr(spider, "crawler", None) is self.crawler
+        if (crawler := getattr(record, "crawler", None)) is not None:
+            return crawler is self.crawler
+        return record.name in self.logger_names
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        if stats := crawler_stats(self.crawler):
+            stats.inc_value(f"log_count/{record.levelname}")
+
+
+def crawler_stats(crawler: Crawler) -> StatsCollector | None:
+    try:
+        return crawler.stats
+    except RuntimeError:
+        # Not set until the crawl starts.
+        return None
+
+
+class CrawlWorker:
+    """
+    Run spiders taken from a shared queue, several at a time, in the reactor
+    of a single worker process. No more spiders are taken once `draining` is
+    set, so that the spiders running can finish before the worker is killed.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        tasks: multiprocessing.Queue,
+        results: multiprocessing.Queue,
+        all_queued: Any,
+        draining: Any,
+        opts: argparse.Namespace,
+    ):
+        self.settings = settings
+        self.tasks = tasks
+        self.results = results
+        self.all_queued = all_queued
+        self.draining = draining
+        self.opts = opts
+        self.stopping = False
+
+    def run(self) -> None:
+        install_reactor(self.settings["TWISTED_REACTOR"], self.settings["ASYNCIO_EVENT_LOOP"])
+        from twisted.internet.defer import DeferredList
+
+        self.crawler_process = CrawlerProcess(self.settings)
+        get_reactor().addSystemEventTrigger("before", "shutdown", self.stop)
+
+        slots = DeferredList([self.run_slot() for _ in range(self.opts.concurrent_spiders)])
+        slots.addBoth(self.stop_reactor)
+        self.crawler_process.start(stop_after_crawl=False)
+
+    def stop(self) -> None:
+        self.stopping = True
+
+    @staticmethod
+    def stop_reactor(_: Any = None) -> None:
+        # Raised if the reactor is already stopping, e.g. after a signal.
+        with contextlib.suppress(RuntimeError):
+            get_reactor().stop()
+
+    def next_spider(self) -> str | None:
+        # Runs in a reactor thread, so it must return once the reactor wants to stop.
+        while not self.stopping and not self.draining.is_set():
+            try:
+                return self.tasks.get(timeout=1)
+            except queue.Empty:
+                if self.all_queued.is_set():
+                    return None
+        return None
+
+    def run_slot(self):
+        from twisted.internet.defer import inlineCallbacks
+        from twisted.internet.threads import deferToThread
+
+        @inlineCallbacks
+        def slot():
+            while spider_name := (yield deferToThread(self.next_spider)):
+                yield self.crawl(spider_name)
+
+        return slot()
+
+    def crawl(self, spider_name: str):
+        self.results.put(("started", spider_name, os.getpid()))
+        spidercls = self.crawler_process.spider_loader.load(spider_name)
+        crawler = Crawler(spidercls, spider_settings(self.settings, spider_name, self.opts))
+        log_handler = SpiderLogHandler(crawler, os.path.join(self.opts.output_dir, "logs", f"{spider_name}.txt"))
+        logging.root.addHandler(log_handler)
+
+        timer = None
+        if self.opts.timeout:
+            # Mirror `timeout -k`: ask the spider to stop, the parent process kills the worker if that doesn't work.
+            timer = get_reactor().callLater(self.opts.timeout + self.opts.kill_after, self.stop_crawler, crawler)
+
+        def finished(result):
+            if timer is not None and timer.active():
+                timer.cancel()
+            logging.root.removeHandler(log_handler)
+            log_handler.close()
+            if isinstance(result, Failure):
+                logger.error("Spider %s failed: %s", spider_name, result.value)
+                reason = "error"
+            elif stats := crawler_stats(crawler):
+                reason = stats.get_value("finish_reason", "finished")
+            else:
+                reason = "finished"
+            self.results.put(("finished", spider_name, os.getpid(), reason))
+
+        d = self.crawler_process.crawl(crawler)
+        d.addBoth(finished)
+        return d
+
+    @staticmethod
+    def stop_crawler(crawler: Crawler) -> None:
+        logger.error("Spider %s exceeded its time limit, stopping", crawler.spidercls.name)
+        deferred_from_coro(crawler.stop_async())
+
+
+def spider_settings(settings: Settings, spider_name: str, opts: argparse.Namespace) -> Settings:
+    """
+    :return: the settings for a single spider, with the per spider output, stats
+             and time limit that `scrapy crawl` would be given on the command line
+    """
+    spider_settings = settings.copy()
+    spider_settings.set(
+        "FEEDS",
+        {
+            os.path.join(opts.output_dir, "output", f"{spider_name}.{feed_format}"): {
+                "format": feed_format,
+                "overwrite": True,
+            }
+            for feed_format in opts.formats
+        },
+        priority="cmdline",
+    )
+    spider_settings.set("LOGSTATS_FILE", os.path.join(opts.output_dir, "stats", f"{spider_name}.json"), "cmdline")
+    if opts.timeout:
+        spider_settings.set("CLOSESPIDER_TIMEOUT", opts.timeout, "cmdline")
+    extensions = spider_settings.getdict("EXTENSIONS")
+    extensions["scrapy.extensions.logcount.LogCount"] = None
+    spider_settings.set("EXTENSIONS", extensions, "cmdline")
+    return spider_settings
+
+
+def _run_worker(*args: Any) -> None:
+    CrawlWorker(*args).run()
+
+
+def preload_shared_data() -> None:
+    """
+    Load the read only data used by most spiders before the workers are
+    forked, so that each worker shares it rather than loading its own copy.
+    """
+    import reverse_geocoder
+
+    from locations.name_suggestion_index import NSI
+
+    try:
+        NSI()._ensure_loaded()
+    except OSError as e:
+        logger.warning("Not preloading the NSI: %s", e)
+    reverse_geocoder.get((0.0, 0.0), mode=1, verbose=False)
+
+
+class CrawlManyCommand(ScrapyCommand):
+    requires_project = True
+
+    def syntax(self) -> str:
+        return "[options] [<spider> ...]"
+
+    def short_desc(self) -> str:
+        return "Run many spiders in a pool of worker processes"
+
+    def long_desc(self) -> str:
+        return (
+            "Run the given spiders (or every spider) in a fixed pool of worker processes, each of which runs "
+            "several spiders at once in a single reactor. Every spider writes its own output, log and stats "
+            "file, as `scrapy crawl` does when given --output, --logfile and -s LOGSTATS_FILE."
+        )
+
+    def add_options(self, parser: argparse.ArgumentParser) -> None:
+        super().add_options(parser)
+        parser.add_argument("--spider-list", dest="spider_list", help="file of spider names to run, one per line")
+        parser.add_argument(
+            "--output-dir", dest="output_dir", required=True, help="directory for output/, logs/ and stats/"
+        )
+        parser.add_argument(
+            "--format",
+            dest="formats",
+            action="append",
+            help=f"feed format to write for each spider, may be repeated (default: {', '.join(DEFAULT_FORMATS)})",
+        )
+        parser.add_argument(
+            "--workers", dest="workers", type=int, default=os.cpu_count() or 1, help="number of worker processes"
+        )
+        parser.add_argument(
+            "--concurrent-spiders",
+            dest="concurrent_spiders",
+            type=int,
+            default=4,
+            help="number of spiders each worker runs at once",
+        )
+        parser.add_argument(
+            "--timeout", dest="timeout", type=int, default=0, help="seconds after which a spider is closed"
+        )
+        parser.add_argument(
+            "--kill-after",
+            dest="kill_after",
+            type=int,
+            default=15 * 60,
+            help="seconds past --timeout before a spider is stopped, and again before its worker is killed",
+        )
+
+    def process_options(self, args: list[str], opts: argparse.Namespace) -> None:
+        super().process_options(args, opts)
+        opts.formats = opts.formats or DEFAULT_FORMATS
+        if opts.workers < 1 or opts.concurrent_spiders < 1:
+            raise UsageError("--workers and --concurrent-spiders must be at least 1")
+
+    def run(self, args: list[str], opts: argparse.Namespace) -> None:
+        if not self.crawler_process:
+            raise RuntimeError("Crawler process not defined")
+        if not self.settings:
+            raise RuntimeError("Settings not defined")
+
+        spider_names = list(args)
+        if opts.spider_list:
+            with open(opts.spider_list) as f:
+                spider_names.extend(line.strip() for line in f if line.strip())
+        if not spider_names:
+            spider_names = sorted(self.crawler_process.spider_loader.list())
+        if unknown := set(spider_names) - set(self.crawler_process.spider_loader.list()):
+            raise UsageError(f"Spider not found: {', '.join(sorted(unknown))}")
+
+        for directory in ("output", "logs", "stats"):
+            os.makedirs(os.path.join(opts.output_dir, directory), exist_ok=True)
+
+        # The spider loader imports spider modules on demand, import them once here for every worker.
+        for spider_name in spider_names:
+            self.crawler_process.spider_loader.load(spider_name)
+        preload_shared_data()
+
+        failed = CrawlPool(self.settings, opts).run(spider_names)
+        if failed:
+            logger.error("%s spiders did not complete: %s", len(failed), ", ".join(sorted(failed)))
+            self.exitcode = 1
+
+
+class CrawlPool:
+    """
+    Hand spiders out to worker processes and enforce the hard per spider time
+    limit, replacing workers that are killed or die.
+    """
+
+    def __init__(self, settings: Settings, opts: argparse.Namespace):
+        self.settings = settings
+        self.opts = opts
+        # Fork so that workers share the imported spiders and preloaded data.
+        self.context = multiprocessing.get_context("fork")
+        self.tasks = self.context.Queue()
+        self.results = self.context.Queue()
+        self.all_queued = self.context.Event()
+        self.workers: dict[int, ForkProcess] = {}
+        self.draining: dict[int, Any] = {}
+        self.running: dict[str, tuple[int, float]] = {}
+        self.retried: set[str] = set()
+        self.failed: set[str] = set()
+
+    def start_worker(self) -> None:
+        draining = self.context.Event()
+        worker = self.context.Process(
+            target=_run_worker, args=(self.settings, self.tasks, self.results, self.all_queued, draining, self.opts)
+        )
+        worker.start()
+        assert worker.pid is not None
+        self.workers[worker.pid] = worker
+        self.draining[worker.pid] = draining
+
+    def run(self, spider_names: list[str]) -> set[str]:
+        remaining = set(spider_names)
+        for spider_name in spider_names:
+            self.tasks.put(spider_name)
+        for _ in range(min(self.opts.workers, len(spider_names))):
+            self.start_worker()
+
+        logger.info("Running %s spiders in %s workers", len(spider_names), len(self.workers))
+        try:
+            while remaining:
+                try:
+                    message = self.results.get(timeout=5)
+                except queue.Empty:
+                    pass
+                else:
+                    if message[0] == "started":
+                        self.running[message[1]] = (message[2], time.monotonic())
+                    elif message[0] == "finished":
+                        self.running.pop(message[1], None)
+                        remaining.discard(message[1])
+                        logger.info("Spider %s finished (%s), %s remaining", message[1], message[3], len(remaining))
+
+                for spider_name in self.kill_overdue_workers() | self.reap_dead_workers():
+                    remaining.discard(spider_name)
+                if remaining and len(self.workers) < self.opts.workers:
+                    self.start_worker()
+        finally:
+            self.all_queued.set()
+            for worker in self.workers.values():
+                worker.join(timeout=60)
+                if worker.is_alive():
+                    worker.kill()
+
+        return self.failed
+
+    def kill_overdue_workers(self) -> set[str]:
+        """
+        Drain any worker running a spider that did not stop by its hard time
+        limit, so that it takes no more spiders, and kill it once every spider
+        it still runs is overdue. The other spiders of the worker are left to
+        finish rather than being lost with it.
+        :return: the overdue spiders of the workers killed
+        """
+        if not self.opts.timeout:
+            return set()
+        limit = self.opts.timeout + 2 * self.opts.kill_after
+        now = time.monotonic()
+        overdue = {spider_name for spider_name, (_, started) in self.running.items() if now - started > limit}
+        killed = set()
+        for pid in {self.running[spider_name][0] for spider_name in overdue}:
+            spider_names = {spider_name for spider_name, (spider_pid, _) in self.running.items() if spider_pid == pid}
+            if pid in self.workers and not spider_names <= overdue:
+                if not self.draining[pid].is_set():
+                    logger.error(
+                        "Spider %s did not stop, killing worker %s once its other spiders finish",
+                        ", ".join(sorted(spider_names & overdue)),
+                        pid,
+                    )
+                    self.draining[pid].set()
+                continue
+            if pid in self.workers:
+                logger.error("Spider %s did not stop, killing worker %s", ", ".join(sorted(spider_names)), pid)
+                os.kill(pid, signal.SIGKILL)
+                self.workers[pid].join()
+            killed |= spider_names & overdue
+        self.failed |= killed
+        for spider_name in killed:
+            del self.running[spider_name]
+        return killed
+
+    def reap_dead_workers(self) -> set[str]:
+        """
+        Requeue the spiders that were running in any worker that has died. A
+        spider whose worker dies twice is given up on.
+        :return: the spiders given up on
+        """
+        given_up = set()
+        for pid, worker in list(self.workers.items()):
+            if worker.is_alive():
+                continue
+            del self.workers[pid]
+            del self.draining[pid]
+            for spider_name, (spider_pid, _) in list(self.running.items()):
+                if spider_pid != pid:
+                    continue
+                del self.running[spider_name]
+                if spider_name in self.retried:
+                    logger.error("Spider %s lost with worker %s, giving up", spider_name, pid)
+                    given_up.add(spider_name)
+                else:
+                    logger.warning("Spider %s lost with worker %s, retrying", spider_name, pid)
+                    self.retried.add(spider_name)
+                    self.tasks.put(spider_name)
+        self.failed |= given_up
+        return given_up
@@ -1,22 +1,38 @@
 import argparse
+import functools
 import json
 import os
 import pprint
 import re
 from collections import Counter, defaultdict
-from typing import IO, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
+from typing import IO, Callable, Iterable, NamedTuple, TypedDict, TypeVar
 from zipfile import ZipFile
 
 import ijson
+import pyarrow.parquet
 import requests
-import scrapy.statscollectors
 from scrapy.commands import ScrapyCommand
-from scrapy.crawler import Crawler
 from scrapy.exceptions import UsageError
 
 from locations.name_suggestion_index import NSI
 from locations.user_agents import BOT_USER_AGENT_REQUESTS
 
+T = TypeVar("T")
+
+
+class FeatureSource(NamedTuple):
+    """
+    A part of an input file which can be read independently of the rest: a
+    JSON file, one member of a ZIP archive, or one row group of a Parquet file.
+    """
+
+    path: str
+    member: str | None = None
+    row_group: int | None = None
+
 
 def iter_json(stream: IO[bytes] | IO[str], file_name: str) -> Iterable[dict]:
     try:
@@ -35,26 +51,46 @@ def iter_json(stream: IO[bytes] | IO[str], file_name: str) -> Iterable[dict]:
         print(e)
 
 
-def iter_features(files_and_dirs: list[str], ignore_spiders: list[str]) -> Iterable[dict]:
+def iter_parquet(parquet_file: pyarrow.parquet.ParquetFile, row_group: int) -> Iterable[dict]:
+    """
+    Read the properties of the features in a row group of a Parquet file,
+    either a "properties" map column as written by ci/ndgeojsons_to_parquet.py
+    or a column per property as written by the geoparquet exporter. Geometry is
+    not read.
+    """
+    if "properties" in parquet_file.schema_arrow.names:
+        for batch in parquet_file.iter_batches(row_groups=[row_group], columns=["properties"]):
+            for properties in batch.column("properties").to_pylist():
+                yield {"type": "Feature", "properties": dict(properties or [])}
+        return
+    geo = json.loads((parquet_file.schema_arrow.metadata or {}).get(b"geo", b"{}"))
+    geometry_columns = set(geo.get("columns", {}).keys())
+    columns = [name for name in parquet_file.schema_arrow.names if name not in geometry_columns]
+    for batch in parquet_file.iter_batches(row_groups=[row_group], columns=columns):
+        for row in batch.to_pylist():
+            yield {"type": "Feature", "properties": {k: v for k, v in row.items() if v is not None}}
+
+
+def ignore_file(s: str, ignore_spiders: list[str]) -> bool:
+    if s.endswith("json") or s.endswith(".zip") or s.endswith(".parquet"):
+        for ignore_spider in ignore_spiders:
+            if ignore_spider in s:
+                return True
+        # It's a JSON, ZIP or Parquet file whose name does not trigger any ignore filter, it's good to process.
+        return False
+    else:
+        return True
+
+
+def find_sources(files_and_dirs: list[str], ignore_spiders: list[str]) -> list[FeatureSource]:
     """
-    Iterate through a set of GeoJSON files and directories. Each item in the iteration is a
-    single feature. Zero length files are skipped. Only files ending .json, .geojson or .ndgeojson
-    are processed.
+    Find the JSON files, ZIP archive members and Parquet row groups to read.
+    Zero length files are skipped. Only files ending .json, .geojson, .ndgeojson,
+    .zip or .parquet are processed.
     :param files_and_dirs: a list of files and directories
     :param ignore_spiders: file names matching any of the strings in this list will be ignored
-    :return: a GeoJSON feature iterator
+    :return: the sources, in the order their features are to be read
     """
-
-    def ignore_file(s: str) -> bool:
-        if s.endswith("json") or s.endswith(".zip"):
-            for ignore_spider in ignore_spiders:
-                if ignore_spider in s:
-                    return True
-            # It's a JSON or ZIP file whose name does not trigger any ignore filter, it's good to process.
-            return False
-        else:
-            return True
-
     file_list = []
     for file_or_dir in files_and_dirs:
         if os.path.isfile(file_or_dir):
@@ -65,20 +101,178 @@ def iter_features(files_and_dirs: list[str], ignore_spiders: list[str]) -> Itera
         else:
             raise UsageError("no such file or directory: " + file_or_dir)
 
-    file_list = list(filter(lambda x: not ignore_file(x) and os.path.getsize(x) > 0, file_list))
+    file_list = list(filter(lambda x: not ignore_file(x, ignore_spiders) and os.path.getsize(x) > 0, file_list))
     if len(file_list) == 0:
-        raise UsageError("no non-empty JSON/ZIP files found")
+        raise UsageError("no non-empty JSON/ZIP/Parquet files found")
 
+    sources = []
     for file_path in file_list:
         if file_path.endswith(".zip"):
             with ZipFile(file_path) as zip_file:
                 for name in zip_file.namelist():
-                    if not ignore_file(name):
-                        with zip_file.open(name) as f:
-                            yield from iter_json(f, name)
+                    if not ignore_file(name, ignore_spiders):
+                        sources.append(FeatureSource(file_path, member=name))
+        elif file_path.endswith(".parquet"):
+            for row_group in range(pyarrow.parquet.ParquetFile(file_path).num_row_groups):
+                sources.append(FeatureSource(file_path, row_group=row_group))
+        else:
+            sources.append(FeatureSource(file_path))
+    return sources
+
+
+def iter_source_features(source: FeatureSource, ignore_spiders: list[str]) -> Iterable[dict]:
+    if source.member is not None:
+        with ZipFile(source.path) as zip_file:
+            with zip_file.open(source.member) as f:
+                yield from iter_json(f, source.member)
+    elif source.row_group is not None:
+        # A Parquet file holds the features of every spider, filter on the spider name instead.
+        for feature in iter_parquet(pyarrow.parquet.ParquetFile(source.path), source.row_group):
+            spider = feature["properties"].get("@spider") or ""
+            if not any(ignore_spider in spider for ignore_spider in ignore_spiders):
+                yield feature
+    else:
+        with open(source.path, "rb") as f:
+            yield from iter_json(f, source.path)
+
+
+def iter_features(files_and_dirs: list[str], ignore_spiders: list[str]) -> Iterable[dict]:
+    """
+    Iterate through a set of GeoJSON and Parquet files and directories. Each item in the
+    iteration is a single feature.
+    :param files_and_dirs: a list of files and directories
+    :param ignore_spiders: file names matching any of the strings in this list will be ignored
+    :return: a GeoJSON feature iterator
+    """
+    for source in find_sources(files_and_dirs, ignore_spiders):
+        yield from iter_source_features(source, ignore_spiders)
+
+
+def scan_source(scan: Callable[[Iterable[dict]], T], source: FeatureSource, ignore_spiders: list[str]) -> T:
+    return scan(iter_source_features(source, ignore_spiders))
+
+
+def scan_features(
+    scan: Callable[[Iterable[dict]], T], files_and_dirs: list[str], ignore_spiders: list[str], workers: int
+) -> Iterable[T]:
+    """
+    Apply a scan function to the features of each source, in a pool of worker
+    processes if there is more than one.
+    :return: the result of the scan function for each source, in source order
+    """
+    sources = find_sources(files_and_dirs, ignore_spiders)
+    if workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            yield scan_source(scan, source, ignore_spiders)
+        return
+    # Forked workers share data already loaded by the parent, such as the NSI.
+    with ProcessPoolExecutor(max_workers=min(workers, len(sources)), mp_context=get_context("fork")) as executor:
+        yield from executor.map(
+            scan_source, repeat(scan), sources, repeat(ignore_spiders), chunksize=max(1, len(sources) // (workers * 8))
+        )
+
+
+def count_value_types(features: Iterable[dict]) -> Counter:
+    counter = Counter()
+    for feature in features:
+        spider_name = feature["properties"].get("@spider")
+        for k, v in feature["properties"].items():
+            if not isinstance(v, str):
+                counter[f"{spider_name}/{k}/{type(v).__name__}"] += 1
+    return counter
+
+
+def count_wikidata_codes(features: Iterable[dict]) -> tuple[Counter, Counter]:
+    nsi = NSI()
+    spider_empty_counter = Counter()
+    spider_nsi_missing_counter = Counter()
+    for feature in features:
+        spider_name = feature["properties"].get("@spider")
+        brand_wikidata = feature["properties"].get("brand:wikidata")
+        if not brand_wikidata:
+            spider_empty_counter[spider_name] += 1
+        elif not nsi.lookup_wikidata(brand_wikidata):
+            spider_nsi_missing_counter[spider_name + "/" + brand_wikidata] += 1
         else:
-            with open(file_path) as f:
-                yield from iter_json(f, file_path)
+            # TODO: query wikidata to see if Q-code remotely sensible?
+            pass
+    return spider_empty_counter, spider_nsi_missing_counter
+
+
+def get_brand_name(item_tags: dict) -> str | None:
+    # Prefer English brand name for insights application (https://www.alltheplaces.xyz/wikidata.html).
+    if brand_en := item_tags.get("brand:en"):
+        return str(brand_en)
+    if brand := item_tags.get("brand"):
+        return str(brand)
+    return None
+
+
+class AtpCodeCount(TypedDict):
+    nsi_id: str | None
+    atp_count: int
+    atp_brand: str | None
+    # Feature counts by country and then spider.
+    atp_splits: dict[str | None, dict[str, int]]
+
+
+def count_atp_wikidata_codes(features: Iterable[dict]) -> dict[str, AtpCodeCount]:
+    """
+    Summarise the features of each brand wikidata code: the last NSI id and
+    brand name seen, and the number of features by country and spider.
+    """
+    codes: dict[str, AtpCodeCount] = {}
+    for feature in features:
+        properties = feature["properties"]
+        brand_wikidata = properties.get("brand:wikidata")
+        if not brand_wikidata:
+            continue
+        if not (r := codes.get(brand_wikidata)):
+            r = codes[brand_wikidata] = AtpCodeCount(nsi_id=None, atp_count=0, atp_brand=None, atp_splits={})
+
+        if nsi_id := properties.get("nsi_id"):
+            r["nsi_id"] = nsi_id
+        r["atp_count"] += 1
+        if brand := get_brand_name(properties):
+            r["atp_brand"] = brand
+
+        split = r["atp_splits"].setdefault(properties.get("addr:country"), {})
+        spider = properties.get("@spider")
+        split[spider] = split.get(spider, 0) + 1
+    return codes
+
+
+@functools.cache
+def nsi_items_by_id() -> dict[str, dict]:
+    nsi = NSI()
+    nsi._ensure_loaded()
+    # Collect category properties like preserveTags for convenience, and create a quick lookup
+    # by ID
+    nsi_items = {}
+    for v in nsi.nsi_json.values():
+        for item in v["items"]:
+            nsi_items[item["id"]] = item | v["properties"]
+    return nsi_items
+
+
+def count_nsi_overrides(features: Iterable[dict]) -> tuple[dict[str, Counter], list[str]]:
+    nsi_items = nsi_items_by_id()
+    counts = defaultdict(Counter)
+    missing = []
+    for feature in features:
+        properties = feature["properties"]
+
+        if "nsi_id" not in properties:
+            continue
+        if properties["nsi_id"] not in nsi_items:
+            missing.append(properties["nsi_id"])
+            continue
+
+        match = nsi_items[properties["nsi_id"]]
+        for key, value in match["tags"].items():
+            if properties.get(key) != value and not any(re.match(pat, key) for pat in match.get("preserveTags", [])):
+                counts[key][properties["@spider"]] += 1
+    return dict(counts), missing
 
 
 # Some utilities that help with the analysis of project GeoJSON output files.
@@ -90,7 +284,7 @@ class InsightsCommand(ScrapyCommand):
         return "[options] <file/dir> ... <file/dir>"
 
     def short_desc(self) -> str:
-        return "Analyze GeoJSON POI files (including ZIP archives) for quality insights"
+        return "Analyze GeoJSON POI files (including ZIP archives) and Parquet files for quality insights"
 
     def add_options(self, parser: argparse.ArgumentParser) -> None:
         ScrapyCommand.add_options(self, parser)
@@ -132,6 +326,13 @@ class InsightsCommand(ScrapyCommand):
             action="store_true",
             help="Check for feature tags that differ from the brand's NSI preset",
         )
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of processes to read files with (default: %(default)s)",
+        )
 
     def run(self, args: list[str], opts: argparse.Namespace) -> None:
         if len(args) < 1:
@@ -155,30 +356,18 @@ class InsightsCommand(ScrapyCommand):
             print(counter)
 
     def check_value_types(self, args: list[str], opts: argparse.Namespace) -> None:
-        crawler = Crawler(scrapy.Spider)
-        stats = scrapy.statscollectors.StatsCollector(crawler)
-        for feature in iter_features(args, opts.filter_spiders):
-            spider_name = feature["properties"].get("@spider")
-            for k, v in feature["properties"].items():
-                if not isinstance(v, str):
-                    stats.inc_value(f"{spider_name}/{k}/{type(v).__name__}")
-
-            pprint.pp(stats._stats)
+        counter = Counter()
+        for partial in scan_features(count_value_types, args, opts.filter_spiders, opts.workers):
+            counter.update(partial)
+        pprint.pp(dict(counter))
 
     def check_wikidata_codes(self, args: list[str], opts: argparse.Namespace) -> None:
-        nsi = NSI()
+        NSI()._ensure_loaded()
         spider_empty_counter = Counter()
         spider_nsi_missing_counter = Counter()
-        for feature in iter_features(args, opts.filter_spiders):
-            spider_name = feature["properties"].get("@spider")
-            brand_wikidata = feature["properties"].get("brand:wikidata")
-            if not brand_wikidata:
-                spider_empty_counter[spider_name] += 1
-            elif not nsi.lookup_wikidata(brand_wikidata):
-                spider_nsi_missing_counter[spider_name + "/" + brand_wikidata] += 1
-            else:
-                # TODO: query wikidata to see if Q-code remotely sensible?
-                pass
+        for empty, nsi_missing in scan_features(count_wikidata_codes, args, opts.filter_spiders, opts.workers):
+            spider_empty_counter.update(empty)
+            spider_nsi_missing_counter.update(nsi_missing)
         self.show_counter("SPIDERS WITH NO BRAND DATA:", spider_empty_counter)
         self.show_counter("NSI MISSING WIKIDATA CODE:", spider_nsi_missing_counter)
 
@@ -208,14 +397,6 @@ class InsightsCommand(ScrapyCommand):
             wikidata_dict[wikidata_code] = record
             return record
 
-        def get_brand_name(item_tags: dict) -> str | None:
-            # Prefer English brand name for insights application (https://www.alltheplaces.xyz/wikidata.html).
-            if brand_en := item_tags.get("brand:en"):
-                return str(brand_en)
-            if brand := item_tags.get("brand"):
-                return str(brand)
-            return None
-
         # A dict keyed by wikidata code.
         wikidata_dict = {}
 
@@ -253,35 +434,27 @@ class InsightsCommand(ScrapyCommand):
         #       If not then that would be a possible problem to highlight.
 
         # Walk through the referenced ATP downloads, if they have wikidata codes then update our output table.
-        for feature in iter_features(args, opts.filter_spiders):
-            properties = feature["properties"]
-            brand_wikidata = properties.get("brand:wikidata")
-            if not brand_wikidata:
-                continue
-            brand = get_brand_name(properties)
-            r = lookup_code(brand_wikidata)
-
-            if nsi_id := properties.get("nsi_id"):
-                # If we have found the brand in NSI then show the NSI brand name in the
-                # output JSON to help highlight where a spider brand name differs from
-                # the NSI brand name.
-                r["nsi_brand"] = nsi_id_to_brand.get(nsi_id)
-
-            count = r.get("atp_count") or 0
-            r["atp_count"] = count + 1
-            if brand:
-                r["atp_brand"] = brand
-
-            splits = r["atp_splits"]
-            country = properties.get("addr:country")
-            if country not in splits:
-                splits[country] = {}
-            split = splits[country]
-
-            spider = properties.get("@spider")
-            r["atp_supplier_count"].add(spider)
-            spider_count = split.get(spider) or 0
-            split[spider] = spider_count + 1
+        # Sources are summarised in parallel and merged in order, so the last NSI id and brand name seen win.
+        for codes in scan_features(count_atp_wikidata_codes, args, opts.filter_spiders, opts.workers):
+            for brand_wikidata, code in codes.items():
+                r = lookup_code(brand_wikidata)
+
+                if nsi_id := code["nsi_id"]:
+                    # If we have found the brand in NSI then show the NSI brand name in the
+                    # output JSON to help highlight where a spider brand name differs from
+                    # the NSI brand name.
+                    r["nsi_brand"] = nsi_id_to_brand.get(nsi_id)
+
+                r["atp_count"] = (r.get("atp_count") or 0) + code["atp_count"]
+                if brand := code["atp_brand"]:
+                    r["atp_brand"] = brand
+
+                splits = r["atp_splits"]
+                for country, spiders in code["atp_splits"].items():
+                    split = splits.setdefault(country, {})
+                    for spider, count in spiders.items():
+                        r["atp_supplier_count"].add(spider)
+                        split[spider] = split.get(spider, 0) + count
 
         for record in wikidata_dict.values():
             record["atp_country_count"] = len(record["atp_splits"])
@@ -293,31 +466,14 @@ class InsightsCommand(ScrapyCommand):
             json.dump(for_datatables, f)
 
     def nsi_overrides(self, args: list[str], opts: argparse.Namespace) -> None:
-        nsi = NSI()
-        nsi._ensure_loaded()
-        # Collect category properties like preserveTags for convenience, and create a quick lookup
-        # by ID
-        nsi_items = {}
-        for v in nsi.nsi_json.values():
-            for item in v["items"]:
-                nsi_items[item["id"]] = item | v["properties"]
-
+        # Load the NSI before any worker processes are forked.
+        nsi_items_by_id()
         counts = defaultdict(Counter)
-        for feature in iter_features(args, opts.filter_spiders):
-            properties = feature["properties"]
-
-            if "nsi_id" not in properties:
-                continue
-            if properties["nsi_id"] not in nsi_items:
-                print("No NSI preset with ID", properties["nsi_id"])
-                continue
-
-            match = nsi_items[properties["nsi_id"]]
-            for key, value in match["tags"].items():
-                if properties.get(key) != value and not any(
-                    re.match(pat, key) for pat in match.get("preserveTags", [])
-                ):
-                    counts[key][properties["@spider"]] += 1
+        for partial_counts, missing in scan_features(count_nsi_overrides, args, opts.filter_spiders, opts.workers):
+            for nsi_id in missing:
+                print("No NSI preset with ID", nsi_id)
+            for key, counter in partial_counts.items():
+                counts[key].update(counter)
 
         for key, counter in counts.items():
             self.show_counter(f"SPIDERS WITH MISMATCHED {key} TAG:", counter)
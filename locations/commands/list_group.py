@@ -4,7 +4,8 @@ import sys
 from scrapy.commands import ScrapyCommand
 from scrapy.exceptions import UsageError
 
-from locations.extensions.add_lineage import VALID_GROUPS, lineage_for_group, spider_class_to_lineage
+from locations.extensions.add_lineage import VALID_GROUPS, lineage_for_group
+from locations.spider_manifest import get_manifest
 
 
 class ListGroupCommand(ScrapyCommand):
@@ -33,11 +34,10 @@ class ListGroupCommand(ScrapyCommand):
             self.exitcode = 1
             return
 
-        if not self.crawler_process:
-            raise RuntimeError("Crawler process not defined")
+        if not self.settings:
+            raise RuntimeError("Settings not defined")
 
-        for spider_name in sorted(self.crawler_process.spider_loader.list()):
-            spidercls = self.crawler_process.spider_loader.load(spider_name)
-            spider_lineage = spider_class_to_lineage(spidercls)
-            if spider_lineage.group == group:
-                sys.stdout.write(f"{spider_name}\n")
+        # The manifest records the group of every spider, so no spider needs importing.
+        manifest = get_manifest(self.settings.getlist("SPIDER_MODULES"))
+        for spider_name in sorted(manifest.names_in_group(group)):
+            sys.stdout.write(f"{spider_name}\n")
@@ -1,15 +1,14 @@
 import argparse
-import re
 from typing import Iterable
 from urllib.parse import urlparse
 
 from scrapy.commands import BaseRunSpiderCommand
 from scrapy.exceptions import UsageError
 from scrapy.http import Request, Response
-from scrapy.spiders import SitemapSpider
 from scrapy.spiders.sitemap import iterloc
-from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
+from scrapy.utils.sitemap import sitemap_urls_from_robots
 
+from locations.sitemap_spider import RuleMatcher, SitemapSpider, StreamingSitemap
 from locations.user_agents import BROWSER_DEFAULT
 
 
@@ -316,17 +315,18 @@ class MySitemapSpider(SitemapSpider):
         r"stores\.(.*)/fl/\w+/$",
         r"stores\.(.*)\/\w-\-.*$",
     ]
+    common_sitemap_matcher = RuleMatcher(common_sitemap_patterns)
     matched_patterns = {}
 
     # Examine a url and highlight possible store pages, store finder pages of interest
     def extract_possible_store(self, url: str) -> None:
         print(url)
-        for pattern in self.common_sitemap_patterns:
-            if re.search(pattern, url):
-                if pattern in self.matched_patterns:
-                    self.matched_patterns[pattern] = self.matched_patterns[pattern] + 1
-                else:
-                    self.matched_patterns[pattern] = 1
+        for i in self.common_sitemap_matcher.matches(url):
+            pattern = self.common_sitemap_patterns[i]
+            if pattern in self.matched_patterns:
+                self.matched_patterns[pattern] = self.matched_patterns[pattern] + 1
+            else:
+                self.matched_patterns[pattern] = 1
 
     def _parse_sitemap(self, response: Response) -> Iterable[Request]:
         if response.url.endswith("/robots.txt"):
@@ -335,17 +335,17 @@ class MySitemapSpider(SitemapSpider):
                     print(url)
                 yield Request(url, callback=self._parse_sitemap)
         else:
-            body = self._get_sitemap_body(response)
-            if body is None:
+            chunks = self._iter_sitemap_body(response)
+            if chunks is None:
                 print("invalid sitemap response: " + response.url)
                 return
 
-            s = Sitemap(body)
+            s = StreamingSitemap(chunks)
             it = self.sitemap_filter(s)
 
             if s.type == "sitemapindex":
                 for loc in iterloc(it, self.sitemap_alternate_links):
-                    if any(x.search(loc) for x in self._follow):
+                    if self._follow_matcher.first(loc) is not None:
                         if not self.pages:
                             print(loc)
                         yield Request(loc, callback=self._parse_sitemap)
@@ -5,6 +5,8 @@ import sys
 from scrapy.commands import ScrapyCommand
 from scrapy.exceptions import UsageError
 
+from locations.spider_manifest import get_manifest
+
 
 class FilenameCommand(ScrapyCommand):
     requires_project = True
@@ -27,18 +29,12 @@ class FilenameCommand(ScrapyCommand):
         if len(args) != 1:
             raise UsageError()
 
-        if not self.crawler_process:
-            raise RuntimeError("Crawler process not defined")
-
-        try:
-            spidercls = self.crawler_process.spider_loader.load(args[0])
-        except KeyError:
-            return self._err(f"Spider not found: {args[0]}")
+        if not self.settings:
+            raise RuntimeError("Settings not defined")
 
-        sfile = sys.modules[spidercls.__module__].__file__
-        if not sfile:
+        spider = get_manifest(self.settings.getlist("SPIDER_MODULES")).get(args[0])
+        if not spider:
             return self._err(f"Spider not found: {args[0]}")
-        sfile = sfile.replace(".pyc", ".py")
-        sfile = os.path.relpath(sfile)
+        sfile = os.path.relpath(spider["file"])
 
         sys.stdout.write(f"{sfile}\n")
@@ -7,7 +7,7 @@ import requests
 import requests_cache
 from scrapy.commands import ScrapyCommand
 
-from locations.name_suggestion_index import NSI_FILE_PATH, WIKIDATA_FILE_PATH
+from locations.name_suggestion_index import NSI_FILE_PATH, SNAPSHOT_FILE_PATH, WIKIDATA_FILE_PATH, write_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -35,17 +35,27 @@ class VendorDataCommand(ScrapyCommand):
             type=str,
             help="nsi.json to be vendored [default: %(default)s]",
         )
+        parser.add_argument(
+            "--snapshot-only",
+            dest="snapshot_only",
+            action="store_true",
+            help="only (re)build the NSI snapshot from the already vendored files",
+        )
 
     def run(self, args: list[str], opts: argparse.Namespace) -> None:
-        with requests_cache.disabled():
-            logger.info("Fetching wikidata.json")
-            self._vendor_wikidata(opts)
+        if not opts.snapshot_only:
+            with requests_cache.disabled():
+                logger.info("Fetching wikidata.json")
+                self._vendor_wikidata(opts)
+
+                logger.info("Fetching nsi.json")
+                self._vendor_nsi(opts)
 
-            logger.info("Fetching nsi.json")
-            self._vendor_nsi(opts)
+            self._report_version(Path(NSI_FILE_PATH))
+            self._report_version(Path(WIKIDATA_FILE_PATH))
 
-        self._report_version(Path(NSI_FILE_PATH))
-        self._report_version(Path(WIKIDATA_FILE_PATH))
+        logger.info("Writing NSI snapshot")
+        write_snapshot(SNAPSHOT_FILE_PATH)
 
     def _vendor_wikidata(self, opts: argparse.Namespace):
         wikidata = requests.get(opts.wikidata_url).json()
@@ -0,0 +1,152 @@
+"""
+Indexes of countries and their subdivisions, built once on import, so that
+country and state values can be checked and resolved with dictionary
+lookups rather than scans of every country or subdivision.
+
+Countries known to geonamescache (which includes some, such as XK, that are
+not in ISO 3166-1) are used to clean up and check item countries, and those
+known to pycountry to check ISO 3166-1 and ISO 3166-2 codes.
+"""
+
+from types import MappingProxyType
+from typing import Any, Callable, Literal, Mapping
+
+import pycountry
+from geonamescache import GeonamesCache
+from geonamescache.types import Country
+
+# Alpha-2 country code to the geonamescache country.
+COUNTRIES: Mapping[str, Country] = MappingProxyType(GeonamesCache().get_countries())
+
+
+def _index_countries(field: Literal["iso3", "name"], normalise: Callable[[str], str] = str) -> Mapping[str, str]:
+    index: dict[str, str] = {}
+    for country in COUNTRIES.values():
+        index.setdefault(normalise(country[field]), country["iso"])
+    return MappingProxyType(index)
+
+
+# Alpha-3 country code to alpha-2 country code.
+ALPHA_3_CODES: Mapping[str, str] = _index_countries("iso3")
+
+# Lower case country name to alpha-2 country code.
+COUNTRY_NAMES: Mapping[str, str] = _index_countries("name", str.lower)
+
+# Lower case country name to alpha-2 country code, for names which are not
+# the geonamescache name of the country. All keys in this dict should be lower
+# case. The idea is also that we only place totally non contentious common
+# mappings here.
+COUNTRY_ALIASES: Mapping[str, str] = MappingProxyType(
+    {
+        "espana": "ES",
+        "great britain": "GB",
+        "england": "GB",
+        "scotland": "GB",
+        "wales": "GB",
+        "northern ireland": "GB",
+        "netherlands": "NL",
+        "uk": "GB",
+        "norge": "NO",
+        "united states of america": "US",
+        "luxemburg (groothertogdom)": "LU",
+        "belgie": "BE",
+        "u s a": "US",
+        "deutschland": "DE",
+        "czech republic": "CZ",
+    }
+)
+
+# ISO 3166-1 alpha-2 country codes.
+ISO_3166_1_ALPHA_2_CODES: frozenset[str] = frozenset(country.alpha_2 for country in pycountry.countries)
+
+
+def _index_subdivisions() -> Mapping[str, Mapping[str, str]]:
+    index: dict[str, Mapping[str, str]] = {}
+    for country in pycountry.countries:
+        subdivisions: dict[str, str] = {}
+        # pycountry returns a set, so where a name is shared (such as a
+        # division and a district of the same name) prefer the top level
+        # subdivision, then the lowest code, rather than whichever the set
+        # happens to iterate first.
+        for subdivision in sorted(
+            pycountry.subdivisions.get(country_code=country.alpha_2) or [],
+            key=lambda subdivision: (subdivision.parent_code is not None, subdivision.code),
+        ):
+            subdivisions.setdefault(subdivision.code.split("-", 1)[1], subdivision.code)
+            subdivisions.setdefault(subdivision.name, subdivision.code)
+        index[country.alpha_2] = MappingProxyType(subdivisions)
+    return MappingProxyType(index)
+
+
+# Alpha-2 country code to the second part of an ISO 3166-2 code, or the name,
+# of each of its subdivisions to the whole ISO 3166-2 code.
+SUBDIVISIONS: Mapping[str, Mapping[str, str]] = _index_subdivisions()
+
+US_TERRITORIES = {
+    "AS": {"code": "AS", "name": "American Samoa"},
+    "FM": {"code": "FM", "name": "Micronesia"},
+    "GU": {"code": "GU", "name": "Guam"},
+    "MH": {"code": "MH", "name": "Marshall Islands"},
+    "MP": {"code": "MP", "name": "Northern Mariana Islands"},
+    "PW": {"code": "PW", "name": "Palau"},
+    "PR": {"code": "PR", "name": "Puerto Rico"},
+    "VI": {"code": "VI", "name": "U.S. Virgin Islands"},
+}
+
+# The states of countries whose state is cleaned up to a code.
+STATES = {
+    "CA": {
+        "AB": {"code": "AB", "name": "Alberta"},
+        "BC": {"code": "BC", "name": "British Columbia"},
+        "MB": {"code": "MB", "name": "Manitoba"},
+        "NB": {"code": "NB", "name": "New Brunswick"},
+        "NT": {"code": "NT", "name": "Northwest Territories"},
+        "NL": {"code": "NL", "name": "Newfoundland and Labrador"},
+        "NS": {"code": "NS", "name": "Nova Scotia"},
+        "NU": {"code": "YT", "name": "Nunavut"},
+        "ON": {"code": "ON", "name": "Ontario"},
+        "PE": {"code": "PE", "name": "Prince Edward Island"},
+        "QC": {"code": "QC", "name": "Quebec"},
+        "SK": {"code": "SK", "name": "Saskatchewan"},
+        "YT": {"code": "YT", "name": "Yukon"},
+    },
+    "US": GeonamesCache().get_us_states() | US_TERRITORIES,
+}
+
+STATE_OVERRIDES = {"Washington, D.C.": "DC"}
+
+
+def _index_states() -> Mapping[str, Mapping[str, str]]:
+    index = {}
+    for country, states in STATES.items():
+        codes = {key: str(state["code"]) for key, state in states.items()}
+        for state in states.values():
+            codes.setdefault(state["name"], str(state["code"]))
+        # Overrides are applied before looking up a state.
+        for override, key in STATE_OVERRIDES.items():
+            if key in codes:
+                codes[override] = codes[key]
+            else:
+                codes.pop(override, None)
+        index[country] = MappingProxyType(codes)
+    return MappingProxyType(index)
+
+
+# Alpha-2 country code to the key, name or an override of each of its
+# STATES to the state code.
+STATE_CODES: Mapping[str, Mapping[str, str]] = _index_states()
+
+
+def is_iso_3166_1_alpha_2_code(country_code: Any) -> bool:
+    return isinstance(country_code, str) and country_code in ISO_3166_1_ALPHA_2_CODES
+
+
+def get_iso_3166_2_code(country_code: Any, state: Any) -> str | None:
+    """
+    :param country_code: ISO 3166-1 alpha-2 country code
+    :param state: the second part of an ISO 3166-2 code, or the name, of a subdivision of the country
+    :return: the ISO 3166-2 code of the subdivision, or None if it is not known
+    """
+    if not is_iso_3166_1_alpha_2_code(country_code) or not isinstance(state, str):
+        return None
+    return SUBDIVISIONS.get(country_code, {}).get(state)
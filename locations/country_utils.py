@@ -4,6 +4,8 @@ from urllib.parse import urlparse
 import geonamescache
 from babel import Locale, UnknownLocaleError
 
+from locations.countries import ALPHA_3_CODES, COUNTRIES, COUNTRY_ALIASES, COUNTRY_NAMES
+
 
 def strip_accents(s):
     return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
@@ -13,25 +15,7 @@ class CountryUtils:
     def __init__(self):
         self.gc = geonamescache.GeonamesCache()
 
-    # All keys in this dict should be lower case. The idea is also that we
-    # only place totally non contentious common mappings here.
-    UNHANDLED_COUNTRY_MAPPINGS = {
-        "espana": "ES",
-        "great britain": "GB",
-        "england": "GB",
-        "scotland": "GB",
-        "wales": "GB",
-        "northern ireland": "GB",
-        "netherlands": "NL",
-        "uk": "GB",
-        "norge": "NO",
-        "united states of america": "US",
-        "luxemburg (groothertogdom)": "LU",
-        "belgie": "BE",
-        "u s a": "US",
-        "deutschland": "DE",
-        "czech republic": "CZ",
-    }
+    UNHANDLED_COUNTRY_MAPPINGS = COUNTRY_ALIASES
 
     def to_iso_alpha2_country_code(self, country_str):
         """
@@ -49,26 +33,24 @@ class CountryUtils:
             return None
         if len(country_str) == 2:
             # Check for the clean/fast path, spider has given us a 2-alpha iso country code.
-            if self.gc.get_countries().get(country_str.upper()):
+            if country_str.upper() in COUNTRIES:
                 return country_str.upper()
         if len(country_str) == 3:
-            # Check for a 3-alpha code, this is done by iteration.
+            # Check for a 3-alpha code.
             country_str = country_str.upper()
-            for country in self.gc.get_countries().values():
-                if country["iso3"] == country_str:
-                    return country["iso"]
+            if country_code := ALPHA_3_CODES.get(country_str):
+                return country_code
         # Failed so far, now let's try a match by name.
         country_name = country_str.lower()
-        for country in self.gc.get_countries().values():
-            if country["name"].lower() == country_name:
-                return country["iso"]
+        if country_code := COUNTRY_NAMES.get(country_name):
+            return country_code
         # Finally let's go digging in the random country string collection!
         return self.UNHANDLED_COUNTRY_MAPPINGS.get(country_name)
 
     def _convert_to_iso2_country_code(self, candidate: str) -> str | None:
         if len(candidate) == 2:
             candidate = candidate.upper()
-            if self.gc.get_countries().get(candidate):
+            if candidate in COUNTRIES:
                 return candidate
             if candidate == "UK":
                 # United Kingdom uses the ccTLD of "UK" but the corresponding
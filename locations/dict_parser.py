@@ -1,4 +1,5 @@
-from typing import Any
+from collections import defaultdict
+from typing import Any, Iterable
 
 from locations.geo import extract_geojson_point_geometry
 from locations.items import Feature
@@ -6,13 +7,43 @@ from locations.items import Feature
 
 class KeyVariations:
     _cache = {}
+    _lookups = {}
 
     @classmethod
-    def get_variations(cls, key: str) -> set[str]:
+    def get_variations(cls, key: str) -> tuple[str, ...]:
         if key not in cls._cache:
-            cls._cache[key] = DictParser.get_variations(key)
+            cls._cache[key] = tuple(DictParser.get_ordered_variations(key))
         return cls._cache[key]
 
+    @classmethod
+    def get_lookup(cls, keys: Iterable[str]) -> dict[str, int]:
+        """
+        :param keys: keys in order of priority
+        :return: every variation of the keys mapped to its priority, lowest
+                 first, ordered by key and then by variation
+        """
+        keys = tuple(keys)
+        if keys not in cls._lookups:
+            lookup = {}
+            for key in keys:
+                for variation in cls.get_variations(key):
+                    lookup.setdefault(variation, len(lookup))
+            cls._lookups[keys] = lookup
+        return cls._lookups[keys]
+
+    @classmethod
+    def get_field_lookup(cls, field_keys: dict[str, list[str]]) -> dict[str, tuple[tuple[str, int], ...]]:
+        """
+        :param field_keys: the keys for each field, in order of priority
+        :return: every variation of the keys mapped to the fields it provides
+                 and its priority for each of them
+        """
+        lookup = defaultdict(list)
+        for field, keys in field_keys.items():
+            for variation, priority in cls.get_lookup(keys).items():
+                lookup[variation].append((field, priority))
+        return {variation: tuple(fields) for variation, fields in lookup.items()}
+
 
 class DictParser:
     # Variations can't handle capitalised acronyms such as "ID" so
@@ -304,6 +335,24 @@ class DictParser:
         "orari",
     ]
 
+    location_keys = [
+        "location",
+        "geo-location",
+        "geo",
+        "geo-point",
+        "geocoded-coordinate",
+        "coordinates",
+        "coords",
+        "geo-position",
+        "position",
+        "positions",
+        "display-coordinate",
+        "location-geopoint",
+        "yextDisplayCoordinate",
+        # NO
+        "koordinat",
+    ]
+
     twitter_keys = [
         "twitter",
         "twitter-link",
@@ -316,12 +365,37 @@ class DictParser:
         "facebook-url",
     ]
 
+    # The fields found by parse(), and the keys for each in order of priority.
+    field_keys = {
+        "ref": ref_keys,
+        "name": name_keys,
+        "location": location_keys,
+        "lat": lat_keys,
+        "lon": lon_keys,
+        "address": full_address_keys,
+        "housenumber": house_number_keys,
+        "street": street_keys,
+        "street_address": street_address_keys,
+        "city": city_keys,
+        "state": region_keys,
+        "postcode": postcode_keys,
+        "country": country_keys,
+        "isocode": isocode_keys,
+        "contact": ["contact"],
+        "email": email_keys,
+        "phone": phone_keys,
+        "website": website_keys,
+        "twitter": twitter_keys,
+        "facebook": facebook_keys,
+    }
+
     @staticmethod
     def parse(obj: dict) -> Feature:
         item = Feature()
 
-        item["ref"] = DictParser.get_first_key(obj, DictParser.ref_keys)
-        item["name"] = DictParser.get_first_key(obj, DictParser.name_keys)
+        fields = DictParser.match_fields(obj)
+        item["ref"] = fields.get("ref")
+        item["name"] = fields.get("name")
 
         if obj.get("geometry") and obj["geometry"].get("type") in [
             "Point",
@@ -340,104 +414,113 @@ class DictParser:
                 # GeoJSON or GJ2008 geometry.
                 item["geometry"] = obj["geometry"]
         else:
-            location = DictParser.get_first_key(
-                obj,
-                [
-                    "location",
-                    "geo-location",
-                    "geo",
-                    "geo-point",
-                    "geocoded-coordinate",
-                    "coordinates",
-                    "coords",
-                    "geo-position",
-                    "position",
-                    "positions",
-                    "display-coordinate",
-                    "location-geopoint",
-                    "yextDisplayCoordinate",
-                    # NO
-                    "koordinat",
-                ],
-            )
+            location = fields.get("location")
             if location and isinstance(location, dict):
                 # First attempt to find coordinates:
                 #   Latitude/longitude are wrapped inside a "coordinates" /
                 #   "location" style of named dictionary.
-                item["lat"] = DictParser.get_first_key(location, DictParser.lat_keys)
-                item["lon"] = DictParser.get_first_key(location, DictParser.lon_keys)
+                location_fields = DictParser.match_fields(location)
+                item["lat"] = location_fields.get("lat")
+                item["lon"] = location_fields.get("lon")
             if item.get("lat", None) is None or item.get("lon", None) is None:
                 # Second attempt to find coordinates if first attempt failed:
                 #   Latitude/longitude are properties of the root dictionary
                 #   or any other nested dictionary of any name.
-                item["lat"] = DictParser.get_first_key(obj, DictParser.lat_keys)
-                item["lon"] = DictParser.get_first_key(obj, DictParser.lon_keys)
+                item["lat"] = fields.get("lat")
+                item["lon"] = fields.get("lon")
 
-        address = DictParser.get_first_key(obj, DictParser.full_address_keys)
+        address = fields.get("address")
 
         if address and isinstance(address, str):
             item["addr_full"] = address
 
-        if not address or not isinstance(address, dict):
-            address = obj
+        address_fields = DictParser.match_fields(address) if address and isinstance(address, dict) else fields
 
-        item["housenumber"] = DictParser.get_first_key(address, DictParser.house_number_keys)
-        item["street"] = DictParser.get_first_key(address, DictParser.street_keys)
-        item["street_address"] = DictParser.get_first_key(address, DictParser.street_address_keys)
-        item["city"] = DictParser.get_first_key(address, DictParser.city_keys)
-        item["state"] = DictParser.get_first_key(address, DictParser.region_keys)
-        item["postcode"] = DictParser.get_first_key(address, DictParser.postcode_keys)
+        item["housenumber"] = address_fields.get("housenumber")
+        item["street"] = address_fields.get("street")
+        item["street_address"] = address_fields.get("street_address")
+        item["city"] = address_fields.get("city")
+        item["state"] = address_fields.get("state")
+        item["postcode"] = address_fields.get("postcode")
 
-        country = DictParser.get_first_key(address, DictParser.country_keys)
+        country = address_fields.get("country")
         if country and isinstance(country, dict):
-            isocode = DictParser.get_first_key(country, DictParser.isocode_keys)
+            isocode = DictParser.match_fields(country).get("isocode")
             if isocode and isinstance(isocode, str):
                 item["country"] = isocode
             # TODO: Handle other potential country fields inside the dict?
         else:
             item["country"] = country
 
-        contact = DictParser.get_first_key(obj, ["contact"])
-        if not contact or not isinstance(contact, dict):
-            contact = obj
+        contact = fields.get("contact")
+        contact_fields = DictParser.match_fields(contact) if contact and isinstance(contact, dict) else fields
 
-        item["email"] = DictParser.get_first_key(contact, DictParser.email_keys)
-        item["phone"] = DictParser.get_first_key(contact, DictParser.phone_keys)
-        item["website"] = DictParser.get_first_key(contact, DictParser.website_keys)
-        item["twitter"] = DictParser.get_first_key(contact, DictParser.twitter_keys)
-        item["facebook"] = DictParser.get_first_key(contact, DictParser.facebook_keys)
+        item["email"] = contact_fields.get("email")
+        item["phone"] = contact_fields.get("phone")
+        item["website"] = contact_fields.get("website")
+        item["twitter"] = contact_fields.get("twitter")
+        item["facebook"] = contact_fields.get("facebook")
 
         return item
 
+    @staticmethod
+    def match_fields(obj: dict) -> dict[str, Any]:
+        """
+        Find the value of each field of DictParser.field_keys in a single pass
+        over the keys of an object.
+        :param obj: the object to search
+        :return: for each field found, the non-empty value of its highest
+                 priority key, as DictParser.get_first_key would return
+        """
+        matches = {}
+        for key, value in obj.items():
+            if not value or (fields := FIELD_KEY_VARIATIONS.get(key)) is None:
+                continue
+            for field, priority in fields:
+                if (match := matches.get(field)) is None or priority < match[0]:
+                    matches[field] = (priority, value)
+        return {field: value for field, (_, value) in matches.items()}
+
     @staticmethod
     def get_first_key(obj: dict, keys: list[str]) -> Any:
-        for key in keys:
-            variations = KeyVariations.get_variations(key)
-            for variation in variations:
-                if obj.get(variation):
-                    return obj[variation]
+        """
+        :param obj: the object to search
+        :param keys: keys in order of priority, each of which is matched in
+                     any of its variations
+        :return: the non-empty value of the highest priority key, or None
+        """
+        lookup = KeyVariations.get_lookup(keys)
+        first = None
+        for key, value in obj.items():
+            if value and (priority := lookup.get(key)) is not None and (first is None or priority < first[0]):
+                first = (priority, value)
+        return first[1] if first else None
 
     @staticmethod
     def get_variations(key: str) -> set[str]:
-        results = set()
-        results.add(key)
+        return set(DictParser.get_ordered_variations(key))
+
+    @staticmethod
+    def get_ordered_variations(key: str) -> list[str]:
+        results = []
+        results.append(key)
 
         lower = key.lower()
-        results.add(lower)
+        results.append(lower)
 
         upper = key.upper()
-        results.add(upper)
+        results.append(upper)
 
         title = key.title()
-        results.add(title)
+        results.append(title)
 
         # example: flatcase
         flatcase = key.lower().replace("-", "")
-        results.add(flatcase)
+        results.append(flatcase)
 
         # example: FLATCASEUPPER
         flatcase_upper = flatcase.upper()
-        results.add(flatcase_upper)
+        results.append(flatcase_upper)
 
         # example: camelCase
         camel_case = key[0].lower()
@@ -450,20 +533,20 @@ class DictParser:
                 camel_case += key[i]
             i += 1
 
-        results.add(camel_case)
+        results.append(camel_case)
 
         # example: PascalCase
         pascal_case = camel_case[0].upper() + camel_case[1:]
 
-        results.add(pascal_case)
+        results.append(pascal_case)
 
         # example: snake_case
         snake_case = key.lower().replace("-", "_")
-        results.add(snake_case)
+        results.append(snake_case)
 
         # example: SCREAMING_SNAKE_CASE
         screaming_snake_case = key.upper().replace("-", "_")
-        results.add(screaming_snake_case)
+        results.append(screaming_snake_case)
 
         # example: camel_Snake_Case
         camel_snake_case = key[0].lower()
@@ -477,14 +560,14 @@ class DictParser:
                 camel_snake_case += key[i]
             i += 1
 
-        results.add(camel_snake_case)
+        results.append(camel_snake_case)
 
         # example: Pascal_Snake_Case
         pascal_snake_case = camel_snake_case[0].upper() + camel_snake_case[1:]
 
-        results.add(pascal_snake_case)
+        results.append(pascal_snake_case)
 
-        return results
+        return list(dict.fromkeys(results))
 
     @staticmethod
     def get_nested_key(obj, key):
@@ -523,3 +606,8 @@ class DictParser:
         elif isinstance(obj, list):
             for x in obj:
                 yield from DictParser.iter_matching_keys(x, key)
+
+
+# Every variation of the keys of each field found by DictParser.parse(), so
+# that parsing doesn't probe an object for each variation of each key.
+FIELD_KEY_VARIATIONS = KeyVariations.get_field_lookup(DictParser.field_keys)
@@ -15,6 +15,7 @@ from scrapy.utils.spider import iter_spider_classes
 from locations.extensions.add_lineage import spider_class_to_lineage
 from locations.geo import extract_geojson_point_geometry
 from locations.settings import SPIDER_MODULES
+from locations.spider_manifest import get_manifest
 
 mapping = (
     ("addr_full", "addr:full"),
@@ -140,6 +141,8 @@ def compute_hash(item: Item) -> str:
 def find_spider_class(spider_name: str):
     if not spider_name:
         return None
+    if spider_class := get_manifest().load_spider_class(spider_name):
+        return spider_class
     for spider_class in iter_spider_classes_in_modules():
         if spider_name == spider_class.name:
             return spider_class
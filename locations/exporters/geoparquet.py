@@ -1,52 +1,154 @@
-import geopandas
+import json
+import math
+import os
+import tempfile
+
 import pyarrow as pa
 import pyarrow.parquet
+import shapely
 from scrapy.exporters import BaseItemExporter
 
 from locations.exporters.geojson import item_to_geojson_feature
 
+# Items are written out as a row group once this many have been exported, so
+# that memory use doesn't grow with the number of items.
+DEFAULT_ROW_GROUP_SIZE = 10_000
+
+GEOMETRY_FIELD = pa.field(
+    "geometry",
+    pa.binary(),
+    metadata={"ARROW:extension:name": "geoarrow.wkb", "ARROW:extension:metadata": "{}"},
+)
+
 
 class GeoparquetExporter(BaseItemExporter):
-    def __init__(self, file, **kwargs):
+    """
+    Export items as GeoParquet, with the geometry as WKB and every property as
+    a string column.
+
+    Items are converted to Arrow record batches as they arrive and written as
+    a row group every `row_group_size` items. Properties first seen after a
+    row group has been written add columns, so row groups are written to
+    temporary segment files and copied a row group at a time into the output,
+    with the columns of every segment, when exporting finishes. The bbox and
+    geometry types of the GeoParquet metadata are accumulated as items arrive.
+    """
+
+    def __init__(self, file, row_group_size: int = DEFAULT_ROW_GROUP_SIZE, **kwargs):
         super().__init__(**kwargs)
-        self.first_item = True
         self.file = file
-        self.features = []
+        self.row_group_size = row_group_size
+        self.columns: dict[str, None] = {}
+        self.geometries: list[bytes | None] = []
+        self.properties: list[dict] = []
+        self.geometry_types: set[str] = set()
+        self.bbox = [math.inf, math.inf, -math.inf, -math.inf]
+        self.temp_dir: tempfile.TemporaryDirectory | None = None
+        self.segments: list[str] = []
+        self.segment_writer: pyarrow.parquet.ParquetWriter | None = None
 
     def export_item(self, item):
-        if self.first_item:
-            # TODO Figure out a way to attach dataset attributes to the parquet file.
-            # self.write_dataset_attributes_table(item)
-            self.first_item = False
-
+        # TODO Figure out a way to attach dataset attributes to the parquet file.
         # Convert the item to a GeoJSON feature
         feature = item_to_geojson_feature(item)
 
         # Convert all attributes to strings so that the Parquet output is of consistent type.
         # Without this, the "global" Parquet file would have mixed types in the same column.
-        for key, value in feature["properties"].items():
-            feature["properties"][key] = str(value)
+        properties = {key: str(value) for key, value in feature["properties"].items()}
+        for key in properties:
+            if key not in self.columns:
+                self.columns[key] = None
+        self.properties.append(properties)
+        self.geometries.append(self.geometry_to_wkb(feature["geometry"]))
 
-        self.features.append(feature)
+        if len(self.properties) >= self.row_group_size:
+            self.write_row_group()
+
+    def geometry_to_wkb(self, geometry: dict | None) -> bytes | None:
+        if not geometry:
+            return None
+        shape = shapely.geometry.shape(geometry)
+        if shape.is_empty:
+            return None
+        self.geometry_types.add(shape.geom_type)
+        min_x, min_y, max_x, max_y = shape.bounds
+        self.bbox = [
+            min(self.bbox[0], min_x),
+            min(self.bbox[1], min_y),
+            max(self.bbox[2], max_x),
+            max(self.bbox[3], max_y),
+        ]
+        return shapely.to_wkb(shape)
+
+    def schema(self, metadata: dict | None = None) -> pa.Schema:
+        return pa.schema([GEOMETRY_FIELD, *(pa.field(column, pa.string()) for column in self.columns)], metadata)
+
+    def write_row_group(self):
+        if not self.properties:
+            return
+        schema = self.schema()
+        batch = pa.record_batch(
+            [
+                pa.array(self.geometries, pa.binary()),
+                *(
+                    pa.array([properties.get(column) for properties in self.properties], pa.string())
+                    for column in self.columns
+                ),
+            ],
+            schema=schema,
+        )
+        if self.segment_writer is not None and not self.segment_writer.schema.equals(schema):
+            # New columns, start another segment.
+            self.segment_writer.close()
+            self.segment_writer = None
+        if self.segment_writer is None:
+            if self.temp_dir is None:
+                self.temp_dir = tempfile.TemporaryDirectory(prefix="geoparquet-")
+            self.segments.append(os.path.join(self.temp_dir.name, f"{len(self.segments)}.parquet"))
+            self.segment_writer = pyarrow.parquet.ParquetWriter(self.segments[-1], schema)
+        self.segment_writer.write_batch(batch, row_group_size=len(self.properties))
+        self.geometries = []
+        self.properties = []
+
+    def geo_metadata(self) -> dict:
+        column = {"encoding": "WKB", "geometry_types": sorted(self.geometry_types)}
+        if self.geometry_types:
+            column["bbox"] = self.bbox
+        return {"version": "1.1.0", "primary_column": "geometry", "columns": {"geometry": column}}
 
     def finish_exporting(self):
+        self.write_row_group()
+        if self.segment_writer is not None:
+            self.segment_writer.close()
+            self.segment_writer = None
+
         # Don't write an empty Parquet file
-        if not self.features:
+        if not self.segments:
             return
 
-        # Create a GeoDataFrame from the features
-        gdf = geopandas.GeoDataFrame.from_features(self.features)
-
-        # Determine if we have a file path or a file-like object
-        if isinstance(self.file, str):
-            # It's a file path string, use gdf.to_parquet directly
-            gdf.to_parquet(self.file)
-        elif hasattr(self.file, "name") and isinstance(self.file.name, str):
-            # It's a real file handle with a .name attribute (opened by Scrapy)
-            # Use the file path instead of the file handle to avoid issues with geopandas.to_parquet()
-            gdf.to_parquet(self.file.name)
-        else:
-            # It's a file-like object (BytesIO), convert geometry to WKB and use pyarrow directly
-            gdf_wkb = gdf.to_wkb()
-            table = pa.Table.from_pandas(gdf_wkb, preserve_index=False)
-            pyarrow.parquet.write_table(table, self.file)
+        schema = self.schema({"geo": json.dumps(self.geo_metadata())})
+        try:
+            with pyarrow.parquet.ParquetWriter(self.file, schema) as writer:
+                for segment in self.segments:
+                    segment_file = pyarrow.parquet.ParquetFile(segment)
+                    for i in range(segment_file.num_row_groups):
+                        row_group = segment_file.read_row_group(i)
+                        writer.write_table(
+                            pa.table(
+                                [
+                                    (
+                                        row_group.column(field.name)
+                                        if field.name in row_group.column_names
+                                        else pa.nulls(row_group.num_rows, field.type)
+                                    )
+                                    for field in schema
+                                ],
+                                schema=schema,
+                            ),
+                            row_group_size=row_group.num_rows,
+                        )
+        finally:
+            if self.temp_dir is not None:
+                self.temp_dir.cleanup()
+                self.temp_dir = None
+            self.segments = []
@@ -16,23 +16,31 @@ class LineDelimitedGeoJsonExporter(JsonLinesItemExporter):
         super().export_item(item)
 
     def _get_serialized_fields(self, item, default_value=None, include_empty=None):
-        feature = []
-        feature.append(("type", "Feature"))
-        feature.append(("id", compute_hash(item)))
-        feature.append(("dataset_attributes", self.dataset_attributes))
-        feature.append(("properties", item_to_properties(item)))
-
-        lat = item.get("lat")
-        lon = item.get("lon")
-        geometry = item.get("geometry")
-        if lat and lon and not geometry:
-            try:
-                geometry = {
-                    "type": "Point",
-                    "coordinates": [float(item["lon"]), float(item["lat"])],
-                }
-            except ValueError:
-                logging.warning("Couldn't convert lat (%s) and lon (%s) to float", lat, lon)
-        feature.append(("geometry", geometry))
-
-        return feature
+        return list(item_to_feature(item, self.dataset_attributes).items())
+
+
+def item_to_feature(item, dataset_attributes: dict | None) -> dict:
+    """
+    :return: the GeoJSON feature of an item, as a line of NdGeoJSON
+    """
+    feature = {
+        "type": "Feature",
+        "id": compute_hash(item),
+        "dataset_attributes": dataset_attributes,
+        "properties": item_to_properties(item),
+    }
+
+    lat = item.get("lat")
+    lon = item.get("lon")
+    geometry = item.get("geometry")
+    if lat and lon and not geometry:
+        try:
+            geometry = {
+                "type": "Point",
+                "coordinates": [float(item["lon"]), float(item["lat"])],
+            }
+        except ValueError:
+            logging.warning("Couldn't convert lat (%s) and lon (%s) to float", lat, lon)
+    feature["geometry"] = geometry
+
+    return feature
@@ -0,0 +1,278 @@
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet
+import shapely
+from scrapy.exporters import BaseItemExporter
+from scrapy.utils.serialize import ScrapyJSONEncoder
+
+from locations.exporters.geojson import get_dataset_attributes
+from locations.exporters.ld_geojson import item_to_feature
+
+logger = logging.getLogger(__name__)
+
+# Features are converted to an Arrow record batch once this many have been
+# added, so that memory use is that of the Arrow data rather than the items.
+DEFAULT_BATCH_SIZE = 10_000
+
+# Batches are sorted and written as a row group once this many have been
+# converted, so that memory use doesn't grow with the number of features.
+DEFAULT_RUN_BATCHES = 10
+
+# The key-value metadata of shards sorted by the Hilbert key within each row
+# group, as ShardWriter writes them, rather than as a whole.
+HILBERT_ORDER_KEY = b"hilbert_order"
+HILBERT_ORDER_ROW_GROUP = b"row_group"
+
+# The number of bits of each axis in the Hilbert key, giving a uint32 key over
+# the whole world, a cell of about 600 m at the equator.
+HILBERT_BITS = 16
+
+# Rows without geometry are given this key, after every real key.
+HILBERT_NULL_KEY = 2 ** (2 * HILBERT_BITS)
+
+BBOX_TYPE = pa.struct(
+    [
+        pa.field("xmin", pa.float64()),
+        pa.field("ymin", pa.float64()),
+        pa.field("xmax", pa.float64()),
+        pa.field("ymax", pa.float64()),
+    ]
+)
+
+# The columns of the GeoParquet file made by ci/ndgeojsons_to_parquet.py,
+# with the Hilbert key its rows are ordered by.
+SHARD_SCHEMA = pa.schema(
+    [
+        pa.field("id", pa.string()),
+        pa.field("type", pa.string()),
+        pa.field("dataset_attributes", pa.map_(pa.string(), pa.string())),
+        pa.field("properties", pa.map_(pa.string(), pa.string())),
+        pa.field("geom", pa.binary()),
+        pa.field("bbox", BBOX_TYPE),
+        pa.field("hilbert", pa.uint32()),
+    ]
+)
+
+
+def hilbert_keys(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    :param x: longitudes
+    :param y: latitudes
+    :return: the position of each point along a Hilbert curve over the world, as uint32
+    """
+    n = 1 << HILBERT_BITS
+    x = np.clip(((np.asarray(x, dtype=np.float64) + 180) / 360 * n).astype(np.int64), 0, n - 1)
+    y = np.clip(((np.asarray(y, dtype=np.float64) + 90) / 180 * n).astype(np.int64), 0, n - 1)
+    keys = np.zeros(x.shape, dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so that the curve within it is continuous with its neighbours.
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+    return keys.astype(np.uint32)
+
+
+class ShardWriter:
+    """
+    Write NdGeoJSON features as a Parquet shard: the geometry as WKB with its
+    bbox, every dataset attribute and property as a string, and rows ordered
+    by the Hilbert key of the centre of their bbox, so that shards can be
+    merged into one spatially ordered GeoParquet file without sorting it all.
+
+    Every `run_batches` batches are sorted and written as a row group, so
+    only that many rows are held in memory however many features a spider
+    has. Each row group is then a sorted run, which ci/ndgeojsons_to_parquet.py
+    merges like a shard of its own. The bbox and geometry types of the shard
+    are kept as GeoParquet metadata when it is closed. Nothing is written if
+    no features were added.
+
+    The row groups are written to a temporary file, which only becomes the
+    shard when it is closed, so that a spider killed part way through never
+    leaves a shard without its Parquet footer.
+    """
+
+    def __init__(self, file, batch_size: int = DEFAULT_BATCH_SIZE, run_batches: int = DEFAULT_RUN_BATCHES):
+        self.file = file
+        self.batch_size = batch_size
+        self.run_batches = run_batches
+        self.encoder = ScrapyJSONEncoder()
+        self.rows: list[tuple] = []
+        self.batches: list[pa.RecordBatch] = []
+        self.geometry_types: set[str] = set()
+        self.bbox = [math.inf, math.inf, -math.inf, -math.inf]
+        self.writer: pyarrow.parquet.ParquetWriter | None = None
+        self.temp_path: str | None = None
+        self.row_count = 0
+
+    def add(self, feature: dict) -> None:
+        geom, bounds = self.geometry_to_wkb(feature.get("geometry"))
+        self.rows.append(
+            (
+                feature.get("id"),
+                feature.get("type"),
+                self.to_map(feature.get("dataset_attributes")),
+                self.to_map(feature.get("properties")),
+                geom,
+                bounds,
+            )
+        )
+        if len(self.rows) >= self.batch_size:
+            self.write_batch()
+
+    def to_map(self, values: dict | None) -> list[tuple[str, str | None]] | None:
+        if values is None:
+            return None
+        return [(key, self.to_string(value)) for key, value in values.items()]
+
+    def to_string(self, value) -> str | None:
+        """
+        :return: the value as a string, as DuckDB reads JSON values into a MAP(VARCHAR, VARCHAR)
+        """
+        if value is None or isinstance(value, str):
+            return value
+        encoded = self.encoder.encode(value)
+        return json.loads(encoded) if encoded.startswith('"') else encoded
+
+    def geometry_to_wkb(self, geometry: dict | None) -> tuple[bytes | None, tuple | None]:
+        if not geometry:
+            return None, None
+        try:
+            shape = shapely.geometry.shape(geometry)
+        except (ValueError, TypeError, AttributeError, KeyError, shapely.errors.ShapelyError) as e:
+            logger.warning("Couldn't convert geometry %r: %s", geometry, e)
+            return None, None
+        if shape.is_empty:
+            return None, None
+        self.geometry_types.add(shape.geom_type)
+        bounds = shape.bounds
+        self.bbox = [
+            min(self.bbox[0], bounds[0]),
+            min(self.bbox[1], bounds[1]),
+            max(self.bbox[2], bounds[2]),
+            max(self.bbox[3], bounds[3]),
+        ]
+        return shapely.to_wkb(shape), bounds
+
+    def write_batch(self) -> None:
+        if not self.rows:
+            return
+        ids, types, dataset_attributes, properties, geoms, bounds = zip(*self.rows)
+        has_bounds = np.array([b is not None for b in bounds])
+        bounds_array = np.array([b if b is not None else (0.0,) * 4 for b in bounds], dtype=np.float64)
+        keys = hilbert_keys(
+            (bounds_array[:, 0] + bounds_array[:, 2]) / 2, (bounds_array[:, 1] + bounds_array[:, 3]) / 2
+        )
+        bbox = pa.StructArray.from_arrays(
+            [pa.array(bounds_array[:, i], mask=~has_bounds) for i in range(4)],
+            fields=list(BBOX_TYPE),
+            mask=pa.array(~has_bounds),
+        )
+        self.batches.append(
+            pa.record_batch(
+                [
+                    pa.array(ids, pa.string()),
+                    pa.array(types, pa.string()),
+                    pa.array(dataset_attributes, SHARD_SCHEMA.field("dataset_attributes").type),
+                    pa.array(properties, SHARD_SCHEMA.field("properties").type),
+                    pa.array(geoms, pa.binary()),
+                    bbox,
+                    pa.array(keys, pa.uint32(), mask=~has_bounds),
+                ],
+                schema=SHARD_SCHEMA,
+            )
+        )
+        self.rows = []
+        if len(self.batches) >= self.run_batches:
+            self.write_run()
+
+    def write_run(self) -> None:
+        """
+        Sort the batches and write them as a row group.
+        """
+        if not self.batches:
+            return
+        table = pa.Table.from_batches(self.batches).sort_by("hilbert")
+        self.batches = []
+        if self.writer is None:
+            if isinstance(self.file, (str, os.PathLike)):
+                self.temp_path = f"{self.file}.tmp"
+            else:
+                fd, self.temp_path = tempfile.mkstemp(prefix="parquet-shard-", suffix=".tmp")
+                os.close(fd)
+            self.writer = pyarrow.parquet.ParquetWriter(self.temp_path, SHARD_SCHEMA, compression="zstd")
+        self.writer.write_table(table, row_group_size=table.num_rows)
+        self.row_count += table.num_rows
+
+    def geo_metadata(self) -> dict:
+        return geo_metadata(self.geometry_types, self.bbox if self.geometry_types else None)
+
+    def close(self) -> int:
+        """
+        Write the rows left and the metadata of the shard.
+        :return: the number of rows written
+        """
+        self.write_batch()
+        self.write_run()
+        if self.writer is None or self.temp_path is None:
+            return 0
+        self.writer.add_key_value_metadata(
+            {b"geo": json.dumps(self.geo_metadata()).encode(), HILBERT_ORDER_KEY: HILBERT_ORDER_ROW_GROUP}
+        )
+        self.writer.close()
+        self.writer = None
+        if isinstance(self.file, (str, os.PathLike)):
+            os.replace(self.temp_path, self.file)
+        else:
+            with open(self.temp_path, "rb") as f:
+                shutil.copyfileobj(f, self.file)
+            os.remove(self.temp_path)
+        self.temp_path = None
+        return self.row_count
+
+
+def geo_metadata(geometry_types: set[str], bbox: list[float] | None) -> dict:
+    """
+    :return: the GeoParquet metadata of the "geom" column
+    """
+    return {
+        "version": "1.1.0",
+        "primary_column": "geom",
+        # No "crs" key: per the GeoParquet spec, omitting it means the default of
+        # OGC:CRS84 (WGS84, lon/lat axis order), which matches our WKB geometries.
+        "columns": {"geom": {"encoding": "WKB", "geometry_types": sorted(geometry_types)}},
+        "bbox": bbox or [None, None, None, None],
+    }
+
+
+class ParquetShardExporter(BaseItemExporter):
+    """
+    Export items as a Parquet shard of ci/ndgeojsons_to_parquet.py, the same
+    features as the ndgeojson exporter, so that the consolidated GeoParquet
+    file of a run is a merge of the shards of each spider.
+    """
+
+    def __init__(self, file, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = ShardWriter(file)
+        self.dataset_attributes = None
+
+    def export_item(self, item):
+        if self.dataset_attributes is None:
+            self.dataset_attributes = get_dataset_attributes(item["extras"].get("@spider"))
+        self.writer.add(item_to_feature(item, self.dataset_attributes))
+
+    def finish_exporting(self):
+        self.writer.close()
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from scrapy import Request, signals
+from scrapy.core.downloader import Slot
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.settings import SETTINGS_PRIORITIES
+from scrapy.spiders import Spider
+
+from locations.middlewares.cdnstats import get_cdn
+
+logger = logging.getLogger(__name__)
+
+# Statuses of responses asking for fewer requests, and those which are also
+# a block when from a CDN.
+THROTTLED_STATUSES = {429, 503}
+CDN_BLOCKED_STATUSES = {403}
+
+
+@dataclass
+class HostProfile:
+    """
+    The learned crawl rate of a host (or other download slot), kept between
+    runs.
+    """
+
+    delay: float
+    concurrency: int
+    latency: float | None = None
+    responses: int = 0
+    throttled: int = 0
+    # Healthy responses since the host last throttled, or since concurrency was last raised.
+    healthy_streak: int = 0
+    updated: float = 0.0
+
+
+class AdaptiveThrottleExtension:
+    """
+    Tune the download delay and concurrency of each host from its responses,
+    and keep what was learned of each host for the next run of the spider.
+
+    A response asking for fewer requests (429 or 503), or blocked by a CDN,
+    doubles the delay of its host, to at least any Retry-After, and halves
+    its concurrency. Otherwise the delay is lowered by a tenth for each
+    response, though not below ADAPTIVE_THROTTLE_MIN_DELAY (or a DOWNLOAD_DELAY
+    set by the spider) nor below the average latency of the host spread over
+    ADAPTIVE_THROTTLE_MAX_CONCURRENCY requests. Concurrency is raised by one
+    after each ADAPTIVE_THROTTLE_WINDOW responses in a row without throttling,
+    up to ADAPTIVE_THROTTLE_MAX_CONCURRENCY (or a CONCURRENT_REQUESTS_PER_DOMAIN
+    or CONCURRENT_REQUESTS_PER_IP set by the spider).
+
+    Enabled with ADAPTIVE_THROTTLE_ENABLED, the profile of each host is kept
+    in a JSON file of each spider in ADAPTIVE_THROTTLE_DIR, and profiles not
+    updated for ADAPTIVE_THROTTLE_EXPIRATION_DAYS are forgotten.
+    """
+
+    crawler: Crawler
+
+    def __init__(self, crawler: Crawler):
+        if not crawler.settings.getbool("ADAPTIVE_THROTTLE_ENABLED"):
+            raise NotConfigured
+        if crawler.settings.getbool("AUTOTHROTTLE_ENABLED"):
+            raise NotConfigured("AutoThrottle is enabled")
+        self.crawler = crawler
+        settings = crawler.settings
+        self.profiles_dir = Path(settings.get("ADAPTIVE_THROTTLE_DIR"))
+        self.start_delay = settings.getfloat("DOWNLOAD_DELAY")
+        if (settings.getpriority("DOWNLOAD_DELAY") or 0) > SETTINGS_PRIORITIES["project"]:
+            # Never faster than a delay the spider asks for.
+            self.min_delay = self.start_delay
+        else:
+            self.min_delay = min(settings.getfloat("ADAPTIVE_THROTTLE_MIN_DELAY"), self.start_delay)
+        self.max_delay = settings.getfloat("ADAPTIVE_THROTTLE_MAX_DELAY")
+        self.max_concurrency = settings.getint("ADAPTIVE_THROTTLE_MAX_CONCURRENCY")
+        for name in ("CONCURRENT_REQUESTS_PER_DOMAIN", "CONCURRENT_REQUESTS_PER_IP"):
+            if (settings.getpriority(name) or 0) > SETTINGS_PRIORITIES["project"] and settings.getint(name):
+                # Never more concurrent than the spider asks for.
+                self.max_concurrency = min(self.max_concurrency, settings.getint(name))
+        self.window = settings.getint("ADAPTIVE_THROTTLE_WINDOW")
+        self.expiration_secs = settings.getfloat("ADAPTIVE_THROTTLE_EXPIRATION_DAYS") * 24 * 60 * 60
+        self.profiles: dict[str, HostProfile] = {}
+        # The slot each profile was last applied to, as idle slots are
+        # garbage collected and replaced with new ones at the default rate.
+        self.slots: dict[str, Slot] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler):
+        extension = cls(crawler)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(extension.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(extension.response_downloaded, signal=signals.response_downloaded)
+        return extension
+
+    def profiles_path(self, spider: Spider) -> Path:
+        return self.profiles_dir / f"{spider.name}.json"
+
+    def spider_opened(self, spider: Spider) -> None:
+        self.profiles = self.load_profiles(self.profiles_path(spider))
+        self.crawler.stats.set_value("atp/adaptive_throttle/profiles_loaded", len(self.profiles))
+
+    def spider_closed(self, spider: Spider) -> None:
+        self.save_profiles(self.profiles_path(spider))
+
+    def load_profiles(self, path: Path) -> dict[str, HostProfile]:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            profiles = {host: HostProfile(**profile) for host, profile in data.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable throttle profiles %s: %s", path, e)
+            return {}
+        expire_before = time.time() - self.expiration_secs
+        for profile in profiles.values():
+            profile.delay = min(max(profile.delay, self.min_delay), self.max_delay)
+            profile.concurrency = min(max(profile.concurrency, 1), self.max_concurrency)
+        return {host: profile for host, profile in profiles.items() if profile.updated >= expire_before}
+
+    def save_profiles(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({host: asdict(profile) for host, profile in sorted(self.profiles.items())}, f, indent=1)
+        os.replace(tmp_path, path)
+
+    def get_slot(self, request: Request) -> tuple[str | None, Slot | None]:
+        key = request.meta.get("download_slot")
+        if key is None or key in self.crawler.engine.downloader.per_slot_settings:
+            # Slots configured with DOWNLOAD_SLOTS are left as configured.
+            return None, None
+        return key, self.crawler.engine.downloader.slots.get(key)
+
+    def request_reached_downloader(self, request: Request, spider: Spider) -> None:
+        key, slot = self.get_slot(request)
+        if key is None or slot is None or self.slots.get(key) is slot:
+            return
+        if (profile := self.profiles.get(key)) is None:
+            profile = self.profiles[key] = HostProfile(
+                delay=slot.delay, concurrency=min(slot.concurrency, self.max_concurrency)
+            )
+        # Learned before the spider asked for less.
+        profile.concurrency = min(profile.concurrency, self.max_concurrency)
+        self.slots[key] = slot
+        self.apply(profile, slot)
+
+    def response_downloaded(self, response: Response, request: Request, spider: Spider) -> None:
+        if request.meta.get("autothrottle_dont_adjust_delay"):
+            return
+        key, slot = self.get_slot(request)
+        if key is None or slot is None or (profile := self.profiles.get(key)) is None:
+            return
+        profile.responses += 1
+        profile.updated = time.time()
+        if self.is_throttled(response):
+            self.crawler.stats.inc_value("atp/adaptive_throttle/throttled_count")
+            self.slow_down(profile, response)
+        else:
+            if (latency := request.meta.get("download_latency")) is not None:
+                profile.latency = latency if profile.latency is None else 0.8 * profile.latency + 0.2 * latency
+            self.speed_up(profile)
+        self.apply(profile, slot)
+        self.crawler.stats.max_value("atp/adaptive_throttle/max_delay", round(profile.delay, 3))
+
+    @staticmethod
+    def is_throttled(response: Response) -> bool:
+        if response.status in THROTTLED_STATUSES:
+            return True
+        return response.status in CDN_BLOCKED_STATUSES and get_cdn(response) is not None
+
+    def slow_down(self, profile: HostProfile, response: Response) -> None:
+        retry_after = 0.0
+        try:
+            retry_after = float(response.headers.get(b"Retry-After") or b"0")
+        except ValueError:
+            # An HTTP date rather than a number of seconds.
+            pass
+        profile.throttled += 1
+        profile.healthy_streak = 0
+        profile.delay = min(max(profile.delay * 2, self.start_delay, retry_after), self.max_delay)
+        profile.concurrency = max(profile.concurrency // 2, 1)
+
+    def speed_up(self, profile: HostProfile) -> None:
+        profile.healthy_streak += 1
+        latency_delay = (profile.latency or 0.0) / self.max_concurrency
+        profile.delay = min(max(profile.delay * 0.9, self.min_delay, latency_delay), self.max_delay)
+        if profile.healthy_streak >= self.window and profile.concurrency < self.max_concurrency:
+            profile.concurrency += 1
+            profile.healthy_streak = 0
+
+    @staticmethod
+    def apply(profile: HostProfile, slot: Slot) -> None:
+        slot.delay = profile.delay
+        slot.concurrency = profile.concurrency
@@ -4,6 +4,8 @@ import json
 from scrapy import signals
 from scrapy.crawler import Crawler
 
+from locations.extensions.pipeline_timing import publish_pipeline_timings
+
 
 class LogStatsExtension:
     """
@@ -31,6 +33,8 @@ class LogStatsExtension:
                 return o.isoformat()
 
         if filename:
+            # This is called before the item pipeline manager sets its stats.
+            publish_pipeline_timings(self.crawler)
             with open(filename, "w") as f:
                 f.write(
                     json.dumps(
@@ -0,0 +1,167 @@
+import functools
+import inspect
+import math
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable
+
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.pipelines import ItemPipelineManager
+
+
+class LatencyHistogram:
+    """
+    Durations counted in buckets spaced logarithmically, 16 to each doubling,
+    so that percentiles are known to within about 4% in constant memory.
+    """
+
+    BUCKETS_PER_DOUBLING = 16
+
+    def __init__(self):
+        self.counts: Counter[int] = Counter()
+        self.total = 0
+
+    def add(self, seconds: float) -> None:
+        nanoseconds = max(seconds * 1e9, 1.0)
+        self.counts[math.floor(math.log2(nanoseconds) * self.BUCKETS_PER_DOUBLING)] += 1
+        self.total += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        :return: the duration in seconds below which the given percentage of durations fall, None if there are none
+        """
+        if not self.total:
+            return None
+        rank = math.ceil(self.total * percent / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                break
+        # The geometric middle of the bucket.
+        return 2 ** ((bucket + 0.5) / self.BUCKETS_PER_DOUBLING) / 1e9
+
+
+class PipelineTiming:
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.latency = LatencyHistogram()
+        self.memory_samples = 0
+        self.memory_peak_total = 0
+        self.memory_peak_max = 0
+
+    def record(self, seconds: float, memory_peak: int | None) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.latency.add(seconds)
+        if memory_peak is not None:
+            self.memory_samples += 1
+            self.memory_peak_total += memory_peak
+            self.memory_peak_max = max(self.memory_peak_max, memory_peak)
+
+    def stats(self) -> dict[str, int | float]:
+        stats = {
+            "calls": self.calls,
+            "total_seconds": round(self.total_seconds, 6),
+        }
+        if (p50 := self.latency.percentile(50)) is not None:
+            stats["p50_ms"] = round(p50 * 1000, 4)
+        if (p99 := self.latency.percentile(99)) is not None:
+            stats["p99_ms"] = round(p99 * 1000, 4)
+        if self.memory_samples:
+            stats["tracemalloc_samples"] = self.memory_samples
+            stats["tracemalloc_peak_bytes_mean"] = self.memory_peak_total // self.memory_samples
+            stats["tracemalloc_peak_bytes_max"] = self.memory_peak_max
+        return stats
+
+
+class TimedItemPipelineManager(ItemPipelineManager):
+    """
+    An item pipeline manager which, with PIPELINE_TIMING_ENABLED, times the
+    process_item of each pipeline. The number of calls, total time and p50
+    and p99 latencies of each pipeline are set as the stats
+    atp/perf/pipeline/<pipeline class>/... when the spider closes.
+
+    With PIPELINE_TIMING_TRACEMALLOC_SAMPLE_RATE set to N, every Nth call of
+    each pipeline also has the peak memory it allocates traced. Tracing slows
+    every allocation, so this is for finding where memory goes rather than
+    for timing.
+    """
+
+    def __init__(self, *middlewares: Any, crawler: Crawler | None = None):
+        self.timings: dict[str, PipelineTiming] = {}
+        self.timing_enabled = False
+        self.tracemalloc_sample_rate = 0
+        if crawler is not None and crawler.settings.getbool("PIPELINE_TIMING_ENABLED"):
+            self.timing_enabled = True
+            self.tracemalloc_sample_rate = crawler.settings.getint("PIPELINE_TIMING_TRACEMALLOC_SAMPLE_RATE")
+            if self.tracemalloc_sample_rate and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            crawler.signals.connect(self.publish_stats, signal=signals.spider_closed)
+        super().__init__(*middlewares, crawler=crawler)
+
+    def _add_middleware(self, mw: Any) -> None:
+        if self.timing_enabled and hasattr(mw, "process_item"):
+            mw.process_item = self.timed(type(mw).__name__, mw.process_item)
+        super()._add_middleware(mw)
+
+    def timed(self, name: str, process_item: Callable) -> Callable:
+        timing = self.timings.setdefault(name, PipelineTiming())
+        sample_rate = self.tracemalloc_sample_rate
+
+        def start() -> tuple[float, int | None]:
+            memory = None
+            if sample_rate and timing.calls % sample_rate == 0:
+                tracemalloc.reset_peak()
+                memory = tracemalloc.get_traced_memory()[0]
+            return time.perf_counter(), memory
+
+        def stop(started: float, memory: int | None) -> None:
+            seconds = time.perf_counter() - started
+            if memory is not None:
+                memory = tracemalloc.get_traced_memory()[1] - memory
+            timing.record(seconds, memory)
+
+        # The wrappers keep the signature of process_item, which the manager
+        # inspects to find whether to pass the spider.
+        if inspect.iscoroutinefunction(process_item):
+
+            @functools.wraps(process_item)
+            async def timed_process_item_async(*args, **kwargs):
+                started, memory = start()
+                try:
+                    return await process_item(*args, **kwargs)
+                finally:
+                    stop(started, memory)
+
+            return timed_process_item_async
+
+        @functools.wraps(process_item)
+        def timed_process_item(*args, **kwargs):
+            started, memory = start()
+            try:
+                return process_item(*args, **kwargs)
+            finally:
+                stop(started, memory)
+
+        return timed_process_item
+
+    def publish_stats(self) -> None:
+        if not self.crawler or not self.crawler.stats:
+            return
+        for name, timing in self.timings.items():
+            for key, value in timing.stats().items():
+                self.crawler.stats.set_value(f"atp/perf/pipeline/{name}/{key}", value)
+
+
+def publish_pipeline_timings(crawler: Crawler) -> None:
+    """
+    Set the pipeline timing stats now, rather than when the item pipeline
+    manager receives spider_closed.
+    """
+    scraper = getattr(getattr(crawler, "engine", None), "scraper", None)
+    if isinstance(itemproc := getattr(scraper, "itemproc", None), TimedItemPipelineManager):
+        itemproc.publish_stats()
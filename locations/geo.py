@@ -1,15 +1,18 @@
-import csv
-import gzip
 import json
+import logging
 import math
-from io import TextIOWrapper
 from itertools import groupby
-from typing import Any, Iterable
+from typing import Any, Iterable, NamedTuple
 
 import geonamescache
+import shapely
 from pyproj import Transformer
+from scrapy.statscollectors import StatsCollector
 
-from locations.searchable_points import get_searchable_points_path, open_searchable_points
+from locations.searchable_points import open_searchable_points
+from locations.searchable_points.store import load_point_set
+
+logger = logging.getLogger(__name__)
 
 # Radius of the Earth in kilometers
 EARTH_RADIUS = 6378.1
@@ -40,7 +43,12 @@ def vincenty_distance(lat: float, lon: float, distance_km: float, bearing_deg: f
     return math.degrees(lat2), math.degrees(lon2)
 
 
-def country_iseadgg_centroids(country_codes: list[str] | str, radius: int) -> list[tuple[float, float]]:
+def country_iseadgg_centroids(
+    country_codes: list[str] | str,
+    radius: int,
+    bbox: tuple[float, float, float, float] | None = None,
+    polygon: shapely.Geometry | None = None,
+) -> list[tuple[float, float]]:
     """
     Get WGS84 ISEADGG point locations for one or more countries at a specified
     radius.
@@ -77,6 +85,10 @@ def country_iseadgg_centroids(country_codes: list[str] | str, radius: int) -> li
     :param radius: a radius (in kilometres) with accepted values being 24, 48,
            79, 94, 158, 315 and 458. If any other radius is supplied, this
            function will raise a ValueError exception.
+    :param bbox: optional (xmin, ymin, xmax, ymax) bounding box to only
+           return point locations within.
+    :param polygon: optional shapely geometry to only return point
+           locations within or on the boundary of.
     :return: list of locations being a tuple consisting of latitude then
              longitude WGS84 coordinates.
     """
@@ -89,23 +101,24 @@ def country_iseadgg_centroids(country_codes: list[str] | str, radius: int) -> li
     all_points = []
     for country_code in country_codes:
         try:
-            with open_searchable_points(
+            point_set = load_point_set(
                 "iseadgg/{}_centroids_iseadgg_{}km_radius.csv".format(country_code.lower(), str(radius))
-            ) as file:
-                rows = csv.DictReader(file)
-                for row in rows:
-                    all_points.append((float(row["latitude"]), float(row["longitude"])))
+            )
         except FileNotFoundError:
             raise ValueError(
                 "Invalid ISO-3166 alpha-2 country code supplied. Ensure supplied code is represented in the locations/searchable_points/iseadgg/ path."
             )
+        all_points.extend(point_set.points(point_set.mask(bbox=bbox, polygon=polygon)))
 
     unique_points = list(set(all_points))
     return unique_points
 
 
 def point_locations(
-    areas_csv_file: list[str] | str, area_field_filter: list[str] | str = []
+    areas_csv_file: list[str] | str,
+    area_field_filter: list[str] | str = [],
+    bbox: tuple[float, float, float, float] | None = None,
+    polygon: shapely.Geometry | None = None,
 ) -> Iterable[tuple[float, float]]:
     """
     Get WGS84 point locations from requested *_centroids_*.csv file.
@@ -114,46 +127,23 @@ def point_locations(
         point_locations("eu_centroids_40km_radius_country.csv")
         point_locations("eu_centroids_40km_radius_country.csv", ["GB", "IE"])
         point_locations("us_centroids_50mile_radius_state.csv", "NY")
+        point_locations("us_centroids_50mile_radius.csv", bbox=(-80, 40, -70, 45))
 
     :param areas_csv_file: single CSV file or list of CSV files with lat/lon points
     :param area_field_filter: optional area name or list of area names to filter on
+    :param bbox: optional (xmin, ymin, xmax, ymax) bounding box to filter on
+    :param polygon: optional shapely geometry to filter on, including its boundary
     :return: iterable point locations being a a tuple consisting of latitude
              then longitude WGS84 coordinates.
 
     """
-
-    def get_key(row, keys):
-        for key in keys:
-            if row.get(key):
-                return row[key]
-        return None
-
     if isinstance(areas_csv_file, str):
         areas_csv_file = [areas_csv_file]
     if area_field_filter and isinstance(area_field_filter, str):
         area_field_filter = [area_field_filter]
     for csv_file in areas_csv_file:
-        with open_searchable_points("{}".format(csv_file)) as file:
-            for row in csv.DictReader(file):
-                try:
-                    lat, lon = float(row["latitude"]), float(row["longitude"])
-                except ValueError:
-                    raise Exception(
-                        "Invalid latitude/longitude in searchable points file {} where latitude = {} and longitude = {}.".format(
-                            csv_file, row["latitude"], row["longitude"]
-                        )
-                    )
-                area = get_key(row, ["country", "territory", "state"])
-                if area_field_filter:
-                    if not area:
-                        raise Exception(
-                            "Searchable points file {} does not support area field filters (columns named 'country', 'territory' and 'state').".format(
-                                csv_file
-                            )
-                        )
-                    if area not in area_field_filter:
-                        continue
-                yield lat, lon
+        point_set = load_point_set(csv_file)
+        yield from point_set.points(point_set.mask(area_field_filter or None, bbox, polygon))
 
 
 def city_locations(country_code: str, min_population: int = 0) -> Iterable[dict]:
@@ -189,15 +179,14 @@ def postal_regions(country_code: str, min_population: int = 0, consolidate_citie
     :return: post code regions with possible extras
     """
     if country_code == "GB":
-        with gzip.open(get_searchable_points_path("postcodes/outward_gb.json.gz"), mode="rb") as points:
-            for outward_code in json.load(TextIOWrapper(points)):
-                yield {
-                    "postal_region": outward_code["postcode"],
-                    "city": outward_code["town"],
-                    "state": outward_code["country_string"],
-                    "latitude": outward_code["latitude"],
-                    "longitude": outward_code["longitude"],
-                }
+        for outward_code in load_point_set("postcodes/outward_gb.json.gz").rows():
+            yield {
+                "postal_region": outward_code["postcode"],
+                "city": outward_code["town"],
+                "state": outward_code["country_string"],
+                "latitude": outward_code["latitude"],
+                "longitude": outward_code["longitude"],
+            }
     elif country_code == "US":
         # US zip code database from https://simplemaps.com/data/us-zips
         # From their licence.txt:
@@ -209,42 +198,40 @@ def postal_regions(country_code: str, min_population: int = 0, consolidate_citie
         # easily found though links on the root domain. The link must be clearly visible to the human eye.
         # The backlink must be placed before the Customer uses the Database in production.
         #
-        with gzip.open(get_searchable_points_path("postcodes/uszips.csv.gz"), mode="rb") as points:
-
-            def create_postcode_output_dict(postcode: dict) -> dict:
-                return {
-                    "postal_region": postcode["zip"],
-                    "city": postcode["city"],
-                    "state": postcode["state_id"],
-                    "latitude": postcode["lat"],
-                    "longitude": postcode["lng"],
-                }
-
-            postcode_data = filter(
-                lambda x: not (x["population"].isnumeric() and int(x["population"]) < min_population),
-                csv.DictReader(TextIOWrapper(points)),
-            )
-            if consolidate_cities:
-                postcode_data = sorted(postcode_data, key=lambda x: (x["state_name"], x["county_name"], x["city"]))
-                for city, postcodes_in_city in groupby(
-                    postcode_data, lambda x: (x["state_name"], x["county_name"], x["city"])
-                ):
-                    largest_postcode = max(list(postcodes_in_city), key=lambda x: x["population"])
-                    yield create_postcode_output_dict(largest_postcode)
-            else:
-                for postcode in postcode_data:
-                    yield create_postcode_output_dict(postcode)
+
+        def create_postcode_output_dict(postcode: dict) -> dict:
+            return {
+                "postal_region": postcode["zip"],
+                "city": postcode["city"],
+                "state": postcode["state_id"],
+                "latitude": postcode["lat"],
+                "longitude": postcode["lng"],
+            }
+
+        def is_populated(postcode: dict[str, str | None]) -> bool:
+            population = postcode["population"]
+            return not (population is not None and population.isnumeric() and int(population) < min_population)
+
+        postcode_data = filter(is_populated, load_point_set("postcodes/uszips.csv.gz").rows())
+        if consolidate_cities:
+            postcode_data = sorted(postcode_data, key=lambda x: (x["state_name"], x["county_name"], x["city"]))
+            for city, postcodes_in_city in groupby(
+                postcode_data, lambda x: (x["state_name"], x["county_name"], x["city"])
+            ):
+                largest_postcode = max(list(postcodes_in_city), key=lambda x: x["population"] or "")
+                yield create_postcode_output_dict(largest_postcode)
+        else:
+            for postcode in postcode_data:
+                yield create_postcode_output_dict(postcode)
 
     elif country_code == "FR":
         # French postal code database from https://datanova.legroupe.laposte.fr
-
-        with gzip.open(get_searchable_points_path("postcodes/frzips.csv.gz"), mode="rb") as points:
-            for row in csv.DictReader(TextIOWrapper(points)):
-                yield {
-                    "postal_region": row["Code_postal"],
-                    "latitude": row["lat"],
-                    "longitude": row["lng"],
-                }
+        for row in load_point_set("postcodes/frzips.csv.gz").rows():
+            yield {
+                "postal_region": row["Code_postal"],
+                "latitude": row["lat"],
+                "longitude": row["lng"],
+            }
     else:
         raise Exception("country code not supported: " + country_code)
 
@@ -391,6 +378,140 @@ def bbox_split(
     return bbox_list
 
 
+class QuadtreeCell(NamedTuple):
+    bounds: tuple[float, float, float, float]
+    depth: int
+
+
+class QuadtreeSearch:
+    """
+    Plans the bounding box searches of an API which returns at most a fixed
+    number of results per search. Rather than searching every cell of a
+    fixed grid fine enough for the densest area, the bounds are searched as
+    a coarse grid, and only cells whose search hits the result limit are
+    split into four and searched again. Empty cells, and cells with fewer
+    results than the limit, are complete.
+
+    Driven from the callbacks of a spider, for example:
+
+        async def start(self):
+            self.search = QuadtreeSearch((-180, -85, 180, 85), result_limit=100, stats=self.crawler.stats)
+            for cell in self.search.cells():
+                yield self.make_request(cell)
+
+        def parse(self, response, cell):
+            locations = response.json()["locations"]
+            yield from self.parse_locations(locations)
+            for subcell in self.search.record(cell, len(locations)):
+                yield self.make_request(subcell)
+
+    Progress is kept in the "atp/geo_search/quadtree/*" stats, including
+    the requests made against the number a fixed grid of the finest cells
+    searched would have needed, and the fraction of the area completely
+    searched.
+    """
+
+    def __init__(
+        self,
+        bounds: tuple[float, float, float, float],
+        result_limit: int,
+        num_tiles: int = 1,
+        max_depth: int = 12,
+        stats: StatsCollector | None = None,
+    ):
+        """
+        :param bounds: A tuple representing a lat/lon bounding box to search. Uses (xmin, ymin, xmax, ymax).
+        :param result_limit: The maximum number of results the API returns for a search.
+        :param num_tiles: The number of cells in the X and Y direction of the initial grid.
+        :param max_depth: The number of times a cell may be split. A cell at this depth which hits the result
+                          limit is left truncated.
+        :param stats: Optional crawler stats to keep progress in.
+        """
+        self.bounds = bounds
+        self.result_limit = result_limit
+        self.num_tiles = num_tiles
+        self.max_depth = max_depth
+        self.stats = stats
+        self.requests = 0
+        self.deepest = 0
+        self.empty_cells = 0
+        self.split_cells = 0
+        self.truncated_cells = 0
+        self.complete_area = 0.0
+
+    def cells(self) -> list[QuadtreeCell]:
+        """
+        :return: The cells of the initial grid, to be searched first.
+        """
+        cells = [QuadtreeCell(bounds, 0) for bounds in make_subdivisions(self.bounds, self.num_tiles)]
+        self.requests += len(cells)
+        self.update_stats()
+        return cells
+
+    def record(self, cell: QuadtreeCell, result_count: int) -> list[QuadtreeCell]:
+        """
+        Record the number of results of the search of a cell.
+
+        :param cell: The cell searched.
+        :param result_count: The number of results the search returned.
+        :return: The cells to search next, being the four quarters of the cell if the search hit the result
+                 limit, otherwise none.
+        """
+        self.deepest = max(self.deepest, cell.depth)
+        subcells = []
+        if result_count == 0:
+            self.empty_cells += 1
+            self.complete_area += bbox_area(cell.bounds)
+        elif result_count < self.result_limit:
+            self.complete_area += bbox_area(cell.bounds)
+        elif cell.depth >= self.max_depth:
+            self.truncated_cells += 1
+            logger.warning(
+                "Search of %s returned %s results at the maximum depth of %s, some results may be missing",
+                cell.bounds,
+                result_count,
+                self.max_depth,
+            )
+        else:
+            self.split_cells += 1
+            subcells = [QuadtreeCell(bounds, cell.depth + 1) for bounds in make_subdivisions(cell.bounds, 2)]
+            self.requests += len(subcells)
+        self.update_stats()
+        return subcells
+
+    def fixed_grid_requests(self) -> int:
+        """
+        :return: The number of requests a fixed grid of cells as small as the smallest searched would need.
+        """
+        return self.num_tiles**2 * 4**self.deepest
+
+    def coverage(self) -> float:
+        """
+        :return: The fraction of the area of the bounds completely searched.
+        """
+        return self.complete_area / bbox_area(self.bounds)
+
+    def update_stats(self) -> None:
+        if self.stats is None:
+            return
+        self.stats.set_value("atp/geo_search/quadtree/requests", self.requests)
+        self.stats.set_value("atp/geo_search/quadtree/fixed_grid_requests", self.fixed_grid_requests())
+        self.stats.set_value("atp/geo_search/quadtree/empty_cells", self.empty_cells)
+        self.stats.set_value("atp/geo_search/quadtree/split_cells", self.split_cells)
+        self.stats.set_value("atp/geo_search/quadtree/truncated_cells", self.truncated_cells)
+        self.stats.set_value("atp/geo_search/quadtree/max_depth", self.deepest)
+        self.stats.set_value("atp/geo_search/quadtree/coverage", round(self.coverage(), 4))
+
+
+def bbox_area(bounds: tuple[float, float, float, float]) -> float:
+    """
+    :param bounds: A tuple representing a lat/lon bounding box. Uses (xmin, ymin, xmax, ymax).
+    :return: The area of the bounding box in square degrees.
+    """
+    xmin, ymin, xmax, ymax = bounds
+    return (xmax - xmin) * (ymax - ymin)
+
+
 def bbox_contains(bounds: tuple[float, float, float, float], point: tuple[float, float]) -> bool:
     """
     Returns true if the lat/lon point is contained in the given lat/lon bounding box.
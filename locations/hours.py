@@ -1,7 +1,9 @@
+import functools
 import logging
 import re
 import time
 from collections import defaultdict
+from typing import Iterable
 
 DAYS = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
 DAYS_FROM_SUNDAY = DAYS[-1:] + DAYS[:-1]
@@ -1019,6 +1021,8 @@ CLOSED_NO = ["stengt"]
 
 CLOSED_FR = ["fermée", "fermé", "fermee", "ferme"]
 
+TWELVE_HOUR_TIME_REGEX = re.compile(r"\d\s*[AP]\.?M\.?", re.IGNORECASE)
+
 logger = logging.getLogger(__name__)
 
 
@@ -1051,10 +1055,56 @@ def sanitise_day(day: str, days: dict[str, str] = DAYS_EN) -> str | None:
     return days.get(day)
 
 
+_FAST_TIME_FORMATS = {
+    "%H:%M": re.compile(r"([0-9]{1,2}):([0-9]{1,2})()"),
+    "%H:%M:%S": re.compile(r"([0-9]{1,2}):([0-9]{1,2}):([0-9]{1,2})"),
+}
+_MIDNIGHT_START = 0
+_MIDNIGHT_END = 23 * 60 + 59
+
+
+def _parse_time(value: str | time.struct_time, time_format: str) -> int:
+    """
+    Convert a time of day to the number of minutes since midnight.
+    :param value: time of day as a string or time.struct_time.
+    :param time_format: time.strptime format of value if it is a string.
+    :returns: number of minutes since midnight.
+    """
+    if isinstance(value, time.struct_time):
+        return value.tm_hour * 60 + value.tm_min
+    return _parse_time_string(value, time_format)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_time_string(value: str, time_format: str) -> int:
+    if fast_time_regex := _FAST_TIME_FORMATS.get(time_format):
+        # Avoid the (comparatively slow) time.strptime for the common
+        # "HH:MM" and "HH:MM:SS" formats.
+        if m := fast_time_regex.fullmatch(value):
+            hour, minute, second = m.group(1, 2, 3)
+            if int(hour) < 24 and int(minute) < 60 and (not second or int(second) < 62):
+                return int(hour) * 60 + int(minute)
+    parsed = time.strptime(value, time_format)
+    return parsed.tm_hour * 60 + parsed.tm_min
+
+
+def format_time(minutes: int) -> str:
+    """
+    :param minutes: a time of day as minutes since midnight, as kept by OpeningHours
+    :return: the time formatted as HH:MM
+    """
+    return "%02d:%02d" % divmod(minutes, 60)
+
+
 class OpeningHours:
+    # Opening hours are stored per day as a set of (open, close) tuples,
+    # with each time stored as the integer number of minutes since
+    # midnight. Closing at midnight is stored as 23:59.
+    __slots__ = ("day_hours", "days_closed")
+
     def __init__(self):
-        self.day_hours = defaultdict(set)
-        self.days_closed = set()
+        self.day_hours: defaultdict[str, set[tuple[int, int]]] = defaultdict(set)
+        self.days_closed: set[str] = set()
 
     def __bool__(self):
         return bool(self.day_hours or self.days_closed)
@@ -1108,7 +1158,8 @@ class OpeningHours:
         time_format: str = "%H:%M",
         closed: list[str] = CLOSED_EN,
     ):
-        day = sanitise_day(day)
+        if day not in DAYS:
+            day = sanitise_day(day)
 
         if day not in DAYS:
             raise ValueError(f"day must be one of {DAYS}, not {day!r}")
@@ -1138,23 +1189,21 @@ class OpeningHours:
                 close_time = "23:59"
             if close_time in ("24:00:00", "00:00:00"):
                 close_time = "23:59:00"
-        if not isinstance(open_time, time.struct_time):
-            open_time = time.strptime(open_time, time_format)
-        if not isinstance(close_time, time.struct_time):
-            close_time = time.strptime(close_time, time_format)
-            if close_time.tm_hour == 0 and close_time.tm_min == 0:
-                # weird format not caught by checks above
-                # may be 0:00 or even more divergent if time_format
-                # parameter was used with some exotic value
-                close_time = time.strptime("23:59", "%H:%M")
-        if open_time.tm_hour == close_time.tm_hour and open_time.tm_min == close_time.tm_min:
+        open_minutes = _parse_time(open_time, time_format)
+        close_minutes = _parse_time(close_time, time_format)
+        if close_minutes == _MIDNIGHT_START and not isinstance(close_time, time.struct_time):
+            # weird format not caught by checks above
+            # may be 0:00 or even more divergent if time_format
+            # parameter was used with some exotic value
+            close_minutes = _MIDNIGHT_END
+        if open_minutes == close_minutes:
             # A single time of day was provided, not a range. Ignore request.
             # Sometimes source data uses 00:00-00:00 as a range denoting a
             # closed day.
             return
 
         self.days_closed.discard(day)
-        self.day_hours[day].add((open_time, close_time))
+        self.day_hours[day].add((open_minutes, close_minutes))
 
     def as_opening_hours(self) -> str:
         day_groups = []
@@ -1173,17 +1222,14 @@ class OpeningHours:
         # so we need only check whether time goes over midnight and split it
         # in two regular ranges
         day_hours_midnight_split = defaultdict(set)
-        time_format = "%H:%M"
-        midnight_end = time.strptime("23:59", time_format)
-        midnight_start = time.strptime("00:00", time_format)
         for index, day in enumerate(DAYS):
             for h in self.day_hours[day]:
-                if h[0].tm_hour * 60 + h[0].tm_min > h[1].tm_hour * 60 + h[1].tm_min:
+                if h[0] > h[1]:
                     # start hour is greater than end hour, indicating that it is
                     # an over-midnight range
-                    day_hours_midnight_split[day].add((h[0], midnight_end))
+                    day_hours_midnight_split[day].add((h[0], _MIDNIGHT_END))
                     next_day = DAYS[(index + 1) % len(DAYS)]
-                    day_hours_midnight_split[next_day].add((midnight_start, h[1]))
+                    day_hours_midnight_split[next_day].add((_MIDNIGHT_START, h[1]))
                     if next_day in self.days_closed:
                         self.days_closed.remove(next_day)
                 else:
@@ -1193,11 +1239,7 @@ class OpeningHours:
                 hours = "closed"
             else:
                 hours = ",".join(
-                    "%s-%s"
-                    % (
-                        time.strftime("%H:%M", h[0]),
-                        time.strftime("%H:%M", h[1]).replace("23:59", "24:00"),
-                    )
+                    "%s-%s" % (format_time(h[0]), "24:00" if h[1] == _MIDNIGHT_END else format_time(h[1]))
                     for h in sorted(day_hours_midnight_split[day])
                 )
 
@@ -1307,24 +1349,24 @@ class OpeningHours:
         return days_regex_parts
 
     @staticmethod
-    def named_day_ranges_regex(named_day_ranges: dict[str, list[str]] = NAMED_DAY_RANGES_EN) -> str:
+    def named_day_ranges_regex(named_day_ranges: Iterable[str] = NAMED_DAY_RANGES_EN) -> str:
         """
         Creates a regular expression for capturing named day ranges
         within a string containing time information. For example, in
         the string of "Weekends: 9am-5pm", "Weekends" is captured.
-        :param named_day_ranges: dictionary mapping localised named
-                                 day ranges to lists of days from
-                                 DAYS ("Mo", "Tu", ...).
+        :param named_day_ranges: localised named day ranges, such as
+                                 the keys of a dictionary mapping them
+                                 to lists of days from DAYS.
         :returns: regular expression which captures named day ranges
                   in a string containing opening time information.
         """
-        named_day_ranges_regex = r"(?<!\w)(" + r"|".join(map(re.escape, named_day_ranges.keys())) + r")(?!\w)"
+        named_day_ranges_regex = r"(?<!\w)(" + r"|".join(map(re.escape, named_day_ranges)) + r")(?!\w)"
         return named_day_ranges_regex
 
     @staticmethod
     def any_day_extraction_regex(
         days: dict[str, str] = DAYS_EN,
-        named_day_ranges: dict[str, list[str]] = NAMED_DAY_RANGES_EN,
+        named_day_ranges: Iterable[str] = NAMED_DAY_RANGES_EN,
         delimiters: list[str] = DELIMITERS_EN,
     ) -> str:
         """
@@ -1332,9 +1374,9 @@ class OpeningHours:
         as single, range or named range with requested localisation.
         :param days: dictionary mapping localised day names to those
                      within DAYS ("Mo", "Tu", ...).
-        :param named_day_ranges: dictionary mapping localised named
-                                 day ranges to lists of days from
-                                 DAYS ("Mo", "Tu", ...).
+        :param named_day_ranges: localised named day ranges, such as
+                                 the keys of a dictionary mapping them
+                                 to lists of days from DAYS.
         :param delimiters: list of strings which are delimiters to
                            capture with the created regular
                            expression.
@@ -1417,7 +1459,7 @@ class OpeningHours:
     def hours_extraction_regex(
         time_24h: bool = True,
         days: dict[str, str] = DAYS_EN,
-        named_day_ranges: dict[str, list[str]] = NAMED_DAY_RANGES_EN,
+        named_day_ranges: Iterable[str] = NAMED_DAY_RANGES_EN,
         delimiters: list[str] = DELIMITERS_EN,
     ) -> str:
         """
@@ -1428,9 +1470,9 @@ class OpeningHours:
                          opening time information.
         :param days: dictionary mapping localised day names to those
                      within DAYS ("Mo", "Tu", ...).
-        :param named_day_ranges: dictionary mapping localised named
-                                 day ranges to lists of days from
-                                 DAYS ("Mo", "Tu", ...).
+        :param named_day_ranges: localised named day ranges, such as
+                                 the keys of a dictionary mapping them
+                                 to lists of days from DAYS.
         :param delimiters: list of strings which are delimiters to
                            capture with the created regular
                            expression.
@@ -1456,7 +1498,7 @@ class OpeningHours:
     @staticmethod
     def closed_days_extraction_regex(
         days: dict[str, str] = DAYS_EN,
-        named_day_ranges: dict[str, list[str]] = NAMED_DAY_RANGES_EN,
+        named_day_ranges: Iterable[str] = NAMED_DAY_RANGES_EN,
         delimiters: list[str] = DELIMITERS_EN,
         closed: list[str] = CLOSED_EN,
     ) -> str:
@@ -1465,9 +1507,9 @@ class OpeningHours:
         information from a localised string.
         :param days: dictionary mapping localised day names to those
                      within DAYS ("Mo", "Tu", ...).
-        :param named_day_ranges: dictionary mapping localised named
-                                 day ranges to lists of days from
-                                 DAYS ("Mo", "Tu", ...).
+        :param named_day_ranges: localised named day ranges, such as
+                                 the keys of a dictionary mapping them
+                                 to lists of days from DAYS.
         :param delimiters: list of strings which are delimiters to
                            capture with the created regular
                            expression.
@@ -1507,6 +1549,64 @@ class OpeningHours:
                 day_list = DAYS[start_day_index : end_day_index + 1]
         return day_list
 
+    @staticmethod
+    @functools.cache
+    def _compiled_extraction_regexes(
+        days: tuple[tuple[str, str], ...],
+        named_day_ranges: tuple[str, ...],
+        delimiters: tuple[str, ...],
+        closed: tuple[str, ...],
+    ) -> tuple[re.Pattern, re.Pattern, re.Pattern, re.Pattern, re.Pattern]:
+        """
+        Builds and compiles the regular expressions used by
+        extract_hours_from_string. The result is cached for each
+        distinct combination of localisation tables so that the
+        (large) regular expressions are only built and compiled once
+        per process, rather than on every call.
+        :param days: tuple of (localised day name, DAYS day) pairs.
+        :param named_day_ranges: tuple of localised named day ranges.
+        :param delimiters: tuple of delimiter strings.
+        :param closed: tuple of strings representing localised
+                       meaning of "closed".
+        :returns: tuple of compiled regular expressions for extracting
+                  24h hours, 12h hours and closed days, followed by
+                  compiled regular expressions for extracting 24h and
+                  12h time ranges.
+        """
+        days_dict = dict(days)
+        delimiters_list = list(delimiters)
+        time_ranges_regexes = [
+            OpeningHours.time_of_day_regex(time_24h=time_24h)
+            + OpeningHours.delimiters_regex(delimiters_list)
+            + OpeningHours.time_of_day_regex(time_24h=time_24h)
+            for time_24h in (True, False)
+        ]
+        return (
+            re.compile(
+                OpeningHours.hours_extraction_regex(
+                    time_24h=True, days=days_dict, named_day_ranges=named_day_ranges, delimiters=delimiters_list
+                ),
+                re.IGNORECASE,
+            ),
+            re.compile(
+                OpeningHours.hours_extraction_regex(
+                    time_24h=False, days=days_dict, named_day_ranges=named_day_ranges, delimiters=delimiters_list
+                ),
+                re.IGNORECASE,
+            ),
+            re.compile(
+                OpeningHours.closed_days_extraction_regex(
+                    days=days_dict,
+                    named_day_ranges=named_day_ranges,
+                    delimiters=delimiters_list,
+                    closed=list(closed),
+                ),
+                re.IGNORECASE,
+            ),
+            re.compile(time_ranges_regexes[0], re.IGNORECASE),
+            re.compile(time_ranges_regexes[1], re.IGNORECASE),
+        )
+
     @staticmethod
     def extract_hours_from_string(
         ranges_string: str,
@@ -1542,15 +1642,15 @@ class OpeningHours:
         :param closed: list of strings representing
                            localised meaning of "closed"
         """
-        # Create regular expressions for extracting opening time information from a string.
-        hours_extraction_regex_24h = OpeningHours.hours_extraction_regex(
-            time_24h=True, days=days, named_day_ranges=named_day_ranges, delimiters=delimiters
-        )
-        hours_extraction_regex_12h = OpeningHours.hours_extraction_regex(
-            time_24h=False, days=days, named_day_ranges=named_day_ranges, delimiters=delimiters
-        )
-        closed_days_extraction_regex = OpeningHours.closed_days_extraction_regex(
-            days=days, named_day_ranges=named_day_ranges, delimiters=delimiters, closed=closed
+        # Obtain (cached) compiled regular expressions for extracting opening time information from a string.
+        (
+            hours_extraction_regex_24h,
+            hours_extraction_regex_12h,
+            closed_days_extraction_regex,
+            time_ranges_regex_24h,
+            time_ranges_regex_12h,
+        ) = OpeningHours._compiled_extraction_regexes(
+            tuple(days.items()), tuple(named_day_ranges.keys()), tuple(delimiters), tuple(closed)
         )
 
         # Replace named times in source ranges string (e.g. midnight -> 00:00).
@@ -1558,12 +1658,12 @@ class OpeningHours:
         ranges_string_12h = OpeningHours.replace_named_times(ranges_string, named_times, False)
 
         # Execute regular expressions.
-        if re.search(r"\d\s*[AP]\.?M\.?", ranges_string_24h, re.IGNORECASE):
+        if TWELVE_HOUR_TIME_REGEX.search(ranges_string_24h):
             # Input string contains AM/PM (or derivatives) and therefore
             # should be treated as having 12h time format. Execute the regular
             # expression for 12h time format only.
             results_24h = []
-            results_12h = re.findall(hours_extraction_regex_12h, ranges_string_12h, re.IGNORECASE)
+            results_12h = hours_extraction_regex_12h.findall(ranges_string_12h)
         else:
             # Execute the regular expression for 24h time format only. There
             # is an unlikely chance that the string is actually in 12h time
@@ -1575,9 +1675,9 @@ class OpeningHours:
             # provide a hint (such as adding "AM" after instances of ":00") if
             # this assumption of 24h time format is invalid for a particular
             # spider.
-            results_24h = re.findall(hours_extraction_regex_24h, ranges_string_24h, re.IGNORECASE)
+            results_24h = hours_extraction_regex_24h.findall(ranges_string_24h)
             results_12h = []
-        results_closed = re.findall(closed_days_extraction_regex, ranges_string_24h, re.IGNORECASE)
+        results_closed = closed_days_extraction_regex.findall(ranges_string_24h)
 
         # Normalise results to 24h time.
         results = []
@@ -1589,13 +1689,7 @@ class OpeningHours:
                 days_in_range = OpeningHours.days_in_day_range(
                     day_range=day_range, days=days, named_day_ranges=named_day_ranges
                 )
-                time_ranges = re.findall(
-                    OpeningHours.time_of_day_regex(time_24h=True)
-                    + OpeningHours.delimiters_regex(delimiters)
-                    + OpeningHours.time_of_day_regex(time_24h=True),
-                    result[time_start_index],
-                    re.IGNORECASE,
-                )
+                time_ranges = time_ranges_regex_24h.findall(result[time_start_index])
                 for time_range in time_ranges:
                     time_start_minute = time_range[1]
                     if not time_range[1]:
@@ -1614,13 +1708,7 @@ class OpeningHours:
                 days_in_range = OpeningHours.days_in_day_range(
                     day_range=day_range, days=days, named_day_ranges=named_day_ranges
                 )
-                time_ranges = re.findall(
-                    OpeningHours.time_of_day_regex(time_24h=False)
-                    + OpeningHours.delimiters_regex(delimiters)
-                    + OpeningHours.time_of_day_regex(time_24h=False),
-                    result[time_start_index],
-                    re.IGNORECASE,
-                )
+                time_ranges = time_ranges_regex_12h.findall(result[time_start_index])
                 for time_range in time_ranges:
                     time_start_hour = time_range[0]
                     if time_start_hour == "00" or time_start_hour == "0":
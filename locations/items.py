@@ -7,9 +7,9 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Iterable
 
-import pycountry
 import scrapy
 
+from locations.countries import get_iso_3166_2_code, is_iso_3166_1_alpha_2_code
 from locations.hours import OpeningHours
 
 logger = logging.getLogger(__name__)
@@ -73,11 +73,7 @@ class Feature(scrapy.Item):
         :return: True or False for whether the feature's country is a valid
                  ISO 3166-1 alpha-2 code.
         """
-        if not self.get("country"):
-            return False
-        if self["country"] not in [country.alpha_2 for country in pycountry.countries]:
-            return False
-        return True
+        return is_iso_3166_1_alpha_2_code(self.get("country"))
 
     def get_iso_3166_2_code(self) -> str | None:
         """
@@ -88,16 +84,7 @@ class Feature(scrapy.Item):
         :return: ISO 3166-2 code or None if a code cannot be generated for
                  the feature's defined country and state.
         """
-        if not self.get("country"):
-            return None
-        if not self.get("state"):
-            return None
-        if not self.has_valid_country_code():
-            return None
-        for subdivision in pycountry.subdivisions.get(country_code=self["country"]):
-            if self["state"] in [subdivision.code.split("-", 1)[1], subdivision.name]:
-                return subdivision.code
-        return None
+        return get_iso_3166_2_code(self.get("country"), self.get("state"))
 
 
 def get_lat_lon(item: Feature) -> tuple[float, float] | None:
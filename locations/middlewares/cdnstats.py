@@ -2,6 +2,20 @@ from scrapy import Request
 from scrapy.http import Response
 from scrapy.spidermiddlewares.base import BaseSpiderMiddleware
 
+# The Server header of responses from known CDNs.
+CDN_SERVERS = {
+    b"cloudflare": "cloudflare",
+    b"AkamaiGHost": "akamai",
+    b"CloudFront": "cloudfront",
+}
+
+
+def get_cdn(response: Response) -> str | None:
+    """
+    :return: the name of the known CDN the response is from, or None
+    """
+    return CDN_SERVERS.get(response.headers.get(b"Server"))
+
 
 class CDNStatsMiddleware(BaseSpiderMiddleware):
     """
@@ -11,13 +25,7 @@ class CDNStatsMiddleware(BaseSpiderMiddleware):
     def process_response(self, request: Request, response: Response):
         if not self.crawler or not self.crawler.stats:
             return response
-        if response.headers.get(b"Server") == b"cloudflare":
-            self.crawler.stats.inc_value("atp/cdn/cloudflare/response_count")
-            self.crawler.stats.inc_value(f"atp/cdn/cloudflare/response_status_count/{response.status}")
-        elif response.headers.get(b"Server") == b"AkamaiGHost":
-            self.crawler.stats.inc_value("atp/cdn/akamai/response_count")
-            self.crawler.stats.inc_value(f"atp/cdn/akamai/response_status_count/{response.status}")
-        elif response.headers.get(b"Server") == b"CloudFront":
-            self.crawler.stats.inc_value("atp/cdn/cloudfront/response_count")
-            self.crawler.stats.inc_value(f"atp/cdn/cloudfront/response_status_count/{response.status}")
+        if cdn := get_cdn(response):
+            self.crawler.stats.inc_value(f"atp/cdn/{cdn}/response_count")
+            self.crawler.stats.inc_value(f"atp/cdn/{cdn}/response_status_count/{response.status}")
         return response
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers, Request, Response
+from scrapy.responsetypes import responsetypes
+from scrapy.settings import BaseSettings
+from scrapy.spiders import Spider
+from scrapy.utils.misc import load_object
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+
+@dataclass
+class CacheEntry:
+    """
+    What is kept of a response between runs: its validators, a hash of its
+    body and, if it has a validator, the response itself.
+    """
+
+    url: str
+    etag: str | None
+    last_modified: str | None
+    body_sha1: str
+    status: int | None = None
+    headers: bytes | None = None
+    body: bytes | None = None
+
+    def has_validator(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def to_response(self) -> Response | None:
+        """
+        :return: the stored response, or None if only the validators were kept or retrieved
+        """
+        if self.status is None or self.headers is None or self.body is None:
+            return None
+        headers = decode_headers(self.headers)
+        response_class = responsetypes.from_args(headers=headers, url=self.url, body=self.body)
+        return response_class(url=self.url, status=self.status, headers=headers, body=self.body, flags=["cached"])
+
+
+def decode_headers(raw: bytes) -> Headers:
+    """
+    :return: the headers written by headers_dict_to_raw
+    """
+    return Headers(headers_raw_to_dict(raw))
+
+
+def decode_header(headers: Headers, name: bytes) -> str | None:
+    """
+    :return: the last value of the header, or None if it is missing or empty
+    """
+    if value := headers.get(name):
+        return value.decode("latin-1")
+    return None
+
+
+class SqliteCacheStorage:
+    """
+    Keep the cache entries of each spider in a SQLite database in
+    CONDITIONAL_CACHE_DIR.
+    """
+
+    VALIDATOR_COLUMNS = "url, etag, last_modified, body_sha1"
+
+    def __init__(self, settings: BaseSettings):
+        self.cache_dir = Path(settings.get("CONDITIONAL_CACHE_DIR"))
+        self.db: sqlite3.Connection | None = None
+
+    def open_spider(self, spider: Spider) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Each statement is committed as it is made, so a spider which is killed keeps its entries.
+        self.db = db = sqlite3.connect(self.cache_dir / f"{spider.name}.sqlite", isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body_sha1 TEXT NOT NULL,
+                status INTEGER,
+                headers BLOB,
+                body BLOB,
+                seen REAL NOT NULL
+            )
+        """)
+
+    def connection(self) -> sqlite3.Connection:
+        if self.db is None:
+            raise RuntimeError("The conditional cache storage is not open")
+        return self.db
+
+    def close_spider(self, spider: Spider, expire_before: float) -> None:
+        db = self.connection()
+        db.execute("DELETE FROM entries WHERE seen < ?", (expire_before,))
+        db.close()
+        self.db = None
+
+    def retrieve_validators(self, key: str) -> CacheEntry | None:
+        db = self.connection()
+        row = db.execute(f"SELECT {self.VALIDATOR_COLUMNS} FROM entries WHERE key = ?", (key,)).fetchone()
+        return CacheEntry(*row) if row is not None else None
+
+    def retrieve(self, key: str) -> CacheEntry | None:
+        db = self.connection()
+        row = db.execute(
+            f"SELECT {self.VALIDATOR_COLUMNS}, status, headers, body FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        db.execute("UPDATE entries SET seen = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(*row)
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        self.connection().execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, *asdict(entry).values(), time.time()),
+        )
+
+
+class DirectoryCacheStorage:
+    """
+    Keep each cache entry as a JSON file, with the body alongside it, in a
+    directory of each spider in CONDITIONAL_CACHE_DIR.
+    """
+
+    def __init__(self, settings: BaseSettings):
+        self.cache_dir = Path(settings.get("CONDITIONAL_CACHE_DIR"))
+        self.spider_dir: Path | None = None
+
+    def open_spider(self, spider: Spider) -> None:
+        self.spider_dir = self.cache_dir / spider.name
+        self.spider_dir.mkdir(parents=True, exist_ok=True)
+
+    def directory(self) -> Path:
+        if self.spider_dir is None:
+            raise RuntimeError("The conditional cache storage is not open")
+        return self.spider_dir
+
+    def close_spider(self, spider: Spider, expire_before: float) -> None:
+        for path in self.directory().glob("*/*.json"):
+            if path.stat().st_mtime < expire_before:
+                path.unlink()
+                path.with_suffix(".body").unlink(missing_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.directory() / key[:2] / f"{key}.json"
+
+    def retrieve_validators(self, key: str) -> CacheEntry | None:
+        try:
+            with open(self.path(key)) as f:
+                data = json.load(f)
+            return CacheEntry(data["url"], data["etag"], data["last_modified"], data["body_sha1"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def retrieve(self, key: str) -> CacheEntry | None:
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data["headers"] is not None:
+                data["headers"] = data["headers"].encode("latin-1")
+                data["body"] = path.with_suffix(".body").read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+        # The modification time records when the entry was last used.
+        os.utime(path)
+        return CacheEntry(**data)
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        path = self.path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = asdict(entry)
+        if entry.body is not None and entry.headers is not None:
+            path.with_suffix(".body").write_bytes(entry.body)
+            data["headers"] = entry.headers.decode("latin-1")
+        else:
+            path.with_suffix(".body").unlink(missing_ok=True)
+        data["body"] = None
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+class ConditionalCacheMiddleware:
+    """
+    Keep the ETag and Last-Modified validators, and a hash of the body, of
+    each page fetched by a spider, and the page itself if it has a validator.
+    On later runs, requests for the page are made conditional with
+    If-None-Match and If-Modified-Since, and a 304 Not Modified response is
+    replaced with the stored page. Only the validators and hash of an entry
+    are read otherwise, and an entry is marked as used when its page is read
+    for a 304 or it is stored again.
+
+    Enabled with CONDITIONAL_CACHE_ENABLED, entries are kept by the
+    CONDITIONAL_CACHE_STORAGE class in CONDITIONAL_CACHE_DIR. Entries not
+    used for CONDITIONAL_CACHE_EXPIRATION_DAYS are deleted when the spider
+    closes.
+    """
+
+    crawler: Crawler
+
+    def __init__(self, crawler: Crawler):
+        if not crawler.settings.getbool("CONDITIONAL_CACHE_ENABLED"):
+            raise NotConfigured
+        self.crawler = crawler
+        self.storage = load_object(crawler.settings.get("CONDITIONAL_CACHE_STORAGE"))(crawler.settings)
+        self.expiration_secs = crawler.settings.getfloat("CONDITIONAL_CACHE_EXPIRATION_DAYS") * 24 * 60 * 60
+        self.started = time.time()
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler):
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider: Spider) -> None:
+        self.storage.open_spider(spider)
+
+    def spider_closed(self, spider: Spider) -> None:
+        self.storage.close_spider(spider, self.started - self.expiration_secs)
+
+    def key(self, request: Request) -> str:
+        return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
+    def process_request(self, request: Request) -> None:
+        if request.method != "GET" or request.meta.get("dont_cache"):
+            return None
+        key = self.key(request)
+        if not (entry := self.storage.retrieve_validators(key)) or not entry.has_validator():
+            return None
+        if entry.etag and b"If-None-Match" not in request.headers:
+            request.headers[b"If-None-Match"] = entry.etag
+        if entry.last_modified and b"If-Modified-Since" not in request.headers:
+            request.headers[b"If-Modified-Since"] = entry.last_modified
+        request.meta["conditional_cache_key"] = key
+        self.crawler.stats.inc_value("atp/conditional_cache/conditional_request")
+        return None
+
+    def process_response(self, request: Request, response: Response) -> Response:
+        if request.method != "GET" or request.meta.get("dont_cache") or "cached" in response.flags:
+            return response
+
+        if response.status == 304 and (key := request.meta.get("conditional_cache_key")):
+            if (entry := self.storage.retrieve(key)) and (cached := entry.to_response()) is not None:
+                self.crawler.stats.inc_value("atp/conditional_cache/not_modified")
+                self.crawler.stats.inc_value("atp/conditional_cache/bytes_saved", len(cached.body))
+                return cached
+            return response
+
+        if response.status != 200:
+            return response
+
+        key = self.key(request)
+        body_sha1 = hashlib.sha1(response.body).hexdigest()
+        previous = self.storage.retrieve_validators(key)
+        if previous and previous.body_sha1 == body_sha1:
+            self.crawler.stats.inc_value("atp/conditional_cache/unchanged")
+            self.crawler.stats.inc_value("atp/conditional_cache/unchanged_bytes", len(response.body))
+
+        entry = CacheEntry(
+            url=response.url,
+            etag=decode_header(response.headers, b"ETag"),
+            last_modified=decode_header(response.headers, b"Last-Modified"),
+            body_sha1=body_sha1,
+        )
+        if entry.has_validator():
+            entry.status = response.status
+            entry.headers = headers_dict_to_raw(response.headers)
+            entry.body = response.body
+        self.storage.store(key, entry)
+        self.crawler.stats.inc_value("atp/conditional_cache/store")
+        return response
@@ -0,0 +1,99 @@
+import functools
+from typing import AsyncIterator, Iterable
+
+from scrapy.crawler import Crawler
+from scrapy.http import Request, Response
+from scrapy.item import Item
+
+from locations.countries import STATES
+from locations.country_utils import CountryUtils
+from locations.items import Feature, get_lat_lon
+from locations.pipelines.state_clean_up import StateCodeCleanUpPipeline
+from locations.reverse_geocoding import ReverseGeocoder
+
+BATCH_SIZE = 500
+
+
+class ReverseGeocodeBatchMiddleware:
+    """
+    Hold back the items of a response, up to a batch at a time, and reverse
+    geocode in one query the locations of those that the country and state
+    clean up pipelines will reverse geocode, which then find them in the
+    cache of the spider's reverse geocoder. Requests are passed on without
+    waiting.
+    """
+
+    crawler: Crawler
+
+    def __init__(self, crawler: Crawler):
+        self.crawler = crawler
+        self.reverse_geocoder = ReverseGeocoder.from_crawler(crawler)
+        self.batch_size = crawler.settings.getint("REVERSE_GEOCODE_BATCH_SIZE", BATCH_SIZE)
+        self.country_utils = CountryUtils()
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler):
+        return cls(crawler)
+
+    @functools.cached_property
+    def spider_name_country(self) -> str | None:
+        spider = self.crawler.spider
+        if spider is None or getattr(spider, "skip_auto_cc_spider_name", False):
+            return None
+        return self.country_utils.country_code_from_spider_name(spider.name)
+
+    def will_reverse_geocode(self, item: Feature) -> bool:
+        """
+        :return: whether CountryCodeCleanUpPipeline or StateCodeCleanUpPipeline
+                 will reverse geocode the item, following the same steps
+        """
+        spider = self.crawler.spider
+        country = self.country_utils.to_iso_alpha2_country_code(item.get("country"))
+        if not country:
+            if getattr(spider, "skip_auto_cc", False):
+                return False
+            country = self.spider_name_country
+            if not country and not getattr(spider, "skip_auto_cc_domain", False):
+                country = self.country_utils.country_code_from_url(item.get("website"))
+            if not country:
+                return not getattr(spider, "skip_auto_cc_geocoder", False)
+        return country in STATES and not StateCodeCleanUpPipeline.clean_state(str(item.get("state")), country)
+
+    def prefetch(self, items: list[Feature]) -> list[Feature]:
+        locations = []
+        for item in items:
+            if not self.will_reverse_geocode(item):
+                continue
+            if location := get_lat_lon(item):
+                locations.append(location)
+        if len(locations) > 1:
+            self.reverse_geocoder.prefetch(locations)
+        return items
+
+    def process_spider_output(self, response: Response, result: Iterable[Item | Request]) -> Iterable[Item | Request]:
+        items = []
+        for x in result:
+            if not isinstance(x, Feature):
+                yield x
+                continue
+            items.append(x)
+            if len(items) >= self.batch_size:
+                yield from self.prefetch(items)
+                items = []
+        yield from self.prefetch(items)
+
+    async def process_spider_output_async(
+        self, response: Response, result: AsyncIterator[Item | Request]
+    ) -> AsyncIterator[Item | Request]:
+        items = []
+        async for x in result:
+            if not isinstance(x, Feature):
+                yield x
+                continue
+            items.append(x)
+            if len(items) >= self.batch_size:
+                for item in self.prefetch(items):
+                    yield item
+                items = []
+        for item in self.prefetch(items):
+            yield item
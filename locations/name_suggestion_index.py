@@ -1,7 +1,14 @@
+import array
 import json
+import logging
+import mmap
+import os
+import pickle
 import re
+import sys
+from collections.abc import Mapping, Sequence
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, Literal
 from urllib.parse import urlparse
 
 import pycountry
@@ -14,6 +21,11 @@ from locations.user_agents import BOT_USER_AGENT_REQUESTS
 _DATA_DIR = Path(__file__).resolve().parent / "data"
 NSI_FILE_PATH = _DATA_DIR / "nsi.json"
 WIKIDATA_FILE_PATH = _DATA_DIR / "nsi-wikidata.json"
+SNAPSHOT_FILE_PATH = _DATA_DIR / "nsi.snapshot"
+
+SNAPSHOT_MAGIC = b"ATPNSI01"
+
+logger = logging.getLogger(__name__)
 
 
 class Singleton(type):
@@ -25,17 +37,263 @@ class Singleton(type):
         return cls._instances[cls]
 
 
+class _SnapshotKeys:
+    """
+    NUL separated keys stored in an NSI snapshot, with a key to row number
+    dictionary built on first lookup.
+    """
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+        self._keys: list[str] | None = None
+        self._rows: dict[str, int] | None = None
+
+    @property
+    def keys(self) -> list[str]:
+        if self._keys is None:
+            self._keys = str(self._buffer, "utf-8").split("\0") if len(self._buffer) else []
+        return self._keys
+
+    def row(self, key: str) -> int:
+        if self._rows is None:
+            self._rows = {k: i for i, k in enumerate(self.keys)}
+        return self._rows[key]
+
+
+class _SnapshotItems(Sequence):
+    """
+    Read-only sequence of JSON values stored in an NSI snapshot, located by
+    an array of boundary offsets. Values are only decoded when first
+    accessed.
+    """
+
+    def __init__(self, buffer: memoryview, offsets: memoryview):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._decoded = {}
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+        if (value := self._decoded.get(i)) is None:
+            if not 0 <= i < len(self):
+                raise IndexError(i)
+            value = self._decoded[i] = json.loads(bytes(self._buffer[self._offsets[i] : self._offsets[i + 1]]))
+        return value
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+class _SnapshotEntries(Mapping):
+    """
+    Read-only mapping of keys to JSON values stored in an NSI snapshot.
+    Values are only decoded when first accessed.
+    """
+
+    def __init__(self, keys: _SnapshotKeys, values: _SnapshotItems):
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._keys.row(key)]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys.keys)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class _SnapshotIndex(Mapping):
+    """
+    Read-only mapping of keys to lists of item numbers stored in an NSI
+    snapshot in compressed sparse row form.
+    """
+
+    def __init__(self, keys: _SnapshotKeys, indptr: memoryview, indices: memoryview):
+        self._keys = keys
+        self._indptr = indptr
+        self._indices = indices
+
+    def __getitem__(self, key) -> list[int]:
+        row = self._keys.row(key)
+        return self._indices[self._indptr[row] : self._indptr[row + 1]].tolist()
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys.keys)
+
+    def __len__(self) -> int:
+        return len(self._indptr) - 1
+
+
+def _index_nsi_items(nsi_json: dict) -> tuple[list[dict], dict[str, list[int]], dict[str, list[int]]]:
+    """
+    Flatten nsi.json items and index them by brand/operator wikidata code
+    and by locationSet include code, preserving nsi.json ordering.
+    :param nsi_json: "nsi" dictionary of nsi.json
+    :return: tuple of the list of all items, and dictionaries of wikidata
+             code and location code to indexes in that list
+    """
+    nsi_items = []
+    by_wikidata = {}
+    by_location = {}
+    for v in nsi_json.values():
+        for item in v["items"]:
+            i = len(nsi_items)
+            nsi_items.append(item)
+            for wikidata_code in {item["tags"].get("brand:wikidata"), item["tags"].get("operator:wikidata")}:
+                if wikidata_code:
+                    by_wikidata.setdefault(wikidata_code, []).append(i)
+            include = item["locationSet"].get("include") or []
+            for location_code in dict.fromkeys(x for x in include if isinstance(x, str)):
+                by_location.setdefault(location_code, []).append(i)
+    return nsi_items, by_wikidata, by_location
+
+
+def _index_websites(wikidata_json: Mapping) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
+    """
+    Index wikidata.json codes by official website FQDN, FQDN excluding any
+    "www." prefix, and registered domain. Where multiple codes share a key,
+    the first in wikidata.json order is kept.
+    :param wikidata_json: "wikidata" dictionary of wikidata.json
+    :return: tuple of the three indexes
+    """
+    by_fqdn: dict[str, str] = {}
+    by_host: dict[str, str] = {}
+    by_registered_domain: dict[str, str] = {}
+    for wikidata_code, org_parameters in wikidata_json.items():
+        for official_website in org_parameters.get("officialWebsites", []):
+            official_website_domain = urlparse(official_website).netloc
+            by_fqdn.setdefault(official_website_domain, wikidata_code)
+            by_host.setdefault(official_website_domain.removeprefix("www."), wikidata_code)
+            by_registered_domain.setdefault(tldextract.extract(official_website).registered_domain, wikidata_code)
+    return by_fqdn, by_host, by_registered_domain
+
+
+def _source_files_signature() -> dict[str, tuple[int, int]]:
+    return {
+        path.name: (path.stat().st_size, path.stat().st_mtime_ns)
+        for path in (NSI_FILE_PATH, WIKIDATA_FILE_PATH)
+        if path.exists()
+    }
+
+
+def write_snapshot(snapshot_path: Path | None = None) -> None:
+    """
+    Write a snapshot of the vendored NSI data files with all lookup indexes
+    prebuilt, which NSI can then memory map instead of parsing the JSON
+    files in every process.
+
+    The snapshot consists of SNAPSHOT_MAGIC, the length of a pickled header
+    as an unsigned 64-bit little endian integer, the header, and then a
+    number of 8 byte aligned sections. The header maps section names to the
+    (offset, length) of that section relative to the end of the header,
+    and records the size and modification time of the JSON files the
+    snapshot was built from.
+
+    Each wikidata.json entry and nsi.json item is stored as its own JSON
+    document so it can be decoded individually, located by an array of
+    boundary offsets. Keys are stored NUL separated, and the wikidata and
+    location indexes of nsi.json items are stored as arrays in compressed
+    sparse row form. Indexes only needed by commands are pickled.
+    :param snapshot_path: path of the snapshot file to write,
+                          SNAPSHOT_FILE_PATH if not specified
+    """
+    snapshot_path = snapshot_path or SNAPSHOT_FILE_PATH
+    wikidata_json = json.load(open(WIKIDATA_FILE_PATH))["wikidata"]
+    nsi_json = json.load(open(NSI_FILE_PATH))["nsi"]
+    nsi_items, by_wikidata, by_location = _index_nsi_items(nsi_json)
+
+    data = bytearray()
+    sections = {}
+
+    def add_section(name: str, blob: bytes) -> None:
+        data.extend(bytes(-len(data) % 8))
+        sections[name] = (len(data), len(blob))
+        data.extend(blob)
+
+    def add_json_values(name: str, values: Iterable) -> None:
+        blobs = [json.dumps(value, separators=(",", ":")).encode() for value in values]
+        offsets = array.array("Q", [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        add_section(f"{name}/offsets", offsets.tobytes())
+        add_section(f"{name}/values", b"".join(blobs))
+
+    def add_index(name: str, index: dict[str, list[int]]) -> None:
+        indptr = array.array("Q", [0])
+        indices = array.array("I")
+        for rows in index.values():
+            indices.extend(rows)
+            indptr.append(len(indices))
+        add_section(f"{name}/keys", "\0".join(index.keys()).encode())
+        add_section(f"{name}/indptr", indptr.tobytes())
+        add_section(f"{name}/indices", indices.tobytes())
+
+    add_section("wikidata/keys", "\0".join(wikidata_json.keys()).encode())
+    add_json_values("wikidata", wikidata_json.values())
+    add_json_values("nsi_items", nsi_items)
+    add_index("nsi_items_by_wikidata", by_wikidata)
+    add_index("nsi_items_by_location", by_location)
+    add_section("websites", pickle.dumps(_index_websites(wikidata_json)))
+    add_section(
+        "normalised_labels",
+        pickle.dumps([(k, NSI.normalise_label(v["label"])) for k, v in wikidata_json.items() if v.get("label")]),
+    )
+
+    header = pickle.dumps({"byteorder": sys.byteorder, "sources": _source_files_signature(), "sections": sections})
+    header += bytes(-(len(SNAPSHOT_MAGIC) + 8 + len(header)) % 8)
+
+    tmp_path = snapshot_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(data)
+    os.replace(tmp_path, snapshot_path)
+
+
 # This is a lazy initialised singleton as it pulls (over the network) quite a lot of data into memory.
 class NSI(metaclass=Singleton):
     """
     Interact with Name Suggestion Index (NSI). The NSI people publish a JSON version of their database
     which is used by the OSM editor to do rather useful brand suggestions when editing POIs.
+
+    If an up to date snapshot written by write_snapshot (see the vendor_nsi
+    command) is available it is memory mapped, and entries are only decoded
+    as they are looked up. Otherwise the vendored JSON files are parsed.
     """
 
     def __init__(self):
         self.loaded: bool = False
-        self.wikidata_json: dict = {}
-        self.nsi_json: dict = {}
+        self.wikidata_json: Mapping = {}
+        self._nsi_json: dict | None = {}
+        # Indexes of nsi_items by brand/operator wikidata and by location.
+        self.nsi_items: Sequence[dict] = []
+        self.nsi_items_by_wikidata: Mapping[str, list[int]] = {}
+        self.nsi_items_by_location: Mapping[str, list[int]] = {}
+        # Indexes only needed by some commands, which are built (or read
+        # from the snapshot) on first use.
+        self._website_indexes: tuple[dict[str, str], dict[str, str], dict[str, str]] | None = None
+        self._normalised_labels: list[tuple[str, str]] | None = None
+        self._snapshot: memoryview | None = None
+        self._snapshot_sections: dict[str, tuple[int, int]] = {}
+
+    @property
+    def nsi_json(self) -> dict:
+        """
+        The "nsi" dictionary of nsi.json. When loaded from a snapshot, this
+        is only parsed from nsi.json on first access.
+        """
+        self._ensure_loaded()
+        if self._nsi_json is None:
+            self._nsi_json = json.load(open(NSI_FILE_PATH))["nsi"]
+        return self._nsi_json
+
+    @nsi_json.setter
+    def nsi_json(self, value: dict) -> None:
+        self._nsi_json = value
 
     @staticmethod
     def _request_file(file: str) -> dict:
@@ -49,10 +307,93 @@ class NSI(metaclass=Singleton):
 
     def _ensure_loaded(self):
         if not self.loaded:
-            self.wikidata_json = json.load(open(WIKIDATA_FILE_PATH))["wikidata"]
-            self.nsi_json = json.load(open(NSI_FILE_PATH))["nsi"]
+            if not self._load_snapshot():
+                self.wikidata_json = json.load(open(WIKIDATA_FILE_PATH))["wikidata"]
+                self._nsi_json = json.load(open(NSI_FILE_PATH))["nsi"]
+                self._build_nsi_indexes()
             self.loaded = True
 
+    def _load_snapshot(self, snapshot_path: Path | None = None) -> bool:
+        """
+        Memory map the NSI snapshot, if one exists and was built from the
+        current vendored JSON files.
+        :param snapshot_path: path of the snapshot file, SNAPSHOT_FILE_PATH
+                              if not specified
+        :return: True if the snapshot was loaded, False otherwise
+        """
+        snapshot_path = snapshot_path or SNAPSHOT_FILE_PATH
+        if not snapshot_path.exists():
+            return False
+        with open(snapshot_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            logger.warning("Ignoring NSI snapshot %s with unknown format", snapshot_path)
+            return False
+        header_length = int.from_bytes(buffer[len(SNAPSHOT_MAGIC) : len(SNAPSHOT_MAGIC) + 8], "little")
+        header_offset = len(SNAPSHOT_MAGIC) + 8
+        header = pickle.loads(buffer[header_offset : header_offset + header_length])
+        if header["byteorder"] != sys.byteorder:
+            logger.warning("Ignoring NSI snapshot %s built on a machine of different byte order", snapshot_path)
+            return False
+        sources = _source_files_signature()
+        if sources and sources != header["sources"]:
+            logger.warning(
+                "Ignoring NSI snapshot %s which is out of date, run `scrapy vendor_nsi --snapshot-only`",
+                snapshot_path,
+            )
+            return False
+
+        self._snapshot = memoryview(buffer)[header_offset + header_length :]
+        self._snapshot_sections = header["sections"]
+        self.wikidata_json = _SnapshotEntries(
+            _SnapshotKeys(self._snapshot_section("wikidata/keys")),
+            _SnapshotItems(self._snapshot_section("wikidata/values"), self._snapshot_section("wikidata/offsets", "Q")),
+        )
+        self.nsi_items = _SnapshotItems(
+            self._snapshot_section("nsi_items/values"), self._snapshot_section("nsi_items/offsets", "Q")
+        )
+        self.nsi_items_by_wikidata = self._snapshot_index("nsi_items_by_wikidata")
+        self.nsi_items_by_location = self._snapshot_index("nsi_items_by_location")
+        self._nsi_json = None
+        return True
+
+    def _snapshot_section(self, name: str, format: Literal["Q", "I"] | None = None) -> memoryview:
+        if self._snapshot is None:
+            raise RuntimeError("No NSI snapshot is loaded")
+        offset, length = self._snapshot_sections[name]
+        section = self._snapshot[offset : offset + length]
+        return section.cast(format) if format else section
+
+    def _snapshot_index(self, name: str) -> _SnapshotIndex:
+        return _SnapshotIndex(
+            _SnapshotKeys(self._snapshot_section(f"{name}/keys")),
+            self._snapshot_section(f"{name}/indptr", "Q"),
+            self._snapshot_section(f"{name}/indices", "I"),
+        )
+
+    def _build_nsi_indexes(self) -> None:
+        if self._nsi_json is None:
+            raise RuntimeError("nsi.json is not loaded")
+        self.nsi_items, self.nsi_items_by_wikidata, self.nsi_items_by_location = _index_nsi_items(self._nsi_json)
+
+    def _get_website_indexes(self) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
+        if self._website_indexes is None:
+            if self._snapshot is not None:
+                self._website_indexes = pickle.loads(self._snapshot_section("websites"))
+            else:
+                self._website_indexes = _index_websites(self.wikidata_json)
+        return self._website_indexes
+
+    def _get_normalised_labels(self) -> list[tuple[str, str]]:
+        if self._normalised_labels is None:
+            if self._snapshot is not None:
+                self._normalised_labels = pickle.loads(self._snapshot_section("normalised_labels"))
+            else:
+                self._normalised_labels = [
+                    (k, self.normalise_label(v["label"])) for k, v in self.wikidata_json.items() if v.get("label")
+                ]
+        return self._normalised_labels
+
     def get_wikidata_code_from_url(self, url: str) -> str | None:
         """
         Attempt to return a single Wikidata code corresponding to
@@ -61,27 +402,16 @@ class NSI(metaclass=Singleton):
         :return: Wikidata code, or None if no match found
         """
         self._ensure_loaded()
+        by_fqdn, by_host, by_registered_domain = self._get_website_indexes()
         supplied_url_domain = urlparse(url).netloc
         # First attempt to find an exact FQDN match
-        for wikidata_code, org_parameters in self.wikidata_json.items():
-            for official_website in org_parameters.get("officialWebsites", []):
-                official_website_domain = urlparse(official_website).netloc
-                if official_website_domain == supplied_url_domain:
-                    return wikidata_code
+        if wikidata_code := by_fqdn.get(supplied_url_domain):
+            return wikidata_code
         # Next attempt to find an exact match excluding any "www." prefix
-        for wikidata_code, org_parameters in self.wikidata_json.items():
-            for official_website in org_parameters.get("officialWebsites", []):
-                official_website_domain = urlparse(official_website).netloc
-                if official_website_domain.removeprefix("www.") == supplied_url_domain.removeprefix("www."):
-                    return wikidata_code
+        if wikidata_code := by_host.get(supplied_url_domain.removeprefix("www.")):
+            return wikidata_code
         # Last attempt to find a fuzzy match for registered domain (excluding subdomains)
-        for wikidata_code, org_parameters in self.wikidata_json.items():
-            for official_website in org_parameters.get("officialWebsites", []):
-                official_website_reg = tldextract.extract(official_website).registered_domain
-                supplied_url_reg = tldextract.extract(supplied_url_domain).registered_domain
-                if official_website_reg == supplied_url_reg:
-                    return wikidata_code
-        return None
+        return by_registered_domain.get(tldextract.extract(supplied_url_domain).registered_domain)
 
     def lookup_wikidata(self, wikidata_code: str, include_dissolved: bool = False) -> dict | None:
         """
@@ -115,11 +445,9 @@ class NSI(metaclass=Singleton):
                 yield (k, v)
         else:
             label_to_find_fuzzy = self.normalise_label(label_to_find)
-            for k, v in self.wikidata_json.items():
-                if nsi_label := v.get("label"):
-                    nsi_label_fuzzy = self.normalise_label(nsi_label)
-                    if label_to_find_fuzzy in nsi_label_fuzzy:
-                        yield (k, v)
+            for k, nsi_label_fuzzy in self._get_normalised_labels():
+                if label_to_find_fuzzy in nsi_label_fuzzy:
+                    yield (k, self.wikidata_json[k])
 
     def iter_country(self, location_code: str | None = None) -> Iterable[dict]:
         """
@@ -128,12 +456,11 @@ class NSI(metaclass=Singleton):
         :return: iterator of matching NSI wikidata.json entries
         """
         self._ensure_loaded()
-        for v in self.nsi_json.values():
-            for item in v["items"]:
-                if not location_code:
-                    yield item
-                elif location_code.lower() in item["locationSet"].get("include"):
-                    yield item
+        if not location_code:
+            yield from self.nsi_items
+        else:
+            for i in self.nsi_items_by_location.get(location_code.lower(), []):
+                yield self.nsi_items[i]
 
     def iter_nsi(self, wikidata_code: str | None = None) -> Iterable[dict]:
         """
@@ -142,14 +469,11 @@ class NSI(metaclass=Singleton):
         :return: iterator of matching NSI nsi.json item entries
         """
         self._ensure_loaded()
-        for v in self.nsi_json.values():
-            for item in v["items"]:
-                if not wikidata_code:
-                    yield item
-                elif wikidata_code == item["tags"].get("brand:wikidata"):
-                    yield item
-                elif wikidata_code == item["tags"].get("operator:wikidata"):
-                    yield item
+        if not wikidata_code:
+            yield from self.nsi_items
+        else:
+            for i in self.nsi_items_by_wikidata.get(wikidata_code, []):
+                yield self.nsi_items[i]
 
     @staticmethod
     def normalise_label(original_label: str) -> str:
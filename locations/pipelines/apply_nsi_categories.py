@@ -1,3 +1,5 @@
+from typing import NamedTuple
+
 from scrapy.crawler import Crawler
 
 from locations.categories import get_category_tags
@@ -5,12 +7,18 @@ from locations.items import Feature
 from locations.name_suggestion_index import NSI
 
 
+class NSIMatch(NamedTuple):
+    stats: tuple[str, ...]
+    nsi_entry: dict | None = None
+
+
 class ApplyNSICategoriesPipeline:
     nsi = NSI()
     wikidata_cache = {}
 
     def __init__(self, crawler: Crawler):
         self.crawler = crawler
+        self.match_cache: dict[tuple, NSIMatch] = {}
 
     @classmethod
     def from_crawler(cls, crawler: Crawler):
@@ -36,7 +44,46 @@ class ApplyNSICategoriesPipeline:
             self.crawler.stats.inc_value("atp/nsi/brand_or_operator_missing")
             return item
 
-        if not get_category_tags(item) and item.get("brand_wikidata"):
+        # Nearly every item of a spider has the same Wikidata item,
+        # categories and country, so the outcome of matching is kept for
+        # each combination of what matching depends on.
+        try:
+            key = (
+                brand_operator_qcode,
+                bool(item.get("brand_wikidata")),
+                bool(item.get("operator_wikidata")),
+                frozenset(get_category_tags(item).items()),
+                item.get("country"),
+                item.get("state"),
+            )
+            match = self.match_cache.get(key)
+        except TypeError:
+            # Unhashable values are matched without the cache.
+            key = None
+            match = None
+        if match is None:
+            match = self.match(item)
+            if key is not None:
+                self.match_cache[key] = match
+
+        for stat in match.stats:
+            self.crawler.stats.inc_value(stat)
+        if match.nsi_entry is not None:
+            self.apply_nsi_tags(match.nsi_entry, item)
+        return item
+
+    def match(self, item: Feature) -> NSIMatch:
+        """
+        Find the NSI entry of an ATP Feature which has a brand_wikidata or
+        operator_wikidata.
+        :param item: ATP Feature to match.
+        :return: the NSI entry matched, if any, and the stats to increment.
+        """
+        stats = []
+        brand_operator_qcode = item.get("brand_wikidata", item.get("operator_wikidata"))
+        category_tags = get_category_tags(item)
+
+        if not category_tags and item.get("brand_wikidata"):
             # Not a fatal condition for NSI matching because many ATP spiders
             # do not specify top level category tags which could be used to
             # match with NSI. It is rare enough that an NSI entry is
@@ -56,8 +103,8 @@ class ApplyNSICategoriesPipeline:
             #   of "Costco" in the US with Wikidata item Q715583 being both
             #   shop/warehouse and amenity/car_wash. The only field different
             #   in NSI entries is the category.
-            self.crawler.stats.inc_value("atp/nsi/category_missing")
-        elif not get_category_tags(item):
+            stats.append("atp/nsi/category_missing")
+        elif not category_tags:
             # Failure to match due to missing top level category tags on the
             # ATP item, preventing matching with NSI operator entries. Most
             # ATP spiders matching against NSI operator entries already
@@ -71,15 +118,15 @@ class ApplyNSICategoriesPipeline:
             #   of knowing which of numerous NSI entries associated with the
             #   local government organisation is applicable if no category is
             #   specified.
-            self.crawler.stats.inc_value("atp/nsi/match_failed")
-            self.crawler.stats.inc_value("atp/nsi/category_missing")
-            return item
+            stats.append("atp/nsi/match_failed")
+            stats.append("atp/nsi/category_missing")
+            return NSIMatch(tuple(stats))
 
         if not item.has_valid_country_code():
             # Not a fatal condition for NSI matching because both the ATP and
             # NSI items may have global applicability (e.g. "001" for NSI).
             # However, it's still worth collecting statistics.
-            self.crawler.stats.inc_value("atp/nsi/country_missing")
+            stats.append("atp/nsi/country_missing")
 
         if brand_operator_qcode not in self.wikidata_cache:
             # wikidata_cache will usually only hold one thing, but can contain
@@ -94,17 +141,17 @@ class ApplyNSICategoriesPipeline:
             # for a brand, but NSI does not know of this Wikidata item.
             # It is suggested that a change be submitted to:
             # https://github.com/osmlab/name-suggestion-index
-            self.crawler.stats.inc_value("atp/nsi/match_failed")
-            self.crawler.stats.inc_value("atp/nsi/brand_unknown")
-            return item
+            stats.append("atp/nsi/match_failed")
+            stats.append("atp/nsi/brand_unknown")
+            return NSIMatch(tuple(stats))
         elif len(nsi_matches) == 0 and item.get("operator_wikidata"):
             # Failure to match due to the ATP item specifying a Wikidata item
             # for an operator, but NSI does not know of this Wikidata item.
             # It is suggested that a change be submitted to:
             # https://github.com/osmlab/name-suggestion-index
-            self.crawler.stats.inc_value("atp/nsi/match_failed")
-            self.crawler.stats.inc_value("atp/nsi/operator_unknown")
-            return item
+            stats.append("atp/nsi/match_failed")
+            stats.append("atp/nsi/operator_unknown")
+            return NSIMatch(tuple(stats))
 
         # Sometimes a brand and operator are the same across both NSI's
         # "brand" and "operator" namespaces. For example, "KFC" is listed in
@@ -118,8 +165,8 @@ class ApplyNSICategoriesPipeline:
         elif item.get("operator_wikidata"):
             nsi_matches = list(filter(lambda x: self.nsi_entry_is_operator(x), nsi_matches))
 
-        if get_category_tags(item):
-            nsi_matches = list(filter(lambda x: self.nsi_entry_has_all_tags(x, get_category_tags(item)), nsi_matches))
+        if category_tags:
+            nsi_matches = list(filter(lambda x: self.nsi_entry_has_all_tags(x, category_tags), nsi_matches))
 
             if len(nsi_matches) == 0:
                 # Failure to match due to NSI not knowing of the brand/operator
@@ -129,9 +176,9 @@ class ApplyNSICategoriesPipeline:
                 # match to NSI is not possible as NSI first needs updating to
                 # reflect the brand "Costco" opening pubs adjoining their
                 # warehouses.
-                self.crawler.stats.inc_value("atp/nsi/match_failed")
-                self.crawler.stats.inc_value("atp/nsi/category_unknown")
-                return item
+                stats.append("atp/nsi/match_failed")
+                stats.append("atp/nsi/category_unknown")
+                return NSIMatch(tuple(stats))
 
         location_code = item.get_iso_3166_2_code()
         if not location_code:
@@ -143,24 +190,22 @@ class ApplyNSICategoriesPipeline:
             # operating within the ATP items designated country and first
             # level subdivision. For example, "Chick-fil-A" is known in NSI
             # to operate in 3 countries, but Andorra ("AD") is not one them.
-            self.crawler.stats.inc_value("atp/nsi/match_failed")
-            self.crawler.stats.inc_value("atp/nsi/location_unknown")
-            return item
+            stats.append("atp/nsi/match_failed")
+            stats.append("atp/nsi/location_unknown")
+            return NSIMatch(tuple(stats))
 
-        if len(nsi_matches) == 1 and (not get_category_tags(item) or not location_code):
+        if len(nsi_matches) == 1 and (not category_tags or not location_code):
             # Imperfect match where one NSI entry is returned, but a category
             # match wasn't possible so there is a remaining risk that a
             # mismatch has occurred. Alternatively or additionally, a location
             # match wasn't possible.
-            self.crawler.stats.inc_value("atp/nsi/match_imperfect")
-            self.apply_nsi_tags(nsi_matches[0], item)
-            return item
+            stats.append("atp/nsi/match_imperfect")
+            return NSIMatch(tuple(stats), nsi_matches[0])
         elif len(nsi_matches) == 1:
             # Perfect match where only one NSI entry is returned matching the
             # ATP item.
-            self.crawler.stats.inc_value("atp/nsi/match_perfect")
-            self.apply_nsi_tags(nsi_matches[0], item)
-            return item
+            stats.append("atp/nsi/match_perfect")
+            return NSIMatch(tuple(stats), nsi_matches[0])
 
         # Reaching this point means that more than one NSI entry is matching
         # the ATP item. This may occur if NSI knows of "KFC" (of the same
@@ -170,9 +215,9 @@ class ApplyNSICategoriesPipeline:
         # country and first level subvision, both of the two KFC NSI entries
         # could be returned at this point. Matching fails here because it's
         # unknown which of the multiple NSI matches to apply.
-        self.crawler.stats.inc_value("atp/nsi/match_failed")
-        self.crawler.stats.inc_value("atp/nsi/multiple_matches")
-        return item
+        stats.append("atp/nsi/match_failed")
+        stats.append("atp/nsi/multiple_matches")
+        return NSIMatch(tuple(stats))
 
     @staticmethod
     def nsi_entry_is_brand(nsi_entry: dict) -> bool:
@@ -4,10 +4,10 @@ import unicodedata
 from re import Pattern
 from urllib.parse import urlparse
 
-from geonamescache import GeonamesCache
 from scrapy import Spider
 from scrapy.crawler import Crawler
 
+from locations.countries import COUNTRIES
 from locations.hours import OpeningHours
 from locations.items import Feature, set_lat_lon
 
@@ -39,7 +39,7 @@ def check_field(
 class CheckItemPropertiesPipeline:
     crawler: Crawler
 
-    countries = GeonamesCache().get_countries().keys()
+    countries = COUNTRIES
     email_regex = re.compile(r"(^[-\w_.+]+@[-\w]+\.[-\w.]+$)")
     twitter_regex = re.compile(r"^@?([-\w_]+)$")
     wikidata_regex = re.compile(
@@ -1,8 +1,8 @@
-import reverse_geocoder
 from scrapy.crawler import Crawler
 
 from locations.country_utils import CountryUtils
 from locations.items import Feature, get_lat_lon
+from locations.reverse_geocoding import ReverseGeocoder
 
 
 class CountryCodeCleanUpPipeline:
@@ -11,6 +11,7 @@ class CountryCodeCleanUpPipeline:
     def __init__(self, crawler: Crawler):
         self.crawler = crawler
         self.country_utils = CountryUtils()
+        self.reverse_geocoder = ReverseGeocoder.from_crawler(crawler)
 
     @classmethod
     def from_crawler(cls, crawler: Crawler):
@@ -44,7 +45,7 @@ class CountryCodeCleanUpPipeline:
         if not getattr(self.crawler.spider, "skip_auto_cc_geocoder", False):
             # Still no country set, try an offline reverse geocoder.
             if location := get_lat_lon(item):
-                if result := reverse_geocoder.get((location[0], location[1]), mode=1, verbose=False):
+                if result := self.reverse_geocoder.get(location[0], location[1]):
                     self.crawler.stats.inc_value(  # ty: ignore[unresolved-attribute]
                         "atp/field/country/from_reverse_geocoding"
                     )
@@ -1,4 +1,7 @@
+import hashlib
 import logging
+import sqlite3
+from array import array
 
 from scrapy.crawler import Crawler
 from scrapy.exceptions import DropItem
@@ -8,30 +11,177 @@ from locations.items import Feature
 logger = logging.getLogger(__name__)
 
 
+def hash_ref(ref: str, digest_size: int) -> bytes:
+    return hashlib.blake2b(str(ref).encode(), digest_size=digest_size).digest()
+
+
+class RefSet:
+    """
+    The refs seen, as a set of strings.
+    """
+
+    def __init__(self):
+        self.refs = set()
+
+    def add(self, ref: str) -> bool:
+        """
+        :return: whether the ref had not been seen before
+        """
+        if ref in self.refs:
+            return False
+        self.refs.add(ref)
+        return True
+
+    def close(self) -> None:
+        self.refs = set()
+
+
+class CompactRefSet:
+    """
+    The refs seen, as 64 or 128 bit hashes in an open addressing hash table
+    of arrays of 64 bit integers. At 128 bits, this takes 23 to 46 bytes per
+    ref, depending on how full the table is, rather than the 100 or more of a
+    set of strings, and at 64 bits, half as much.
+
+    At 128 bits, two refs sharing a hash is too unlikely to matter; at 64
+    bits, it becomes likely somewhere among spiders of hundreds of millions
+    of refs.
+    """
+
+    INITIAL_CAPACITY = 1024
+    MAX_LOAD = 0.7
+
+    def __init__(self, bits: int = 128):
+        if bits not in (64, 128):
+            raise ValueError("Hashes must be 64 or 128 bits")
+        self.digest_size = bits // 8
+        self.size = 0
+        self.capacity = self.INITIAL_CAPACITY
+        # The first 64 bits of each hash, with 0 marking an empty slot, and
+        # at 128 bits, the second 64 bits in the same slot of another array.
+        self.highs = array("Q", bytes(8 * self.capacity))
+        self.lows = array("Q", bytes(8 * self.capacity)) if bits == 128 else None
+
+    def insert(self, high: int, low: int) -> bool:
+        highs = self.highs
+        lows = self.lows
+        mask = self.capacity - 1
+        i = high & mask
+        while True:
+            h = highs[i]
+            if h == 0:
+                highs[i] = high
+                if lows is not None:
+                    lows[i] = low
+                self.size += 1
+                return True
+            if h == high and (lows is None or lows[i] == low):
+                return False
+            i = (i + 1) & mask
+
+    def grow(self) -> None:
+        highs = self.highs
+        lows = self.lows if self.lows is not None else array("Q", bytes(8 * self.capacity))
+        self.capacity *= 2
+        self.highs = array("Q", bytes(8 * self.capacity))
+        if self.lows is not None:
+            self.lows = array("Q", bytes(8 * self.capacity))
+        self.size = 0
+        for high, low in zip(highs, lows):
+            if high:
+                self.insert(high, low)
+
+    def add(self, ref: str) -> bool:
+        """
+        :return: whether the ref had not been seen before
+        """
+        digest = hash_ref(ref, self.digest_size)
+        high = int.from_bytes(digest[:8], "little") or 1
+        if not self.insert(high, int.from_bytes(digest[8:], "little")):
+            return False
+        if self.size > self.capacity * self.MAX_LOAD:
+            self.grow()
+        return True
+
+    def close(self) -> None:
+        self.highs = array("Q")
+        self.lows = None
+
+
+class DiskRefSet:
+    """
+    The refs seen, as 128 bit hashes in a temporary SQLite database, which
+    keeps its most recently used pages in memory and the rest on disk. For
+    spiders with more refs than fit in memory even as hashes.
+    """
+
+    def __init__(self):
+        # An empty path is a database in a temporary file, deleted when closed.
+        self.db = sqlite3.connect("")
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE refs (hash BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def add(self, ref: str) -> bool:
+        """
+        :return: whether the ref had not been seen before
+        """
+        return self.db.execute("INSERT OR IGNORE INTO refs VALUES (?)", (hash_ref(ref, 16),)).rowcount == 1
+
+    def close(self) -> None:
+        self.db.close()
+
+
 class DuplicatesPipeline:
+    """
+    Drop items with the ref of an earlier item. The refs seen are kept as
+    chosen by the `duplicates_store` attribute of the spider, or otherwise
+    the DUPLICATES_STORE setting:
+    - "set": a set of strings
+    - "compact": a CompactRefSet of 128 bit hashes, or with "compact64", of 64 bit hashes
+    - "disk": a DiskRefSet
+    """
+
     crawler: Crawler
 
     def __init__(self, crawler: Crawler):
-        self.ids_seen = set()
         self.crawler = crawler
+        self.ids_seen: RefSet | CompactRefSet | DiskRefSet | None = None
 
     @classmethod
     def from_crawler(cls, crawler: Crawler):
         return cls(crawler)
 
+    def open_spider(self) -> RefSet | CompactRefSet | DiskRefSet:
+        store = getattr(self.crawler.spider, "duplicates_store", None) or self.crawler.settings.get(
+            "DUPLICATES_STORE", "set"
+        )
+        if store == "set":
+            self.ids_seen = RefSet()
+        elif store == "compact":
+            self.ids_seen = CompactRefSet(128)
+        elif store == "compact64":
+            self.ids_seen = CompactRefSet(64)
+        elif store == "disk":
+            self.ids_seen = DiskRefSet()
+        else:
+            raise ValueError("Unknown duplicates store: {}".format(store))
+        return self.ids_seen
+
     def process_item(self, item: Feature) -> Feature:
         if getattr(self.crawler.spider, "no_refs", False):
             return item
 
-        ref = (self.crawler.spider.name, item["ref"])  # ty: ignore[unresolved-attribute]
-        if ref in self.ids_seen:
+        ids_seen = self.ids_seen if self.ids_seen is not None else self.open_spider()
+        if not ids_seen.add(item["ref"]):
             if self.crawler.stats:
                 self.crawler.stats.inc_value("atp/duplicate_count")
             raise DropItem("Duplicate item: {}".format(item["ref"]))
         else:
-            self.ids_seen.add(ref)
             return item
 
     def close_spider(self) -> None:
+        if self.ids_seen is not None:
+            self.ids_seen.close()
         if self.crawler.stats:
             logger.info("Dropped {} duplicate items".format(self.crawler.stats.get_value("atp/duplicate_count", 0)))
@@ -1,4 +1,5 @@
 import re
+from collections import OrderedDict
 
 import phonenumbers
 from phonenumbers import NumberParseException
@@ -6,12 +7,24 @@ from scrapy.crawler import Crawler
 
 from locations.items import Feature
 
+# Chains often give the same central number for every store, so the
+# normalised form of this many of the most recently seen numbers is kept.
+CACHE_SIZE = 4096
+
+SEPARATORS = re.compile(r"[;/]\s")
+TEL = re.compile(r"tel:", flags=re.IGNORECASE)
+UNDEFINED = re.compile(r"undefined", flags=re.IGNORECASE)
+NOT_APPLICABLE = re.compile(r"n/a", flags=re.IGNORECASE)
+NON_DIGITS = re.compile(r"[^\d]")
+
 
 class PhoneCleanUpPipeline:
     crawler: Crawler
 
     def __init__(self, crawler: Crawler):
         self.crawler = crawler
+        self.cache_size = crawler.settings.getint("PHONE_CACHE_SIZE", CACHE_SIZE)
+        self.cache: OrderedDict[tuple[str, str | None], tuple[str | None, bool]] = OrderedDict()
 
     @classmethod
     def from_crawler(cls, crawler: Crawler):
@@ -43,26 +56,45 @@ class PhoneCleanUpPipeline:
         )
 
     def normalize_numbers(self, phone, country, spider):
-        numbers = [self.normalize(p, country, spider) for p in re.split(r"[;/]\s", str(phone))]
-        phones = []
-        [phones.append(p) for p in filter(None, numbers) if p not in phones]
-        return ";".join(phones)
+        numbers = [self.normalize(p, country, spider) for p in SEPARATORS.split(str(phone))]
+        # Unique numbers, in order.
+        return ";".join(dict.fromkeys(filter(None, numbers)))
 
     def normalize(self, phone, country, spider):
-        phone = re.sub(r"tel:", "", phone, flags=re.IGNORECASE)
-        phone = re.sub(r"undefined", "", phone, flags=re.IGNORECASE)
-        phone = re.sub(r"n/a", "", phone, flags=re.IGNORECASE)
+        key = (phone, country)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            number, valid = self.cache[key]
+            self.crawler.stats.inc_value("atp/phone_cache/hit")
+        else:
+            number, valid = self.parse(phone, country)
+            self.cache[key] = number, valid
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            self.crawler.stats.inc_value("atp/phone_cache/miss")
+        if not valid:
+            spider.crawler.stats.inc_value("atp/field/phone/invalid")
+        return number
+
+    @staticmethod
+    def parse(phone: str, country: str | None) -> tuple[str | None, bool]:
+        """
+        :return: the number in international format, or as given if it isn't
+                 valid, or None if there's no number, and whether it is valid
+        """
+        phone = TEL.sub("", phone)
+        phone = UNDEFINED.sub("", phone)
+        phone = NOT_APPLICABLE.sub("", phone)
         phone = phone.strip()
         if not phone:
-            return None
-        numbers_only = re.sub(r"[^\d]", "", phone)
+            return None, True
+        numbers_only = NON_DIGITS.sub("", phone)
         if numbers_only == "" or int(numbers_only) == 0:
-            return None
+            return None, True
         try:
             ph = phonenumbers.parse(phone, country)
             if phonenumbers.is_valid_number(ph):
-                return phonenumbers.format_number(ph, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
+                return phonenumbers.format_number(ph, phonenumbers.PhoneNumberFormat.INTERNATIONAL), True
         except NumberParseException:
             pass
-        spider.crawler.stats.inc_value("atp/field/phone/invalid")
-        return phone
+        return phone, False
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from typing import Iterable
+from weakref import WeakKeyDictionary
+
+import reverse_geocoder
+from scrapy.crawler import Crawler
+
+# Coordinates are rounded to this many decimal places (about 10cm) for the
+# cache key, so that locations sharing a point share one lookup.
+COORDINATE_PRECISION = 6
+CACHE_SIZE = 4096
+
+
+class ReverseGeocoder:
+    """
+    An LRU cache in front of the offline reverse geocoder. Querying the
+    geocoder one point at a time costs an order of magnitude more per point
+    than querying a batch, so points can be looked up in advance with
+    `prefetch`, after which `get` answers from the cache.
+    """
+
+    def __init__(self, cache_size: int = CACHE_SIZE, precision: int = COORDINATE_PRECISION):
+        self.cache_size = cache_size
+        self.precision = precision
+        self.cache: OrderedDict[tuple[float, float], dict | None] = OrderedDict()
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> "ReverseGeocoder":
+        """
+        :return: the reverse geocoder of the crawler, shared by its pipelines and middlewares
+        """
+        if crawler not in _crawler_geocoders:
+            _crawler_geocoders[crawler] = cls()
+        return _crawler_geocoders[crawler]
+
+    def key(self, lat: float, lon: float) -> tuple[float, float]:
+        return round(lat, self.precision), round(lon, self.precision)
+
+    def store(self, key: tuple[float, float], result: dict | None) -> None:
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def get(self, lat: float, lon: float) -> dict | None:
+        """
+        :return: the nearest place to the coordinates, with its "cc" country code and "admin1" name
+        """
+        key = self.key(lat, lon)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        result = reverse_geocoder.get((float(lat), float(lon)), mode=1, verbose=False)
+        self.store(key, result)
+        return result
+
+    def prefetch(self, locations: Iterable[tuple[float, float]]) -> None:
+        """
+        Look up every location not already cached in a single query.
+        """
+        keys = {}
+        for lat, lon in locations:
+            key = self.key(lat, lon)
+            if key not in self.cache and key not in keys:
+                keys[key] = (float(lat), float(lon))
+        if not keys:
+            return
+        for key, result in zip(keys.keys(), reverse_geocoder.search(list(keys.values()), mode=1, verbose=False)):
+            self.store(key, result)
+
+
+_crawler_geocoders: WeakKeyDictionary[Crawler, ReverseGeocoder] = WeakKeyDictionary()
@@ -0,0 +1,372 @@
+import csv
+import gzip
+import json
+import logging
+import mmap
+import os
+import pickle
+import sys
+from collections.abc import Sequence
+from io import TextIOWrapper
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy
+import shapely
+
+from locations.searchable_points import get_searchable_points_path
+
+STORE_FILE_PATH = Path(get_searchable_points_path("points.store"))
+
+STORE_MAGIC = b"ATPPTS01"
+
+# The columns kept of each postcode file, as strings.
+POSTCODE_COLUMNS = {
+    "postcodes/outward_gb.json.gz": ["postcode", "town", "country_string", "latitude", "longitude"],
+    "postcodes/uszips.csv.gz": ["zip", "city", "state_id", "state_name", "county_name", "lat", "lng", "population"],
+    "postcodes/frzips.csv.gz": ["Code_postal", "lat", "lng"],
+}
+POSTCODE_COORDINATES = {
+    "postcodes/outward_gb.json.gz": ("latitude", "longitude"),
+    "postcodes/uszips.csv.gz": ("lat", "lng"),
+    "postcodes/frzips.csv.gz": ("lat", "lng"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+class StringColumn(Sequence):
+    """
+    Read-only sequence of strings, or None, stored in the points store,
+    located by an array of boundary offsets.
+    """
+
+    def __init__(self, buffer: memoryview, offsets: numpy.ndarray, nulls: numpy.ndarray):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._nulls = set(nulls.tolist())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if i in self._nulls:
+            return None
+        return str(self._buffer[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+class PointSet:
+    """
+    The points of a searchable points file, as arrays of latitudes and
+    longitudes, with the area (country, territory or state) of each point
+    as an index into a list of areas, and any other columns as strings.
+    The arrays of a PointSet loaded from the store are memory mapped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latitudes: numpy.ndarray,
+        longitudes: numpy.ndarray,
+        area_codes: numpy.ndarray | None = None,
+        areas: list[str] | None = None,
+        columns: dict[str, Sequence[str | None]] | None = None,
+    ):
+        self.name = name
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.area_codes = area_codes
+        self.areas = areas or []
+        self.columns = columns or {}
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    def has_areas(self) -> bool:
+        """
+        :return: whether every point has an area
+        """
+        return self.area_codes is not None and "" not in self.areas
+
+    def mask(
+        self,
+        areas: Iterable[str] | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        polygon: shapely.Geometry | None = None,
+    ) -> numpy.ndarray:
+        """
+        :param areas: areas to include points of
+        :param bbox: (min lon, min lat, max lon, max lat) bounds to include points within
+        :param polygon: geometry to include points within or on the boundary of
+        :return: a boolean array of the points to include
+        """
+        mask = numpy.ones(len(self), dtype=bool)
+        if areas is not None:
+            if self.area_codes is None or not self.has_areas():
+                raise Exception(
+                    "Searchable points file {} does not support area field filters (columns named 'country', 'territory' and 'state').".format(
+                        self.name
+                    )
+                )
+            areas = set(areas)
+            codes = [code for code, area in enumerate(self.areas) if area in areas]
+            mask &= numpy.isin(self.area_codes, codes)
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            mask &= (self.longitudes >= min_lon) & (self.longitudes <= max_lon)
+            mask &= (self.latitudes >= min_lat) & (self.latitudes <= max_lat)
+        if polygon is not None:
+            mask &= shapely.intersects_xy(polygon, self.longitudes, self.latitudes)
+        return mask
+
+    def points(self, mask: numpy.ndarray | None = None) -> list[tuple[float, float]]:
+        """
+        :return: (latitude, longitude) of each point, or of each point included by a mask
+        """
+        if mask is None:
+            return list(zip(self.latitudes.tolist(), self.longitudes.tolist()))
+        return list(zip(self.latitudes[mask].tolist(), self.longitudes[mask].tolist()))
+
+    def rows(self, mask: numpy.ndarray | None = None) -> Iterator[dict[str, str | None]]:
+        """
+        :return: the columns of each point, or of each point included by a mask, as strings
+        """
+        indexes = range(len(self)) if mask is None else numpy.flatnonzero(mask).tolist()
+        for i in indexes:
+            yield {name: column[i] for name, column in self.columns.items()}
+
+
+def to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def read_centroids(name: str) -> PointSet:
+    latitudes, longitudes, area_codes, areas = [], [], [], {}
+    with open(get_searchable_points_path(name)) as file:
+        for row in csv.DictReader(file):
+            try:
+                latitudes.append(float(row["latitude"]))
+                longitudes.append(float(row["longitude"]))
+            except ValueError:
+                raise Exception(
+                    "Invalid latitude/longitude in searchable points file {} where latitude = {} and longitude = {}.".format(
+                        name, row["latitude"], row["longitude"]
+                    )
+                )
+            area = next((row[key] for key in ("country", "territory", "state") if row.get(key)), "")
+            area_codes.append(areas.setdefault(area, len(areas)))
+    return PointSet(
+        name,
+        numpy.array(latitudes, dtype="<f8"),
+        numpy.array(longitudes, dtype="<f8"),
+        numpy.array(area_codes, dtype="<u4"),
+        list(areas),
+    )
+
+
+def read_postcodes(name: str) -> PointSet:
+    with gzip.open(get_searchable_points_path(name), mode="rb") as file:
+        if name.endswith(".json.gz"):
+            records = json.load(TextIOWrapper(file))
+        else:
+            records = list(csv.DictReader(TextIOWrapper(file)))
+    columns: dict[str, Sequence[str | None]] = {
+        column: [None if record.get(column) is None else str(record[column]) for record in records]
+        for column in POSTCODE_COLUMNS[name]
+    }
+    lat, lon = POSTCODE_COORDINATES[name]
+    return PointSet(
+        name,
+        numpy.array([to_float(value) for value in columns[lat]], dtype="<f8"),
+        numpy.array([to_float(value) for value in columns[lon]], dtype="<f8"),
+        columns=columns,
+    )
+
+
+def read_source(name: str) -> PointSet:
+    """
+    Parse a searchable points file.
+    :param name: path of the file within locations/searchable_points
+    """
+    if name in POSTCODE_COLUMNS:
+        return read_postcodes(name)
+    return read_centroids(name)
+
+
+def source_names() -> list[str]:
+    root = Path(get_searchable_points_path(""))
+    return sorted(str(path.relative_to(root)) for path in root.rglob("*.csv")) + list(POSTCODE_COLUMNS)
+
+
+def source_signature(name: str) -> tuple[int, int]:
+    stat = os.stat(get_searchable_points_path(name))
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_store(store_path: Path | None = None, names: Iterable[str] | None = None) -> None:
+    """
+    Write every searchable points file to a store which can be memory
+    mapped, so the files need not be parsed in every process.
+
+    As for the NSI snapshot, the store consists of STORE_MAGIC, the length
+    of a pickled header as an unsigned 64-bit little endian integer, the
+    header, and then a number of 8 byte aligned sections. The header maps
+    the name of each file to the size and modification time of the file, its
+    number of points, areas and columns, and the (offset, length) of each of
+    its sections relative to the end of the header.
+    :param store_path: path of the store file to write, STORE_FILE_PATH if not specified
+    :param names: searchable points files to store, all of them if not specified
+    """
+    store_path = store_path or STORE_FILE_PATH
+    data = bytearray()
+    point_sets = {}
+
+    def add_section(blob: bytes) -> tuple[int, int]:
+        data.extend(bytes(-len(data) % 8))
+        section = (len(data), len(blob))
+        data.extend(blob)
+        return section
+
+    for name in source_names() if names is None else names:
+        try:
+            point_set = read_source(name)
+        except Exception as e:
+            # Left to be parsed, and to raise, when used.
+            logger.warning("Not storing searchable points file %s: %s", name, e)
+            continue
+        sections = {
+            "latitudes": add_section(point_set.latitudes.tobytes()),
+            "longitudes": add_section(point_set.longitudes.tobytes()),
+        }
+        if point_set.area_codes is not None:
+            sections["area_codes"] = add_section(point_set.area_codes.tobytes())
+        for column_name, column in point_set.columns.items():
+            blobs = [b"" if value is None else value.encode() for value in column]
+            offsets = numpy.cumsum([0] + [len(blob) for blob in blobs], dtype="<u8")
+            nulls = numpy.array([i for i, value in enumerate(column) if value is None], dtype="<u4")
+            sections[f"{column_name}/offsets"] = add_section(offsets.tobytes())
+            sections[f"{column_name}/values"] = add_section(b"".join(blobs))
+            sections[f"{column_name}/nulls"] = add_section(nulls.tobytes())
+        point_sets[name] = {
+            "signature": source_signature(name),
+            "length": len(point_set),
+            "areas": point_set.areas if point_set.area_codes is not None else None,
+            "columns": list(point_set.columns),
+            "sections": sections,
+        }
+
+    header = pickle.dumps({"byteorder": sys.byteorder, "point_sets": point_sets})
+    header += bytes(-(len(STORE_MAGIC) + 8 + len(header)) % 8)
+
+    tmp_path = store_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(STORE_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(data)
+    os.replace(tmp_path, store_path)
+
+
+class PointsStore:
+    """
+    The searchable points files written by write_store, memory mapped.
+    """
+
+    def __init__(self, store_path: Path | None = None):
+        self.store_path = store_path or STORE_FILE_PATH
+        self.point_sets: dict[str, dict] = {}
+        self.buffer: memoryview | None = None
+        self.warned = False
+
+    def load(self) -> bool:
+        """
+        :return: True if the store was loaded, False if there is no usable store
+        """
+        if not self.store_path.exists():
+            return False
+        with open(self.store_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[: len(STORE_MAGIC)] != STORE_MAGIC:
+            logger.warning("Ignoring searchable points store %s with unknown format", self.store_path)
+            return False
+        header_length = int.from_bytes(buffer[len(STORE_MAGIC) : len(STORE_MAGIC) + 8], "little")
+        header_offset = len(STORE_MAGIC) + 8
+        header = pickle.loads(buffer[header_offset : header_offset + header_length])
+        if header["byteorder"] != sys.byteorder:
+            logger.warning(
+                "Ignoring searchable points store %s built on a machine of different byte order", self.store_path
+            )
+            return False
+        self.buffer = memoryview(buffer)[header_offset + header_length :]
+        self.point_sets = header["point_sets"]
+        return True
+
+    def section(self, point_set: dict, name: str) -> memoryview:
+        if self.buffer is None:
+            raise RuntimeError("Searchable points store {} is not loaded".format(self.store_path))
+        offset, length = point_set["sections"][name]
+        return self.buffer[offset : offset + length]
+
+    def get(self, name: str) -> PointSet | None:
+        """
+        :return: the points of the file, or None if the file isn't in the store or has changed since it was written
+        """
+        if (point_set := self.point_sets.get(name)) is None:
+            return None
+        if source_signature(name) != point_set["signature"]:
+            if not self.warned:
+                logger.warning(
+                    "Ignoring searchable points store entry %s which is out of date, run `scrapy build_searchable_points`",
+                    name,
+                )
+                self.warned = True
+            return None
+        columns = {}
+        for column_name in point_set["columns"]:
+            columns[column_name] = StringColumn(
+                self.section(point_set, f"{column_name}/values"),
+                numpy.frombuffer(self.section(point_set, f"{column_name}/offsets"), dtype="<u8"),
+                numpy.frombuffer(self.section(point_set, f"{column_name}/nulls"), dtype="<u4"),
+            )
+        return PointSet(
+            name,
+            numpy.frombuffer(self.section(point_set, "latitudes"), dtype="<f8"),
+            numpy.frombuffer(self.section(point_set, "longitudes"), dtype="<f8"),
+            (
+                numpy.frombuffer(self.section(point_set, "area_codes"), dtype="<u4")
+                if point_set["areas"] is not None
+                else None
+            ),
+            point_set["areas"],
+            columns,
+        )
+
+
+_store: PointsStore | None = None
+
+
+def load_point_set(name: str) -> PointSet:
+    """
+    Get the points of a searchable points file, from the store if it is up
+    to date, and otherwise by parsing the file.
+    :param name: path of the file within locations/searchable_points
+    :raises FileNotFoundError: if there is no such file
+    """
+    global _store
+    if _store is None:
+        _store = PointsStore()
+        if not _store.load():
+            _store.point_sets = {}
+    try:
+        if (point_set := _store.get(name)) is not None:
+            return point_set
+    except FileNotFoundError:
+        pass
+    return read_source(name)
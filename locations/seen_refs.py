@@ -0,0 +1,52 @@
+from typing import Any, Iterable, Iterator, TypeVar
+
+from scrapy.statscollectors import StatsCollector
+
+from locations.dict_parser import DictParser
+
+RecordT = TypeVar("RecordT", bound=dict)
+
+
+class SeenRefs:
+    """
+    Skip source records already seen, by their ref, before they are parsed.
+
+    Geographic radius searches return the same location from many
+    overlapping searches, and each copy would otherwise be parsed and go
+    through every pipeline before DuplicatesPipeline drops it. The ref of a
+    record is that which DictParser.parse would find, unless ref_keys are
+    given. Records without a ref are never skipped.
+
+    The number of records skipped is kept in the "atp/early_duplicate_count"
+    stat, alongside the "atp/duplicate_count" of DuplicatesPipeline.
+    """
+
+    def __init__(self, stats: StatsCollector | None = None, ref_keys: list[str] | None = None):
+        self.stats = stats
+        self.ref_keys = ref_keys or DictParser.ref_keys
+        self.refs: set[str] = set()
+
+    def get_ref(self, record: dict) -> Any:
+        return DictParser.get_first_key(record, self.ref_keys)
+
+    def is_new(self, record: dict) -> bool:
+        """
+        :return: whether the ref of the record had not been seen before, or the record has no ref
+        """
+        if (ref := self.get_ref(record)) is None or isinstance(ref, (dict, list)):
+            return True
+        ref = str(ref)
+        if ref in self.refs:
+            if self.stats:
+                self.stats.inc_value("atp/early_duplicate_count")
+            return False
+        self.refs.add(ref)
+        return True
+
+    def filter(self, records: Iterable[RecordT]) -> Iterator[RecordT]:
+        """
+        :return: the records whose ref had not been seen before, or which have no ref
+        """
+        for record in records:
+            if self.is_new(record):
+                yield record
@@ -17,6 +17,8 @@ BOT_NAME = "locations"
 
 SPIDER_MODULES = ["locations.spiders"]
 NEWSPIDER_MODULE = "locations.spiders"
+# Find spiders using a manifest rather than importing every spider module.
+SPIDER_LOADER_CLASS = "locations.spider_manifest.ManifestSpiderLoader"
 COMMANDS_MODULE = "locations.commands"
 
 
@@ -34,6 +36,7 @@ FEED_EXPORTERS = {
     "geojson": "locations.exporters.geojson.GeoJsonExporter",
     "parquet": "locations.exporters.geoparquet.GeoparquetExporter",
     "ndgeojson": "locations.exporters.ld_geojson.LineDelimitedGeoJsonExporter",
+    "parquet_shard": "locations.exporters.parquet_shard.ParquetShardExporter",
     "osm": "locations.exporters.osm.OSMExporter",
 }
 
@@ -67,6 +70,7 @@ TELNETCONSOLE_ENABLED = False
 # See http://scrapy.readthedocs.org/en/latest/topics/spider-middleware.html
 SPIDER_MIDDLEWARES = {
     "locations.middlewares.track_sources.TrackSourcesMiddleware": 500,
+    "locations.middlewares.reverse_geocode_batch.ReverseGeocodeBatchMiddleware": 600,
 }
 
 # Enable or disable downloader middlewares
@@ -85,6 +89,7 @@ if os.environ.get("ZYTE_API_KEY"):
     REQUEST_FINGERPRINTER_CLASS = "scrapy_zyte_api.ScrapyZyteAPIRequestFingerprinter"
 
 DOWNLOADER_MIDDLEWARES["locations.middlewares.cdnstats.CDNStatsMiddleware"] = 500
+DOWNLOADER_MIDDLEWARES["locations.middlewares.conditional_cache.ConditionalCacheMiddleware"] = 900
 
 # Enable or disable extensions
 # See http://scrapy.readthedocs.org/en/latest/topics/extensions.html
@@ -95,6 +100,7 @@ DOWNLOADER_MIDDLEWARES["locations.middlewares.cdnstats.CDNStatsMiddleware"] = 50
 EXTENSIONS = {
     "locations.extensions.add_lineage.AddLineageExtension": 100,
     "locations.extensions.filter_stats.FilterStatsExtension": 150,
+    "locations.extensions.adaptive_throttle.AdaptiveThrottleExtension": 200,
     "locations.extensions.log_stats.LogStatsExtension": 1000,
 }
 
@@ -126,6 +132,19 @@ ITEM_PIPELINES = {
     "locations.pipelines.tag_duplicator.TagDuplicatorPipeline": 900,
 }
 
+# How DuplicatesPipeline keeps the refs seen, "set", "compact", "compact64"
+# or "disk", unless the spider has a duplicates_store attribute. Only
+# "compact64" can take two refs sharing a 64 bit hash as duplicates, which
+# makes atp/duplicate_count inexact.
+DUPLICATES_STORE = "set"
+
+# Time each item pipeline with PIPELINE_TIMING_ENABLED, giving the stats
+# atp/perf/pipeline/<pipeline>/..., and trace the memory allocated by every
+# Nth call with PIPELINE_TIMING_TRACEMALLOC_SAMPLE_RATE.
+ITEM_PROCESSOR = "locations.extensions.pipeline_timing.TimedItemPipelineManager"
+PIPELINE_TIMING_ENABLED = bool(os.environ.get("PIPELINE_TIMING_ENABLED"))
+PIPELINE_TIMING_TRACEMALLOC_SAMPLE_RATE = 0
+
 LOG_FORMATTER = "locations.logformatter.DebugDuplicateLogFormatter"
 
 # Enable and configure the AutoThrottle extension (disabled by default)
@@ -149,6 +168,24 @@ LOG_FORMATTER = "locations.logformatter.DebugDuplicateLogFormatter"
 # HTTPCACHE_IGNORE_HTTP_CODES = []
 # HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
 
+# Make requests conditional on the ETag and Last-Modified of the same page in
+# earlier runs, with the cache directory kept between runs.
+CONDITIONAL_CACHE_ENABLED = bool(os.environ.get("CONDITIONAL_CACHE_DIR"))
+CONDITIONAL_CACHE_DIR = os.environ.get("CONDITIONAL_CACHE_DIR", "conditional_cache")
+CONDITIONAL_CACHE_STORAGE = "locations.middlewares.conditional_cache.SqliteCacheStorage"
+CONDITIONAL_CACHE_EXPIRATION_DAYS = 28
+
+# Tune the download delay and concurrency of each host from its responses,
+# starting from what was learned of the host in earlier runs, with the
+# profile directory kept between runs.
+ADAPTIVE_THROTTLE_ENABLED = bool(os.environ.get("ADAPTIVE_THROTTLE_DIR"))
+ADAPTIVE_THROTTLE_DIR = os.environ.get("ADAPTIVE_THROTTLE_DIR", "throttle_profiles")
+ADAPTIVE_THROTTLE_MIN_DELAY = 0.25
+ADAPTIVE_THROTTLE_MAX_DELAY = 60
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 4
+ADAPTIVE_THROTTLE_WINDOW = 50
+ADAPTIVE_THROTTLE_EXPIRATION_DAYS = 28
+
 DEFAULT_PLAYWRIGHT_SETTINGS = {
     "DOWNLOAD_HANDLERS": {
         "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
@@ -0,0 +1,255 @@
+import logging
+import re
+import zlib
+from typing import Any, Iterable, Iterator
+
+import lxml.etree
+from scrapy import Request
+from scrapy.http import Response, XmlResponse
+from scrapy.spiders import SitemapSpider as ScrapySitemapSpider
+from scrapy.spiders.sitemap import iterloc
+from scrapy.utils.gz import gzip_magic_number
+from scrapy.utils.sitemap import sitemap_urls_from_robots
+
+logger = logging.getLogger(__name__)
+
+# Sitemap bodies are decompressed and parsed this many bytes at a time.
+CHUNK_SIZE = 64 * 1024
+
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+INLINE_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x", re.ASCII: "a"}
+
+
+class RuleMatcher:
+    """
+    Match URLs against an ordered list of regular expressions, as given in
+    `sitemap_rules` and `sitemap_follow`. All the expressions are combined
+    into one, so a URL matching none of them, as most URLs of a large sitemap
+    don't, is rejected with a single search. When the combined expression
+    matches, only the expressions before the one which matched need to be
+    tried to find the first that does.
+
+    Expressions which can't be combined, such as those with backreferences,
+    are tried one at a time in order.
+    """
+
+    def __init__(self, patterns: Iterable[re.Pattern | str]):
+        self.patterns = [re.compile(pattern) if isinstance(pattern, str) else pattern for pattern in patterns]
+        self.combined = self.combine(self.patterns)
+
+    @staticmethod
+    def combine(patterns: list[re.Pattern]) -> re.Pattern | None:
+        if not patterns:
+            return None
+        alternatives = []
+        for i, pattern in enumerate(patterns):
+            if BACKREFERENCE.search(pattern.pattern) or pattern.flags & re.LOCALE:
+                return None
+            flags = "".join(letter for flag, letter in INLINE_FLAGS.items() if pattern.flags & flag)
+            source = pattern.pattern
+            if pattern.flags & re.VERBOSE:
+                # End any comment at the end of the expression.
+                source += "\n"
+            alternatives.append(f"(?P<_rule{i}>(?{flags}:{source}))")
+        try:
+            return re.compile("|".join(alternatives))
+        except re.error:
+            # For example, the same group name used in two expressions.
+            return None
+
+    def first(self, url: str) -> int | None:
+        """
+        :return: the index of the first expression which matches the URL, or None
+        """
+        if self.combined is None:
+            for i, pattern in enumerate(self.patterns):
+                if pattern.search(url):
+                    return i
+            return None
+        if (match := self.combined.search(url)) is None:
+            return None
+        matched = int(match.lastgroup.removeprefix("_rule"))
+        for i in range(matched):
+            if self.patterns[i].search(url):
+                return i
+        return matched
+
+    def matches(self, url: str) -> list[int]:
+        """
+        :return: the indexes of every expression which matches the URL
+        """
+        if self.combined is not None and self.combined.search(url) is None:
+            return []
+        return [i for i, pattern in enumerate(self.patterns) if pattern.search(url)]
+
+
+def get_tag_name(elem: lxml.etree._Element) -> str:
+    tag = elem.tag
+    if not isinstance(tag, str):
+        return ""
+    _, _, localname = tag.partition("}")
+    return localname or tag
+
+
+class StreamingSitemap:
+    """
+    Parse a sitemap or sitemap index from chunks of XML, reading only as many
+    chunks as needed for the next entry and discarding each entry once read,
+    so the whole document is never held in memory. Entries are the same as
+    those of scrapy.utils.sitemap.Sitemap.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.parser = lxml.etree.XMLPullParser(
+            events=("start", "end"),
+            recover=True,
+            remove_comments=True,
+            resolve_entities=False,
+            remove_blank_text=True,
+            collect_ids=False,
+            remove_pis=True,
+        )
+        self.events = self.iter_events()
+        self.type = ""
+        for _, root in self.events:
+            self.type = get_tag_name(root)
+            break
+
+    def iter_events(self) -> Iterator[tuple[str, lxml.etree._Element]]:
+        try:
+            for chunk in self.chunks:
+                self.parser.feed(chunk)
+                yield from self.parser.read_events()
+            self.parser.close()
+        except lxml.etree.XMLSyntaxError:
+            pass
+        yield from self.parser.read_events()
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for event, elem in self.events:
+            if event == "end" and get_tag_name(elem) in {"url", "sitemap"}:
+                if entry := self.read_entry(elem):
+                    yield entry
+
+    @staticmethod
+    def read_entry(elem: lxml.etree._Element) -> dict[str, Any] | None:
+        entry = {}
+        alternate = []
+        for el in elem:
+            if not (tag_name := get_tag_name(el)):
+                continue
+            if tag_name == "link":
+                if href := el.get("href"):
+                    alternate.append(href)
+            else:
+                entry[tag_name] = el.text.strip() if el.text else ""
+        elem.clear()
+        if (parent := elem.getparent()) is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+        if "loc" not in entry:
+            return None
+        if alternate:
+            entry["alternate"] = alternate
+        return entry
+
+
+def iter_chunks(body: bytes) -> Iterator[bytes]:
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield body[i : i + CHUNK_SIZE]
+
+
+class SitemapSpider(ScrapySitemapSpider):
+    """
+    A SitemapSpider which decompresses and parses sitemaps incrementally,
+    following sitemaps and making requests for pages as their entries are
+    read rather than after the whole sitemap has been parsed. URLs are
+    matched against `sitemap_rules` and `sitemap_follow` with a RuleMatcher.
+
+    Spiders which override `_get_sitemap_body` have the body it returns
+    parsed incrementally.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rule_matcher = RuleMatcher([rule for rule, _ in self._cbs])
+        self._follow_matcher = RuleMatcher(self._follow)
+
+    def _parse_sitemap(self, response: Response) -> Iterable[Request]:
+        if response.url.endswith("/robots.txt"):
+            for url in sitemap_urls_from_robots(response.text, base_url=response.url):
+                yield Request(url, callback=self._parse_sitemap)
+            return
+
+        chunks = self._iter_sitemap_body(response)
+        sitemap = StreamingSitemap(chunks) if chunks is not None else None
+        if sitemap is None or sitemap.type not in ("sitemapindex", "urlset"):
+            logger.warning("Ignoring invalid sitemap: %(response)s", {"response": response}, extra={"spider": self})
+            return
+
+        if sitemap.type == "sitemapindex":
+            for loc in iterloc(self.sitemap_filter(sitemap), self.sitemap_alternate_links):
+                if self._follow_matcher.first(loc) is not None:
+                    yield Request(loc, callback=self._parse_sitemap)
+        else:
+            for loc in iterloc(self.sitemap_filter(sitemap), self.sitemap_alternate_links):
+                if (rule := self._rule_matcher.first(loc)) is not None:
+                    yield Request(loc, callback=self._cbs[rule][1])
+
+    def _iter_sitemap_body(self, response: Response) -> Iterator[bytes] | None:
+        """
+        The incremental equivalent of `_get_sitemap_body`.
+        :return: chunks of the sitemap XML, or None if the response is not a sitemap
+        """
+        if type(self)._get_sitemap_body is not ScrapySitemapSpider._get_sitemap_body:
+            body = self._get_sitemap_body(response)
+            return iter_chunks(body) if body else None
+        if isinstance(response, XmlResponse):
+            return iter_chunks(response.body)
+        if gzip_magic_number(response):
+            return self._iter_gunzip(response)
+        # As in _get_sitemap_body, a .xml.gz response which isn't gzipped was
+        # decompressed by HttpCompressionMiddleware.
+        if response.url.endswith(".xml") or response.url.endswith(".xml.gz"):
+            return iter_chunks(response.body)
+        return None
+
+    def _iter_gunzip(self, response: Response) -> Iterator[bytes]:
+        max_size = response.meta.get("download_maxsize", self._max_size)
+        warn_size = response.meta.get("download_warnsize", self._warn_size)
+        compressed_size = len(response.body)
+        size = 0
+        data = response.body
+        # A gzip file may be several gzip members one after the other.
+        while data:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            while not decompressor.eof:
+                try:
+                    chunk = decompressor.decompress(data, CHUNK_SIZE)
+                except zlib.error:
+                    # Keep what could be decompressed of a corrupt body, as gunzip does.
+                    return
+                data = decompressor.unconsumed_tail
+                if not chunk and not data:
+                    # Truncated.
+                    chunk = decompressor.flush()
+                    if not chunk:
+                        return
+                if max_size and size + len(chunk) > max_size:
+                    logger.warning(
+                        "%(response)s body size after decompression is larger than the download maximum size "
+                        "(%(max_size)s B), ignoring the rest of the sitemap",
+                        {"response": response, "max_size": max_size},
+                        extra={"spider": self},
+                    )
+                    return
+                if compressed_size < warn_size <= size + len(chunk) and size < warn_size:
+                    logger.warning(
+                        f"{response} body size after decompression is larger than the download warning size "
+                        f"({warn_size} B)."
+                    )
+                size += len(chunk)
+                yield chunk
+            data = decompressor.unused_data
@@ -0,0 +1,256 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import traceback
+import warnings
+from pathlib import Path
+from typing import Iterator, Self
+
+from scrapy import Request, Spider
+from scrapy.settings import BaseSettings
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.spider import iter_spider_classes
+
+from locations.extensions.add_lineage import Lineage, spider_class_to_lineage
+from locations.settings import SPIDER_MODULES
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_PATH = Path(__file__).parent / "data" / "spider_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def iter_module_files(spider_modules: list[str]) -> Iterator[tuple[str, str]]:
+    """
+    Find the modules below the spider modules without importing them.
+    :param spider_modules: package names, as in the SPIDER_MODULES setting
+    :return: an iterator of (module name, file path)
+    """
+    for package in spider_modules:
+        spec = importlib.util.find_spec(package)
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for root in spec.submodule_search_locations:
+            for directory, dir_names, file_names in os.walk(root):
+                dir_names[:] = sorted(d for d in dir_names if os.path.isfile(os.path.join(directory, d, "__init__.py")))
+                prefix = ".".join([package, *Path(os.path.relpath(directory, root)).parts]).removesuffix(".")
+                for file_name in sorted(file_names):
+                    if not file_name.endswith(".py"):
+                        continue
+                    if file_name == "__init__.py":
+                        yield prefix, os.path.join(directory, file_name)
+                    else:
+                        yield f"{prefix}.{file_name[:-3]}", os.path.join(directory, file_name)
+
+
+def file_signature(path: str) -> list[int]:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def support_signature(spider_modules: list[str], module_files: dict[str, str]) -> str:
+    """
+    Spiders inherit from storefinders and other helpers in the same project,
+    which can change the attributes recorded in the manifest. Summarise every
+    other Python file in the top level packages of the spider modules.
+    """
+    spider_files = set(module_files.values())
+    sha1 = hashlib.sha1()
+    for top_level in sorted({package.split(".")[0] for package in spider_modules}):
+        spec = importlib.util.find_spec(top_level)
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for root in spec.submodule_search_locations:
+            for directory, dir_names, file_names in os.walk(root):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    path = os.path.join(directory, file_name)
+                    if file_name.endswith(".py") and path not in spider_files:
+                        sha1.update(f"{path}:{file_signature(path)}\n".encode())
+    return sha1.hexdigest()
+
+
+def describe_spider(spider_class: type[Spider], module_file: str) -> dict:
+    custom_settings = getattr(spider_class, "custom_settings", None) or {}
+    lineage = spider_class_to_lineage(spider_class)
+    return {
+        "name": spider_class.name,
+        "module": spider_class.__module__,
+        "class": spider_class.__name__,
+        "file": module_file,
+        "lineage": lineage.value,
+        "group": lineage.group,
+        "robots_txt_obey": custom_settings.get("ROBOTSTXT_OBEY", True),
+        "requires_proxy": getattr(spider_class, "requires_proxy", False),
+        "playwright": getattr(spider_class, "is_playwright_spider", False)
+        or any(base.__name__ == "PlaywrightSpider" for base in spider_class.__mro__),
+    }
+
+
+class SpiderManifest:
+    """
+    An index of every spider in the spider modules: its module, class, run
+    group and a few custom settings flags. Finding one spider otherwise means
+    importing all of the thousands of spider modules.
+
+    The manifest records the mtime and size of each spider module. When any
+    has changed only those modules are imported again; a change to any other
+    module of the project rebuilds the whole manifest.
+    """
+
+    def __init__(self, spider_modules: list[str], manifest_path: Path | None = None, warn_only: bool = False):
+        self.spider_modules = spider_modules
+        self.manifest_path = manifest_path or MANIFEST_FILE_PATH
+        self.warn_only = warn_only
+        self.modules: dict[str, dict] = {}
+        self.spiders: dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, spider_modules: list[str], manifest_path: Path | None = None, warn_only: bool = False) -> Self:
+        """
+        Load the manifest, first updating it if any spider module has changed.
+        """
+        manifest = cls(spider_modules, manifest_path, warn_only)
+        manifest.update()
+        return manifest
+
+    def read(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION or data.get("spider_modules") != self.spider_modules:
+            return {}
+        return data
+
+    def update(self) -> None:
+        data = self.read()
+        module_files = dict(iter_module_files(self.spider_modules))
+        support = support_signature(self.spider_modules, module_files)
+        previous = data.get("modules", {}) if data.get("support") == support else {}
+
+        changed = False
+        for module_name, module_file in module_files.items():
+            signature = file_signature(module_file)
+            if (entry := previous.get(module_name)) and entry["signature"] == signature:
+                self.modules[module_name] = entry
+                continue
+            if (spiders := self.import_spiders(module_name, module_file)) is not None:
+                self.modules[module_name] = {"signature": signature, "spiders": spiders}
+                changed = True
+        changed = changed or previous.keys() != self.modules.keys()
+
+        for entry in self.modules.values():
+            for spider in entry["spiders"]:
+                if spider["name"] in self.spiders:
+                    other = self.spiders[spider["name"]]
+                    warnings.warn(
+                        f"There are several spiders with the same name {spider['name']!r}: "
+                        f"{other['module']}.{other['class']} and {spider['module']}.{spider['class']}",
+                        stacklevel=2,
+                        category=UserWarning,
+                    )
+                self.spiders[spider["name"]] = spider
+
+        if changed:
+            self.write(support)
+
+    def import_spiders(self, module_name: str, module_file: str) -> list[dict] | None:
+        try:
+            module = importlib.import_module(module_name)
+        except (ImportError, SyntaxError):
+            if not self.warn_only:
+                raise
+            warnings.warn(
+                f"\n{traceback.format_exc()}Could not load spiders from module '{module_name}'. "
+                "See above traceback for details.",
+                stacklevel=2,
+                category=RuntimeWarning,
+            )
+            # Not recorded, so that it is tried again next time.
+            return None
+        return [describe_spider(spider_class, module_file) for spider_class in iter_spider_classes(module)]
+
+    def write(self, support: str) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "spider_modules": self.spider_modules,
+            "support": support,
+            "modules": self.modules,
+        }
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            # Several scrapy processes may update the manifest at once, each writes a whole file.
+            tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning("Could not write spider manifest %s: %s", self.manifest_path, e)
+
+    def get(self, spider_name: str) -> dict | None:
+        return self.spiders.get(spider_name)
+
+    def names(self) -> list[str]:
+        return list(self.spiders.keys())
+
+    def names_in_group(self, group: str) -> list[str]:
+        return [name for name, spider in self.spiders.items() if spider["group"] == group]
+
+    def lineage(self, spider_name: str) -> Lineage:
+        return Lineage(self.spiders[spider_name]["lineage"])
+
+    def load_spider_class(self, spider_name: str) -> type[Spider] | None:
+        """
+        Import only the module of the spider.
+        :return: the spider class, or None if the spider is not in the manifest
+        """
+        if not (spider := self.spiders.get(spider_name)):
+            return None
+        spider_class = getattr(importlib.import_module(spider["module"]), spider["class"], None)
+        if spider_class is None or getattr(spider_class, "name", None) != spider_name:
+            return None
+        return spider_class
+
+
+class ManifestSpiderLoader(SpiderLoader):
+    """
+    A spider loader that finds spiders using the spider manifest, importing
+    the module of a spider only when it is loaded.
+    """
+
+    def __init__(self, settings: BaseSettings):
+        self.spider_modules: list[str] = settings.getlist("SPIDER_MODULES")
+        self.warn_only: bool = settings.getbool("SPIDER_LOADER_WARN_ONLY")
+        self._spiders: dict[str, type[Spider]] = {}
+        self.manifest = get_manifest(self.spider_modules, warn_only=self.warn_only)
+
+    def load(self, spider_name: str) -> type[Spider]:
+        if spider_name not in self._spiders:
+            if (spider_class := self.manifest.load_spider_class(spider_name)) is None:
+                raise KeyError(f"Spider not found: {spider_name}")
+            self._spiders[spider_name] = spider_class
+        return self._spiders[spider_name]
+
+    def find_by_request(self, request: Request) -> list[str]:
+        return [name for name in self.list() if self.load(name).handles_request(request)]
+
+    def list(self) -> list[str]:
+        return self.manifest.names()
+
+
+_manifests: dict[tuple[str, ...], SpiderManifest] = {}
+
+
+def get_manifest(spider_modules: list[str] = SPIDER_MODULES, warn_only: bool = True) -> SpiderManifest:
+    """
+    :return: the spider manifest for the spider modules, loaded once per process
+    """
+    key = tuple(spider_modules)
+    if key not in _manifests:
+        _manifests[key] = SpiderManifest.load(list(spider_modules), warn_only=warn_only)
+    return _manifests[key]
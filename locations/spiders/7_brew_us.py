@@ -1,8 +1,7 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class SevenBrewUSSpider(SitemapSpider):
@@ -1,8 +1,7 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import extract_phone
 
 
@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.playwright_spider import PlaywrightSpider
 from locations.settings import DEFAULT_PLAYWRIGHT_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 from locations.user_agents import BROWSER_DEFAULT
 
@@ -1,10 +1,10 @@
 import re
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
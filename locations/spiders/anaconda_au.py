@@ -1,11 +1,11 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.hours import OpeningHours, sanitise_day
 from locations.items import Feature
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import extract_phone
 
 
@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.linked_data_parser import LinkedDataParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class ArnoldClarkSpider(SitemapSpider):
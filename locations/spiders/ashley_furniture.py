@@ -1,9 +1,10 @@
 import scrapy
 
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
-class AshleyFurnitureSpider(scrapy.spiders.SitemapSpider, StructuredDataSpider):
+class AshleyFurnitureSpider(SitemapSpider, StructuredDataSpider):
     name = "ashley_furniture"
     item_attributes = {"brand_wikidata": "Q4805437"}
     sitemap_urls = ["https://stores.ashleyfurniture.com/sitemap_index.xml"]
@@ -2,13 +2,13 @@ import re
 from typing import Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.google_url import extract_google_position
 from locations.hours import OpeningHours
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 class AutobarnAUSpider(SitemapSpider):
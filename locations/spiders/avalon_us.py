@@ -1,10 +1,9 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 AVALON_BRANDS = {
     "AVA": "Q134707069",
@@ -2,9 +2,10 @@ import scrapy
 
 from locations.google_url import extract_google_position
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
-class AverittSpider(scrapy.spiders.SitemapSpider):
+class AverittSpider(SitemapSpider):
     name = "averitt"
     item_attributes = {"brand": "Averitt Express", "brand_wikidata": "Q4828320"}
     allowed_domains = ["averitt.com"]
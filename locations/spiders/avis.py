@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.hours import OpeningHours
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
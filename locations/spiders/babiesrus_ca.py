@@ -1,10 +1,10 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 class BabiesrusCASpider(SitemapSpider):
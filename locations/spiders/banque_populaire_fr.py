@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -2,10 +2,10 @@ import re
 from typing import Any, Iterable
 
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.costcutter_gb import CostcutterGBSpider
 from locations.spiders.james_retail_gb import JamesRetailGBSpider
 from locations.spiders.the_food_warehouse_gb import TheFoodWarehouseGBSpider
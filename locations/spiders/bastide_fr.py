@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.linked_data_parser import LinkedDataParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class BastideFRSpider(SitemapSpider):
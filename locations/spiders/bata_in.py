@@ -1,11 +1,11 @@
 from typing import Iterable
 
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.hours import DELIMITERS_EN, OpeningHours, day_range, sanitise_day
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
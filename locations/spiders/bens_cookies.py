@@ -1,11 +1,11 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.hours import OpeningHours, sanitise_day
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class BensCookiesSpider(SitemapSpider):
@@ -5,10 +5,11 @@ import scrapy
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import BROWSER_DEFAULT
 
 
-class BestWesternSpider(scrapy.spiders.SitemapSpider):
+class BestWesternSpider(SitemapSpider):
     name = "best_western"
 
     # Brand mapping is found in HTML of
@@ -2,9 +2,9 @@ import json
 from typing import Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -3,11 +3,11 @@ from html import unescape
 from typing import Iterable
 
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.hours import DAYS_FULL, OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 DAY_MAP = {day.upper(): DAYS_FULL[i] for i, day in enumerate(DAYS_FULL)}
@@ -2,7 +2,6 @@ from json import loads
 from typing import Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.brand_utils import extract_located_in
 from locations.categories import Categories, apply_category, apply_yes_no
@@ -10,6 +9,7 @@ from locations.google_url import extract_google_position
 from locations.hours import DAYS_FULL, OpeningHours
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.coles_au import ColesAUSpider
 
 
@@ -2,9 +2,9 @@ import json
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.linked_data_parser import LinkedDataParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class BjRestaurantUSSpider(SitemapSpider):
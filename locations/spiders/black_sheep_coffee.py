@@ -2,11 +2,11 @@ import re
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.hours import OpeningHours
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 class BlackSheepCoffeeSpider(SitemapSpider):
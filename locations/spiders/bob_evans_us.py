@@ -1,9 +1,8 @@
 from datetime import datetime
 
-from scrapy.spiders import SitemapSpider
-
 from locations.dict_parser import DictParser
 from locations.hours import DAYS, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class BobEvansUSSpider(SitemapSpider):
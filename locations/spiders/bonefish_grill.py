@@ -2,9 +2,10 @@ import scrapy
 
 from locations.linked_data_parser import LinkedDataParser
 from locations.microdata_parser import MicrodataParser
+from locations.sitemap_spider import SitemapSpider
 
 
-class BonefishGrillSpider(scrapy.spiders.SitemapSpider):
+class BonefishGrillSpider(SitemapSpider):
     name = "bonefish_grill"
     item_attributes = {
         "brand": "Bonefish Grill",
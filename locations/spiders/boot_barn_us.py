@@ -1,10 +1,10 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class BootBarnUSSpider(SitemapSpider):
@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class BrewdogSpider(SitemapSpider):
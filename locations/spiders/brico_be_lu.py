@@ -3,11 +3,11 @@ import re
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_FR, OpeningHours, sanitise_day
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 class BricoBELUSpider(SitemapSpider):
@@ -1,8 +1,7 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.hours import DAYS_WEEKDAY, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -1,8 +1,7 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.hours import OpeningHours
 from locations.open_graph_spider import OpenGraphSpider
+from locations.sitemap_spider import SitemapSpider
 
 
 class BudgensGBSpider(SitemapSpider, OpenGraphSpider):
@@ -1,8 +1,8 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.burger_king import BURGER_KING_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
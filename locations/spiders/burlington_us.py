@@ -5,9 +5,9 @@ from scrapy.http import JsonRequest, Response
 from scrapy.spiders import Spider
 
 from locations.categories import Categories, apply_category
+from locations.countries import US_TERRITORIES
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_FULL, OpeningHours
-from locations.pipelines.state_clean_up import US_TERRITORIES
 
 
 class BurlingtonUSSpider(Spider):
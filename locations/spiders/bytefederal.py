@@ -2,11 +2,11 @@ from typing import Any
 
 from chompjs import parse_js_object
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.hours import DAYS, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class BytefederalSpider(SitemapSpider):
@@ -1,8 +1,8 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -1,9 +1,8 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
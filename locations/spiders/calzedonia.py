@@ -1,8 +1,7 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
 from locations.hours import DAYS_IT, OpeningHours, sanitise_day
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
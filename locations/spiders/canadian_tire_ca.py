@@ -1,11 +1,10 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import BROWSER_DEFAULT
 
 
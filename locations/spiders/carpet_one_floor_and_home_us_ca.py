@@ -2,11 +2,11 @@ from typing import Any
 
 from chompjs import parse_js_object
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
 from locations.items import SocialMedia, set_social_media
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 
 
 class CarpetOneFloorAndHomeUSCASpider(SitemapSpider):
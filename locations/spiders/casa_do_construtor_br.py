@@ -1,11 +1,11 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.google_url import url_to_coords
 from locations.items import Feature, SocialMedia, set_social_media
+from locations.sitemap_spider import SitemapSpider
 
 
 class CasaDoConstrutorBRSpider(SitemapSpider):
@@ -1,11 +1,10 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.google_url import url_to_coords
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 class CbaCZSpider(SitemapSpider):
@@ -1,9 +1,8 @@
 from copy import deepcopy
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -1,12 +1,12 @@
 from typing import Any, Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Extras, apply_yes_no
 from locations.google_url import extract_google_position
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.outdoor_supply_hardware_us import decode_email
 
 
@@ -1,10 +1,9 @@
 import json
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import CHROME_LATEST
 
 
@@ -1,10 +1,10 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.google_url import extract_google_position
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.choices_flooring_au import ChoicesFlooringAUSpider
 
 
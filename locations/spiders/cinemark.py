@@ -1,9 +1,9 @@
 from urllib.parse import parse_qs, urlparse
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature, set_closed
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -2,11 +2,11 @@ import json
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 BRANDS = {
     "coccimarket": {"brand": "CocciMarket", "brand_wikidata": "Q90020480"},
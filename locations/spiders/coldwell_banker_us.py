@@ -1,8 +1,7 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class ColdwellBankerUSSpider(SitemapSpider):
@@ -1,11 +1,11 @@
 from typing import Any, Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.hours import DAYS_ES, OpeningHours, sanitise_day
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 CHARTER = {"brand": "Charter", "brand_wikidata": "Q95916752"}
@@ -3,12 +3,12 @@ from typing import Iterable
 
 from chompjs import parse_js_object
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.hours import DAYS_FROM_SUNDAY, OpeningHours
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 class CookGBGGSpider(SitemapSpider):
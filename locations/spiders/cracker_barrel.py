@@ -1,10 +1,9 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.hours import DAYS_FULL, OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class CrackerBarrelSpider(SitemapSpider):
@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.hours import DAYS_IT, sanitise_day
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
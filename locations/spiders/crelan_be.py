@@ -1,9 +1,8 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.google_url import extract_google_position
 from locations.hours import DAYS_NL, OpeningHours, sanitise_day
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class CrelanBESpider(SitemapSpider):
@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.settings import DEFAULT_PLAYWRIGHT_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
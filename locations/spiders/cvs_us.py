@@ -1,9 +1,8 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.hours import OpeningHours
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.schnucks_us import SchnucksUSSpider
 from locations.spiders.target_us import TargetUSSpider
 from locations.spiders.tesco_gb import set_located_in
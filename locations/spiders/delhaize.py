@@ -1,8 +1,8 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature, SocialMedia, set_social_media
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 AD_DELHAIZE = {"name": "AD Delhaize", "brand": "AD Delhaize", "brand_wikidata": "Q1184173"}
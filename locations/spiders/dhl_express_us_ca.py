@@ -1,8 +1,7 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.dhl_express_de import DHL_EXPRESS_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
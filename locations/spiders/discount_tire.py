@@ -1,10 +1,10 @@
 import json
 
 from scrapy import Request
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_EN, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import BROWSER_DEFAULT
 
 
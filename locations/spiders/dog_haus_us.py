@@ -1,7 +1,7 @@
 import chompjs
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Extras, apply_yes_no
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -2,10 +2,10 @@ import re
 from typing import Any, Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import BROWSER_DEFAULT
 
 
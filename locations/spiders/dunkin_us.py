@@ -1,7 +1,7 @@
 from chompjs import parse_js_object
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Extras, apply_yes_no
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.dunkin_at import DUNKIN_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
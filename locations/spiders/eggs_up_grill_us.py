@@ -1,7 +1,7 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature, SocialMedia, set_social_media
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
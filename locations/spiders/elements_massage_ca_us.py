@@ -3,10 +3,10 @@ from typing import AsyncIterator
 
 from scrapy.http import Request
 
+from locations.countries import STATES
 from locations.hours import OpeningHours
 from locations.json_blob_spider import JSONBlobSpider
 from locations.pipelines.address_clean_up import merge_address_lines
-from locations.pipelines.state_clean_up import STATES
 
 
 class ElementsMassageCAUSSpider(JSONBlobSpider):
@@ -3,10 +3,10 @@ from typing import Any, AsyncIterator, Iterable
 
 from scrapy import Request
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
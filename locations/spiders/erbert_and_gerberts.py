@@ -1,9 +1,9 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import BROWSER_DEFAULT
 
 
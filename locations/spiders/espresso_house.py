@@ -1,9 +1,9 @@
 from chompjs import parse_js_object
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class EspressoHouseSpider(SitemapSpider):
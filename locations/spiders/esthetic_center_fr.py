@@ -2,11 +2,11 @@ import re
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.hours import CLOSED_FR, DAYS_FR, DELIMITERS_FR, OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class EstheticCenterFRSpider(SitemapSpider):
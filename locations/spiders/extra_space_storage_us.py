@@ -1,10 +1,10 @@
 from typing import Any, Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
 from locations.linked_data_parser import LinkedDataParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class ExtraSpaceStorageUSSpider(SitemapSpider):
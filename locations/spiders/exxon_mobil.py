@@ -1,10 +1,10 @@
 from scrapy.http import JsonRequest
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, Extras, Fuel, FuelCards, PaymentMethods, apply_category, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.hours import DAYS, OpeningHours
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import BROWSER_DEFAULT
 
 # We can get the first 250 from the API, but can't find a way to get the next 250 :(
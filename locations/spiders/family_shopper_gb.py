@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories
 from locations.open_graph_spider import OpenGraphSpider
+from locations.sitemap_spider import SitemapSpider
 
 
 class FamilyShopperGBSpider(SitemapSpider, OpenGraphSpider):
@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.open_graph_spider import OpenGraphSpider
+from locations.sitemap_spider import SitemapSpider
 
 
 class FantasticSamsCAUSSpider(SitemapSpider, OpenGraphSpider):
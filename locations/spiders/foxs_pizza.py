@@ -1,9 +1,8 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class FoxsPizzaSpider(SitemapSpider):
@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.open_graph_spider import OpenGraphSpider
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import extract_phone
 
 
@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 FRANPRIX = {"brand": "Franprix", "brand_wikidata": "Q2420096"}
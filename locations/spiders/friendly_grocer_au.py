@@ -2,10 +2,10 @@ from typing import Iterable
 
 from chompjs import parse_js_object
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class FriendlyGrocerAUSpider(SitemapSpider):
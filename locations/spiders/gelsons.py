@@ -4,9 +4,10 @@ import scrapy
 
 from locations.dict_parser import DictParser
 from locations.hours import DAYS, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
-class GelsonsSpider(scrapy.spiders.SitemapSpider):
+class GelsonsSpider(SitemapSpider):
     name = "gelsons"
     item_attributes = {
         "brand": "Gelson's",
@@ -1,7 +1,6 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -2,10 +2,9 @@ import json
 import re
 from urllib.parse import urljoin
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class GreyhoundSpider(SitemapSpider):
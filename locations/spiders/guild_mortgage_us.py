@@ -1,6 +1,6 @@
 import chompjs
-from scrapy.spiders import SitemapSpider
 
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
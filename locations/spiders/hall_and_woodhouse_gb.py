@@ -1,9 +1,9 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class HallAndWoodhouseGBSpider(SitemapSpider):
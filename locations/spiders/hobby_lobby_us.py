@@ -2,7 +2,6 @@ from typing import Iterable
 
 from chompjs import chompjs
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
@@ -10,6 +9,7 @@ from locations.hours import OpeningHours
 from locations.items import Feature
 from locations.json_blob_spider import JSONBlobSpider
 from locations.react_server_components import parse_rsc
+from locations.sitemap_spider import SitemapSpider
 
 
 class HobbyLobbyUSSpider(SitemapSpider, JSONBlobSpider):
@@ -1,10 +1,10 @@
 from scrapy import Selector
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.google_url import extract_google_position
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import extract_email, extract_phone
 
 
@@ -1,5 +1,4 @@
-from scrapy.spiders import SitemapSpider
-
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 from locations.user_agents import BROWSER_DEFAULT
 
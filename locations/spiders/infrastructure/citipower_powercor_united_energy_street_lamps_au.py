@@ -5,7 +5,7 @@ from scrapy import Spider
 from scrapy.http import JsonRequest, Response
 
 from locations.categories import Categories, apply_category
-from locations.geo import bbox_split
+from locations.geo import QuadtreeCell, QuadtreeSearch, bbox_split
 from locations.items import Feature
 from locations.user_agents import BROWSER_DEFAULT
 
@@ -21,17 +21,20 @@ class CitipowerPowercorUnitedEnergyStreetLampsAUSpider(Spider):
     # each API request.
     _tid_counter: int = 0  # Transaction ID counter the API uses.
 
-    @staticmethod
-    def get_victoria_bboxes() -> list[tuple[tuple[float, float], tuple[float, float]]]:
+    def get_victoria_search(self) -> QuadtreeSearch:
         lat_n = -33.97  # Murray River SA/VIC border
         lon_e = 146.29  # Wangaratta (nothing East of this city)
         lat_s = -38.86  # Cape Otway (nothing South of this point)
         lon_w = 140.96  # Murray River SA/VIC border
-        return bbox_split(((lat_n, lon_w), (lat_s, lon_e)), lat_parts=8, lon_parts=8, precision=4)
+        return QuadtreeSearch(
+            (lon_w, lat_s, lon_e, lat_n), result_limit=1000, num_tiles=8, max_depth=7, stats=self.crawler.stats
+        )
 
-    def make_bbox_search_request(
-        self, bbox: tuple[tuple[float, float], tuple[float, float]], level: int = 1
-    ) -> JsonRequest:
+    def make_bbox_search_request(self, cell: QuadtreeCell) -> JsonRequest:
+        # Slightly buffered, in case the API rounds coordinates or excludes
+        # lamps exactly on the edge of a bounding box.
+        xmin, ymin, xmax, ymax = cell.bounds
+        bbox = bbox_split(((ymax, xmin), (ymin, xmax)), lat_parts=1, lon_parts=1, precision=4)[0]
         lon_se = bbox[1][1]
         lat_se = bbox[1][0]
         lon_nw = bbox[0][1]
@@ -62,7 +65,7 @@ class CitipowerPowercorUnitedEnergyStreetLampsAUSpider(Spider):
             url="https://publiclighting.portal.powercor.com.au/apexremote",
             data=data,
             headers=headers,
-            meta={"bbox": bbox, "level": level},
+            meta={"bbox": bbox, "cell": cell},
             method="POST",
             callback=self.parse_street_lamps,
         )
@@ -72,8 +75,9 @@ class CitipowerPowercorUnitedEnergyStreetLampsAUSpider(Spider):
         request_attribs_js = "{" + js_object.split('{"name":"findLamps",', 1)[1].split("}", 1)[0] + "}"
         self._request_attribs = parse_js_object(request_attribs_js)
         self._request_attribs["vid"] = js_object.split('"vid":"', 1)[1].split('"', 1)[0]
-        for bbox in self.get_victoria_bboxes():
-            yield self.make_bbox_search_request(bbox)
+        self.search = self.get_victoria_search()
+        for cell in self.search.cells():
+            yield self.make_bbox_search_request(cell)
 
     def parse_street_lamps(self, response: Response) -> Iterable[Feature | JsonRequest]:
         bbox_string = "NW:[{},{}] SE:[{},{}]".format(
@@ -88,39 +92,24 @@ class CitipowerPowercorUnitedEnergyStreetLampsAUSpider(Spider):
                     bbox_string
                 )
             )
+        cell = response.meta["cell"]
         if "result" not in response.json()[0].keys():
             # No street lamps exist in the requested bounding box.
             self.crawler.stats.inc_value("atp/geo_search/misses")
+            self.search.record(cell, 0)
             return
-        level = response.meta["level"]
-        if level == 4:
-            self.crawler.stats.max_value(
-                "atp/geo_search/max_features_returned/level4", len(response.json()[0]["result"]["items"])
-            )
-        if len(response.json()[0]["result"]["items"]) == 1000:
-            self.crawler.stats.inc_value("atp/geo_search/misses")
-            self.crawler.stats.inc_value(f"atp/geo_search/misses/level{level}")
-            if level == 1:
-                lat_lon_parts = 6
-            elif level == 2:
-                lat_lon_parts = 4
-            elif level == 3:
-                lat_lon_parts = 4
-            else:
-                raise RuntimeError(
-                    "More than 4 levels of subdivision of bounding boxes were unexpectedly encountered. Crawling stopped to avoid an endless recursive loop."
-                )
-            for bbox in bbox_split(
-                response.meta["bbox"], lat_parts=lat_lon_parts, lon_parts=lat_lon_parts, precision=4
-            ):
-                yield self.make_bbox_search_request(bbox, level=level + 1)
-            return
-        self.crawler.stats.inc_value("atp/geo_search/hits")
-        self.crawler.stats.inc_value(f"atp/geo_search/hits/level{level}")
         if isinstance(response.json()[0]["result"]["items"], dict):
             street_lamps = [response.json()[0]["result"]["items"]]
         else:
             street_lamps = response.json()[0]["result"]["items"]
+        if subcells := self.search.record(cell, len(street_lamps)):
+            self.crawler.stats.inc_value("atp/geo_search/misses")
+            self.crawler.stats.inc_value(f"atp/geo_search/misses/level{cell.depth}")
+            for subcell in subcells:
+                yield self.make_bbox_search_request(subcell)
+            return
+        self.crawler.stats.inc_value("atp/geo_search/hits")
+        self.crawler.stats.inc_value(f"atp/geo_search/hits/level{cell.depth}")
         for street_lamp in street_lamps:
             if street_lamp.get("company") not in ["CP", "PCOR", "UE"]:
                 continue
@@ -3,13 +3,13 @@ from typing import Any, AsyncIterator
 import chompjs
 from scrapy import Request
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Access, Categories, Extras, Fuel, apply_category, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.hours import DAYS, OpeningHours
 from locations.items import Feature
 from locations.react_server_components import parse_rsc
+from locations.sitemap_spider import SitemapSpider
 
 
 class IntermarcheSpider(SitemapSpider):
@@ -2,9 +2,9 @@ from typing import Any
 
 from scrapy.http import Response
 from scrapy.linkextractors import LinkExtractor
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
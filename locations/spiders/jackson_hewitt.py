@@ -2,9 +2,10 @@ import scrapy
 
 from locations.linked_data_parser import LinkedDataParser
 from locations.microdata_parser import MicrodataParser
+from locations.sitemap_spider import SitemapSpider
 
 
-class JacksonHewittSpider(scrapy.spiders.SitemapSpider):
+class JacksonHewittSpider(SitemapSpider):
     name = "jackson_hewitt"
     item_attributes = {"brand": "Jackson Hewitt", "brand_wikidata": "Q6117132"}
     allowed_domains = ["jacksonhewitt.com"]
@@ -4,9 +4,9 @@ from urllib.parse import quote
 from scrapy import Request, Spider
 
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
+from locations.countries import STATES
 from locations.dict_parser import DictParser
 from locations.geo import country_iseadgg_centroids
-from locations.pipelines.state_clean_up import STATES
 
 # Set of language and country as required for the "requestMarketLocale"
 # parameter, then the actual ISO country code(s) required for
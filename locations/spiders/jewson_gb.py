@@ -2,10 +2,11 @@ import scrapy
 from scrapy.http import Response
 
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
-class JewsonGBSpider(scrapy.spiders.SitemapSpider, StructuredDataSpider):
+class JewsonGBSpider(SitemapSpider, StructuredDataSpider):
     name = "jewson_gb"
     item_attributes = {"brand": "Jewson", "brand_wikidata": "Q6190226", "country": "GB"}
     sitemap_urls = ["https://www.jewson.co.uk/sitemap/sitemap_branches_jewson.xml"]
@@ -1,8 +1,7 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class JptcaSpider(SitemapSpider):
@@ -1,8 +1,7 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
 from locations.hours import DAYS_DE, OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class KampsDESpider(SitemapSpider):
@@ -2,11 +2,11 @@ from typing import Iterable
 
 from scrapy import Selector
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.kfc_us import KFC_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
@@ -1,9 +1,8 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_FULL, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.kfc_us import KFC_SHARED_ATTRIBUTES
 
 
@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.items import set_closed
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 KFC_SHARED_ATTRIBUTES = {"brand": "KFC", "brand_wikidata": "Q524757", "extras": Categories.FAST_FOOD.value}
@@ -1,8 +1,8 @@
 import chompjs
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class KopAndKandeSpider(SitemapSpider):
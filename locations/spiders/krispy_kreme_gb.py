@@ -1,5 +1,4 @@
-from scrapy.spiders import SitemapSpider
-
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.krispy_kreme_us import KrispyKremeUSSpider
 from locations.structured_data_spider import StructuredDataSpider
 
@@ -4,7 +4,6 @@ from typing import Iterable
 from urllib.parse import urljoin, urlparse
 
 from scrapy import Request
-from scrapy.spiders import SitemapSpider
 from scrapy.spiders.sitemap import iterloc
 from scrapy.utils.sitemap import Sitemap
 
@@ -12,6 +11,7 @@ from locations.categories import Categories, apply_category
 from locations.hours import OpeningHours
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import FIREFOX_LATEST
 
 BRANDS = {
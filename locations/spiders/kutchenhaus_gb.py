@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class KutchenhausGBSpider(SitemapSpider):
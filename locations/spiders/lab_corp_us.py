@@ -1,9 +1,9 @@
 import json
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.linked_data_parser import LinkedDataParser
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.tesco_gb import set_located_in
 from locations.spiders.walgreens import WalgreensSpider
 
@@ -1,11 +1,11 @@
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.google_url import extract_google_position
 from locations.hours import DAYS_DE, OpeningHours, sanitise_day
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class LagerhausATSpider(SitemapSpider):
@@ -1,8 +1,7 @@
 import html
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.items import SocialMedia, get_social_media, set_social_media
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
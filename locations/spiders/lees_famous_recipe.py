@@ -1,11 +1,10 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Extras, apply_yes_no
 from locations.google_url import extract_google_position
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class LeesFamousRecipeSpider(SitemapSpider):
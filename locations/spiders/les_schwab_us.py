@@ -1,10 +1,9 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 # The shop webpages do have structured data, but they do not have coordinates,
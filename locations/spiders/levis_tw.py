@@ -2,10 +2,10 @@ from typing import Any
 
 import chompjs
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_WEEKDAY, DAYS_WEEKEND, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class LevisTWSpider(SitemapSpider):
@@ -1,9 +1,8 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import apply_yes_no
 from locations.items import SocialMedia, set_closed, set_social_media
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -1,8 +1,8 @@
 from chompjs import chompjs
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class LjsilversSpider(SitemapSpider):
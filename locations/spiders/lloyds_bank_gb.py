@@ -1,9 +1,9 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.brand_utils import extract_located_in
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.items import Feature, set_closed
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.asda_gb import AsdaGBSpider
 from locations.spiders.bp import BpSpider
 from locations.spiders.morrisons_gb import MorrisonsGBSpider
@@ -2,9 +2,10 @@ import scrapy
 
 from locations.categories import Categories
 from locations.open_graph_spider import OpenGraphSpider
+from locations.sitemap_spider import SitemapSpider
 
 
-class LondisGBSpider(scrapy.spiders.SitemapSpider, OpenGraphSpider):
+class LondisGBSpider(SitemapSpider, OpenGraphSpider):
     name = "londis_gb"
     item_attributes = {"brand": "Londis", "brand_wikidata": "Q21008564", "extras": Categories.SHOP_CONVENIENCE.value}
     allowed_domains = ["londis.co.uk"]
@@ -1,10 +1,10 @@
 import json
 
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class LovesAlternativeEnergySpider(SitemapSpider):
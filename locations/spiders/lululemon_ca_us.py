@@ -1,11 +1,10 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
 from locations.playwright_spider import PlaywrightSpider
 from locations.settings import DEFAULT_PLAYWRIGHT_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 from locations.user_agents import BROWSER_DEFAULT
 
 
@@ -1,12 +1,12 @@
 import json
 
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
 from locations.items import set_closed
+from locations.sitemap_spider import SitemapSpider
 
 
 class MatalanGBSpider(SitemapSpider):
@@ -1,10 +1,10 @@
 from typing import Iterable
 
 from scrapy.http import TextResponse
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.ntb_us import NtbUSSpider
 from locations.structured_data_spider import StructuredDataSpider
 
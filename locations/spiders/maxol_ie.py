@@ -1,9 +1,8 @@
 import html
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -3,11 +3,11 @@ from typing import Any
 
 from scrapy import Selector
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.hours import CLOSED_DE, DAYS_DE, OpeningHours, sanitise_day
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.mcdonalds import McdonaldsSpider
 
 
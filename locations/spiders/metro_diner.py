@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -2,9 +2,10 @@ import scrapy
 
 from locations.linked_data_parser import LinkedDataParser
 from locations.microdata_parser import MicrodataParser
+from locations.sitemap_spider import SitemapSpider
 
 
-class ModPizzaSpider(scrapy.spiders.SitemapSpider):
+class ModPizzaSpider(SitemapSpider):
     name = "mod_pizza"
     item_attributes = {
         "brand": "MOD Pizza",
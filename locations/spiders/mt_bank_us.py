@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.brand_utils import extract_located_in
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.caseys_general_store_us import CaseysGeneralStoreUSSpider
 from locations.spiders.circle_k import CircleKSpider
 from locations.spiders.costco_ca_gb_us import CostcoCAGBUSSpider
@@ -1,8 +1,7 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.camoufox_spider import CamoufoxSpider
 from locations.categories import Categories, apply_category
 from locations.settings import DEFAULT_CAMOUFOX_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -3,11 +3,12 @@ import json
 import scrapy
 
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 
 NANDOS_SHARED_ATTRIBUTES = {"brand": "Nando's", "brand_wikidata": "Q3472954"}
 
 
-class NandosSpider(scrapy.spiders.SitemapSpider):
+class NandosSpider(SitemapSpider):
     name = "nandos"
     item_attributes = NANDOS_SHARED_ATTRIBUTES
     sitemap_urls = [
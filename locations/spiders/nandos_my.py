@@ -1,8 +1,7 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.nandos import NANDOS_SHARED_ATTRIBUTES
 
 
@@ -1,7 +1,7 @@
 import scrapy
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
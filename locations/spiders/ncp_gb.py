@@ -1,13 +1,12 @@
 import json
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, Extras, PaymentMethods, apply_category, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
 from locations.pipelines.address_clean_up import merge_address_lines
 from locations.settings import DEFAULT_PLAYWRIGHT_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.central_england_cooperative import set_operator
 from locations.user_agents import BROWSER_DEFAULT
 
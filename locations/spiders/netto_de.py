@@ -1,10 +1,10 @@
 from h2.exceptions import ProtocolError
 from scrapy.http import Response
 from scrapy.settings.default_settings import RETRY_EXCEPTIONS
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 from locations.user_agents import FIREFOX_LATEST
 
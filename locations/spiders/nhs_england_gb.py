@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.nhs_scotland_gb import ignore
 from locations.structured_data_spider import StructuredDataSpider
 
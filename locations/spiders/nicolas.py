@@ -2,9 +2,9 @@ import json
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import extract_phone
 
 
@@ -1,9 +1,8 @@
 import json
 from urllib.parse import unquote
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, apply_category, apply_yes_no
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
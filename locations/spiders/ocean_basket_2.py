@@ -1,10 +1,9 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.ocean_basket_1 import OCEAN_BASKET_SHARED_ATTRIBUTES
 
 
@@ -1,5 +1,4 @@
-from scrapy.spiders import SitemapSpider
-
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 PAPA_JOHNS_SHARED_ATTRIBUTES = item_attributes = {"brand": "Papa John's", "brand_wikidata": "Q2759586"}
@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.linked_data_parser import LinkedDataParser
 from locations.microdata_parser import MicrodataParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class PapaMurphysSpider(SitemapSpider):
@@ -1,9 +1,8 @@
 import json
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.dict_parser import DictParser
+from locations.sitemap_spider import SitemapSpider
 
 
 class PigglyWigglyUSSpider(SitemapSpider):
@@ -2,11 +2,11 @@ from typing import Any
 from urllib import parse
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.google_url import url_to_coords
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class PizzaHutLUSpider(SitemapSpider):
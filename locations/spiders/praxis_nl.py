@@ -2,11 +2,11 @@ from typing import Any
 
 import chompjs
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_NL, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class PraxisNLSpider(SitemapSpider):
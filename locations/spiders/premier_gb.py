@@ -1,9 +1,10 @@
 import scrapy
 
 from locations.open_graph_spider import OpenGraphSpider
+from locations.sitemap_spider import SitemapSpider
 
 
-class PremierGBSpider(scrapy.spiders.SitemapSpider, OpenGraphSpider):
+class PremierGBSpider(SitemapSpider, OpenGraphSpider):
     name = "premier_gb"
     item_attributes = {"brand": "Premier", "brand_wikidata": "Q7240340"}
     allowed_domains = ["premier-stores.co.uk"]
@@ -1,9 +1,9 @@
 import chompjs
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_WEEKDAY, DAYS_WEEKEND, OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class PumaTWSpider(SitemapSpider):
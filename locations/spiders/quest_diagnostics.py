@@ -1,8 +1,7 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.hours import DAYS_FULL, OpeningHours
 from locations.items import Feature
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 
 
 class QuestDiagnosticsSpider(SitemapSpider):
@@ -4,12 +4,12 @@ from typing import Any
 
 import chompjs
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Drink, Extras, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.items import Feature
 from locations.react_server_components import parse_rsc
+from locations.sitemap_spider import SitemapSpider
 
 BRANDS = {
     "RRI": {"brand": "Red Roof Inn", "brand_wikidata": "Q7304949"},
@@ -1,7 +1,6 @@
 from typing import AsyncIterator, Iterable
 
 from scrapy.http import Request, Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
@@ -9,6 +8,7 @@ from locations.hours import DAYS_FULL, OpeningHours
 from locations.items import Feature
 from locations.playwright_spider import PlaywrightSpider
 from locations.settings import DEFAULT_PLAYWRIGHT_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 
 
 class ReeceSpider(SitemapSpider, PlaywrightSpider):
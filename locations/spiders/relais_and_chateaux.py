@@ -2,11 +2,11 @@ import re
 from typing import Any, Iterable
 
 from chompjs import chompjs
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.sitemap_spider import SitemapSpider
 
 
 class RelaisAndChateauxSpider(SitemapSpider):
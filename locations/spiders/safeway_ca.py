@@ -1,10 +1,9 @@
 import json
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class SafewayCASpider(SitemapSpider):
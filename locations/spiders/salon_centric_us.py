@@ -1,6 +1,5 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.items import set_closed
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -2,12 +2,12 @@ from typing import Any
 
 import chompjs
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
 from locations.items import SocialMedia, set_social_media
+from locations.sitemap_spider import SitemapSpider
 
 
 class SaveALotUSSpider(SitemapSpider):
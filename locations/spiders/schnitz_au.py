@@ -1,10 +1,10 @@
 import re
 
 from scrapy import Request
-from scrapy.spiders import SitemapSpider
 
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class SchnitzAUSpider(SitemapSpider):
@@ -2,11 +2,11 @@ import json
 from typing import Any
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.dict_parser import DictParser
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class ScotrailGBSpider(SitemapSpider):
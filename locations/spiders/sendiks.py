@@ -3,9 +3,10 @@ import json
 import scrapy
 
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
-class SendiksSpider(scrapy.spiders.SitemapSpider):
+class SendiksSpider(SitemapSpider):
     name = "sendiks"
     item_attributes = {"brand": "Sendik's Food Market", "brand_wikidata": "Q23461945"}
     allowed_domains = ["www.sendiks.com"]
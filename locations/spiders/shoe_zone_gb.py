@@ -1,8 +1,7 @@
 import json
 
-from scrapy.spiders import SitemapSpider
-
 from locations.hours import OpeningHours, day_range
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
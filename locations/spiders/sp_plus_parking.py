@@ -3,12 +3,12 @@ from typing import Any, Iterable, Optional
 
 from scrapy import Request
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, Fuel, apply_category, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class SpPlusParkingSpider(SitemapSpider):
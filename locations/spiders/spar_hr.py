@@ -1,9 +1,9 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, apply_category
 from locations.items import Feature
 from locations.settings import DEFAULT_PLAYWRIGHT_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.spar_aspiag import SPAR_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
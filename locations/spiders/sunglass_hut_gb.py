@@ -1,7 +1,6 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.sunglass_hut import SUNGLASS_HUT_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
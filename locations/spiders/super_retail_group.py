@@ -2,8 +2,7 @@ import json
 import re
 from html import unescape
 
-from scrapy.spiders import SitemapSpider
-
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import StructuredDataSpider
 
 
@@ -1,10 +1,9 @@
 import re
 
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
 from locations.hours import DAYS_BG, OpeningHours, day_range, sanitise_day
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class TMarketBGSpider(SitemapSpider):
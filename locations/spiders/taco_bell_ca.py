@@ -1,8 +1,8 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Extras, apply_yes_no
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.taco_bell_us import TACO_BELL_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
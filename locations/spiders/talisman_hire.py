@@ -1,7 +1,7 @@
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.buco_na_za import BucoNAZASpider
 from locations.spiders.builders import BuildersSpider
 from locations.structured_data_spider import StructuredDataSpider
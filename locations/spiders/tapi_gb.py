@@ -1,9 +1,10 @@
 import scrapy
 
 from locations.linked_data_parser import LinkedDataParser
+from locations.sitemap_spider import SitemapSpider
 
 
-class TapiGBSpider(scrapy.spiders.SitemapSpider):
+class TapiGBSpider(SitemapSpider):
     name = "tapi_gb"
     item_attributes = {"brand": "Tapi Carpets", "brand_wikidata": "Q79223951"}
     allowed_domains = ["tapi.co.uk"]
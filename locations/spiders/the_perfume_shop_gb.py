@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.google_url import extract_google_position
 from locations.pipelines.address_clean_up import clean_address
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.superdrug import SuperdrugSpider
 from locations.spiders.tesco_gb import set_located_in
 from locations.structured_data_spider import StructuredDataSpider
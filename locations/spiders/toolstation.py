@@ -6,9 +6,10 @@ import scrapy
 
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours, day_range, sanitise_day
+from locations.sitemap_spider import SitemapSpider
 
 
-class ToolstationSpider(scrapy.spiders.SitemapSpider):
+class ToolstationSpider(SitemapSpider):
     name = "toolstation"
     item_attributes = {"brand": "Toolstation", "brand_wikidata": "Q7824103"}
     sitemap_urls = [
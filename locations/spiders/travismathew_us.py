@@ -1,10 +1,9 @@
 from urllib.parse import parse_qs, urlparse
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class TravismathewUSSpider(SitemapSpider):
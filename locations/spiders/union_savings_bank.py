@@ -1,9 +1,8 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories
 from locations.google_url import extract_google_position
 from locations.hours import OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class UnionSavingsBankSpider(SitemapSpider):
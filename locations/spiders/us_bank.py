@@ -1,11 +1,10 @@
 import json
 from urllib.parse import urlsplit, urlunsplit
 
-from scrapy.spiders import SitemapSpider
-
 from locations.categories import Categories, Extras, apply_category, apply_yes_no
 from locations.dict_parser import DictParser
 from locations.hours import OpeningHours
+from locations.sitemap_spider import SitemapSpider
 
 
 class UsBankSpider(SitemapSpider):
@@ -1,7 +1,6 @@
-from scrapy.spiders import SitemapSpider
-
 from locations.hours import DAYS, OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 
 
 class VallartaUSSpider(SitemapSpider):
@@ -1,5 +1,4 @@
-from scrapy.spiders import SitemapSpider
-
+from locations.sitemap_spider import SitemapSpider
 from locations.spiders.vodafone_de import VODAFONE_SHARED_ATTRIBUTES
 from locations.structured_data_spider import StructuredDataSpider
 
@@ -4,12 +4,12 @@ from typing import Any, Iterable
 from urllib.parse import unquote
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.categories import Categories, Extras, PaymentMethods, apply_category, apply_yes_no, map_payment
 from locations.dict_parser import DictParser
 from locations.hours import DAYS_FULL, OpeningHours
 from locations.items import Feature
+from locations.sitemap_spider import SitemapSpider
 from locations.structured_data_spider import clean_facebook
 
 
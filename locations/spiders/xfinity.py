@@ -4,9 +4,9 @@ from geonamescache import GeonamesCache
 from scrapy import Spider
 from scrapy.http import Request
 
+from locations.countries import US_TERRITORIES
 from locations.hours import DAYS, OpeningHours
 from locations.items import Feature, set_closed
-from locations.pipelines.state_clean_up import US_TERRITORIES
 
 
 class XfinitySpider(Spider):
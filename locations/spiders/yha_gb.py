@@ -1,13 +1,13 @@
 from typing import Iterable
 
 from scrapy.http import Response
-from scrapy.spiders import SitemapSpider
 
 from locations.camoufox_spider import CamoufoxSpider
 from locations.categories import Categories, apply_category
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
 from locations.settings import DEFAULT_CAMOUFOX_SETTINGS
+from locations.sitemap_spider import SitemapSpider
 
 
 class YhaGBSpider(SitemapSpider, CamoufoxSpider):
@@ -9,6 +9,7 @@ from scrapy.http.request.form import FormRequest
 from locations.dict_parser import DictParser
 from locations.geo import country_iseadgg_centroids, point_locations
 from locations.items import Feature
+from locations.seen_refs import SeenRefs
 
 
 class StoreLocatorPlusSelfSpider(Spider):
@@ -55,6 +56,10 @@ class StoreLocatorPlusSelfSpider(Spider):
     ensure that max_results (or more) locations are never returned for any
     radius search.
 
+    Locations returned by more than one radius search are skipped, by their
+    ref, before being parsed again. Set skip_seen_refs = False if the same ref
+    can be returned with different details.
+
     If clean ups or additional field extraction is required from the source
     data, override the parse_item function. Two parameters are passed:
       item: an ATP "Feature" class
@@ -68,6 +73,8 @@ class StoreLocatorPlusSelfSpider(Spider):
     searchable_points_files: list[str] = []
     search_radius: int = 0
     max_results: int = 0
+    skip_seen_refs: bool = True
+    seen_refs: SeenRefs | None = None
 
     async def start(self) -> AsyncIterator[FormRequest]:
         if len(self.start_urls) == 0 and len(self.allowed_domains) == 1:
@@ -79,6 +86,8 @@ class StoreLocatorPlusSelfSpider(Spider):
                 "Specify one domain name in the allowed_domains list attribute or one URL in the start_urls list attribute."
             )
             return
+        if self.skip_seen_refs:
+            self.seen_refs = SeenRefs(self.crawler.stats)
         if url and len(self.iseadgg_countries_list) > 0 and self.search_radius != 0 and self.max_results != 0:
             # PREFERRED geographic radius search method using ISEADGG
             # centroids for a supplied list of ISO-3166 alpha-2 country codes.
@@ -143,6 +152,9 @@ class StoreLocatorPlusSelfSpider(Spider):
                     self.crawler.stats.inc_value("atp/geo_search/misses")
                 self.crawler.stats.max_value("atp/geo_search/max_features_returned", len(locations))
 
+        if self.seen_refs is not None:
+            locations = self.seen_refs.filter(locations)
+
         for location in locations:
             item = DictParser.parse(location)
             item.pop("addr_full", None)
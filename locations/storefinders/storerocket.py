@@ -7,6 +7,7 @@ from locations.dict_parser import DictParser
 from locations.geo import country_iseadgg_centroids, point_locations
 from locations.hours import OpeningHours
 from locations.items import Feature, SocialMedia, set_social_media
+from locations.seen_refs import SeenRefs
 
 
 class StoreRocketSpider(Spider):
@@ -49,6 +50,10 @@ class StoreRocketSpider(Spider):
        pre-configured set of search radiuses and these change per StoreRocket
        account. Check the store finder page for a drop-down box listing valid
        search radius values.
+
+    Locations returned by more than one radius search are skipped, by their
+    ref, before being parsed again. Set skip_seen_refs = False if the same ref
+    can be returned with different details.
     """
 
     dataset_attributes: dict = {"source": "api", "api": "storerocket.io"}
@@ -60,6 +65,8 @@ class StoreRocketSpider(Spider):
     searchable_points_files: list[str] = []
     search_radius: int = 0
     max_results: int = 1000
+    skip_seen_refs: bool = True
+    seen_refs: SeenRefs | None = None
 
     async def start(self) -> AsyncIterator[JsonRequest]:
         if len(self.iseadgg_countries_list) == 0 and len(self.searchable_points_files) == 0:
@@ -68,7 +75,10 @@ class StoreRocketSpider(Spider):
             # maximum number of results returned and if this is the case, a
             # geographic search method is required to be used.
             yield JsonRequest(url=f"https://storerocket.io/api/user/{self.storerocket_id}/locations")
-        elif len(self.iseadgg_countries_list) > 0 and self.search_radius != 0 and self.max_results != 0:
+            return
+        if self.skip_seen_refs:
+            self.seen_refs = SeenRefs(self.crawler.stats)
+        if len(self.iseadgg_countries_list) > 0 and self.search_radius != 0 and self.max_results != 0:
             # SECOND PREFERENCE geographic radius search method using ISEADGG
             # centroids for a supplied list of ISO-3166 alpha-2 country codes.
             if self.search_radius >= 285:
@@ -121,6 +131,9 @@ class StoreRocketSpider(Spider):
                     self.crawler.stats.inc_value("atp/geo_search/misses")
                 self.crawler.stats.max_value("atp/geo_search/max_features_returned", len(locations))
 
+        if self.seen_refs is not None:
+            locations = self.seen_refs.filter(locations)
+
         for location in locations:
             self.pre_process_data(location)
             item = DictParser.parse(location)
@@ -9,6 +9,7 @@ from locations.geo import country_iseadgg_centroids, point_locations
 from locations.hours import DAYS_BY_FREQUENCY, OpeningHours
 from locations.items import Feature
 from locations.pipelines.address_clean_up import merge_address_lines
+from locations.seen_refs import SeenRefs
 
 
 class WPStoreLocatorSpider(Spider):
@@ -65,6 +66,10 @@ class WPStoreLocatorSpider(Spider):
     that max_results (or more) locations are never returned for any radius
     search.
 
+    Locations returned by more than one radius search are skipped, by their
+    ref, before being parsed again. Set skip_seen_refs = False if the same ref
+    can be returned with different details.
+
     If clean ups or additional field extraction is required from the source
     data, override the parse_item function. Two parameters are passed:
       item: an ATP "Feature" class
@@ -81,12 +86,18 @@ class WPStoreLocatorSpider(Spider):
     search_radius: int = 0
     max_results: int = 0
     possible_days: list[dict] = DAYS_BY_FREQUENCY
+    skip_seen_refs: bool = True
+    seen_refs: SeenRefs | None = None
 
     async def start(self) -> AsyncIterator[JsonRequest]:
         if len(self.iseadgg_countries_list) > 0 and self.search_radius != 0 and self.max_results != 0:
+            if self.skip_seen_refs:
+                self.seen_refs = SeenRefs(self.crawler.stats)
             for request in self.start_requests_geo_search_iseadgg_method():
                 yield request
         elif len(self.searchable_points_files) > 0 and self.search_radius != 0 and self.max_results != 0:
+            if self.skip_seen_refs:
+                self.seen_refs = SeenRefs(self.crawler.stats)
             for request in self.start_requests_geo_search_manual_method():
                 yield request
         else:
@@ -200,6 +211,9 @@ class WPStoreLocatorSpider(Spider):
                     "Locations have probably been truncated due to max_results (or more) features being returned by a single geographic radius search. Use a smaller search_radius."
                 )
 
+        if self.seen_refs is not None:
+            features = self.seen_refs.filter(features)
+
         for feature in features:
             self.pre_process_data(feature)
             item = DictParser.parse(feature)
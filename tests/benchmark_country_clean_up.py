@@ -0,0 +1,112 @@
+"""
+Benchmark of the per-item cost of country and state clean up, with the
+indexes of locations.countries, against the scans of every country and
+subdivision they replaced. Also verifies that both give the same results.
+
+Run with: python -m tests.benchmark_country_clean_up
+"""
+
+import timeit
+
+import pycountry
+from geonamescache import GeonamesCache
+from scrapy.utils.spider import DefaultSpider
+from scrapy.utils.test import get_crawler
+
+from locations.countries import COUNTRY_ALIASES, STATE_OVERRIDES, STATES
+from locations.country_utils import strip_accents
+from locations.items import Feature
+from locations.pipelines.country_code_clean_up import CountryCodeCleanUpPipeline
+from locations.pipelines.state_clean_up import StateCodeCleanUpPipeline
+
+# Country and state values as given by spiders, with coordinates so that
+# neither pipeline falls back to reverse geocoding.
+ITEMS = [
+    {"country": "US", "state": "CA"},
+    {"country": "United States", "state": "California"},
+    {"country": "USA", "state": "Washington, D.C."},
+    {"country": "CA", "state": "Ontario"},
+    {"country": "GB", "state": "England"},
+    {"country": "United Kingdom", "state": "ENG"},
+    {"country": "DEU", "state": "Bayern"},
+    {"country": "México", "state": "Jalisco"},
+    {"country": "Deutschland", "state": "BY"},
+    {"country": "AU", "state": "NSW"},
+]
+
+geonames_countries = GeonamesCache().get_countries()
+
+
+def scan_country(country_str: str) -> str | None:
+    country_str = strip_accents(country_str.replace(".", "").strip())
+    if len(country_str) == 2 and geonames_countries.get(country_str.upper()):
+        return country_str.upper()
+    if len(country_str) == 3:
+        for country in geonames_countries.values():
+            if country["iso3"] == country_str.upper():
+                return country["iso"]
+    for country in geonames_countries.values():
+        if country["name"].lower() == country_str.lower():
+            return country["iso"]
+    return COUNTRY_ALIASES.get(country_str.lower())
+
+
+def scan_state(state: str, country: str) -> str | None:
+    state = STATE_OVERRIDES.get(state, state)
+    if s := STATES[country].get(state):
+        return str(s["code"])
+    for possible_state in STATES[country].values():
+        if possible_state["name"] == state:
+            return str(possible_state["code"])
+    return None
+
+
+def scan_iso_3166_2_code(country: str, state: str) -> str | None:
+    if country not in [country.alpha_2 for country in pycountry.countries]:
+        return None
+    for subdivision in pycountry.subdivisions.get(country_code=country):
+        if state in [subdivision.code.split("-", 1)[1], subdivision.name]:
+            return subdivision.code
+    return None
+
+
+def scan_clean_up(values: dict) -> tuple:
+    country = scan_country(values["country"])
+    state = scan_state(values["state"], country) if country in STATES else values["state"]
+    return country, state, scan_iso_3166_2_code(country, state)
+
+
+def get_pipelines() -> tuple[CountryCodeCleanUpPipeline, StateCodeCleanUpPipeline]:
+    crawler = get_crawler(DefaultSpider)
+    crawler.spider = crawler._create_spider("benchmark")
+    return CountryCodeCleanUpPipeline(crawler), StateCodeCleanUpPipeline(crawler)
+
+
+def indexed_clean_up(values: dict, pipelines: tuple) -> tuple:
+    item = Feature(lat=0, lon=0, **values)
+    for pipeline in pipelines:
+        item = pipeline.process_item(item)
+    return item["country"], item["state"], item.get_iso_3166_2_code()
+
+
+def per_item_microseconds(clean_up, number: int) -> float:
+    def run():
+        for values in ITEMS:
+            clean_up(values)
+
+    return min(timeit.repeat(run, number=number, repeat=5)) / (number * len(ITEMS)) * 1e6
+
+
+def main():
+    pipelines = get_pipelines()
+    for values in ITEMS:
+        assert indexed_clean_up(values, pipelines) == scan_clean_up(values), values
+
+    before = per_item_microseconds(scan_clean_up, 20)
+    after = per_item_microseconds(lambda values: indexed_clean_up(values, pipelines), 200)
+    print(f"scans:   {before:.1f} µs/item")
+    print(f"indexes: {after:.1f} µs/item ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
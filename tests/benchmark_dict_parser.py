@@ -0,0 +1,176 @@
+"""
+Benchmark of DictParser.parse, which finds each field in a single pass over
+the keys of an object, against the previous implementation which probed the
+object for every variation of every key of every field. Also verifies that
+both produce identical items.
+
+Run with: python -m tests.benchmark_dict_parser
+"""
+
+import functools
+import timeit
+
+from locations.dict_parser import DictParser
+from locations.geo import extract_geojson_point_geometry
+from locations.items import Feature
+
+# Store objects shaped like those returned by common store finder APIs.
+PAYLOADS = {
+    "wp_store_locator": {
+        "id": "1042",
+        "store": "Main Street",
+        "address": "12 Main Street",
+        "address2": "",
+        "city": "Springfield",
+        "state": "IL",
+        "zip": "62701",
+        "country": "United States",
+        "lat": "39.7990175",
+        "lng": "-89.6439575",
+        "phone": "(217) 555-0100",
+        "fax": "",
+        "email": "",
+        "hours": "<table><tr><td>Monday</td><td>9AM - 5PM</td></tr></table>",
+        "url": "https://example.com/stores/main-street",
+        "permalink": "https://example.com/stores/main-street",
+        "thumb": "",
+        "distance": "1.2",
+    },
+    "yext": {
+        "meta": {"id": "3456", "entityType": "location"},
+        "id": "3456",
+        "name": "Example Store Kidderminster",
+        "address": {
+            "line1": "3-6 Coventry Street",
+            "city": "Kidderminster",
+            "region": "Worcestershire",
+            "postalCode": "DY10 2DG",
+            "countryCode": "GB",
+        },
+        "yextDisplayCoordinate": {"latitude": 52.388391, "longitude": -2.247847},
+        "mainPhone": "+441562746695",
+        "emails": ["kidderminster@example.com"],
+        "websiteUrl": {"url": "https://example.com/kidderminster"},
+        "hours": {"monday": {"openIntervals": [{"start": "08:00", "end": "18:00"}]}},
+        "c_pagesURL": "https://example.com/kidderminster",
+        "closed": False,
+    },
+    "storerocket": {
+        "id": 88231,
+        "name": "Downtown",
+        "address_line_1": "400 Market St",
+        "city": "San Francisco",
+        "state": "CA",
+        "postcode": "94111",
+        "country": "US",
+        "lat": 37.7907,
+        "lng": -122.3995,
+        "phone": "415-555-0199",
+        "email": "downtown@example.com",
+        "url": "https://example.com/downtown",
+        "facebook": "https://facebook.com/example",
+        "twitter": "",
+        "hours": {"mon": "9:00-17:00"},
+        "fields": [],
+        "locations_id": 2,
+    },
+    "nested_contact": {
+        "storeID": "A-77",
+        "storeName": "Harbour View",
+        "geo": {"lat": "-33.8568", "lon": "151.2153"},
+        "address": {
+            "streetAddress": "1 Harbour Road",
+            "suburb": "Sydney",
+            "stateCode": "NSW",
+            "postCode": "2000",
+            "country": {"name": "Australia", "isoCode": "AU"},
+        },
+        "contact": {"phoneNumber": "02 5550 1234", "emailAddress": "harbour@example.com"},
+        "services": ["parking", "atm"],
+        "openingHours": [{"day": "Monday", "open": "08:00", "close": "18:00"}],
+    },
+    "geojson": {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [4.8952, 52.3702]},
+        "properties": {"name": "Amsterdam"},
+        "id": "nl-1",
+        "name": "Amsterdam Centraal",
+        "street": "Stationsplein",
+        "house_number": "1",
+        "city": "Amsterdam",
+        "postalCode": "1012 AB",
+        "country": "NL",
+    },
+}
+
+
+@functools.cache
+def legacy_variations(key: str) -> set[str]:
+    return DictParser.get_variations(key)
+
+
+def legacy_get_first_key(obj: dict, keys: list[str]):
+    for key in keys:
+        for variation in legacy_variations(key):
+            if obj.get(variation):
+                return obj[variation]
+
+
+def legacy_parse(obj: dict) -> Feature:
+    """The previous DictParser.parse, probing the object for each key."""
+    item = Feature()
+    item["ref"] = legacy_get_first_key(obj, DictParser.ref_keys)
+    item["name"] = legacy_get_first_key(obj, DictParser.name_keys)
+    if obj.get("geometry") and obj["geometry"].get("type") in ["Point", "MultiPoint"]:
+        item["geometry"] = extract_geojson_point_geometry(obj["geometry"])
+    else:
+        location = legacy_get_first_key(obj, DictParser.location_keys)
+        if location and isinstance(location, dict):
+            item["lat"] = legacy_get_first_key(location, DictParser.lat_keys)
+            item["lon"] = legacy_get_first_key(location, DictParser.lon_keys)
+        if item.get("lat", None) is None or item.get("lon", None) is None:
+            item["lat"] = legacy_get_first_key(obj, DictParser.lat_keys)
+            item["lon"] = legacy_get_first_key(obj, DictParser.lon_keys)
+    address = legacy_get_first_key(obj, DictParser.full_address_keys)
+    if address and isinstance(address, str):
+        item["addr_full"] = address
+    if not address or not isinstance(address, dict):
+        address = obj
+    item["housenumber"] = legacy_get_first_key(address, DictParser.house_number_keys)
+    item["street"] = legacy_get_first_key(address, DictParser.street_keys)
+    item["street_address"] = legacy_get_first_key(address, DictParser.street_address_keys)
+    item["city"] = legacy_get_first_key(address, DictParser.city_keys)
+    item["state"] = legacy_get_first_key(address, DictParser.region_keys)
+    item["postcode"] = legacy_get_first_key(address, DictParser.postcode_keys)
+    country = legacy_get_first_key(address, DictParser.country_keys)
+    if country and isinstance(country, dict):
+        isocode = legacy_get_first_key(country, DictParser.isocode_keys)
+        if isocode and isinstance(isocode, str):
+            item["country"] = isocode
+    else:
+        item["country"] = country
+    contact = legacy_get_first_key(obj, ["contact"])
+    if not contact or not isinstance(contact, dict):
+        contact = obj
+    item["email"] = legacy_get_first_key(contact, DictParser.email_keys)
+    item["phone"] = legacy_get_first_key(contact, DictParser.phone_keys)
+    item["website"] = legacy_get_first_key(contact, DictParser.website_keys)
+    item["twitter"] = legacy_get_first_key(contact, DictParser.twitter_keys)
+    item["facebook"] = legacy_get_first_key(contact, DictParser.facebook_keys)
+    return item
+
+
+def main():
+    for name, payload in PAYLOADS.items():
+        assert dict(DictParser.parse(payload)) == dict(legacy_parse(payload)), name
+
+    number = 2000
+    print(f"{'payload':<20} {'before µs':>10} {'after µs':>10} {'speedup':>8}")
+    for name, payload in PAYLOADS.items():
+        before = min(timeit.repeat(lambda: legacy_parse(payload), number=number, repeat=3)) / number * 1e6
+        after = min(timeit.repeat(lambda: DictParser.parse(payload), number=number, repeat=3)) / number * 1e6
+        print(f"{name:<20} {before:>10.1f} {after:>10.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
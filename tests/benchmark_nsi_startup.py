@@ -0,0 +1,104 @@
+"""
+Benchmark of the time taken by a new process to load the NSI and perform
+the first lookup, as ApplyNSICategoriesPipeline does for every spider,
+from the vendored JSON files and from the prebuilt snapshot.
+
+The vendored NSI files are used if present, otherwise synthetic files of
+a similar size are generated.
+
+Run with: python -m tests.benchmark_nsi_startup
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from locations import name_suggestion_index
+
+LOAD_AND_LOOKUP = """
+import sys, time
+from pathlib import Path
+from locations import name_suggestion_index
+name_suggestion_index.NSI_FILE_PATH = Path(sys.argv[1])
+name_suggestion_index.WIKIDATA_FILE_PATH = Path(sys.argv[2])
+name_suggestion_index.SNAPSHOT_FILE_PATH = Path(sys.argv[3])
+nsi = name_suggestion_index.NSI()
+start = time.perf_counter()
+list(nsi.iter_nsi("Q38076"))
+nsi.lookup_wikidata("Q38076")
+print(time.perf_counter() - start)
+"""
+
+
+def write_synthetic_data(directory: Path) -> tuple[Path, Path]:
+    wikidata = {
+        f"Q{i}": {
+            "label": f"Brand {i}",
+            "description": "chain of convenience stores",
+            "officialWebsites": [f"https://www.brand{i}.example.com/"],
+            "identities": {"facebook": f"brand{i}", "website": f"https://www.brand{i}.example.com/"},
+            "logos": {"wikidata": f"https://commons.wikimedia.org/wiki/Special:FilePath/Brand{i}.svg"},
+        }
+        for i in range(40000)
+    }
+    nsi = {
+        f"brands/shop/category{c}": {
+            "properties": {"path": f"brands/shop/category{c}"},
+            "items": [
+                {
+                    "displayName": f"Brand {i}",
+                    "id": f"brand{i}-{c}",
+                    "locationSet": {"include": ["gb", "ie", "us"]},
+                    "tags": {"brand": f"Brand {i}", "brand:wikidata": f"Q{i}", "name": f"Brand {i}", "shop": "x"},
+                }
+                for i in range(c, 40000, 5)
+            ],
+        }
+        for c in range(10)
+    }
+    nsi_path = directory / "nsi.json"
+    wikidata_path = directory / "nsi-wikidata.json"
+    json.dump({"nsi": nsi}, open(nsi_path, "w"), indent="\t")
+    json.dump({"wikidata": wikidata}, open(wikidata_path, "w"), indent="\t")
+    return nsi_path, wikidata_path
+
+
+def time_load(nsi_path: Path, wikidata_path: Path, snapshot_path: str) -> float:
+    results = []
+    for _ in range(3):
+        output = subprocess.run(
+            [sys.executable, "-c", LOAD_AND_LOOKUP, str(nsi_path), str(wikidata_path), snapshot_path],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(float(output.stdout))
+    return min(results)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        if name_suggestion_index.NSI_FILE_PATH.exists() and name_suggestion_index.WIKIDATA_FILE_PATH.exists():
+            nsi_path, wikidata_path = name_suggestion_index.NSI_FILE_PATH, name_suggestion_index.WIKIDATA_FILE_PATH
+        else:
+            print("Vendored NSI files not found, using synthetic data")
+            nsi_path, wikidata_path = write_synthetic_data(directory)
+        name_suggestion_index.NSI_FILE_PATH = nsi_path
+        name_suggestion_index.WIKIDATA_FILE_PATH = wikidata_path
+        snapshot_path = directory / "nsi.snapshot"
+        start = time.perf_counter()
+        name_suggestion_index.write_snapshot(snapshot_path)
+        print(f"snapshot written in {time.perf_counter() - start:.2f} s ({snapshot_path.stat().st_size:,} bytes)")
+
+        json_time = time_load(nsi_path, wikidata_path, str(directory / "missing.snapshot"))
+        snapshot_time = time_load(nsi_path, wikidata_path, str(snapshot_path))
+        print(f"load and first lookup from JSON:     {json_time * 1000:.1f} ms")
+        print(f"load and first lookup from snapshot: {snapshot_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
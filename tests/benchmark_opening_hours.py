@@ -0,0 +1,40 @@
+"""
+Micro-benchmark of OpeningHours.add_ranges_from_string per-call latency
+with and without the compiled extraction regex cache.
+
+Run with: python -m tests.benchmark_opening_hours
+"""
+
+import timeit
+from unittest.mock import patch
+
+from locations.hours import DAYS_DE, DAYS_EN, DELIMITERS_DE, OpeningHours
+
+SAMPLES = [
+    ("Mon-Fri: 9am - 5:30pm, Sat: 10am - 4pm, Sun: Closed", {}),
+    ("Monday to Friday 08:00-20:00 Saturday 09:00-18:00 Sunday 10:00-16:00", {"days": DAYS_EN}),
+    ("Mo-Fr 07:00-19:00 Sa 08:00-14:00", {"days": DAYS_DE, "delimiters": DELIMITERS_DE}),
+]
+
+
+def parse_samples():
+    for ranges_string, kwargs in SAMPLES:
+        OpeningHours().add_ranges_from_string(ranges_string, **kwargs)
+
+
+def per_call_microseconds(number: int) -> float:
+    return min(timeit.repeat(parse_samples, number=number, repeat=5)) / (number * len(SAMPLES)) * 1e6
+
+
+def main():
+    uncached = staticmethod(OpeningHours._compiled_extraction_regexes.__wrapped__)
+    with patch.object(OpeningHours, "_compiled_extraction_regexes", uncached):
+        before = per_call_microseconds(50)
+    parse_samples()  # Warm the cache.
+    after = per_call_microseconds(500)
+    print(f"uncached regexes: {before:.1f} µs/call")
+    print(f"cached regexes:   {after:.1f} µs/call ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
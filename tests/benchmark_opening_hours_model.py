@@ -0,0 +1,159 @@
+"""
+Benchmark of the integer-minute OpeningHours model against the previous
+time.struct_time based model, over a corpus of real-world hours strings.
+Also verifies that both models produce byte-identical opening_hours output.
+
+Run with: python -m tests.benchmark_opening_hours_model
+"""
+
+import time
+import timeit
+from collections import defaultdict
+
+from locations.hours import CLOSED_EN, DAYS, DAYS_DE, DAYS_FR, DAYS_IT, DELIMITERS_DE, OpeningHours, sanitise_day
+
+# Hours strings as found in the source data of various spiders.
+HOURS_STRINGS = [
+    ("Mon-Fri: 9am - 5:30pm, Sat: 10am - 4pm, Sun: Closed", {}),
+    ("Monday - Friday 7:00 AM - 10:00 PM Saturday 8:00 AM - 9:00 PM Sunday 9:00 AM - 8:00 PM", {}),
+    ("Mo-Fr 08:00-20:00; Sa 09:00-18:00; Su 10:00-16:00", {}),
+    ("Mon-Sun 00:00-24:00", {}),
+    ("Monday: 11:00 AM - 2:00 AM Tuesday: 11:00 AM - 2:00 AM Wednesday: 11:00 AM - 2:00 AM", {}),
+    ("Mon - Thu 10:30-22:00, Fri - Sat 10:30-23:00, Sun 11:00-22:00", {}),
+    ("Weekdays 6:30am-midnight, Weekends 7am-midnight", {}),
+    ("Mon-Fri 9:00-13:00 / 14:00-18:00, Sat 9:00-12:00", {}),
+    ("Montag - Freitag 08:00 - 20:00 Samstag 08:00 - 18:00", {"days": DAYS_DE, "delimiters": DELIMITERS_DE}),
+    ("Lundi - Samedi 09:00 - 19:30 Dimanche fermé", {"days": DAYS_FR}),
+    ("lun - ven 9:00 - 13:00 / 15:00 - 19:30 sab 09:00 - 19:30", {"days": DAYS_IT}),
+    ("Sunday to Thursday 10:00-22:00 Friday 10:00-14:00", {}),
+]
+
+# Individual ranges as supplied to add_range by spiders parsing structured data.
+RANGES = [
+    ("Mo", "09:00", "17:00", "%H:%M"),
+    ("Tu", "9:00", "17:30", "%H:%M"),
+    ("We", "08:30:00", "20:00:00", "%H:%M:%S"),
+    ("Th", "10:00 AM", "09:00 PM", "%I:%M %p"),
+    ("Fr", "0900", "2100", "%H%M"),
+    ("Sa", "22:00", "02:00", "%H:%M"),
+    ("Su", "00:00", "24:00", "%H:%M"),
+    ("Su", "10.00", "16.00", "%H.%M"),
+]
+
+
+class StructTimeOpeningHours(OpeningHours):
+    """The previous OpeningHours model, storing time.struct_time values."""
+
+    def add_range(self, day, open_time, close_time, time_format="%H:%M", closed=CLOSED_EN):
+        day = sanitise_day(day)
+        if day not in DAYS:
+            raise ValueError(f"day must be one of {DAYS}, not {day!r}")
+        if not open_time or not close_time:
+            return
+        if (
+            isinstance(open_time, str)
+            and isinstance(close_time, str)
+            and open_time.lower() in closed
+            and close_time.lower() in closed
+        ):
+            self.day_hours.pop(day, None)
+            self.days_closed.add(day)
+            return
+        if isinstance(open_time, str):
+            if open_time.lower() in closed:
+                return
+        if isinstance(close_time, str):
+            if close_time.lower() in closed:
+                return
+            if open_time in ("00:00", "0:00", "00:00:00") and close_time in ("00:00", "0:00", "00:00:00"):
+                return
+            if close_time in ("24:00", "00:00", "0:00"):
+                close_time = "23:59"
+            if close_time in ("24:00:00", "00:00:00"):
+                close_time = "23:59:00"
+        if not isinstance(open_time, time.struct_time):
+            open_time = time.strptime(open_time, time_format)
+        if not isinstance(close_time, time.struct_time):
+            close_time = time.strptime(close_time, time_format)
+            if close_time.tm_hour == 0 and close_time.tm_min == 0:
+                close_time = time.strptime("23:59", "%H:%M")
+        if open_time.tm_hour == close_time.tm_hour and open_time.tm_min == close_time.tm_min:
+            return
+        self.days_closed.discard(day)
+        self.day_hours[day].add((open_time, close_time))
+
+    def as_opening_hours(self) -> str:
+        day_groups = []
+        this_day_group = None
+        day_hours_midnight_split = defaultdict(set)
+        midnight_end = time.strptime("23:59", "%H:%M")
+        midnight_start = time.strptime("00:00", "%H:%M")
+        for index, day in enumerate(DAYS):
+            for h in self.day_hours[day]:
+                if h[0].tm_hour * 60 + h[0].tm_min > h[1].tm_hour * 60 + h[1].tm_min:
+                    day_hours_midnight_split[day].add((h[0], midnight_end))
+                    next_day = DAYS[(index + 1) % len(DAYS)]
+                    day_hours_midnight_split[next_day].add((midnight_start, h[1]))
+                    if next_day in self.days_closed:
+                        self.days_closed.remove(next_day)
+                else:
+                    day_hours_midnight_split[day].add(h)
+        for day in DAYS:
+            if day in self.days_closed:
+                hours = "closed"
+            else:
+                hours = ",".join(
+                    "%s-%s" % (time.strftime("%H:%M", h[0]), time.strftime("%H:%M", h[1]).replace("23:59", "24:00"))
+                    for h in sorted(day_hours_midnight_split[day])
+                )
+            if not this_day_group:
+                this_day_group = {"from_day": day, "to_day": day, "hours": hours}
+            elif this_day_group["hours"] != hours:
+                day_groups.append(this_day_group)
+                this_day_group = {"from_day": day, "to_day": day, "hours": hours}
+            else:
+                this_day_group["to_day"] = day
+        if this_day_group is not None:
+            day_groups.append(this_day_group)
+        opening_hours = ""
+        for day_group in day_groups:
+            if not day_group["hours"]:
+                continue
+            elif day_group["from_day"] == day_group["to_day"]:
+                opening_hours += "{from_day} {hours}; ".format(**day_group)
+            elif day_group["from_day"] == "Su" and day_group["to_day"] == "Sa":
+                opening_hours += "{hours}; ".format(**day_group)
+            else:
+                opening_hours += "{from_day}-{to_day} {hours}; ".format(**day_group)
+        return opening_hours[:-2]
+
+
+# Pre-extract the hours strings so that only the opening hours model is measured.
+EXTRACTED = [OpeningHours.extract_hours_from_string(s, **kwargs) for s, kwargs in HOURS_STRINGS]
+
+
+def build_all(opening_hours_class: type[OpeningHours]) -> list[str]:
+    results = []
+    for extracted in EXTRACTED:
+        oh = opening_hours_class()
+        for days, open_time, close_time in extracted:
+            for day in days:
+                oh.add_range(day, open_time, close_time)
+        results.append(oh.as_opening_hours())
+    oh = opening_hours_class()
+    for day, open_time, close_time, time_format in RANGES:
+        oh.add_range(day, open_time, close_time, time_format=time_format)
+    results.append(oh.as_opening_hours())
+    return results
+
+
+def main():
+    assert build_all(OpeningHours) == build_all(StructTimeOpeningHours), "opening_hours output differs"
+    for opening_hours_class in (StructTimeOpeningHours, OpeningHours):
+        number = 200
+        seconds = min(timeit.repeat(lambda: build_all(opening_hours_class), number=number, repeat=5))
+        print(f"{opening_hours_class.__name__}: {seconds / (number * (len(EXTRACTED) + 1)) * 1e6:.1f} µs/object")
+
+
+if __name__ == "__main__":
+    main()
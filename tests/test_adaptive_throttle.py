@@ -0,0 +1,135 @@
+import time
+from types import SimpleNamespace
+
+from scrapy import Request, Spider
+from scrapy.core.downloader import Slot
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+
+from locations.extensions.adaptive_throttle import AdaptiveThrottleExtension, HostProfile
+
+
+class ThrottledSpider(Spider):
+    name = "throttled"
+
+
+class SlowSpider(Spider):
+    name = "slow"
+    custom_settings = {"DOWNLOAD_DELAY": 2}
+
+
+class OneAtATimeSpider(Spider):
+    name = "one_at_a_time"
+    custom_settings = {"CONCURRENT_REQUESTS_PER_DOMAIN": 1}
+
+
+def get_extension(tmp_path, spider_class: type[Spider] = ThrottledSpider) -> AdaptiveThrottleExtension:
+    crawler = get_crawler(
+        spider_class,
+        {
+            "ADAPTIVE_THROTTLE_ENABLED": True,
+            "ADAPTIVE_THROTTLE_DIR": str(tmp_path),
+            "ADAPTIVE_THROTTLE_MIN_DELAY": 0.25,
+            "ADAPTIVE_THROTTLE_MAX_DELAY": 60,
+            "ADAPTIVE_THROTTLE_MAX_CONCURRENCY": 4,
+            "ADAPTIVE_THROTTLE_WINDOW": 5,
+            "ADAPTIVE_THROTTLE_EXPIRATION_DAYS": 28,
+            "DOWNLOAD_DELAY": 1,
+        },
+    )
+    crawler.stats.open_spider()
+    crawler.spider = crawler._create_spider()
+    crawler.engine = SimpleNamespace(downloader=SimpleNamespace(slots={}, per_slot_settings={}))
+    return AdaptiveThrottleExtension(crawler)
+
+
+def download(extension: AdaptiveThrottleExtension, host: str, status: int = 200, headers: dict | None = None) -> Slot:
+    downloader = extension.crawler.engine.downloader
+    slot = downloader.slots.setdefault(host, Slot(8, 1.0, 0))
+    request = Request(f"https://{host}/", meta={"download_slot": host, "download_latency": 0.1})
+    extension.request_reached_downloader(request, extension.crawler.spider)
+    response = Response(request.url, status=status, headers=headers, request=request)
+    extension.response_downloaded(response, request, extension.crawler.spider)
+    return slot
+
+
+def test_speeds_up_healthy_host(tmp_path):
+    extension = get_extension(tmp_path)
+    extension.spider_opened(extension.crawler.spider)
+    for _ in range(100):
+        slot = download(extension, "api.example.com")
+    assert slot.delay == 0.25
+    assert slot.concurrency == 4
+
+
+def test_slows_down_throttled_host(tmp_path):
+    extension = get_extension(tmp_path)
+    extension.spider_opened(extension.crawler.spider)
+    for _ in range(20):
+        download(extension, "api.example.com")
+    slot = download(extension, "api.example.com", 429)
+    assert slot.delay == 1
+    assert slot.concurrency == 2
+    slot = download(extension, "api.example.com", 429, {"Retry-After": "10"})
+    assert slot.delay == 10
+    assert slot.concurrency == 1
+    slot = download(extension, "api.example.com", 403, {"Server": "cloudflare"})
+    assert slot.delay == 20
+    slot = download(extension, "api.example.com", 403)
+    assert slot.delay == 18
+    assert extension.crawler.stats.get_value("atp/adaptive_throttle/throttled_count") == 3
+
+
+def test_spider_download_delay_is_minimum(tmp_path):
+    extension = get_extension(tmp_path, SlowSpider)
+    extension.spider_opened(extension.crawler.spider)
+    for _ in range(20):
+        slot = download(extension, "www.example.com")
+    assert slot.delay == 2
+
+
+def test_spider_concurrency_is_maximum(tmp_path):
+    extension = get_extension(tmp_path, OneAtATimeSpider)
+    extension.spider_opened(extension.crawler.spider)
+    # Learned in an earlier run, before the spider asked for one request at a time.
+    extension.profiles["api.example.com"] = HostProfile(delay=1, concurrency=4)
+    for _ in range(100):
+        download(extension, "api.example.com")
+        slot = download(extension, "www.example.com")
+    assert slot.concurrency == 1
+    assert extension.crawler.engine.downloader.slots["api.example.com"].concurrency == 1
+
+
+def test_profiles_persist(tmp_path):
+    extension = get_extension(tmp_path)
+    extension.spider_opened(extension.crawler.spider)
+    for _ in range(100):
+        download(extension, "api.example.com")
+    download(extension, "www.example.com", 503)
+    extension.spider_closed(extension.crawler.spider)
+
+    extension = get_extension(tmp_path)
+    extension.spider_opened(extension.crawler.spider)
+    assert extension.crawler.stats.get_value("atp/adaptive_throttle/profiles_loaded") == 2
+    slot = Slot(8, 1.0, 0)
+    extension.crawler.engine.downloader.slots["api.example.com"] = slot
+    extension.request_reached_downloader(
+        Request("https://api.example.com/", meta={"download_slot": "api.example.com"}), extension.crawler.spider
+    )
+    assert slot.delay == 0.25
+    assert slot.concurrency == 4
+    assert extension.profiles["www.example.com"].throttled == 1
+
+
+def test_expired_profiles_forgotten(tmp_path):
+    extension = get_extension(tmp_path)
+    extension.profiles = {
+        "old.example.com": HostProfile(delay=5, concurrency=1, updated=time.time() - 30 * 24 * 60 * 60),
+        "new.example.com": HostProfile(delay=500, concurrency=100, updated=time.time()),
+    }
+    extension.spider_closed(extension.crawler.spider)
+
+    extension.spider_opened(extension.crawler.spider)
+    assert list(extension.profiles) == ["new.example.com"]
+    assert extension.profiles["new.example.com"].delay == 60
+    assert extension.profiles["new.example.com"].concurrency == 4
@@ -0,0 +1,64 @@
+import io
+import json
+
+import pyarrow
+import pyarrow.parquet
+
+from ci.concatenate_parquet import align_schema, concatenate
+from locations.exporters.geoparquet import GeoparquetExporter
+from locations.items import Feature, set_lat_lon
+
+
+def write_spider_parquet(path, refs: list[str], extras: dict | None = None, row_group_size: int = 2):
+    exporter = GeoparquetExporter(str(path), row_group_size=row_group_size)
+    for i, ref in enumerate(refs):
+        item = Feature()
+        item["ref"] = ref
+        item["extras"].update(extras or {})
+        set_lat_lon(item, 10.0 + i, 20.0 + len(refs))
+        exporter.export_item(item)
+    exporter.finish_exporting()
+
+
+def test_align_schema():
+    schema = pyarrow.schema([("a", pyarrow.string()), ("b", pyarrow.int64())])
+    table = pyarrow.table({"a": ["x", "y"]})
+
+    aligned = align_schema(table, schema)
+
+    assert aligned.schema == schema
+    assert aligned.column("b").to_pylist() == [None, None]
+
+
+def test_concatenate(tmp_path):
+    write_spider_parquet(tmp_path / "a.parquet", ["a1", "a2", "a3"], {"shop": "bakery"})
+    write_spider_parquet(tmp_path / "b.parquet", ["b1"], {"amenity": "cafe"})
+    write_spider_parquet(tmp_path / "c.parquet", ["c1", "c2"])
+    (tmp_path / "invalid.parquet").write_text("not parquet")
+    files = [str(tmp_path / f"{name}.parquet") for name in ["c", "invalid", "a", "b"]]
+
+    output = io.BytesIO()
+    assert concatenate(files, output, threads=2) == 6
+
+    table = pyarrow.parquet.read_table(io.BytesIO(output.getvalue()))
+    assert table.column("ref").to_pylist() == ["c1", "c2", "a1", "a2", "a3", "b1"]
+    assert table.column("shop").to_pylist() == [None, None, "bakery", "bakery", "bakery", None]
+    assert table.column("amenity").to_pylist() == [None, None, None, None, None, "cafe"]
+    geo = json.loads(table.schema.metadata[b"geo"])
+    assert geo["columns"]["geometry"]["bbox"] == [21.0, 10.0, 23.0, 12.0]
+
+
+def test_concatenate_columns_and_row_group_size(tmp_path):
+    write_spider_parquet(tmp_path / "a.parquet", ["a1", "a2", "a3"], {"shop": "bakery"})
+    write_spider_parquet(tmp_path / "b.parquet", ["b1", "b2", "b3", "b4"], {"amenity": "cafe"})
+    files = [str(tmp_path / "a.parquet"), str(tmp_path / "b.parquet")]
+
+    output = io.BytesIO()
+    concatenate(files, output, columns=["ref", "geometry", "amenity", "missing"], row_group_size=3)
+
+    parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(output.getvalue()))
+    assert [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)] == [3, 3, 1]
+    table = parquet_file.read()
+    assert table.schema.names == ["ref", "geometry", "amenity"]
+    assert table.column("ref").to_pylist() == ["a1", "a2", "a3", "b1", "b2", "b3", "b4"]
+    assert json.loads(table.schema.metadata[b"geo"])["primary_column"] == "geometry"
@@ -0,0 +1,113 @@
+import pytest
+from scrapy import Request
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse, Response
+from scrapy.utils.spider import DefaultSpider
+from scrapy.utils.test import get_crawler
+
+from locations.middlewares.conditional_cache import ConditionalCacheMiddleware
+
+BODY = b"<html><body>Store 1</body></html>"
+
+
+def get_middleware(tmp_path, storage: str) -> ConditionalCacheMiddleware:
+    crawler = get_crawler(
+        DefaultSpider,
+        {
+            "CONDITIONAL_CACHE_ENABLED": True,
+            "CONDITIONAL_CACHE_DIR": str(tmp_path),
+            "CONDITIONAL_CACHE_STORAGE": f"locations.middlewares.conditional_cache.{storage}",
+        },
+    )
+    crawler.spider = crawler._create_spider("example")
+    middleware = ConditionalCacheMiddleware.from_crawler(crawler)
+    middleware.spider_opened(crawler.spider)
+    return middleware
+
+
+def close(middleware: ConditionalCacheMiddleware) -> None:
+    middleware.spider_closed(middleware.crawler.spider)
+
+
+@pytest.mark.parametrize("storage", ["SqliteCacheStorage", "DirectoryCacheStorage"])
+def test_not_modified(tmp_path, storage):
+    middleware = get_middleware(tmp_path, storage)
+    request = Request("https://example.com/stores/1")
+    assert middleware.process_request(request) is None
+    assert b"If-None-Match" not in request.headers
+    response = HtmlResponse(
+        request.url, headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, body=BODY
+    )
+    assert middleware.process_response(request, response) is response
+    close(middleware)
+
+    # The next run
+    middleware = get_middleware(tmp_path, storage)
+    request = Request("https://example.com/stores/1")
+    middleware.process_request(request)
+    assert request.headers[b"If-None-Match"] == b'"abc"'
+    assert request.headers[b"If-Modified-Since"] == b"Mon, 01 Jan 2024 00:00:00 GMT"
+
+    cached = middleware.process_response(request, Response(request.url, status=304))
+    assert isinstance(cached, HtmlResponse)
+    assert cached.status == 200
+    assert cached.body == BODY
+    assert cached.headers[b"ETag"] == b'"abc"'
+    assert "cached" in cached.flags
+    stats = middleware.crawler.stats
+    assert stats.get_value("atp/conditional_cache/conditional_request") == 1
+    assert stats.get_value("atp/conditional_cache/not_modified") == 1
+    assert stats.get_value("atp/conditional_cache/bytes_saved") == len(BODY)
+    close(middleware)
+
+
+@pytest.mark.parametrize("storage", ["SqliteCacheStorage", "DirectoryCacheStorage"])
+def test_without_validators(tmp_path, storage):
+    middleware = get_middleware(tmp_path, storage)
+    request = Request("https://example.com/stores/1")
+    middleware.process_response(request, HtmlResponse(request.url, body=BODY))
+
+    request = Request("https://example.com/stores/1")
+    middleware.process_request(request)
+    assert b"If-None-Match" not in request.headers
+    assert b"If-Modified-Since" not in request.headers
+    middleware.process_response(request, HtmlResponse(request.url, body=BODY))
+    assert middleware.crawler.stats.get_value("atp/conditional_cache/unchanged") == 1
+    assert middleware.crawler.stats.get_value("atp/conditional_cache/conditional_request") is None
+    close(middleware)
+
+
+def test_expired_entries_deleted(tmp_path):
+    middleware = get_middleware(tmp_path, "SqliteCacheStorage")
+    request = Request("https://example.com/stores/1")
+    middleware.process_response(request, HtmlResponse(request.url, headers={"ETag": '"abc"'}, body=BODY))
+    middleware.expiration_secs = -60
+    close(middleware)
+
+    middleware = get_middleware(tmp_path, "SqliteCacheStorage")
+    request = Request("https://example.com/stores/1")
+    middleware.process_request(request)
+    assert b"If-None-Match" not in request.headers
+    close(middleware)
+
+
+def test_disabled():
+    crawler = get_crawler(DefaultSpider)
+    with pytest.raises(NotConfigured):
+        ConditionalCacheMiddleware.from_crawler(crawler)
+
+
+@pytest.mark.parametrize("storage", ["SqliteCacheStorage", "DirectoryCacheStorage"])
+def test_retrieve_validators(tmp_path, storage):
+    middleware = get_middleware(tmp_path, storage)
+    request = Request("https://example.com/stores/1")
+    middleware.process_response(request, HtmlResponse(request.url, headers={"ETag": '"abc"'}, body=BODY))
+
+    key = middleware.key(request)
+    validators = middleware.storage.retrieve_validators(key)
+    assert validators.etag == '"abc"'
+    assert validators.body is None
+    assert validators.to_response() is None
+    assert middleware.storage.retrieve(key).to_response().body == BODY
+    assert middleware.storage.retrieve_validators(middleware.key(Request("https://example.com/stores/2"))) is None
+    close(middleware)
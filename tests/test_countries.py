@@ -0,0 +1,43 @@
+import pytest
+
+from locations.countries import (
+    ALPHA_3_CODES,
+    COUNTRY_NAMES,
+    STATE_CODES,
+    get_iso_3166_2_code,
+    is_iso_3166_1_alpha_2_code,
+)
+
+
+def test_country_indexes():
+    assert ALPHA_3_CODES["GBR"] == "GB"
+    assert COUNTRY_NAMES["united kingdom"] == "GB"
+    with pytest.raises(TypeError):
+        COUNTRY_NAMES["narnia"] = "NA"
+
+
+def test_is_iso_3166_1_alpha_2_code():
+    assert is_iso_3166_1_alpha_2_code("GB")
+    assert not is_iso_3166_1_alpha_2_code("gb")
+    assert not is_iso_3166_1_alpha_2_code("XK")
+    assert not is_iso_3166_1_alpha_2_code(None)
+    assert not is_iso_3166_1_alpha_2_code(["GB"])
+
+
+def test_get_iso_3166_2_code():
+    assert get_iso_3166_2_code("US", "TX") == "US-TX"
+    assert get_iso_3166_2_code("US", "Texas") == "US-TX"
+    assert get_iso_3166_2_code("US", "texas") is None
+    assert get_iso_3166_2_code("US", "ZZ") is None
+    assert get_iso_3166_2_code("AQ", "ZZ") is None
+    assert get_iso_3166_2_code("XX", "TX") is None
+    assert get_iso_3166_2_code("US", None) is None
+    # The top level subdivision where a district shares its name.
+    assert get_iso_3166_2_code("BD", "Dhaka") == "BD-C"
+
+
+def test_state_codes():
+    assert STATE_CODES["US"]["CA"] == "CA"
+    assert STATE_CODES["US"]["California"] == "CA"
+    assert STATE_CODES["US"]["Washington, D.C."] == "DC"
+    assert "Washington, D.C." not in STATE_CODES["CA"]
@@ -0,0 +1,86 @@
+import argparse
+import logging
+import signal
+import threading
+import time
+
+from scrapy import Spider
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from locations.commands.crawl_many import CrawlPool, SpiderLogHandler, spider_settings
+
+
+class FirstSpider(Spider):
+    name = "first"
+
+
+class SecondSpider(Spider):
+    name = "second"
+
+
+def test_spider_settings(tmp_path):
+    opts = argparse.Namespace(output_dir=str(tmp_path), formats=["geojson", "ndgeojson"], timeout=60)
+    settings = spider_settings(
+        Settings({"EXTENSIONS": {"locations.extensions.log_stats.LogStatsExtension": 1000}}), "first", opts
+    )
+
+    assert settings.getdict("FEEDS") == {
+        str(tmp_path / "output" / "first.geojson"): {"format": "geojson", "overwrite": True},
+        str(tmp_path / "output" / "first.ndgeojson"): {"format": "ndgeojson", "overwrite": True},
+    }
+    assert settings.get("LOGSTATS_FILE") == str(tmp_path / "stats" / "first.json")
+    assert settings.getint("CLOSESPIDER_TIMEOUT") == 60
+    assert settings.getdict("EXTENSIONS") == {
+        "locations.extensions.log_stats.LogStatsExtension": 1000,
+        "scrapy.extensions.logcount.LogCount": None,
+    }
+
+
+def test_spider_log_handler(tmp_path, caplog):
+    caplog.set_level(logging.DEBUG)
+    first = get_crawler(FirstSpider, {"LOG_LEVEL": "INFO"})
+    second = get_crawler(SecondSpider, {"LOG_LEVEL": "INFO"})
+    first_spider = FirstSpider.from_crawler(first)
+    second_spider = SecondSpider.from_crawler(second)
+    handler = SpiderLogHandler(first, str(tmp_path / "first.txt"))
+    logging.root.addHandler(handler)
+    try:
+        first_spider.logger.info("first spider")
+        second_spider.logger.info("second spider")
+        logging.getLogger("scrapy.core.engine").info("first engine", extra={"spider": first_spider})
+        logging.getLogger("scrapy.core.engine").info("second engine", extra={"spider": second_spider})
+        logging.getLogger(FirstSpider.__module__).info("first module")
+        logging.getLogger("twisted").info("unattributed")
+        first_spider.logger.debug("below log level")
+    finally:
+        logging.root.removeHandler(handler)
+        handler.close()
+
+    lines = (tmp_path / "first.txt").read_text().splitlines()
+    assert [line.split(": ", 1)[1] for line in lines] == ["first spider", "first engine", "first module"]
+
+
+class FakeWorker:
+    def join(self):
+        pass
+
+
+def test_kill_overdue_workers_lets_other_spiders_finish(monkeypatch):
+    killed = []
+    monkeypatch.setattr("os.kill", lambda pid, sig: killed.append((pid, sig)))
+    pool = CrawlPool(Settings(), argparse.Namespace(timeout=10, kill_after=0))
+    pool.workers = {1: FakeWorker()}
+    pool.draining = {1: threading.Event()}
+    pool.running = {"first": (1, time.monotonic() - 100), "second": (1, time.monotonic())}
+
+    # The worker takes no more spiders, but isn't killed while another of its spiders runs.
+    assert pool.kill_overdue_workers() == set()
+    assert pool.draining[1].is_set()
+    assert killed == []
+
+    del pool.running["second"]
+    assert pool.kill_overdue_workers() == {"first"}
+    assert killed == [(1, signal.SIGKILL)]
+    assert pool.failed == {"first"}
+    assert pool.running == {}
@@ -255,3 +255,36 @@ def test_geometry_parse():
     src = {"geometry": {"coordinates": [-77.0633046, 38.9069966], "type": "Point"}}
     item = DictParser.parse(src)
     assert item["geometry"]["coordinates"] == [-77.0633046, 38.9069966]
+
+
+def test_get_first_key_priority():
+    # Earlier keys take priority over later keys, whatever order the object's keys are in, and empty values are
+    # skipped.
+    obj = {"identifier": "3", "Id": "2", "REF": "", "storeId": "4"}
+    assert DictParser.get_first_key(obj, DictParser.ref_keys) == "2"
+    obj["ref"] = "1"
+    assert DictParser.get_first_key(obj, DictParser.ref_keys) == "1"
+    # The exact key is preferred over its other variations.
+    assert DictParser.get_first_key({"NAME": "upper", "name": "exact"}, ["name"]) == "exact"
+
+
+def test_match_fields():
+    obj = {
+        "storeName": "Example",
+        "title": "Page title",
+        "ID": "7",
+        "address": {"line1": "1 High Street", "town": "Example Town", "zipCode": "12345"},
+        "phoneNumber": "555-0100",
+        "webAddress": "https://example.com",
+        "lat": 0,
+    }
+    fields = DictParser.match_fields(obj)
+    for field, keys in DictParser.field_keys.items():
+        assert fields.get(field) == DictParser.get_first_key(obj, keys)
+    assert fields == {
+        "ref": "7",
+        "name": "Example",
+        "address": obj["address"],
+        "phone": "555-0100",
+        "website": "https://example.com",
+    }
@@ -1,10 +1,14 @@
 import io
+import json
 import os
 import tempfile
 
+import pyarrow.parquet
+
 from locations.exporters.geojson import GeoJsonExporter, item_to_properties
 from locations.exporters.geoparquet import GeoparquetExporter
 from locations.exporters.ld_geojson import LineDelimitedGeoJsonExporter
+from locations.exporters.parquet_shard import ParquetShardExporter, hilbert_keys
 from locations.items import Feature, SocialMedia, set_lat_lon, set_social_media
 
 
@@ -147,3 +151,72 @@ def test_geoparquet_exporter_with_bytesio():
     exporter.finish_exporting()
 
     assert len(output.getvalue()) > 0, "BytesIO output should not be empty"
+
+
+def test_geoparquet_exporter_row_groups():
+    """Test that geoparquet exporter writes row groups and adds columns first seen in later items"""
+    output = io.BytesIO()
+    exporter = GeoparquetExporter(output, row_group_size=2)
+    for i in range(5):
+        item = Feature()
+        item["ref"] = str(i)
+        set_lat_lon(item, 40.0 + i, -74.0)
+        if i == 3:
+            item["extras"]["late"] = "yes"
+        exporter.export_item(item)
+    exporter.finish_exporting()
+
+    parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(output.getvalue()))
+    assert parquet_file.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("ref").to_pylist() == ["0", "1", "2", "3", "4"]
+    assert table.column("late").to_pylist() == [None, None, None, "yes", None]
+    assert all(field.type == "string" for field in table.schema if field.name != "geometry")
+
+    geo = json.loads(table.schema.metadata[b"geo"])
+    assert geo["columns"]["geometry"]["geometry_types"] == ["Point"]
+    assert geo["columns"]["geometry"]["bbox"] == [-74.0, 40.0, -74.0, 44.0]
+
+
+def test_geoparquet_exporter_empty():
+    output = io.BytesIO()
+    exporter = GeoparquetExporter(output)
+    exporter.finish_exporting()
+
+    assert output.getvalue() == b""
+
+
+def test_parquet_shard_exporter():
+    """Test that the parquet shard exporter writes rows ordered by their Hilbert key, with the ndgeojson fields"""
+    output = io.BytesIO()
+    exporter = ParquetShardExporter(output)
+    for i, (lat, lon) in enumerate([(51.5, -0.1), (-33.9, 151.2), (40.7, -74.0)]):
+        item = Feature()
+        item["ref"] = str(i)
+        item["extras"]["@spider"] = "dixy_ru"
+        item["extras"]["number"] = i
+        set_lat_lon(item, lat, lon)
+        exporter.export_item(item)
+    item = Feature()
+    item["ref"] = "no_location"
+    exporter.export_item(item)
+    exporter.finish_exporting()
+
+    table = pyarrow.parquet.read_table(io.BytesIO(output.getvalue()))
+    assert table.schema.names == ["id", "type", "dataset_attributes", "properties", "geom", "bbox", "hilbert"]
+    keys = table.column("hilbert").to_pylist()
+    assert keys[:3] == sorted(keys[:3])
+    assert keys[3] is None
+    assert (
+        keys[0] == hilbert_keys([table.column("bbox")[0]["xmin"].as_py()], [table.column("bbox")[0]["ymin"].as_py()])[0]
+    )
+
+    properties = [dict(row) for row in table.column("properties").to_pylist()]
+    assert sorted(p["ref"] for p in properties) == ["0", "1", "2", "no_location"]
+    assert {p["ref"]: p.get("number") for p in properties}["1"] == "1"
+    assert table.column("geom").to_pylist()[3] is None
+    assert table.column("bbox").to_pylist()[3] is None
+
+    geo = json.loads(pyarrow.parquet.read_metadata(io.BytesIO(output.getvalue())).metadata[b"geo"])
+    assert geo["columns"]["geom"]["geometry_types"] == ["Point"]
+    assert geo["bbox"] == [-74.0, -33.9, 151.2, 51.5]
@@ -1,5 +1,10 @@
+import shapely
+
 from locations.geo import (
+    QuadtreeCell,
+    QuadtreeSearch,
     antimeridian_safe_longitude_sum,
+    bbox_area,
     bbox_contains,
     bbox_split,
     bbox_to_geojson,
@@ -326,3 +331,74 @@ def test_bbox_split():
         ((80.05, 179.9), (74.95, -169.9)),
         ((75.05, 179.9), (69.95, -169.9)),
     ]
+
+
+def test_point_locations_bbox_and_polygon():
+    points_file = "eu_centroids_120km_radius_country.csv"
+    bbox = (-10, 50, 2, 60)
+    expected = [
+        (lat, lon)
+        for lat, lon in point_locations(points_file)
+        if bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]
+    ]
+    assert 0 < len(expected)
+    assert list(point_locations(points_file, bbox=bbox)) == expected
+    assert list(point_locations(points_file, polygon=shapely.box(*bbox))) == expected
+    assert list(point_locations(points_file, "DE", bbox=bbox)) == []
+
+
+def test_country_iseadgg_centroids_bbox():
+    centroids = country_iseadgg_centroids("AU", 94)
+    bbox = (140, -40, 155, -25)
+    assert sorted(country_iseadgg_centroids("AU", 94, bbox=bbox)) == sorted(
+        (lat, lon) for lat, lon in centroids if bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]
+    )
+
+
+def test_bbox_area():
+    assert bbox_area((-10, -5, 10, 5)) == 200
+
+
+def test_quadtree_search():
+    # A dense city, a small town, and nothing else.
+    points = [(0.5 + i / 1000, 0.5 + j / 1000) for i in range(10) for j in range(10)] + [(-5.0, 5.0)]
+
+    def search(bounds):
+        xmin, ymin, xmax, ymax = bounds
+        # As an API returning at most 20 results.
+        return [(x, y) for x, y in points if xmin <= x < xmax and ymin <= y < ymax][:20]
+
+    quadtree = QuadtreeSearch((-10, -10, 10, 10), result_limit=20, num_tiles=2)
+    found = set()
+    pending = quadtree.cells()
+    assert pending[0] == QuadtreeCell((-10, -10, 0, 0), 0)
+    while pending:
+        cell = pending.pop()
+        results = search(cell.bounds)
+        found.update(results)
+        pending.extend(quadtree.record(cell, len(results)))
+
+    assert found == set(points)
+    assert quadtree.coverage() == 1
+    assert quadtree.truncated_cells == 0
+    assert quadtree.requests < quadtree.fixed_grid_requests() / 100
+
+
+def test_quadtree_search_max_depth():
+    quadtree = QuadtreeSearch((0, 0, 1, 1), result_limit=10, max_depth=1)
+    (cell,) = quadtree.cells()
+    subcells = quadtree.record(cell, 10)
+    assert subcells == [
+        QuadtreeCell((0, 0, 0.5, 0.5), 1),
+        QuadtreeCell((0, 0.5, 0.5, 1), 1),
+        QuadtreeCell((0.5, 0, 1, 0.5), 1),
+        QuadtreeCell((0.5, 0.5, 1, 1), 1),
+    ]
+    assert quadtree.record(subcells[0], 10) == []
+    assert quadtree.record(subcells[1], 0) == []
+    assert quadtree.record(subcells[2], 3) == []
+    assert quadtree.truncated_cells == 1
+    assert quadtree.empty_cells == 1
+    assert quadtree.coverage() == 0.5
+    assert quadtree.requests == 5
+    assert quadtree.fixed_grid_requests() == 4
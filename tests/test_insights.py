@@ -0,0 +1,92 @@
+import json
+from collections import Counter
+from zipfile import ZipFile
+
+import pyarrow as pa
+import pyarrow.parquet
+
+from locations.commands.insights import (
+    count_atp_wikidata_codes,
+    count_value_types,
+    find_sources,
+    iter_features,
+    scan_features,
+)
+
+FEATURES = [
+    {"type": "Feature", "properties": {"@spider": "a", "brand:wikidata": "Q1", "addr:country": "GB", "brand": "A"}},
+    {"type": "Feature", "properties": {"@spider": "a", "brand:wikidata": "Q1", "addr:country": "IE", "nsi_id": "a"}},
+    {"type": "Feature", "properties": {"@spider": "b", "brand:wikidata": "Q2", "ref": 1}},
+    {"type": "Feature", "properties": {"@spider": "b"}},
+]
+
+
+def write_inputs(tmp_path):
+    with open(tmp_path / "a.geojson", "w") as f:
+        json.dump({"type": "FeatureCollection", "features": FEATURES[:2]}, f)
+    with open(tmp_path / "b.ndgeojson", "w") as f:
+        for feature in FEATURES[2:]:
+            f.write(json.dumps(feature) + "\n")
+    with ZipFile(tmp_path / "c.zip", "w") as zip_file:
+        zip_file.writestr("c.geojson", json.dumps({"type": "FeatureCollection", "features": FEATURES}))
+    (tmp_path / "empty.geojson").touch()
+    (tmp_path / "notes.txt").write_text("ignored")
+
+
+def test_iter_features(tmp_path):
+    write_inputs(tmp_path)
+    features = list(iter_features([str(tmp_path)], []))
+    assert sorted(json.dumps(f, sort_keys=True) for f in features) == sorted(
+        json.dumps(f, sort_keys=True) for f in FEATURES * 2
+    )
+    assert len(list(iter_features([str(tmp_path)], ["c.geojson"]))) == 4
+
+
+def test_iter_features_parquet_properties_map(tmp_path):
+    properties = [list((k, str(v)) for k, v in f["properties"].items()) for f in FEATURES]
+    table = pa.table(
+        {
+            "id": pa.array(["1", "2", "3", "4"]),
+            "properties": pa.array(properties, pa.map_(pa.string(), pa.string())),
+        }
+    )
+    pyarrow.parquet.write_table(table, tmp_path / "output.parquet", row_group_size=3)
+
+    assert len(find_sources([str(tmp_path / "output.parquet")], [])) == 2
+    features = list(iter_features([str(tmp_path / "output.parquet")], []))
+    assert [f["properties"] for f in features] == [{k: str(v) for k, v in f["properties"].items()} for f in FEATURES]
+    assert len(list(iter_features([str(tmp_path / "output.parquet")], ["b"]))) == 2
+
+
+def test_iter_features_parquet_columns(tmp_path):
+    table = pa.table(
+        {
+            "geometry": pa.array([None, None], pa.binary()),
+            "@spider": pa.array(["a", "b"]),
+            "brand": pa.array(["A", None]),
+        },
+        metadata={"geo": json.dumps({"primary_column": "geometry", "columns": {"geometry": {"encoding": "WKB"}}})},
+    )
+    pyarrow.parquet.write_table(table, tmp_path / "output.parquet")
+
+    features = list(iter_features([str(tmp_path / "output.parquet")], []))
+    assert [f["properties"] for f in features] == [{"@spider": "a", "brand": "A"}, {"@spider": "b"}]
+
+
+def test_scan_features_parallel(tmp_path):
+    write_inputs(tmp_path)
+    serial = list(scan_features(count_atp_wikidata_codes, [str(tmp_path)], [], 1))
+    parallel = list(scan_features(count_atp_wikidata_codes, [str(tmp_path)], [], 4))
+    assert parallel == serial
+
+    value_types = Counter()
+    for counter in scan_features(count_value_types, [str(tmp_path)], [], 4):
+        value_types.update(counter)
+    assert value_types == Counter({"b/ref/int": 2})
+
+
+def test_count_atp_wikidata_codes():
+    assert count_atp_wikidata_codes(FEATURES) == {
+        "Q1": {"nsi_id": "a", "atp_count": 2, "atp_brand": "A", "atp_splits": {"GB": {"a": 1}, "IE": {"a": 1}}},
+        "Q2": {"nsi_id": None, "atp_count": 1, "atp_brand": None, "atp_splits": {None: {"b": 1}}},
+    }
@@ -1,3 +1,6 @@
+import json
+
+from locations import name_suggestion_index
 from locations.name_suggestion_index import NSI
 
 
@@ -49,3 +52,103 @@ def test_iter_nsi():
     i = matches[0]
     assert i["displayName"] == "Greggs"
     assert i["tags"]["amenity"] == "fast_food"
+
+
+def _nsi_from_data(wikidata_json: dict, nsi_json: dict) -> NSI:
+    # Bypass the singleton and vendored data files.
+    nsi = object.__new__(NSI)
+    nsi.__init__()
+    nsi.wikidata_json = wikidata_json
+    nsi.nsi_json = nsi_json
+    nsi._build_nsi_indexes()
+    nsi.loaded = True
+    return nsi
+
+
+def test_indexed_lookups():
+    nsi = _nsi_from_data(
+        {
+            "Q1": {"label": "Example Shop", "officialWebsites": ["https://shop.example.com/"]},
+            "Q2": {"label": "Example", "officialWebsites": ["https://www.example.com/", "https://example.org/"]},
+            "Q3": {"label": "Other Example", "officialWebsites": ["https://example.com/"]},
+        },
+        {
+            "brands/shop/convenience": {
+                "items": [
+                    {"id": "a", "locationSet": {"include": ["gb", "ie"]}, "tags": {"brand:wikidata": "Q1"}},
+                    {"id": "b", "locationSet": {"include": ["001"]}, "tags": {"brand:wikidata": "Q2"}},
+                ]
+            },
+            "operators/amenity/toilets": {
+                "items": [
+                    {
+                        "id": "c",
+                        "locationSet": {"include": ["gb", "gb"]},
+                        "tags": {"brand:wikidata": "Q1", "operator:wikidata": "Q1"},
+                    },
+                    {"id": "d", "locationSet": {"include": [[0.1, 51.5, 10]]}, "tags": {"operator:wikidata": "Q3"}},
+                ]
+            },
+        },
+    )
+
+    assert nsi.get_wikidata_code_from_url("https://shop.example.com/stores") == "Q1"
+    assert nsi.get_wikidata_code_from_url("https://example.com/") == "Q3"
+    assert nsi.get_wikidata_code_from_url("https://www.example.org/") == "Q2"
+    assert nsi.get_wikidata_code_from_url("https://stores.example.com/") == "Q1"
+    assert nsi.get_wikidata_code_from_url("https://example.net/") is None
+
+    assert [i["id"] for i in nsi.iter_nsi("Q1")] == ["a", "c"]
+    assert [i["id"] for i in nsi.iter_nsi("Q3")] == ["d"]
+    assert [i["id"] for i in nsi.iter_nsi("Q4")] == []
+    assert [i["id"] for i in nsi.iter_nsi()] == ["a", "b", "c", "d"]
+
+    assert [i["id"] for i in nsi.iter_country("GB")] == ["a", "c"]
+    assert [i["id"] for i in nsi.iter_country("001")] == ["b"]
+    assert [i["id"] for i in nsi.iter_country()] == ["a", "b", "c", "d"]
+
+    assert [k for k, _ in nsi.iter_wikidata("example")] == ["Q1", "Q2", "Q3"]
+    assert [k for k, _ in nsi.iter_wikidata("other")] == ["Q3"]
+
+
+def test_snapshot(tmp_path, monkeypatch):
+    wikidata_json = {
+        "Q1": {"label": "Example Shop", "officialWebsites": ["https://shop.example.com/"]},
+        "Q2": {"label": "Example", "officialWebsites": ["https://www.example.com/"], "dissolutions": [{}]},
+    }
+    nsi_json = {
+        "brands/shop/convenience": {
+            "properties": {"path": "brands/shop/convenience"},
+            "items": [
+                {"id": "a", "locationSet": {"include": ["gb", "ie"]}, "tags": {"brand:wikidata": "Q1"}},
+                {"id": "b", "locationSet": {"include": ["001"]}, "tags": {"brand:wikidata": "Q2"}},
+            ],
+        },
+    }
+    monkeypatch.setattr(name_suggestion_index, "WIKIDATA_FILE_PATH", tmp_path / "nsi-wikidata.json")
+    monkeypatch.setattr(name_suggestion_index, "NSI_FILE_PATH", tmp_path / "nsi.json")
+    json.dump({"wikidata": wikidata_json}, open(tmp_path / "nsi-wikidata.json", "w"))
+    json.dump({"nsi": nsi_json}, open(tmp_path / "nsi.json", "w"))
+    name_suggestion_index.write_snapshot(tmp_path / "nsi.snapshot")
+
+    nsi = object.__new__(NSI)
+    nsi.__init__()
+    assert nsi._load_snapshot(tmp_path / "nsi.snapshot")
+    nsi.loaded = True
+
+    assert nsi.lookup_wikidata("Q1") == wikidata_json["Q1"]
+    assert nsi.lookup_wikidata("Q2") is None
+    assert nsi.lookup_wikidata("Q2", include_dissolved=True) == wikidata_json["Q2"]
+    assert nsi.lookup_wikidata("Q3") is None
+    assert list(nsi.iter_nsi("Q1")) == [nsi_json["brands/shop/convenience"]["items"][0]]
+    assert [i["id"] for i in nsi.iter_nsi()] == ["a", "b"]
+    assert [i["id"] for i in nsi.iter_country("IE")] == ["a"]
+    assert [k for k, _ in nsi.iter_wikidata("example")] == ["Q1", "Q2"]
+    assert nsi.get_wikidata_code_from_url("https://example.com/") == "Q2"
+    assert nsi.nsi_json == nsi_json
+
+    # A snapshot built from different vendored files is ignored.
+    json.dump({"nsi": {}}, open(tmp_path / "nsi.json", "w"))
+    nsi = object.__new__(NSI)
+    nsi.__init__()
+    assert not nsi._load_snapshot(tmp_path / "nsi.snapshot")
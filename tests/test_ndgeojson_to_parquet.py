@@ -1,10 +1,14 @@
+import json
+import os
 import shutil
 from pathlib import Path
 
 import psutil
+import pyarrow.parquet as pq
 from pandas import read_parquet
 
-from ci.ndgeojsons_to_parquet import cgroup_memory_limit_bytes, duckdb_memory_limit, to_parquet
+from ci.ndgeojsons_to_parquet import cgroup_memory_limit_bytes, merge_shards, to_parquet, worker_count
+from locations.exporters.parquet_shard import ShardWriter
 
 
 def _patch_cgroup_v2_path(monkeypatch, cgroup_v2_file: Path):
@@ -39,23 +43,22 @@ def test_cgroup_memory_limit_bytes_none_when_no_cgroup_files(monkeypatch, tmp_pa
     assert cgroup_memory_limit_bytes() is None
 
 
-def test_duckdb_memory_limit_uses_cgroup_limit_over_host_ram(monkeypatch, tmp_path: Path):
+def test_worker_count_uses_cgroup_limit_over_host_ram(monkeypatch, tmp_path: Path):
     limit_bytes = 1024**3  # 1 GiB, well below actual host RAM
     cgroup_v2 = tmp_path / "memory.max"
     cgroup_v2.write_text(str(limit_bytes))
     _patch_cgroup_v2_path(monkeypatch, cgroup_v2)
 
-    # duckdb_memory_limit reserves 2GB and floors to whole GB, so a 1GB cgroup
-    # limit (less than the 2GB reservation) clamps to the reservation itself.
-    assert duckdb_memory_limit() == "2GB"
+    # A 1GB cgroup limit is less than the memory of one worker, which still leaves one.
+    assert worker_count() == 1
 
 
-def test_duckdb_memory_limit_falls_back_to_host_ram_without_cgroup(monkeypatch, tmp_path: Path):
+def test_worker_count_falls_back_to_host_ram_without_cgroup(monkeypatch, tmp_path: Path):
     missing = tmp_path / "does-not-exist"
     monkeypatch.setattr("ci.ndgeojsons_to_parquet.Path", lambda p: missing)
 
-    expected_gb = max(psutil.virtual_memory().total - 2 * 1024**3, 2 * 1024**3) // 1024**3
-    assert duckdb_memory_limit() == f"{expected_gb}GB"
+    expected = max(1, min(os.cpu_count(), psutil.virtual_memory().total // (2 * 1024**3)))
+    assert worker_count() == expected
 
 
 def test_to_parquet(tmp_path: Path):
@@ -78,3 +81,106 @@ def test_to_parquet(tmp_path: Path):
     expected_top_level_columns = ["id", "type", "dataset_attributes", "properties", "geom", "bbox"]
     assert all(col in columns for col in expected_top_level_columns)
     # TODO: better GeoParquet file validation
+
+
+def test_merge_shards_merges_sorted_runs(tmp_path: Path):
+    shard_path = tmp_path / "a.parquet_shard"
+    writer = ShardWriter(str(shard_path), batch_size=2, run_batches=2)
+    lons = [170, -10, 50, -170, 0, 120, -60, 90, 10, -120, 30]
+    for i, lon in enumerate(lons):
+        writer.add({"type": "Feature", "id": str(i), "geometry": {"type": "Point", "coordinates": [lon, 0]}})
+    assert writer.close() == len(lons)
+
+    # Every 4 rows are sorted and written as a row group of their own.
+    shard = pq.ParquetFile(shard_path)
+    assert [shard.metadata.row_group(i).num_rows for i in range(shard.num_row_groups)] == [4, 4, 3]
+    for i in range(shard.num_row_groups):
+        keys = shard.read_row_group(i).column("hilbert").to_pylist()
+        assert keys == sorted(keys)
+    assert json.loads(shard.metadata.metadata[b"geo"])["bbox"] == [-170, 0, 170, 0]
+
+    output_path = tmp_path / "merged.parquet_shard"
+    assert merge_shards([shard_path], output_path) == len(lons)
+    merged = pq.read_table(output_path)
+    keys = merged.column("hilbert").to_pylist()
+    assert keys == sorted(keys)
+    assert sorted(merged.column("id").to_pylist()) == sorted(map(str, range(len(lons))))
+
+
+def test_shard_writer_only_writes_the_shard_when_closed(tmp_path: Path):
+    shard_path = tmp_path / "a.parquet_shard"
+    writer = ShardWriter(str(shard_path), batch_size=1, run_batches=1)
+    writer.add({"type": "Feature", "id": "0", "geometry": {"type": "Point", "coordinates": [0, 0]}})
+    writer.add({"type": "Feature", "id": "1", "geometry": {"type": "Point", "coordinates": [1, 1]}})
+    assert not shard_path.exists()
+    assert writer.close() == 2
+    assert pq.read_table(shard_path).num_rows == 2
+    assert list(tmp_path.iterdir()) == [shard_path]
+
+
+def test_to_parquet_converts_ndgeojson_of_truncated_shard(tmp_path: Path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    writer = ShardWriter(str(input_dir / "a.parquet_shard"))
+    writer.add({"type": "Feature", "id": "a0", "geometry": {"type": "Point", "coordinates": [0, 0]}})
+    writer.close()
+    # A shard cut short, without its footer, by a spider killed while writing it.
+    shutil.copy(Path("./tests/data/dixy_ru.ndgeojson"), input_dir)
+    writer = ShardWriter(str(tmp_path / "dixy_ru.parquet_shard"))
+    for line in Path("./tests/data/dixy_ru.ndgeojson").read_text().splitlines():
+        writer.add(json.loads(line))
+    writer.close()
+    (input_dir / "dixy_ru.parquet_shard").write_bytes((tmp_path / "dixy_ru.parquet_shard").read_bytes()[:-100])
+
+    output_parquet = tmp_path / "output.parquet"
+    to_parquet(input_dir, output_parquet)
+
+    assert pq.read_table(output_parquet).num_rows == 1 + 4
+
+
+def test_to_parquet_merges_shards(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr("ci.ndgeojsons_to_parquet.MAX_FAN_IN", 2)
+    monkeypatch.setattr("ci.ndgeojsons_to_parquet.MERGE_BUFFER_ROWS", 3)
+
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    lons = {"a": [10, -170, 100], "b": [0, 50, -60, 170], "c": [-10, 120], "d": [80, -100]}
+    for spider_name, spider_lons in lons.items():
+        writer = ShardWriter(str(input_dir / f"{spider_name}.parquet_shard"))
+        for i, lon in enumerate(spider_lons):
+            writer.add(
+                {
+                    "type": "Feature",
+                    "id": f"{spider_name}{i}",
+                    "dataset_attributes": {"@spider": spider_name},
+                    "properties": {"ref": i, "lon": lon},
+                    "geometry": {"type": "Point", "coordinates": [lon, lon / 4]},
+                }
+            )
+        writer.add({"type": "Feature", "id": f"{spider_name}-no-geometry", "properties": {}, "geometry": None})
+        writer.close()
+    # A spider without a shard has its NdGeoJSON converted.
+    shutil.copy(Path("./tests/data/dixy_ru.ndgeojson"), input_dir)
+    # An empty shard, from a spider without any items, is skipped.
+    (input_dir / "e.parquet_shard").touch()
+
+    output_parquet = tmp_path / "output.parquet"
+    to_parquet(input_dir, output_parquet)
+
+    output = pq.read_table(output_parquet)
+    assert output.schema.names == ["id", "type", "dataset_attributes", "properties", "geom", "bbox"]
+    assert output.num_rows == 11 + 4 + 4
+    ids = output.column("id").to_pylist()
+    assert sorted(ids) == sorted(
+        [f"{spider_name}{i}" for spider_name, spider_lons in lons.items() for i in range(len(spider_lons))]
+        + [f"{spider_name}-no-geometry" for spider_name in lons]
+        + [row["id"] for row in map(json.loads, Path("./tests/data/dixy_ru.ndgeojson").read_text().splitlines())]
+    )
+    # Rows without geometry come last.
+    assert all(id.endswith("-no-geometry") for id in ids[-4:])
+    assert dict(output.column("properties")[ids.index("a0")].as_py()) == {"ref": "0", "lon": "10"}
+
+    geo = json.loads(output.schema.metadata[b"geo"])
+    assert geo["primary_column"] == "geom"
+    assert geo["columns"]["geom"]["geometry_types"] == ["Point"]
+    assert geo["bbox"][0] == -170 and geo["bbox"][2] == 170
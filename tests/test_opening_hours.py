@@ -1,17 +1,23 @@
 import time
 
+import pytest
+
 from locations.hours import (
+    CLOSED_EN,
     CLOSED_IT,
     DAYS,
     DAYS_BG,
     DAYS_DE,
+    DAYS_EN,
     DAYS_ES,
     DAYS_IT,
     DAYS_PL,
     DAYS_RU,
+    DELIMITERS_EN,
     DELIMITERS_ES,
     DELIMITERS_IT,
     DELIMITERS_RU,
+    NAMED_DAY_RANGES_EN,
     NAMED_DAY_RANGES_IT,
     NAMED_DAY_RANGES_RU,
     NAMED_TIMES_IT,
@@ -48,6 +54,20 @@ def test_times():
     assert o.as_opening_hours() == "Mo 07:00-17:00; Tu 09:00-19:00"
 
 
+def test_time_formats():
+    o = OpeningHours()
+    o.add_range("Mo", "9:5", "17:30")
+    o.add_range("Tu", "08:30:00", "20:00:59", time_format="%H:%M:%S")
+    o.add_range("We", "10:00 AM", "09:00 PM", time_format="%I:%M %p")
+    o.add_range("Th", "1000", "2100", time_format="%H%M")
+    assert o.day_hours["Mo"] == {(9 * 60 + 5, 17 * 60 + 30)}
+    assert o.as_opening_hours() == "Mo 09:05-17:30; Tu 08:30-20:00; We-Th 10:00-21:00"
+
+    for open_time, close_time in [("25:00", "26:00"), ("09:60", "17:00"), ("9am", "5pm")]:
+        with pytest.raises(ValueError):
+            OpeningHours().add_range("Mo", open_time, close_time)
+
+
 def test_two_ranges():
     o = OpeningHours()
     o.add_range("Mo", "07:00", "17:00")
@@ -386,6 +406,26 @@ def test_add_ranges_from_string():
     assert o.as_opening_hours() == "Mo-Fr 09:00-13:00,15:00-19:30; Sa 09:00-19:30; Su 10:00-13:00,15:00-19:30"
 
 
+def test_extraction_regexes_cached_per_locale():
+    OpeningHours.extract_hours_from_string("Mo-Fr 09:00-17:00")
+    OpeningHours.extract_hours_from_string("Mo-Fr 09:00-17:00", days=DAYS_DE)
+    en_regexes = OpeningHours._compiled_extraction_regexes(
+        tuple(DAYS_EN.items()), tuple(NAMED_DAY_RANGES_EN.keys()), tuple(DELIMITERS_EN), tuple(CLOSED_EN)
+    )
+    de_regexes = OpeningHours._compiled_extraction_regexes(
+        tuple(DAYS_DE.items()), tuple(NAMED_DAY_RANGES_EN.keys()), tuple(DELIMITERS_EN), tuple(CLOSED_EN)
+    )
+    assert en_regexes is OpeningHours._compiled_extraction_regexes(
+        tuple(dict(DAYS_EN).items()), tuple(NAMED_DAY_RANGES_EN.keys()), tuple(DELIMITERS_EN), tuple(CLOSED_EN)
+    )
+    assert en_regexes is not de_regexes
+
+    # A modified copy of a locale table must not reuse the cached regexes of the original.
+    days = dict(DAYS_EN) | {"Montag": "Mo"}
+    assert OpeningHours.extract_hours_from_string("Montag 09:00-17:00", days=days) == [(["Mo"], "09:00", "17:00")]
+    assert OpeningHours.extract_hours_from_string("Montag 09:00-17:00") == []
+
+
 def test_oh_as_bool():
     # https://github.com/alltheplaces/alltheplaces/pull/8779#issue-2395034394
     o = OpeningHours()
@@ -310,3 +310,64 @@ def test_brand_state_not_required():
     )
     pipeline.process_item(item)
     assert item.get("nsi_id")
+
+
+def test_match_cache(monkeypatch):
+    # Cached matches apply the same tags and count the same stats as matching each item afresh.
+    monkeypatch.setattr(
+        ApplyNSICategoriesPipeline,
+        "wikidata_cache",
+        {
+            "Q1": [
+                {
+                    "id": "brand-us",
+                    "tags": {"amenity": "fast_food", "brand:wikidata": "Q1", "brand": "One"},
+                    "locationSet": {"include": ["us"]},
+                },
+                {
+                    "id": "brand-tx",
+                    "tags": {"amenity": "fast_food", "brand:wikidata": "Q1", "cuisine": "chicken"},
+                    "locationSet": {"include": ["us-tx.geojson"]},
+                },
+                {
+                    "id": "operator",
+                    "tags": {"amenity": "toilets", "operator:wikidata": "Q1"},
+                    "locationSet": {"include": ["001"]},
+                },
+            ],
+            "Q2": [],
+        },
+    )
+    cases = [
+        {"brand_wikidata": "Q1", "country": "US", "state": "NY", "categories": [Categories.FAST_FOOD.value]},
+        {"brand_wikidata": "Q1", "country": "US", "state": "TX", "categories": [Categories.FAST_FOOD.value]},
+        {"brand_wikidata": "Q1", "country": "GB", "categories": [Categories.FAST_FOOD.value]},
+        {"brand_wikidata": "Q1", "country": "US"},
+        {"operator_wikidata": "Q1", "categories": [Categories.TOILETS.value]},
+        {"operator_wikidata": "Q1"},
+        {"brand_wikidata": "Q2", "country": "US"},
+    ]
+
+    def get_item(case: dict) -> Feature:
+        item = get_test_objects(spider_name="test", **case)[0]
+        # Operator matching needs brand_wikidata to be absent rather than None.
+        for key in [key for key, value in item.items() if value is None]:
+            del item[key]
+        return item
+
+    cached_pipeline = get_test_objects(spider_name="test")[1]
+    for case in cases * 3:
+        item = get_item(case)
+        cached_item = get_item(case)
+        get_test_objects(spider_name="test")[1].process_item(item)
+        cached_pipeline.process_item(cached_item)
+        assert cached_item == item
+
+    assert len(cached_pipeline.match_cache) == len(cases)
+    expected_stats = {}
+    for case in cases:
+        pipeline = get_test_objects(spider_name="test")[1]
+        pipeline.process_item(get_item(case))
+        for key, value in pipeline.crawler.stats.get_stats().items():
+            expected_stats[key] = expected_stats.get(key, 0) + 3 * value
+    assert cached_pipeline.crawler.stats.get_stats() == expected_stats
@@ -0,0 +1,71 @@
+import pytest
+from scrapy.exceptions import DropItem
+from scrapy.utils.spider import DefaultSpider
+from scrapy.utils.test import get_crawler
+
+from locations.items import Feature
+from locations.pipelines.duplicates import CompactRefSet, DiskRefSet, DuplicatesPipeline, RefSet
+
+
+def get_pipeline(settings: dict = None, **spider_attributes) -> DuplicatesPipeline:
+    crawler = get_crawler(DefaultSpider, settings or {})
+    crawler.stats.open_spider()
+    crawler.spider = crawler._create_spider("example")
+    for name, value in spider_attributes.items():
+        setattr(crawler.spider, name, value)
+    pipeline = DuplicatesPipeline.from_crawler(crawler)
+    pipeline.open_spider()
+    return pipeline
+
+
+def process(pipeline: DuplicatesPipeline, refs: list) -> list:
+    kept = []
+    for ref in refs:
+        try:
+            kept.append(pipeline.process_item(Feature(ref=ref))["ref"])
+        except DropItem:
+            pass
+    return kept
+
+
+@pytest.mark.parametrize("store", ["set", "compact", "compact64", "disk"])
+def test_duplicates(store):
+    pipeline = get_pipeline({"DUPLICATES_STORE": store})
+    assert process(pipeline, ["1", "2", "1", "3", "2", "1"]) == ["1", "2", "3"]
+    assert pipeline.crawler.stats.get_value("atp/duplicate_count") == 3
+    pipeline.close_spider()
+
+
+def test_spider_attribute():
+    pipeline = get_pipeline({"DUPLICATES_STORE": "set"}, duplicates_store="disk")
+    assert isinstance(pipeline.ids_seen, DiskRefSet)
+
+
+def test_no_refs():
+    pipeline = get_pipeline(no_refs=True)
+    assert process(pipeline, ["1", "1"]) == ["1", "1"]
+    assert pipeline.crawler.stats.get_value("atp/duplicate_count") is None
+
+
+def test_unknown_store():
+    with pytest.raises(ValueError):
+        get_pipeline({"DUPLICATES_STORE": "bloom"})
+
+
+@pytest.mark.parametrize("ref_set", [RefSet, lambda: CompactRefSet(64), lambda: CompactRefSet(128), DiskRefSet])
+def test_ref_sets(ref_set):
+    refs = ref_set()
+    # Enough refs for the compact table to grow several times.
+    assert all(refs.add(str(i)) for i in range(10000))
+    assert not any(refs.add(str(i)) for i in range(10000))
+    assert refs.add("10000")
+    refs.close()
+
+
+def test_compact_ref_set_load():
+    refs = CompactRefSet()
+    for i in range(5000):
+        refs.add(str(i))
+    assert refs.size == 5000
+    assert refs.size <= refs.capacity * CompactRefSet.MAX_LOAD
+    assert len(refs.highs) == len(refs.lows) == refs.capacity
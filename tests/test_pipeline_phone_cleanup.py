@@ -122,3 +122,33 @@ def test_all_zeros():
     item, pipeline, spider = get_objects("(000) 000-00-00", "US")
     pipeline.process_item(item)
     assert not item.get("phone")
+
+
+def test_cache():
+    item, pipeline, spider = get_objects("(248) 446-8015; 248-446-8015; 12345", "US")
+    pipeline.process_item(item)
+    assert item.get("phone") == "+1 248-446-8015;12345"
+
+    item = Feature(phone="(248) 446-8015; 12345", country="US")
+    pipeline.process_item(item)
+    assert item.get("phone") == "+1 248-446-8015;12345"
+
+    stats = pipeline.crawler.stats
+    assert stats.get_value("atp/phone_cache/miss") == 3
+    assert stats.get_value("atp/phone_cache/hit") == 2
+    # Invalid numbers are counted for every item, cached or not.
+    assert stats.get_value("atp/field/phone/invalid") == 2
+
+    # The same number is looked up again in another country.
+    item = Feature(phone="(248) 446-8015", country="CA")
+    pipeline.process_item(item)
+    assert stats.get_value("atp/phone_cache/miss") == 4
+
+
+def test_cache_size():
+    item, pipeline, spider = get_objects(None, "US")
+    pipeline.cache_size = 2
+    for phone in ["248-446-8015", "248-446-8016", "248-446-8017", "248-446-8015"]:
+        pipeline.normalize(phone, "US", spider)
+    assert list(pipeline.cache) == [("248-446-8017", "US"), ("248-446-8015", "US")]
+    assert pipeline.crawler.stats.get_value("atp/phone_cache/miss") == 4
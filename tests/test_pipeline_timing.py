@@ -0,0 +1,100 @@
+import tracemalloc
+
+import pytest
+from scrapy.exceptions import DropItem
+from scrapy.utils.spider import DefaultSpider
+from scrapy.utils.test import get_crawler
+
+from locations.extensions.pipeline_timing import LatencyHistogram, TimedItemPipelineManager
+from locations.items import Feature
+
+
+class AddRefPipeline:
+    def process_item(self, item):
+        item["ref"] = "1"
+        return item
+
+
+class DropAllPipeline:
+    def process_item(self, item, spider):
+        raise DropItem("Dropped")
+
+
+class AsyncPipeline:
+    async def process_item(self, item):
+        return item
+
+
+pytestmark = pytest.mark.filterwarnings("ignore:.*requires a spider argument")
+
+
+def get_manager(settings: dict) -> TimedItemPipelineManager:
+    crawler = get_crawler(DefaultSpider, settings)
+    crawler.spider = crawler._create_spider("example")
+    return TimedItemPipelineManager(AddRefPipeline(), DropAllPipeline(), AsyncPipeline(), crawler=crawler)
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    for ms in range(1, 101):
+        histogram.add(ms / 1000)
+    assert abs(histogram.percentile(50) - 0.050) < 0.050 * 0.05
+    assert abs(histogram.percentile(99) - 0.099) < 0.099 * 0.05
+
+
+def test_disabled():
+    manager = get_manager({"PIPELINE_TIMING_ENABLED": False})
+    assert manager.timings == {}
+    assert manager.methods["process_item"][0].__qualname__ == "AddRefPipeline.process_item"
+
+
+def test_timing():
+    manager = get_manager({"PIPELINE_TIMING_ENABLED": True})
+    add_ref, drop_all, _ = manager.middlewares
+    item = Feature()
+    for _ in range(3):
+        add_ref.process_item(item)
+        try:
+            drop_all.process_item(item, manager.crawler.spider)
+        except DropItem:
+            pass
+    assert item["ref"] == "1"
+    manager.publish_stats()
+
+    stats = manager.crawler.stats.get_stats()
+    assert stats["atp/perf/pipeline/AddRefPipeline/calls"] == 3
+    assert stats["atp/perf/pipeline/DropAllPipeline/calls"] == 3
+    assert stats["atp/perf/pipeline/AsyncPipeline/calls"] == 0
+    assert stats["atp/perf/pipeline/AddRefPipeline/p50_ms"] <= stats["atp/perf/pipeline/AddRefPipeline/p99_ms"]
+    assert "atp/perf/pipeline/AsyncPipeline/p50_ms" not in stats
+    assert "atp/perf/pipeline/AddRefPipeline/tracemalloc_samples" not in stats
+
+
+def test_wrapped_signature():
+    manager = get_manager({"PIPELINE_TIMING_ENABLED": True})
+    add_ref, drop_all, async_pipeline = manager.middlewares
+    # The manager passes the spider only to methods which take it.
+    assert manager._mw_methods_requiring_spider == {drop_all.process_item}
+    assert list(manager.methods["process_item"]) == [
+        add_ref.process_item,
+        drop_all.process_item,
+        async_pipeline.process_item,
+    ]
+    assert add_ref.process_item.__wrapped__.__self__ is add_ref
+
+
+def test_tracemalloc_sampling():
+    was_tracing = tracemalloc.is_tracing()
+    manager = get_manager({"PIPELINE_TIMING_ENABLED": True, "PIPELINE_TIMING_TRACEMALLOC_SAMPLE_RATE": 2})
+    try:
+        add_ref = manager.middlewares[0]
+        for _ in range(5):
+            add_ref.process_item(Feature())
+        manager.publish_stats()
+        stats = manager.crawler.stats.get_stats()
+        assert stats["atp/perf/pipeline/AddRefPipeline/tracemalloc_samples"] == 3
+        assert stats["atp/perf/pipeline/AddRefPipeline/tracemalloc_peak_bytes_max"] >= 0
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,98 @@
+import reverse_geocoder
+from scrapy import Request
+from scrapy.http import TextResponse
+from scrapy.utils.spider import DefaultSpider
+from scrapy.utils.test import get_crawler
+
+from locations.items import Feature
+from locations.middlewares.reverse_geocode_batch import ReverseGeocodeBatchMiddleware
+from locations.pipelines.country_code_clean_up import CountryCodeCleanUpPipeline
+from locations.reverse_geocoding import ReverseGeocoder
+
+LOCATIONS = [(43.0, -80.0), (31.0, -97.0), (51.5072, -0.1276), (-33.8688, 151.2093), (43.0, -80.0)]
+
+
+def test_get_matches_reverse_geocoder():
+    geocoder = ReverseGeocoder()
+    for lat, lon in LOCATIONS:
+        assert geocoder.get(lat, lon) == reverse_geocoder.get((lat, lon), mode=1, verbose=False)
+    assert len(geocoder.cache) == 4
+
+
+def test_prefetch_matches_reverse_geocoder():
+    geocoder = ReverseGeocoder()
+    geocoder.prefetch(LOCATIONS)
+    assert len(geocoder.cache) == 4
+    for lat, lon in LOCATIONS:
+        assert geocoder.cache[geocoder.key(lat, lon)] == reverse_geocoder.get((lat, lon), mode=1, verbose=False)
+
+
+def test_cache_size():
+    geocoder = ReverseGeocoder(cache_size=2)
+    geocoder.get(*LOCATIONS[0])
+    geocoder.get(*LOCATIONS[1])
+    geocoder.get(*LOCATIONS[0])
+    geocoder.get(*LOCATIONS[2])
+    assert list(geocoder.cache.keys()) == [geocoder.key(*LOCATIONS[0]), geocoder.key(*LOCATIONS[2])]
+
+
+def test_shared_per_crawler():
+    crawler = get_crawler(DefaultSpider)
+    assert ReverseGeocoder.from_crawler(crawler) is ReverseGeocoder.from_crawler(crawler)
+    assert ReverseGeocoder.from_crawler(crawler) is not ReverseGeocoder.from_crawler(get_crawler(DefaultSpider))
+
+
+def test_batch_middleware():
+    crawler = get_crawler(DefaultSpider, {"REVERSE_GEOCODE_BATCH_SIZE": 2})
+    crawler.spider = crawler._create_spider()
+    crawler.spider.name = "meaningless"
+    middleware = ReverseGeocodeBatchMiddleware.from_crawler(crawler)
+    pipeline = CountryCodeCleanUpPipeline(crawler)
+
+    items = []
+    for lat, lon in LOCATIONS:
+        item = Feature()
+        item["lat"], item["lon"] = lat, lon
+        items.append(item)
+    request = Request("https://example.com/next")
+    response = TextResponse("https://example.com", body=b"")
+
+    output = list(middleware.process_spider_output(response, [items[0], request, *items[1:]]))
+    assert output == [request, *items]
+    assert len(middleware.reverse_geocoder.cache) == 4
+
+    for item in items:
+        pipeline.process_item(item)
+    assert [item["country"] for item in items] == ["CA", "US", "GB", "AU", "CA"]
+    assert crawler.stats.get_value("atp/field/country/from_reverse_geocoding") == 5
+
+
+def test_batch_middleware_only_prefetches_what_pipelines_geocode():
+    crawler = get_crawler(DefaultSpider)
+    crawler.spider = crawler._create_spider()
+    crawler.spider.name = "example_gb"
+    middleware = ReverseGeocodeBatchMiddleware.from_crawler(crawler)
+
+    def feature(**kwargs) -> Feature:
+        item = Feature(lat=51.5072, lon=-0.1276)
+        item.update(kwargs)
+        return item
+
+    # The country comes from the spider name, and only US and CA states are reverse geocoded.
+    assert not middleware.will_reverse_geocode(feature())
+    # A valid state is kept, an invalid one is reverse geocoded.
+    assert not middleware.will_reverse_geocode(feature(country="US", state="TX"))
+    assert middleware.will_reverse_geocode(feature(country="United States", state="Nowhere"))
+
+    crawler.spider.name = "meaningless"
+    del middleware.spider_name_country
+    assert not middleware.will_reverse_geocode(feature(website="https://example.co.uk/store"))
+    assert middleware.will_reverse_geocode(feature())
+    crawler.spider.skip_auto_cc_geocoder = True
+    assert not middleware.will_reverse_geocode(feature())
+    crawler.spider.skip_auto_cc = True
+    assert not middleware.will_reverse_geocode(feature(country="Nowhere"))
+
+    items = [feature(country="GB"), feature(country="GB", lat=31.0, lon=-97.0)]
+    assert list(middleware.process_spider_output(TextResponse("https://example.com", body=b""), items)) == items
+    assert len(middleware.reverse_geocoder.cache) == 0
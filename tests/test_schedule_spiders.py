@@ -0,0 +1,58 @@
+import json
+
+from ci.schedule_spiders import load_elapsed_times, order_longest_first, predict_elapsed_times, predict_makespan
+
+
+def test_load_elapsed_times_from_results(tmp_path):
+    results = tmp_path / "_results.json"
+    results.write_text(
+        json.dumps(
+            {
+                "count": 3,
+                "results": [
+                    {"spider": "mcdonalds", "elapsed_time": 120.5},
+                    {"spider": "burger_king", "elapsed_time": 0},
+                    {"spider": "wendys", "elapsed_time": 30},
+                ],
+            }
+        )
+    )
+
+    assert load_elapsed_times(results) == {"mcdonalds": 120.5, "wendys": 30.0}
+
+
+def test_load_elapsed_times_from_manifest(tmp_path):
+    manifest = tmp_path / "brands.manifest.json"
+    manifest.write_text(json.dumps({"group": "brands", "spiders": {"mcdonalds": {"elapsed_time": 42.5}}}))
+
+    assert load_elapsed_times(manifest) == {"mcdonalds": 42.5}
+
+
+def test_load_elapsed_times_from_stats_dir(tmp_path):
+    (tmp_path / "mcdonalds.json").write_text(json.dumps({"elapsed_time_seconds": 42.5}))
+    (tmp_path / "broken.json").write_text("{")
+    (tmp_path / "_results.json").write_text(json.dumps({"results": []}))
+
+    assert load_elapsed_times(tmp_path) == {"mcdonalds": 42.5}
+
+
+def test_predict_elapsed_times():
+    history = {"a": 100.0, "b": 300.0, "c": 50000.0}
+
+    assert predict_elapsed_times(["a", "b", "c", "new"], history) == {"a": 100, "b": 300, "c": 50000, "new": 300}
+    assert predict_elapsed_times(["a", "new"], history, default=10, timeout=28800) == {"a": 100, "new": 10}
+    assert predict_elapsed_times(["c"], history, timeout=28800) == {"c": 28800}
+    assert predict_elapsed_times(["new"], {}) == {"new": 600}
+
+
+def test_longest_first_shortens_makespan():
+    # A long spider late in alphabetical order starts once the others are done.
+    elapsed_times = {"a": 10.0, "b": 10.0, "c": 10.0, "d": 10.0, "z": 40.0}
+    spider_names = sorted(elapsed_times)
+
+    assert predict_makespan(spider_names, elapsed_times, 2) == 60
+    ordered = order_longest_first(spider_names, elapsed_times)
+    assert ordered == ["z", "a", "b", "c", "d"]
+    assert predict_makespan(ordered, elapsed_times, 2) == 40
+    assert predict_makespan(ordered, elapsed_times, 10) == 40
+    assert predict_makespan([], elapsed_times, 2) == 0
@@ -0,0 +1,61 @@
+import os
+
+import numpy
+import shapely
+
+from locations.searchable_points import get_searchable_points_path
+from locations.searchable_points.store import PointsStore, read_source, write_store
+
+NAMES = ["eu_centroids_120km_radius_country.csv", "us_centroids_50mile_radius_state.csv", "postcodes/frzips.csv.gz"]
+
+
+def test_store_matches_source(tmp_path):
+    store_path = tmp_path / "points.store"
+    write_store(store_path, NAMES)
+    store = PointsStore(store_path)
+    assert store.load()
+    for name in NAMES:
+        source = read_source(name)
+        stored = store.get(name)
+        # Points without coordinates, such as some French postcodes, are NaN.
+        assert numpy.array_equal(stored.latitudes, source.latitudes, equal_nan=True)
+        assert numpy.array_equal(stored.longitudes, source.longitudes, equal_nan=True)
+        assert stored.areas == source.areas
+        assert list(stored.rows()) == list(source.rows())
+        if source.has_areas():
+            assert numpy.array_equal(stored.mask(["DE", "NY"]), source.mask(["DE", "NY"]))
+    assert store.get("iseadgg/au_centroids_iseadgg_94km_radius.csv") is None
+
+
+def test_store_keeps_missing_values(tmp_path):
+    store_path = tmp_path / "points.store"
+    write_store(store_path, ["postcodes/frzips.csv.gz"])
+    store = PointsStore(store_path)
+    assert store.load()
+    rows = list(store.get("postcodes/frzips.csv.gz").rows())
+    assert None in (row["lng"] for row in rows)
+    assert "None" not in (row["lng"] for row in rows)
+
+
+def test_mask():
+    point_set = read_source("eu_centroids_120km_radius_country.csv")
+    bbox = (-10, 50, 2, 60)
+    in_bbox = point_set.mask(bbox=bbox)
+    assert 0 < in_bbox.sum() < len(point_set)
+    assert numpy.array_equal(point_set.mask(polygon=shapely.box(*bbox)), in_bbox)
+    assert not (point_set.mask(["DE"]) & in_bbox).any()
+
+
+def test_out_of_date_store_entry(tmp_path):
+    store_path = tmp_path / "points.store"
+    name = "eu_centroids_120km_radius_country.csv"
+    write_store(store_path, [name])
+    path = get_searchable_points_path(name)
+    stat = os.stat(path)
+    try:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        store = PointsStore(store_path)
+        assert store.load()
+        assert store.get(name) is None
+    finally:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
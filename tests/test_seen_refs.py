@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from scrapy.http import JsonRequest, TextResponse
+from scrapy.utils.test import get_crawler
+
+from locations.seen_refs import SeenRefs
+from locations.storefinders.wp_store_locator import WPStoreLocatorSpider
+
+
+def test_seen_refs():
+    crawler = get_crawler()
+    crawler.stats.open_spider()
+    seen_refs = SeenRefs(crawler.stats)
+    records = [{"id": 1}, {"ID": "1"}, {"id": 2}, {"name": "no ref"}, {"name": "no ref"}, {"storeId": 2}]
+
+    assert list(seen_refs.filter(records)) == [{"id": 1}, {"id": 2}, {"name": "no ref"}, {"name": "no ref"}]
+    assert crawler.stats.get_value("atp/early_duplicate_count") == 2
+
+
+def test_seen_refs_keys():
+    seen_refs = SeenRefs(ref_keys=["storeId"])
+
+    assert seen_refs.is_new({"id": 1, "storeId": "A"})
+    assert seen_refs.is_new({"id": 1, "storeId": "B"})
+    assert not seen_refs.is_new({"id": 2, "storeId": "A"})
+
+
+class RadiusSearchSpider(WPStoreLocatorSpider):
+    name = "radius_search"
+    allowed_domains = ["example.com"]
+    searchable_points_files = ["eu_centroids_120km_radius_country.csv"]
+    area_field_filter = ["LU"]
+    search_radius = 200
+    max_results = 10
+
+
+def make_response(features: list[dict]) -> TextResponse:
+    url = "https://example.com/wp-admin/admin-ajax.php?action=store_search"
+    return TextResponse(url, body=json.dumps(features), encoding="utf-8", request=JsonRequest(url))
+
+
+async def collect(iterator) -> list:
+    return [value async for value in iterator]
+
+
+def test_wp_store_locator_skips_seen_refs():
+    crawler = get_crawler(RadiusSearchSpider)
+    crawler.stats.open_spider()
+    spider = crawler._create_spider()
+    assert len(asyncio.run(collect(spider.start()))) > 0
+
+    first = list(spider.parse(make_response([{"id": "1", "store": "A"}, {"id": "2", "store": "B"}])))
+    second = list(spider.parse(make_response([{"id": "2", "store": "B"}, {"id": "3", "store": "C"}])))
+
+    assert [item["ref"] for item in first + second] == ["1", "2", "3"]
+    assert crawler.stats.get_value("atp/early_duplicate_count") == 1
@@ -0,0 +1,137 @@
+import gzip
+import re
+
+from scrapy import Request
+from scrapy.http import Response, XmlResponse
+from scrapy.spiders import SitemapSpider as ScrapySitemapSpider
+from scrapy.utils.sitemap import Sitemap
+from scrapy.utils.test import get_crawler
+
+from locations.sitemap_spider import RuleMatcher, SitemapSpider, StreamingSitemap
+
+URLSET = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:xhtml="http://www.w3.org/1999/xhtml">'
+    + b"".join(
+        b"<url><loc> https://example.com/%s/%d </loc><lastmod>2024-01-01</lastmod>"
+        b'<xhtml:link rel="alternate" hreflang="fr" href="https://example.com/fr/%d"/></url>'
+        % (b"stores" if i % 3 == 0 else b"products", i, i)
+        for i in range(1000)
+    )
+    + b"<!-- comment --><url><lastmod>2024-01-01</lastmod></url></urlset>"
+)
+
+SITEMAPINDEX = (
+    b'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    b"<sitemap><loc>https://example.com/sitemap-stores.xml</loc></sitemap>"
+    b"<sitemap><loc>https://example.com/sitemap-products.xml</loc></sitemap>"
+    b"</sitemapindex>"
+)
+
+
+class ExampleSpider(SitemapSpider):
+    name = "example"
+    sitemap_urls = ["https://example.com/sitemap.xml"]
+    sitemap_follow = ["stores"]
+    sitemap_rules = [(r"/stores/\d+0$", "parse_store"), ("/stores/", "parse")]
+
+    def parse_store(self, response):
+        pass
+
+
+class ScrapyExampleSpider(ScrapySitemapSpider):
+    name = "scrapy_example"
+    sitemap_follow = ExampleSpider.sitemap_follow
+    sitemap_rules = ExampleSpider.sitemap_rules
+
+    def parse_store(self, response):
+        pass
+
+
+def get_spiders() -> tuple[SitemapSpider, ScrapySitemapSpider]:
+    return (
+        ExampleSpider.from_crawler(get_crawler(ExampleSpider)),
+        ScrapyExampleSpider.from_crawler(get_crawler(ScrapyExampleSpider)),
+    )
+
+
+def requests_made(spider, response) -> list[tuple[str, str]]:
+    return [(request.url, request.callback.__name__) for request in spider._parse_sitemap(response)]
+
+
+def test_streaming_sitemap_entries():
+    sitemap = StreamingSitemap(URLSET[i : i + 100] for i in range(0, len(URLSET), 100))
+    assert sitemap.type == "urlset"
+    assert list(sitemap) == list(Sitemap(URLSET))
+
+
+def test_streaming_sitemap_invalid():
+    assert StreamingSitemap([b"not xml"]).type == ""
+    assert StreamingSitemap([]).type == ""
+
+
+def test_rule_matcher():
+    matcher = RuleMatcher(["/stores/", r"/stores/\d+$", re.compile("STORE", re.IGNORECASE)])
+    assert matcher.combined is not None
+    assert matcher.first("https://example.com/stores/1") == 0
+    assert matcher.first("https://example.com/store") == 2
+    assert matcher.first("https://example.com/products/1") is None
+    assert matcher.matches("https://example.com/stores/1") == [0, 1, 2]
+    assert matcher.matches("https://example.com/products/1") == []
+
+
+def test_rule_matcher_first_in_order():
+    # The later expression matches earlier in the URL.
+    matcher = RuleMatcher(["/b$", "/a/"])
+    assert matcher.first("https://example.com/a/b") == 0
+
+
+def test_rule_matcher_not_combined():
+    matcher = RuleMatcher([r"(\d)\1", "/stores/"])
+    assert matcher.combined is None
+    assert matcher.first("https://example.com/stores/11") == 0
+    assert matcher.first("https://example.com/stores/12") == 1
+    assert matcher.matches("https://example.com/products/12") == []
+    assert RuleMatcher([]).first("https://example.com/") is None
+
+
+def test_parse_urlset_same_as_scrapy():
+    spider, scrapy_spider = get_spiders()
+    response = XmlResponse("https://example.com/sitemap.xml", body=URLSET)
+    requests = requests_made(spider, response)
+    assert requests == requests_made(scrapy_spider, response)
+    assert len(requests) == 334
+    assert requests[0] == ("https://example.com/stores/0", "parse")
+    assert requests[10] == ("https://example.com/stores/30", "parse_store")
+
+
+def test_parse_sitemapindex_same_as_scrapy():
+    spider, scrapy_spider = get_spiders()
+    response = XmlResponse("https://example.com/sitemap.xml", body=SITEMAPINDEX)
+    assert requests_made(spider, response) == requests_made(scrapy_spider, response)
+    assert requests_made(spider, response) == [("https://example.com/sitemap-stores.xml", "_parse_sitemap")]
+
+
+def test_parse_gzip_same_as_scrapy():
+    spider, scrapy_spider = get_spiders()
+    url = "https://example.com/sitemap.xml.gz"
+    for body in [gzip.compress(URLSET), gzip.compress(URLSET)[:5000]]:
+        response = Response(url, body=body, request=Request(url))
+        assert requests_made(spider, response) == requests_made(scrapy_spider, response)
+
+
+def test_parse_gzip_max_size():
+    spider, _ = get_spiders()
+    url = "https://example.com/sitemap.xml.gz"
+    response = Response(url, body=gzip.compress(URLSET), request=Request(url, meta={"download_maxsize": 1000}))
+    assert requests_made(spider, response) == []
+
+
+def test_overridden_sitemap_body():
+    class BodySpider(ExampleSpider):
+        def _get_sitemap_body(self, response):
+            return response.body
+
+    spider = BodySpider.from_crawler(get_crawler(BodySpider))
+    response = Response("https://example.com/sitemap.aspx", body=URLSET, request=Request("https://example.com/"))
+    assert len(requests_made(spider, response)) == 334
@@ -0,0 +1,93 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+from locations.spider_manifest import SpiderManifest
+
+SPIDER_TEMPLATE = """
+from scrapy import Spider
+
+
+class {class_name}(Spider):
+    name = "{name}"
+    custom_settings = {custom_settings}
+"""
+
+
+def write_spider(path, class_name, name, custom_settings=None):
+    path.write_text(SPIDER_TEMPLATE.format(class_name=class_name, name=name, custom_settings=custom_settings))
+
+
+@pytest.fixture
+def spider_package(tmp_path, monkeypatch):
+    package = tmp_path / "manifest_test_spiders"
+    (package / "government").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "government" / "__init__.py").write_text("")
+    write_spider(package / "first.py", "FirstSpider", "first", {"ROBOTSTXT_OBEY": False})
+    (package / "government" / "second.py").write_text(textwrap.dedent("""
+            from scrapy import Spider
+
+            from locations.extensions.add_lineage import Lineage
+
+
+            class SecondSpider(Spider):
+                name = "second"
+                lineage = Lineage.Governments
+            """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for module_name in list(sys.modules):
+        if module_name.startswith("manifest_test_spiders"):
+            del sys.modules[module_name]
+
+
+def test_manifest(spider_package, tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest = SpiderManifest.load(["manifest_test_spiders"], manifest_path)
+
+    assert manifest_path.exists()
+    assert sorted(manifest.names()) == ["first", "second"]
+    assert manifest.get("first")["module"] == "manifest_test_spiders.first"
+    assert manifest.get("first")["class"] == "FirstSpider"
+    assert manifest.get("first")["robots_txt_obey"] is False
+    assert manifest.get("second")["robots_txt_obey"] is True
+    assert manifest.names_in_group("government") == ["second"]
+    assert manifest.names_in_group("brands") == ["first"]
+
+    # Loading again uses the manifest rather than importing any spider.
+    for module_name in list(sys.modules):
+        if module_name.startswith("manifest_test_spiders."):
+            del sys.modules[module_name]
+    manifest = SpiderManifest.load(["manifest_test_spiders"], manifest_path)
+    assert sorted(manifest.names()) == ["first", "second"]
+    assert "manifest_test_spiders.first" not in sys.modules
+
+    # Only the module of the requested spider is imported.
+    assert manifest.load_spider_class("second").__name__ == "SecondSpider"
+    assert "manifest_test_spiders.government.second" in sys.modules
+    assert "manifest_test_spiders.first" not in sys.modules
+    assert manifest.load_spider_class("missing") is None
+
+
+def test_manifest_update(spider_package, tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    SpiderManifest.load(["manifest_test_spiders"], manifest_path)
+
+    write_spider(spider_package / "first.py", "FirstSpider", "renamed")
+    stat = os.stat(spider_package / "first.py")
+    os.utime(spider_package / "first.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (spider_package / "government" / "second.py").unlink()
+    (spider_package / "third.py").write_text(textwrap.dedent("""
+            from scrapy import Spider
+
+
+            class ThirdSpider(Spider):
+                name = "third"
+            """))
+    del sys.modules["manifest_test_spiders.first"]
+
+    manifest = SpiderManifest.load(["manifest_test_spiders"], manifest_path)
+    assert sorted(manifest.names()) == ["renamed", "third"]
@@ -0,0 +1,70 @@
+import json
+
+from ci.build_group_manifest import build_manifest
+from ci.summarise_run import count_lines, summarise_run
+
+
+def test_summarise_run(tmp_path):
+    stats_dir = tmp_path / "stats"
+    stats_dir.mkdir()
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    (stats_dir / "mcdonalds.json").write_text(
+        json.dumps({"item_scraped_count": 2, "log_count/ERROR": 1, "elapsed_time_seconds": 42.5})
+    )
+    (stats_dir / "burger_king.json").write_text(json.dumps({"elapsed_time_seconds": 3.0}))
+    (stats_dir / "wendys.json").write_text("{")
+    (output_dir / "mcdonalds.geojson").write_text('{"type":"FeatureCollection","features":[\n{}\n,{}\n]}\n')
+
+    summary, line_count = summarise_run(
+        ["mcdonalds", "burger_king", "wendys", "kfc"],
+        stats_dir,
+        output_dir,
+        {"mcdonalds": "locations/spiders/mcdonalds.py"},
+        threads=2,
+    )
+
+    assert summary == {
+        "count": 4,
+        # In order of spider name rather than the order the spiders ran.
+        "results": [
+            {"spider": "burger_king", "filename": "", "errors": 0, "features": 0, "elapsed_time": 3.0},
+            {
+                "spider": "mcdonalds",
+                "filename": "locations/spiders/mcdonalds.py",
+                "errors": 1,
+                "features": 2,
+                "elapsed_time": 42.5,
+            },
+            {"spider": "wendys", "filename": "", "errors": 0, "features": 0, "elapsed_time": 0},
+        ],
+    }
+    assert line_count == 4
+
+
+def test_count_lines(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"a\n" * 100_000 + b"no newline")
+
+    assert count_lines(path) == 100_000
+    assert count_lines(tmp_path / "missing.txt") == 0
+
+
+def test_manifest_from_summary(tmp_path):
+    summary, _ = summarise_run(["mcdonalds"], tmp_path)
+    assert summary["results"] == []
+
+    results = [{"spider": "mcdonalds", "filename": "", "errors": 0, "features": 100, "elapsed_time": 42.5}]
+    manifest = build_manifest(
+        group="brands",
+        run_id="2026-04-16-14-00-00",
+        run_url_prefix="https://example.com/runs/brands/2026-04-16-14-00-00",
+        spider_names=["mcdonalds", "burger_king"],
+        stats_dir=None,
+        previous_manifest=None,
+        results=results,
+    )
+
+    assert list(manifest["spiders"]) == ["mcdonalds"]
+    assert manifest["spiders"]["mcdonalds"]["feature_count"] == 100
+    assert manifest["spiders"]["mcdonalds"]["elapsed_time"] == 42.5